@@ -13,6 +13,9 @@ export interface CostByOperation {
   cost: number
   tokens: number
   requests: number
+  prompt_tokens: number
+  cached_tokens: number
+  cache_hit_ratio: number
 }
 
 export interface CostByDay {
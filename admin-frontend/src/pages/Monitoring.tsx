@@ -91,6 +91,13 @@ export default function Monitoring() {
       render: (v: number) => v.toLocaleString(),
       sorter: (a: CostByOperation, b: CostByOperation) => a.tokens - b.tokens,
     },
+    {
+      title: 'Кэш промпта',
+      dataIndex: 'cache_hit_ratio',
+      key: 'cache_hit_ratio',
+      render: (v: number) => `${(v * 100).toFixed(1)}%`,
+      sorter: (a: CostByOperation, b: CostByOperation) => a.cache_hit_ratio - b.cache_hit_ratio,
+    },
     {
       title: 'Стоимость',
       dataIndex: 'cost',
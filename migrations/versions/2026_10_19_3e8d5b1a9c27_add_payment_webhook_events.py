@@ -0,0 +1,74 @@
+"""add_payment_webhook_events
+
+Revision ID: 3e8d5b1a9c27
+Revises: 7a1c9e2f4b60
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3e8d5b1a9c27"
+down_revision: str | None = "7a1c9e2f4b60"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create payment_webhook_events inbox table."""
+    op.create_table(
+        "payment_webhook_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("dedupe_key", sa.String(length=120), nullable=False),
+        sa.Column("event_type", sa.String(length=50), nullable=False),
+        sa.Column("payment_id", sa.String(length=50), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(length=20), server_default="pending", nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("outcome", sa.String(length=50), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_payment_webhook_events")),
+        sa.UniqueConstraint("dedupe_key", name=op.f("uq_payment_webhook_events_dedupe_key")),
+    )
+    op.create_index(
+        op.f("ix_payment_webhook_events_payment_id"),
+        "payment_webhook_events",
+        ["payment_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_payment_webhook_events_status_next_attempt",
+        "payment_webhook_events",
+        ["status", "next_attempt_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop payment_webhook_events inbox table."""
+    op.drop_index(
+        "ix_payment_webhook_events_status_next_attempt", table_name="payment_webhook_events"
+    )
+    op.drop_index(
+        op.f("ix_payment_webhook_events_payment_id"), table_name="payment_webhook_events"
+    )
+    op.drop_table("payment_webhook_events")
@@ -0,0 +1,40 @@
+"""add_telegraph_accounts
+
+Revision ID: 5b9e0c3d7f14
+Revises: c41f7d2e8a93
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b9e0c3d7f14"
+down_revision: str | None = "c41f7d2e8a93"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create telegraph_accounts table for the persisted access token."""
+    op.create_table(
+        "telegraph_accounts",
+        sa.Column("short_name", sa.String(length=32), nullable=False),
+        sa.Column("access_token", sa.String(length=128), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("short_name", name=op.f("pk_telegraph_accounts")),
+    )
+
+
+def downgrade() -> None:
+    """Drop telegraph_accounts table."""
+    op.drop_table("telegraph_accounts")
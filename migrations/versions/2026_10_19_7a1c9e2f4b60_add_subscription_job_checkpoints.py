@@ -0,0 +1,45 @@
+"""add_subscription_job_checkpoints
+
+Revision ID: 7a1c9e2f4b60
+Revises: 12302cba8088
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7a1c9e2f4b60"
+down_revision: str | None = "12302cba8088"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add per-period checkpoints for auto-renew and expiry notification jobs."""
+    op.add_column(
+        "subscriptions",
+        sa.Column("renewal_attempted_for", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "subscriptions",
+        sa.Column("expiry_notified_for", sa.DateTime(timezone=True), nullable=True),
+    )
+    # Composite index for job candidate scans (status + period end window)
+    op.create_index(
+        "ix_subscriptions_status_period_end",
+        "subscriptions",
+        ["status", "current_period_end"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Remove job checkpoint columns."""
+    op.drop_index("ix_subscriptions_status_period_end", table_name="subscriptions")
+    op.drop_column("subscriptions", "expiry_notified_for")
+    op.drop_column("subscriptions", "renewal_attempted_for")
@@ -0,0 +1,57 @@
+"""tarot_history_keyset
+
+Revision ID: 8d2a6f4c1e75
+Revises: 5b9e0c3d7f14
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2a6f4c1e75"
+down_revision: str | None = "5b9e0c3d7f14"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add (user_id, created_at DESC) index and users.tarot_history_count."""
+    op.create_index(
+        "ix_tarot_spreads_user_id_created_at",
+        "tarot_spreads",
+        ["user_id", sa.text("created_at DESC")],
+        unique=False,
+    )
+    # Superseded by the composite index (same leading column)
+    op.drop_index(op.f("ix_tarot_spreads_user_id"), table_name="tarot_spreads")
+
+    op.add_column(
+        "users",
+        sa.Column("tarot_history_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE users
+        SET tarot_history_count = counts.total
+        FROM (
+            SELECT user_id, COUNT(*) AS total
+            FROM tarot_spreads
+            GROUP BY user_id
+        ) AS counts
+        WHERE users.id = counts.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop tarot history counter and composite index."""
+    op.drop_column("users", "tarot_history_count")
+    op.create_index(
+        op.f("ix_tarot_spreads_user_id"), "tarot_spreads", ["user_id"], unique=False
+    )
+    op.drop_index("ix_tarot_spreads_user_id_created_at", table_name="tarot_spreads")
@@ -0,0 +1,60 @@
+"""add_card_of_day_pool
+
+Revision ID: a4c8e2f6b391
+Revises: f2b7d4a9c613
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c8e2f6b391"
+down_revision: str | None = "f2b7d4a9c613"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create card_of_day_interpretations (precomputed variant pool)."""
+    op.create_table(
+        "card_of_day_interpretations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("card_id", sa.String(length=20), nullable=False),
+        sa.Column("is_reversed", sa.Boolean(), nullable=False),
+        sa.Column("pool_date", sa.Date(), nullable=False),
+        sa.Column("variant", sa.SmallInteger(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column(
+            "generated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "card_id",
+            "is_reversed",
+            "pool_date",
+            "variant",
+            name="uq_card_of_day_card_date_variant",
+        ),
+    )
+    op.create_index(
+        "ix_card_of_day_interpretations_pool_date",
+        "card_of_day_interpretations",
+        ["pool_date"],
+    )
+
+
+def downgrade() -> None:
+    """Drop card_of_day_interpretations."""
+    op.drop_index(
+        "ix_card_of_day_interpretations_pool_date",
+        table_name="card_of_day_interpretations",
+    )
+    op.drop_table("card_of_day_interpretations")
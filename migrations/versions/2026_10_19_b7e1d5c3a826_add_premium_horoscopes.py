@@ -0,0 +1,52 @@
+"""add_premium_horoscopes
+
+Revision ID: b7e1d5c3a826
+Revises: a4c8e2f6b391
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e1d5c3a826"
+down_revision: str | None = "a4c8e2f6b391"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create premium_horoscopes (precomputed before notification time)."""
+    op.create_table(
+        "premium_horoscopes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("horoscope_date", sa.Date(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column(
+            "generated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "horoscope_date", name="uq_premium_horoscopes_user_date"
+        ),
+    )
+    op.create_index(
+        "ix_premium_horoscopes_horoscope_date",
+        "premium_horoscopes",
+        ["horoscope_date"],
+    )
+
+
+def downgrade() -> None:
+    """Drop premium_horoscopes."""
+    op.drop_index("ix_premium_horoscopes_horoscope_date", table_name="premium_horoscopes")
+    op.drop_table("premium_horoscopes")
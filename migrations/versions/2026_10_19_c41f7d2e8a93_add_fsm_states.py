@@ -0,0 +1,43 @@
+"""add_fsm_states
+
+Revision ID: c41f7d2e8a93
+Revises: 3e8d5b1a9c27
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41f7d2e8a93"
+down_revision: str | None = "3e8d5b1a9c27"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create fsm_states table for persistent aiogram FSM storage."""
+    op.create_table(
+        "fsm_states",
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("state", sa.String(length=255), nullable=True),
+        sa.Column("data", sa.Text(), server_default="{}", nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("key", name=op.f("pk_fsm_states")),
+    )
+    op.create_index(op.f("ix_fsm_states_updated_at"), "fsm_states", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Drop fsm_states table."""
+    op.drop_index(op.f("ix_fsm_states_updated_at"), table_name="fsm_states")
+    op.drop_table("fsm_states")
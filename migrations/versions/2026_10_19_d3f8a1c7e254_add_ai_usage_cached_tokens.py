@@ -0,0 +1,32 @@
+"""add_ai_usage_cached_tokens
+
+Revision ID: d3f8a1c7e254
+Revises: b7e1d5c3a826
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d3f8a1c7e254"
+down_revision: str | None = "b7e1d5c3a826"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add ai_usage.cached_tokens (prompt tokens served from provider cache)."""
+    op.add_column(
+        "ai_usage",
+        sa.Column("cached_tokens", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Drop ai_usage.cached_tokens."""
+    op.drop_column("ai_usage", "cached_tokens")
@@ -0,0 +1,94 @@
+"""admin_search_indexes
+
+Revision ID: e6a3c9d1b048
+Revises: 8d2a6f4c1e75
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# revision identifiers, used by Alembic.
+revision: str = "e6a3c9d1b048"
+down_revision: str | None = "8d2a6f4c1e75"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+SEARCH_VECTOR_SQL = (
+    "to_tsvector('russian', coalesce({row}question, '') || ' ' "
+    "|| coalesce({row}interpretation, ''))"
+)
+BACKFILL_BATCH = 5000
+
+
+def upgrade() -> None:
+    """Add pg_trgm indexes and tarot_spreads.search_vector for admin search.
+
+    Runs online: no table rewrite and no long ACCESS EXCLUSIVE lock.
+    """
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Nullable column without default: catalog-only change. A trigger keeps
+    # it current; a generated column would rewrite the whole table locked
+    op.add_column(
+        "tarot_spreads",
+        sa.Column("search_vector", TSVECTOR(), nullable=True),
+    )
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION tarot_spreads_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR_SQL.format(row="NEW.")};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tarot_spreads_search_vector_update
+        BEFORE INSERT OR UPDATE OF question, interpretation ON tarot_spreads
+        FOR EACH ROW EXECUTE FUNCTION tarot_spreads_search_vector_update()
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        # Backfill existing rows in short id-range batches (one commit each)
+        bind = op.get_bind()
+        max_id = bind.execute(sa.text("SELECT coalesce(max(id), 0) FROM tarot_spreads")).scalar()
+        for start in range(0, max_id, BACKFILL_BATCH):
+            bind.execute(
+                sa.text(
+                    f"UPDATE tarot_spreads SET search_vector = {SEARCH_VECTOR_SQL.format(row='')} "
+                    "WHERE id > :start AND id <= :end AND search_vector IS NULL"
+                ),
+                {"start": start, "end": start + BACKFILL_BATCH},
+            )
+
+        # GIN builds on large tables run concurrently so the bot keeps writing
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tarot_spreads_question_trgm "
+            "ON tarot_spreads USING gin (question gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tarot_spreads_search_vector "
+            "ON tarot_spreads USING gin (search_vector)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_username_trgm "
+            "ON users USING gin (username gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Drop admin search indexes, trigger and search_vector (extension is kept)."""
+    op.drop_index("ix_users_username_trgm", table_name="users")
+    op.drop_index("ix_tarot_spreads_search_vector", table_name="tarot_spreads")
+    op.drop_index("ix_tarot_spreads_question_trgm", table_name="tarot_spreads")
+    op.execute("DROP TRIGGER IF EXISTS tarot_spreads_search_vector_update ON tarot_spreads")
+    op.execute("DROP FUNCTION IF EXISTS tarot_spreads_search_vector_update()")
+    op.drop_column("tarot_spreads", "search_vector")
@@ -0,0 +1,32 @@
+"""add_admin_token_version
+
+Revision ID: f2b7d4a9c613
+Revises: e6a3c9d1b048
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b7d4a9c613"
+down_revision: str | None = "e6a3c9d1b048"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add admins.token_version for JWT revocation."""
+    op.add_column(
+        "admins",
+        sa.Column("token_version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Drop admins.token_version."""
+    op.drop_column("admins", "token_version")
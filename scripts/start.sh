@@ -0,0 +1,19 @@
+#!/bin/sh
+# Production entrypoint: migrate once, then serve with WEB_CONCURRENCY workers.
+# Scheduler jobs run in a single leader worker (PostgreSQL advisory lock).
+set -e
+
+alembic upgrade head
+
+# Prometheus multiprocess mode: per-worker metric files, aggregated on /metrics.
+# Stale files from a previous run would be summed in, so start clean.
+if [ "${WEB_CONCURRENCY:-1}" -gt 1 ]; then
+    export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
+exec uvicorn src.main:app \
+    --host 0.0.0.0 \
+    --port "${PORT:-8000}" \
+    --workers "${WEB_CONCURRENCY:-1}"
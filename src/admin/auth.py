@@ -1,10 +1,12 @@
+import time
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.admin.models import Admin
@@ -45,33 +47,123 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return jwt.encode(to_encode, settings.admin_jwt_secret, algorithm=ALGORITHM)
 
 
-async def get_current_admin(
-    token: str = Depends(oauth2_scheme),
-    session: AsyncSession = Depends(get_session),
-) -> Admin:
-    """Get current admin from JWT token."""
-    credentials_exception = HTTPException(
+@dataclass(frozen=True, slots=True)
+class AdminIdentity:
+    """Authenticated admin, cached between requests."""
+
+    id: int
+    username: str
+    is_active: bool
+    token_version: int
+
+
+# Identity cache: authenticated requests normally skip both JWT decoding and
+# the admins query.
+# - _token_claims: token -> (username, token version, exp timestamp), kept
+#   until the token expires.
+# - _admin_states: username -> (identity, loaded_at), rechecked from the DB
+#   every ADMIN_STATE_TTL seconds, so a version bump or deactivation made by
+#   another process applies within that window (immediately in this one).
+ADMIN_STATE_TTL = 60.0
+MAX_CACHED_TOKENS = 1024
+
+_token_claims: dict[str, tuple[str, int, float]] = {}
+_admin_states: dict[str, tuple[AdminIdentity, float]] = {}
+
+
+def _credentials_exception(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
+        detail=detail,
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_token(token: str) -> tuple[str, int]:
+    """Return (username, token version) for token, decoding it once."""
+    now = time.time()
+    claims = _token_claims.get(token)
+    if claims is not None:
+        username, version, expires_at = claims
+        if now < expires_at:
+            return username, version
+        del _token_claims[token]
+        raise _credentials_exception()
+
     try:
         payload = jwt.decode(token, settings.admin_jwt_secret, algorithms=[ALGORITHM])
-        username: str | None = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    username: str | None = payload.get("sub")
+    if username is None:
+        raise _credentials_exception()
+    version = int(payload.get("ver", 0))
 
-    result = await session.execute(select(Admin).where(Admin.username == username))
-    admin = result.scalar_one_or_none()
+    if len(_token_claims) >= MAX_CACHED_TOKENS:
+        for key in [k for k, (_, _, exp) in _token_claims.items() if exp <= now]:
+            del _token_claims[key]
+        if len(_token_claims) >= MAX_CACHED_TOKENS:
+            _token_claims.clear()
+    _token_claims[token] = (username, version, float(payload.get("exp", now)))
+    return username, version
 
-    if admin is None:
-        raise credentials_exception
-    if not admin.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Admin account is disabled",
-            headers={"WWW-Authenticate": "Bearer"},
+
+async def _load_admin_state(session: AsyncSession, username: str) -> AdminIdentity | None:
+    cached = _admin_states.get(username)
+    if cached is not None and time.monotonic() - cached[1] < ADMIN_STATE_TTL:
+        return cached[0]
+
+    result = await session.execute(
+        select(Admin.id, Admin.username, Admin.is_active, Admin.token_version).where(
+            Admin.username == username
         )
+    )
+    row = result.one_or_none()
+    if row is None:
+        _admin_states.pop(username, None)
+        return None
+
+    identity = AdminIdentity(
+        id=row.id,
+        username=row.username,
+        is_active=row.is_active,
+        token_version=row.token_version,
+    )
+    _admin_states[username] = (identity, time.monotonic())
+    return identity
+
+
+async def get_current_admin(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_session),
+) -> AdminIdentity:
+    """Get current admin from JWT token.
+
+    ``session`` is the route's own request session (FastAPI caches the
+    dependency per request) and is only used when the admin state cache
+    needs a refresh.
+    """
+    username, version = _decode_token(token)
+
+    admin = await _load_admin_state(session, username)
+    if admin is None or admin.token_version != version:
+        raise _credentials_exception()
+    if not admin.is_active:
+        raise _credentials_exception("Admin account is disabled")
     return admin
+
+
+async def revoke_admin_tokens(session: AsyncSession, admin_id: int) -> None:
+    """Invalidate every token issued to admin (bumps token_version)."""
+    result = await session.execute(
+        update(Admin)
+        .where(Admin.id == admin_id)
+        .values(token_version=Admin.token_version + 1)
+        .returning(Admin.username)
+    )
+    username = result.scalar_one_or_none()
+    # Commit before dropping the cached state so a concurrent request
+    # cannot re-cache the old version
+    await session.commit()
+    if username is not None:
+        _admin_states.pop(username, None)
@@ -1,12 +1,22 @@
+import time
+from collections.abc import Callable, Coroutine
 from datetime import datetime, timedelta
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
 from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.admin.auth import create_access_token, get_current_admin, verify_password
+from src.admin.auth import (
+    AdminIdentity,
+    create_access_token,
+    get_current_admin,
+    revoke_admin_tokens,
+    verify_password,
+)
 from src.admin.models import Admin
 from src.admin.schemas import (
     AdminInfo,
@@ -31,6 +41,7 @@ from src.admin.schemas import (
     SubscriptionListResponse,
     TarotSpreadDetail,
     TarotSpreadListResponse,
+    TarotSpreadSearchResponse,
     Token,
     UpdateHoroscopeContentRequest,
     UpdatePromoCodeRequest,
@@ -38,6 +49,7 @@ from src.admin.schemas import (
     UpdateSubscriptionStatusRequest,
     UserDetail,
     UserListResponse,
+    UserSearchResponse,
     UTMAnalyticsResponse,
 )
 from src.admin.services.monitoring import get_monitoring_data
@@ -76,6 +88,7 @@ from src.admin.services.messaging import (
     get_message_history,
     send_or_schedule_message,
 )
+from src.admin.services.search import search_spreads, search_users
 from src.admin.services.spreads import get_spread_detail, get_spreads
 from src.admin.services.users import (
     bulk_action,
@@ -86,8 +99,29 @@ from src.admin.services.users import (
 )
 from src.config import settings
 from src.db.engine import get_session
+from src.monitoring.metrics import ADMIN_REQUEST_DURATION
+
+
+class TimedRoute(APIRoute):
+    """APIRoute recording request latency per endpoint template."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        histogram = ADMIN_REQUEST_DURATION.labels(
+            endpoint=self.path_format, method=",".join(sorted(self.methods))
+        )
+
+        async def timed_handler(request: Request) -> Response:
+            start = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                histogram.observe(time.perf_counter() - start)
 
-admin_router = APIRouter(prefix="/admin/api", tags=["admin"])
+        return timed_handler
+
+
+admin_router = APIRouter(prefix="/admin/api", tags=["admin"], route_class=TimedRoute)
 
 
 @admin_router.post("/token", response_model=Token)
@@ -116,14 +150,24 @@ async def login(
         )
 
     access_token = create_access_token(
-        data={"sub": admin.username},
+        data={"sub": admin.username, "ver": admin.token_version},
         expires_delta=timedelta(minutes=settings.admin_jwt_expire_minutes),
     )
     return Token(access_token=access_token)
 
 
+@admin_router.post("/logout")
+async def logout(
+    session: AsyncSession = Depends(get_session),
+    current_admin: AdminIdentity = Depends(get_current_admin),
+) -> dict:
+    """Revoke all tokens of current admin (logout everywhere)."""
+    await revoke_admin_tokens(session, current_admin.id)
+    return {"status": "ok"}
+
+
 @admin_router.get("/me", response_model=AdminInfo)
-async def get_me(current_admin: Admin = Depends(get_current_admin)) -> AdminInfo:
+async def get_me(current_admin: AdminIdentity = Depends(get_current_admin)) -> AdminInfo:
     """Get current admin info."""
     return AdminInfo.model_validate(current_admin)
 
@@ -134,7 +178,7 @@ async def get_me(current_admin: Admin = Depends(get_current_admin)) -> AdminInfo
 @admin_router.get("/dashboard", response_model=DashboardMetrics)
 async def dashboard(
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> DashboardMetrics:
     """Get dashboard KPI metrics."""
     return await get_dashboard_metrics(session)
@@ -144,7 +188,7 @@ async def dashboard(
 async def funnel(
     days: int = Query(30, ge=1, le=365),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> FunnelData:
     """Get conversion funnel data."""
     return await get_funnel_data(session, days)
@@ -164,7 +208,7 @@ async def users_list(
     sort_by: str = Query("created_at"),
     sort_order: str = Query("desc"),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> UserListResponse:
     """List users with filters and pagination."""
     return await list_users(
@@ -180,11 +224,26 @@ async def users_list(
     )
 
 
+@admin_router.get("/users/search", response_model=UserSearchResponse)
+async def users_search(
+    q: str = Query(..., min_length=1, description="Username substring or telegram_id"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor from previous page"),
+    session: AsyncSession = Depends(get_session),
+    current_admin: AdminIdentity = Depends(get_current_admin),
+) -> UserSearchResponse:
+    """Search users, best match first, with keyset paging."""
+    try:
+        return await search_users(session, q, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @admin_router.get("/users/{user_id}", response_model=UserDetail)
 async def user_detail(
     user_id: int = Path(...),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> UserDetail:
     """Get detailed user info."""
     user = await get_user_detail(session, user_id)
@@ -198,7 +257,7 @@ async def update_subscription(
     user_id: int = Path(...),
     request: UpdateSubscriptionRequest = ...,
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> dict[str, str]:
     """Update user subscription (activate/cancel/extend)."""
     success = await update_user_subscription(session, user_id, request)
@@ -212,7 +271,7 @@ async def gift_user(
     user_id: int = Path(...),
     request: GiftRequest = ...,
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> dict[str, str]:
     """Give gift to user (premium days, detailed natal, spreads)."""
     success = await gift_to_user(session, user_id, request)
@@ -225,7 +284,7 @@ async def gift_user(
 async def users_bulk_action(
     request: BulkActionRequest,
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> BulkActionResponse:
     """Perform bulk action on multiple users."""
     return await bulk_action(session, request)
@@ -241,7 +300,7 @@ async def payments_list(
     status: str | None = Query(None),
     user_search: str | None = Query(None),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> PaymentListResponse:
     """List payments with filters and pagination."""
     return await list_payments(
@@ -261,7 +320,7 @@ async def subscriptions_list(
     plan: str | None = Query(None),
     user_search: str | None = Query(None),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> SubscriptionListResponse:
     """List subscriptions with filters and pagination."""
     return await list_subscriptions(
@@ -279,7 +338,7 @@ async def update_sub_status(
     subscription_id: int = Path(...),
     request: UpdateSubscriptionStatusRequest = ...,
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> dict[str, str]:
     """Update subscription status."""
     success = await update_subscription_status(session, subscription_id, request)
@@ -301,7 +360,7 @@ async def list_tarot_spreads(
     date_from: datetime | None = Query(None),
     date_to: datetime | None = Query(None),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> TarotSpreadListResponse:
     """Get tarot spreads with filters."""
     return await get_spreads(
@@ -316,11 +375,40 @@ async def list_tarot_spreads(
     )
 
 
+@admin_router.get("/tarot-spreads/search", response_model=TarotSpreadSearchResponse)
+async def search_tarot_spreads(
+    q: str = Query(..., min_length=1),
+    mode: Literal["trigram", "fulltext"] = Query(
+        "trigram",
+        description="trigram: substring in question; fulltext: words in question and interpretation",
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor from previous page"),
+    user_id: int | None = Query(None),
+    spread_type: str | None = Query(None),
+    session: AsyncSession = Depends(get_session),
+    current_admin: AdminIdentity = Depends(get_current_admin),
+) -> TarotSpreadSearchResponse:
+    """Search tarot spreads, best match first, with keyset paging."""
+    try:
+        return await search_spreads(
+            session,
+            q,
+            mode=mode,
+            limit=limit,
+            cursor=cursor,
+            user_id=user_id,
+            spread_type=spread_type,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @admin_router.get("/tarot-spreads/{spread_id}", response_model=TarotSpreadDetail)
 async def get_tarot_spread(
     spread_id: int = Path(...),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> TarotSpreadDetail:
     """Get detailed spread info with cards and interpretation."""
     spread = await get_spread_detail(session, spread_id)
@@ -336,7 +424,7 @@ async def get_tarot_spread(
 async def send_message(
     request: SendMessageRequest,
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> SendMessageResponse:
     """Send or schedule a message."""
     return await send_or_schedule_message(session, request, current_admin.id)
@@ -347,7 +435,7 @@ async def messages_history(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> MessageHistoryResponse:
     """Get message history."""
     return await get_message_history(session, page, page_size)
@@ -357,7 +445,7 @@ async def messages_history(
 async def cancel_message(
     message_id: int = Path(...),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> dict[str, str]:
     """Cancel a scheduled message."""
     success = await cancel_scheduled_message(session, message_id)
@@ -372,7 +460,7 @@ async def cancel_message(
 @admin_router.get("/content/horoscopes", response_model=HoroscopeContentListResponse)
 async def list_horoscope_content(
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> HoroscopeContentListResponse:
     """Get horoscope content for all zodiac signs."""
     return await get_all_horoscope_content(session)
@@ -384,7 +472,7 @@ async def list_horoscope_content(
 async def get_content_by_sign(
     zodiac_sign: str = Path(...),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> HoroscopeContentItem:
     """Get horoscope content for specific zodiac sign."""
     content = await get_horoscope_content(session, zodiac_sign)
@@ -400,7 +488,7 @@ async def update_content_by_sign(
     request: UpdateHoroscopeContentRequest,
     zodiac_sign: str = Path(...),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> HoroscopeContentItem:
     """Update horoscope content for specific zodiac sign."""
     content = await update_horoscope_content(
@@ -416,7 +504,7 @@ async def update_content_by_sign(
 async def create_promo(
     request: CreatePromoCodeRequest,
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> PromoCodeListItem:
     """Create a new promo code."""
     try:
@@ -432,7 +520,7 @@ async def promo_list(
     page_size: int = Query(20, ge=1, le=100),
     is_active: bool | None = Query(None),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> PromoCodeListResponse:
     """List promo codes."""
     return await list_promo_codes(session, page, page_size, is_active)
@@ -443,7 +531,7 @@ async def update_promo(
     promo_id: int = Path(...),
     request: UpdatePromoCodeRequest = ...,
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> dict[str, str]:
     """Update a promo code."""
     success = await update_promo_code(session, promo_id, request)
@@ -456,7 +544,7 @@ async def update_promo(
 async def delete_promo(
     promo_id: int = Path(...),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> dict[str, str]:
     """Delete a promo code."""
     success = await delete_promo_code(session, promo_id)
@@ -474,7 +562,7 @@ async def export_users(
     is_premium: bool | None = Query(None),
     has_detailed_natal: bool | None = Query(None),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> StreamingResponse:
     """Export users to CSV."""
     stream = await export_users_csv(
@@ -494,7 +582,7 @@ async def export_users(
 async def export_payments(
     status: str | None = Query(None),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> StreamingResponse:
     """Export payments to CSV."""
     stream = await export_payments_csv(session, status=status)
@@ -509,7 +597,7 @@ async def export_payments(
 async def export_metrics(
     days: int = Query(30, ge=1, le=365),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> StreamingResponse:
     """Export daily metrics to CSV."""
     stream = await export_metrics_csv(session, days=days)
@@ -527,7 +615,7 @@ async def export_metrics(
 async def create_exp(
     request: CreateExperimentRequest,
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> ExperimentListItem:
     """Create a new A/B experiment."""
     exp = await create_experiment(session, request)
@@ -539,7 +627,7 @@ async def list_exps(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> dict:
     """List all experiments."""
     experiments, total = await list_experiments(session, page, page_size)
@@ -555,7 +643,7 @@ async def list_exps(
 async def start_exp(
     experiment_id: int = Path(...),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> dict[str, str]:
     """Start an experiment."""
     success = await start_experiment(session, experiment_id)
@@ -568,7 +656,7 @@ async def start_exp(
 async def stop_exp(
     experiment_id: int = Path(...),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> dict[str, str]:
     """Stop an experiment."""
     success = await stop_experiment(session, experiment_id)
@@ -581,7 +669,7 @@ async def stop_exp(
 async def exp_results(
     experiment_id: int = Path(...),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> ExperimentResults:
     """Get experiment results."""
     results = await get_experiment_results(session, experiment_id)
@@ -593,7 +681,7 @@ async def exp_results(
 @admin_router.get("/utm-analytics", response_model=UTMAnalyticsResponse)
 async def utm_analytics(
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> UTMAnalyticsResponse:
     """Get UTM source analytics."""
     return await get_utm_analytics(session)
@@ -606,7 +694,7 @@ async def utm_analytics(
 async def monitoring_dashboard(
     range: str = Query("7d", pattern="^(24h|7d|30d)$", description="Time range"),
     session: AsyncSession = Depends(get_session),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminIdentity = Depends(get_current_admin),
 ) -> MonitoringResponse:
     """Get monitoring dashboard data.
 
@@ -51,6 +51,19 @@ class UserListResponse(BaseModel):
     pages: int
 
 
+class UserSearchItem(UserListItem):
+    """Ranked user search hit."""
+
+    rank: float
+
+
+class UserSearchResponse(BaseModel):
+    """Ranked user search results (keyset paging via next_cursor)."""
+
+    items: list[UserSearchItem]
+    next_cursor: str | None = None
+
+
 class PaymentHistoryItem(BaseModel):
     """Payment item in user detail."""
 
@@ -353,6 +366,19 @@ class TarotSpreadListResponse(BaseModel):
     page_size: int
 
 
+class TarotSpreadSearchItem(TarotSpreadListItem):
+    """Ranked tarot spread search hit."""
+
+    rank: float
+
+
+class TarotSpreadSearchResponse(BaseModel):
+    """Ranked tarot spread search results (keyset paging via next_cursor)."""
+
+    items: list[TarotSpreadSearchItem]
+    next_cursor: str | None = None
+
+
 class CardPosition(BaseModel):
     """Card position in spread detail."""
 
@@ -537,6 +563,9 @@ class CostByOperation(BaseModel):
     cost: float
     tokens: int
     requests: int
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    cache_hit_ratio: float = 0.0  # cached_tokens / prompt_tokens
 
 
 class CostByDay(BaseModel):
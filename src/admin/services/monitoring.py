@@ -68,7 +68,8 @@ async def get_api_costs_data(
     Returns dict with:
     - total_cost: float
     - total_tokens: int
-    - by_operation: list of {operation, cost, tokens, requests}
+    - by_operation: list of {operation, cost, tokens, requests, prompt_tokens,
+      cached_tokens, cache_hit_ratio}
     - by_day: list of {date, cost, tokens}
     """
     range_start = get_time_range_start(range_type)
@@ -91,6 +92,8 @@ async def get_api_costs_data(
             func.coalesce(func.sum(AIUsage.cost_dollars), 0).label("cost"),
             func.coalesce(func.sum(AIUsage.total_tokens), 0).label("tokens"),
             func.count(AIUsage.id).label("requests"),
+            func.coalesce(func.sum(AIUsage.prompt_tokens), 0).label("prompt_tokens"),
+            func.coalesce(func.sum(AIUsage.cached_tokens), 0).label("cached_tokens"),
         )
         .where(AIUsage.created_at >= range_start)
         .group_by(AIUsage.operation)
@@ -103,6 +106,12 @@ async def get_api_costs_data(
             "cost": float(row.cost),
             "tokens": int(row.tokens),
             "requests": int(row.requests),
+            "prompt_tokens": int(row.prompt_tokens),
+            "cached_tokens": int(row.cached_tokens),
+            # Share of prompt tokens served from the provider prompt cache
+            "cache_hit_ratio": (
+                int(row.cached_tokens) / int(row.prompt_tokens) if row.prompt_tokens else 0.0
+            ),
         }
         for row in by_operation_result.all()
     ]
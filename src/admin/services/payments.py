@@ -12,6 +12,7 @@ from src.admin.schemas import (
     SubscriptionListResponse,
     UpdateSubscriptionStatusRequest,
 )
+from src.admin.services.search import ilike_contains
 from src.db.models.payment import Payment
 from src.db.models.subscription import Subscription
 from src.db.models.user import User
@@ -43,7 +44,7 @@ async def list_payments(
         if user_search.isdigit():
             conditions.append(User.telegram_id == int(user_search))
         else:
-            conditions.append(User.username.ilike(f"%{user_search}%"))
+            conditions.append(ilike_contains(User.username, user_search))
 
     if date_from:
         conditions.append(Payment.created_at >= date_from)
@@ -139,7 +140,7 @@ async def list_subscriptions(
         if user_search.isdigit():
             conditions.append(User.telegram_id == int(user_search))
         else:
-            conditions.append(User.username.ilike(f"%{user_search}%"))
+            conditions.append(ilike_contains(User.username, user_search))
 
     # Apply filters
     for condition in conditions:
@@ -0,0 +1,160 @@
+"""Ranked admin search over tarot spreads and users.
+
+Backed by PostgreSQL indexes (migration e6a3c9d1b048):
+- pg_trgm GIN on tarot_spreads.question and users.username, so
+  ``ILIKE '%term%'`` is an index scan instead of a sequential scan;
+  trigram hits are ranked by ``similarity()``.
+- Trigger-maintained ``tarot_spreads.search_vector`` (question +
+  interpretation, Russian stemming) with a GIN index for full-text mode, ranked by
+  ``ts_rank_cd``.
+
+Ranking can't use the GIN indexes, so it is applied to a bounded
+candidate set: the newest ``SEARCH_CANDIDATES`` matches (found via the
+index). Rare terms rank every match; common terms rank only the newest
+ones, which keeps each page's cost bounded.
+
+Results are paged by keyset on (rank, id) - an opaque cursor carries the
+last row's rank and id, so deep pages cost the same as the first one.
+"""
+
+from typing import Literal
+
+from sqlalchemy import ColumnElement, Float, cast, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from src.admin.schemas import (
+    TarotSpreadSearchItem,
+    TarotSpreadSearchResponse,
+    UserListItem,
+    UserSearchItem,
+    UserSearchResponse,
+)
+from src.db.models.tarot_spread import TarotSpread
+from src.db.models.user import User
+
+SearchMode = Literal["trigram", "fulltext"]
+
+# Matches ranked per query (newest first)
+SEARCH_CANDIDATES = 1000
+
+
+def ilike_contains(column: InstrumentedAttribute, term: str) -> ColumnElement[bool]:
+    """Case-insensitive substring match with LIKE wildcards escaped."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return column.ilike(f"%{escaped}%", escape="\\")
+
+
+def encode_cursor(rank: float, row_id: int) -> str:
+    """Opaque keyset cursor for (rank, id)."""
+    return f"{rank!r}:{row_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    """Parse cursor from encode_cursor.
+
+    Raises:
+        ValueError: If cursor is malformed
+    """
+    rank, _, row_id = cursor.rpartition(":")
+    return float(rank), int(row_id)
+
+
+async def search_spreads(
+    session: AsyncSession,
+    query: str,
+    mode: SearchMode = "trigram",
+    limit: int = 20,
+    cursor: str | None = None,
+    user_id: int | None = None,
+    spread_type: str | None = None,
+) -> TarotSpreadSearchResponse:
+    """Search spreads by question substring or full text, best match first.
+
+    Raises:
+        ValueError: If cursor is malformed
+    """
+    if mode == "fulltext":
+        ts_query = func.websearch_to_tsquery("russian", query)
+        match = TarotSpread.search_vector.op("@@")(ts_query)
+        rank = cast(func.ts_rank_cd(TarotSpread.search_vector, ts_query), Float)
+    else:
+        match = ilike_contains(TarotSpread.question, query)
+        rank = cast(func.similarity(TarotSpread.question, query), Float)
+
+    candidates = select(TarotSpread.id).where(match)
+    if user_id:
+        candidates = candidates.where(TarotSpread.user_id == user_id)
+    if spread_type:
+        candidates = candidates.where(TarotSpread.spread_type == spread_type)
+    candidates = candidates.order_by(TarotSpread.id.desc()).limit(SEARCH_CANDIDATES)
+
+    stmt = (
+        select(
+            TarotSpread.id,
+            TarotSpread.user_id,
+            User.telegram_id,
+            User.username,
+            TarotSpread.spread_type,
+            TarotSpread.question,
+            TarotSpread.created_at,
+            rank.label("rank"),
+        )
+        .join(User, TarotSpread.user_id == User.id)
+        .where(TarotSpread.id.in_(candidates))
+        .order_by(rank.desc(), TarotSpread.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        stmt = stmt.where(tuple_(rank, TarotSpread.id) < tuple_(*decode_cursor(cursor)))
+
+    rows = (await session.execute(stmt)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = [TarotSpreadSearchItem.model_validate(row._asdict()) for row in rows]
+    next_cursor = encode_cursor(rows[-1].rank, rows[-1].id) if has_more else None
+    return TarotSpreadSearchResponse(items=items, next_cursor=next_cursor)
+
+
+async def search_users(
+    session: AsyncSession,
+    query: str,
+    limit: int = 20,
+    cursor: str | None = None,
+) -> UserSearchResponse:
+    """Search users by username substring (or exact telegram_id), best match first.
+
+    Raises:
+        ValueError: If cursor is malformed
+    """
+    if query.isdigit():
+        match = User.telegram_id == int(query)
+        rank = cast(1.0, Float)
+    else:
+        match = ilike_contains(User.username, query)
+        rank = cast(func.similarity(User.username, query), Float)
+
+    candidates = select(User.id).where(match).order_by(User.id.desc()).limit(SEARCH_CANDIDATES)
+    stmt = (
+        select(User, rank.label("rank"))
+        .where(User.id.in_(candidates))
+        .order_by(rank.desc(), User.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        stmt = stmt.where(tuple_(rank, User.id) < tuple_(*decode_cursor(cursor)))
+
+    rows = (await session.execute(stmt)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = [
+        UserSearchItem(**UserListItem.model_validate(user).model_dump(), rank=user_rank)
+        for user, user_rank in rows
+    ]
+    next_cursor = None
+    if has_more:
+        last_user, last_rank = rows[-1]
+        next_cursor = encode_cursor(last_rank, last_user.id)
+    return UserSearchResponse(items=items, next_cursor=next_cursor)
@@ -4,6 +4,7 @@ from datetime import datetime
 
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
 from src.admin.schemas import (
     CardPosition,
@@ -11,6 +12,7 @@ from src.admin.schemas import (
     TarotSpreadListItem,
     TarotSpreadListResponse,
 )
+from src.admin.services.search import ilike_contains
 from src.bot.utils.tarot_cards import get_card_by_id
 from src.bot.utils.tarot_formatting import CELTIC_CROSS_POSITIONS, SPREAD_POSITIONS
 from src.db.models.tarot_spread import TarotSpread
@@ -28,45 +30,28 @@ async def get_spreads(
     date_to: datetime | None = None,
 ) -> TarotSpreadListResponse:
     """Get tarot spreads with filters and pagination."""
-    # Base query with user join
-    query = (
-        select(TarotSpread, User.telegram_id, User.username)
-        .join(User, TarotSpread.user_id == User.id)
-        .order_by(TarotSpread.created_at.desc())
-    )
-
-    # Apply filters
+    # Build filter conditions (shared by rows and count)
+    conditions = []
     if user_id:
-        query = query.where(TarotSpread.user_id == user_id)
-
+        conditions.append(TarotSpread.user_id == user_id)
     if spread_type:
-        query = query.where(TarotSpread.spread_type == spread_type)
-
+        conditions.append(TarotSpread.spread_type == spread_type)
     if search:
-        # Search in question text
-        query = query.where(TarotSpread.question.ilike(f"%{search}%"))
-
+        # Substring in question text (pg_trgm index)
+        conditions.append(ilike_contains(TarotSpread.question, search))
     if date_from:
-        query = query.where(TarotSpread.created_at >= date_from)
-
+        conditions.append(TarotSpread.created_at >= date_from)
     if date_to:
-        query = query.where(TarotSpread.created_at <= date_to)
+        conditions.append(TarotSpread.created_at <= date_to)
 
-    # Build count query with same filters
-    count_query = select(func.count(TarotSpread.id)).join(
-        User, TarotSpread.user_id == User.id
+    query = (
+        select(TarotSpread, User.telegram_id, User.username)
+        .join(User, TarotSpread.user_id == User.id)
+        .where(*conditions)
+        .order_by(TarotSpread.created_at.desc())
     )
-
-    if user_id:
-        count_query = count_query.where(TarotSpread.user_id == user_id)
-    if spread_type:
-        count_query = count_query.where(TarotSpread.spread_type == spread_type)
-    if search:
-        count_query = count_query.where(TarotSpread.question.ilike(f"%{search}%"))
-    if date_from:
-        count_query = count_query.where(TarotSpread.created_at >= date_from)
-    if date_to:
-        count_query = count_query.where(TarotSpread.created_at <= date_to)
+    # Filters only touch tarot_spreads, so the count skips the user join
+    count_query = select(func.count(TarotSpread.id)).where(*conditions)
 
     total = await session.scalar(count_query) or 0
 
@@ -102,7 +87,11 @@ async def get_spread_detail(
 ) -> TarotSpreadDetail | None:
     """Get detailed spread info including cards and interpretation."""
     # Get spread
-    query = select(TarotSpread).where(TarotSpread.id == spread_id)
+    query = (
+        select(TarotSpread)
+        .where(TarotSpread.id == spread_id)
+        .options(undefer(TarotSpread.interpretation))
+    )
     result = await session.execute(query)
     spread = result.scalar_one_or_none()
 
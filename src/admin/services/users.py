@@ -17,6 +17,7 @@ from src.admin.schemas import (
     UserListItem,
     UserListResponse,
 )
+from src.admin.services.search import ilike_contains
 from src.db.models.payment import Payment
 from src.db.models.subscription import Subscription
 from src.db.models.tarot_spread import TarotSpread
@@ -42,7 +43,7 @@ async def list_users(
         if search.isdigit():
             query = query.where(User.telegram_id == int(search))
         else:
-            query = query.where(User.username.ilike(f"%{search}%"))
+            query = query.where(ilike_contains(User.username, search))
 
     # Zodiac filter
     if zodiac_sign:
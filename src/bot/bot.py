@@ -1,6 +1,7 @@
 """Bot and Dispatcher instances."""
 
 from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.memory import MemoryStorage
 
 from src.bot.handlers import (
@@ -20,7 +21,22 @@ from src.config import settings
 # Bot created lazily - token validated only when token is present
 # Empty token is allowed for local development without Telegram
 bot: Bot | None = None
-dp = Dispatcher(storage=MemoryStorage())
+
+
+def _create_storage() -> BaseStorage:
+    """FSM storage: PostgreSQL (shared, survives deploys) or in-memory for local dev."""
+    if settings.fsm_storage == "memory":
+        return MemoryStorage()
+
+    from src.bot.fsm_storage import PostgresFSMStorage
+
+    # Clean cache reads are only safe while one process serves the webhook
+    if settings.web_concurrency > 1:
+        return PostgresFSMStorage(cache_ttl=0)
+    return PostgresFSMStorage(cache_ttl=settings.fsm_cache_ttl)
+
+
+dp = Dispatcher(storage=_create_storage())
 
 # Register routers (order matters: start -> menu -> subscription -> horoscope -> natal -> astrologer_chat -> tarot -> birth_data -> profile_settings -> common)
 dp.include_routers(
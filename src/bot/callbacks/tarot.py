@@ -33,7 +33,8 @@ class HistoryAction(str, Enum):
 
     LIST = "l"  # Список раскладов
     VIEW = "v"  # Просмотр расклада
-    PAGE = "p"  # Пагинация
+    PAGE = "p"  # Следующая страница (старше anchor)
+    PAGE_BACK = "b"  # Предыдущая страница (новее anchor)
 
 
 class HistoryCallback(CallbackData, prefix="h"):
@@ -45,5 +46,5 @@ class HistoryCallback(CallbackData, prefix="h"):
     """
 
     a: HistoryAction  # action
-    i: int | None = None  # spread_id (for VIEW)
+    i: int | None = None  # spread_id (for VIEW; keyset anchor for PAGE/PAGE_BACK)
     p: int | None = None  # page (for PAGE)
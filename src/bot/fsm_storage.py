@@ -0,0 +1,283 @@
+"""PostgreSQL-backed aiogram FSM storage with write-behind cache.
+
+Keeps FSM state (birth data entry, tarot questions, astrologer chat) across
+deploys and shares it between bot instances behind the webhook.
+
+Design:
+- Reads: served from an in-process cache; clean entries are trusted for
+  ``cache_ttl`` seconds, then re-read from PostgreSQL (another replica may
+  have handled the user's last update). Own unflushed writes are always
+  served from cache.
+- Writes: update the cache and mark the key dirty. A background flusher
+  persists all dirty keys every FLUSH_INTERVAL seconds in one batch UPSERT
+  (and one DELETE for cleared keys).
+- Cleanup: rows not updated for STATE_TTL are purged periodically.
+
+Consistency is per process: another process sees a write only after it is
+flushed (up to FLUSH_INTERVAL) and, if it holds a clean entry for the key,
+after that entry expires (up to ``cache_ttl``). A write based on such a
+stale read overwrites the newer state. When updates of one chat can reach
+several processes (WEB_CONCURRENCY > 1 or several replicas), run with
+``cache_ttl=0`` so clean reads always go to PostgreSQL and the window
+shrinks to the flush interval.
+"""
+
+import asyncio
+import json
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from datetime import time as dt_time
+from typing import Any
+
+import structlog
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+
+from src.db.engine import AsyncSessionLocal
+from src.db.models.fsm_state import FSMState
+
+logger = structlog.get_logger()
+
+FLUSH_INTERVAL = 0.5  # seconds between write-behind batches
+CACHE_TTL = 2.0  # seconds a clean cache entry is trusted without DB read
+STATE_TTL = timedelta(days=7)  # abandoned flows are purged after this
+CLEANUP_INTERVAL = 3600  # seconds between TTL cleanups
+
+
+def _encode_default(value: Any) -> Any:
+    """JSON-encode date/time values stored by handlers (e.g. birth_time)."""
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, dt_time):
+        return {"__time__": value.isoformat()}
+    raise TypeError(f"Unsupported FSM data type: {type(value).__name__}")
+
+
+def _decode_hook(obj: dict) -> Any:
+    """Restore values tagged by _encode_default."""
+    if len(obj) == 1:
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if "__date__" in obj:
+            return date.fromisoformat(obj["__date__"])
+        if "__time__" in obj:
+            return dt_time.fromisoformat(obj["__time__"])
+    return obj
+
+
+def encode_data(data: Mapping[str, Any]) -> str:
+    """Serialize FSM data to JSON text."""
+    return json.dumps(dict(data), default=_encode_default, ensure_ascii=False)
+
+
+def decode_data(raw: str | None) -> dict[str, Any]:
+    """Deserialize FSM data from JSON text."""
+    if not raw:
+        return {}
+    return json.loads(raw, object_hook=_decode_hook)
+
+
+def build_key(key: StorageKey) -> str:
+    """Flatten aiogram StorageKey into a primary key string."""
+    return ":".join(
+        str(part) if part is not None else ""
+        for part in (
+            key.bot_id,
+            key.chat_id,
+            key.user_id,
+            key.thread_id,
+            getattr(key, "business_connection_id", None),
+            key.destiny,
+        )
+    )
+
+
+@dataclass
+class _Entry:
+    state: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+    loaded_at: float = 0.0
+    dirty: bool = False
+
+
+class PostgresFSMStorage(BaseStorage):
+    """aiogram BaseStorage on PostgreSQL with write-behind batching."""
+
+    def __init__(
+        self,
+        flush_interval: float = FLUSH_INTERVAL,
+        cache_ttl: float = CACHE_TTL,
+        state_ttl: timedelta = STATE_TTL,
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.cache_ttl = cache_ttl
+        self.state_ttl = state_ttl
+
+        self._cache: dict[str, _Entry] = {}
+        self._dirty: set[str] = set()
+        self._flusher: asyncio.Task | None = None
+        self._last_cleanup = 0.0
+        self._flush_lock = asyncio.Lock()
+
+    # ---------- cache ----------
+
+    async def _get_entry(self, key: StorageKey) -> _Entry:
+        db_key = build_key(key)
+        entry = self._cache.get(db_key)
+        if entry is not None and (
+            entry.dirty or time.monotonic() - entry.loaded_at < self.cache_ttl
+        ):
+            return entry
+
+        async with AsyncSessionLocal() as session:
+            row = await session.get(FSMState, db_key)
+
+        entry = _Entry(
+            state=row.state if row else None,
+            data=decode_data(row.data) if row else {},
+            loaded_at=time.monotonic(),
+        )
+        # A write may have landed while we were reading - keep it
+        current = self._cache.get(db_key)
+        if current is not None and current.dirty:
+            return current
+        self._cache[db_key] = entry
+        return entry
+
+    def _mark_dirty(self, key: StorageKey, entry: _Entry) -> None:
+        db_key = build_key(key)
+        entry.dirty = True
+        entry.loaded_at = time.monotonic()
+        self._cache[db_key] = entry
+        self._dirty.add(db_key)
+        self._ensure_flusher()
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop(), name="fsm-storage-flusher")
+
+    # ---------- BaseStorage API ----------
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = await self._get_entry(key)
+        entry.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(key, entry)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return (await self._get_entry(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        entry = await self._get_entry(key)
+        entry.data = dict(data)
+        self._mark_dirty(key, entry)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        return dict((await self._get_entry(key)).data)
+
+    async def close(self) -> None:
+        """Flush pending writes and stop the background flusher."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+    # ---------- persistence ----------
+
+    async def flush(self) -> None:
+        """Persist all dirty keys in one batch."""
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+
+            keys, self._dirty = self._dirty, set()
+            now = datetime.now(UTC)
+            upserts: list[dict[str, Any]] = []
+            deletes: list[str] = []
+
+            try:
+                for db_key in keys:
+                    entry = self._cache.get(db_key)
+                    if entry is None:
+                        continue
+                    entry.dirty = False
+                    if entry.state is None and not entry.data:
+                        deletes.append(db_key)
+                        continue
+                    try:
+                        data = encode_data(entry.data)
+                    except (TypeError, ValueError) as e:
+                        # Retrying cannot help: keep the entry in cache only
+                        # instead of failing every batch
+                        await logger.aerror("FSM data not serializable", key=db_key, error=str(e))
+                        continue
+                    upserts.append(
+                        {
+                            "key": db_key,
+                            "state": entry.state,
+                            "data": data,
+                            "updated_at": now,
+                        }
+                    )
+
+                async with AsyncSessionLocal() as session:
+                    if upserts:
+                        stmt = insert(FSMState).values(upserts)
+                        stmt = stmt.on_conflict_do_update(
+                            index_elements=[FSMState.key],
+                            set_={
+                                "state": stmt.excluded.state,
+                                "data": stmt.excluded.data,
+                                "updated_at": stmt.excluded.updated_at,
+                            },
+                        )
+                        await session.execute(stmt)
+                    if deletes:
+                        await session.execute(delete(FSMState).where(FSMState.key.in_(deletes)))
+                    await session.commit()
+            except Exception as e:
+                # Re-queue keys so the next batch retries them
+                for db_key in keys:
+                    entry = self._cache.get(db_key)
+                    if entry is not None:
+                        entry.dirty = True
+                self._dirty |= keys
+                await logger.aerror("FSM storage flush failed", keys=len(keys), error=str(e))
+
+    async def cleanup(self) -> None:
+        """Purge stale rows and expired clean cache entries."""
+        cutoff = datetime.now(UTC) - self.state_ttl
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                delete(FSMState).where(FSMState.updated_at < cutoff).returning(FSMState.key)
+            )
+            purged = len(result.all())
+            await session.commit()
+
+        now = time.monotonic()
+        for db_key in [
+            k for k, e in self._cache.items() if not e.dirty and now - e.loaded_at >= self.cache_ttl
+        ]:
+            del self._cache[db_key]
+
+        if purged:
+            await logger.ainfo("FSM storage cleanup", purged=purged)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+            if time.monotonic() - self._last_cleanup >= CLEANUP_INTERVAL:
+                self._last_cleanup = time.monotonic()
+                try:
+                    await self.cleanup()
+                except Exception as e:
+                    await logger.awarning("FSM storage cleanup failed", error=str(e))
+
@@ -1,19 +1,19 @@
 """Handlers for astrologer chat feature."""
 
 import asyncio
-from datetime import date
 
 import structlog
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.callbacks.natal import NatalAction, NatalCallback
 from src.bot.keyboards.natal import get_astrologer_chat_keyboard
 from src.bot.keyboards.main_menu import get_main_menu_keyboard
 from src.bot.states.astrologer_chat import AstrologerChatStates
+from src.core.timezones import local_today
+from src.db.lazy_session import release_current_session
 from src.db.models.user import User
 from src.services.ai import get_ai_service
 from src.services.ai.astrologer_cache import (
@@ -45,6 +45,7 @@ async def start_astrologer_chat(
     callback_data: NatalCallback,
     state: FSMContext,
     session: AsyncSession,
+    db_user: User | None,
 ) -> None:
     """Start astrologer chat conversation.
 
@@ -60,9 +61,8 @@ async def start_astrologer_chat(
 
     user_id = callback.from_user.id
 
-    # Get user from DB
-    result = await session.execute(select(User).where(User.telegram_id == user_id))
-    user = result.scalar_one_or_none()
+    # User loaded by UserContextMiddleware
+    user = db_user
 
     if not user:
         await callback.answer("Пользователь не найден")
@@ -108,7 +108,7 @@ async def start_astrologer_chat(
 
         transit_data = calculate_daily_transits(
             natal_data=natal_data,
-            forecast_date=date.today(),
+            forecast_date=local_today(timezone_str),
             timezone_str=timezone_str,
         )
 
@@ -201,6 +201,7 @@ async def handle_astrologer_question(
     message: Message,
     state: FSMContext,
     session: AsyncSession,
+    db_user: User | None,
 ) -> None:
     """Handle user question in astrologer chat.
 
@@ -244,9 +245,8 @@ async def handle_astrologer_question(
             )
             return
 
-    # Get user from DB
-    result = await session.execute(select(User).where(User.telegram_id == user_id))
-    user = result.scalar_one_or_none()
+    # User loaded by UserContextMiddleware
+    user = db_user
 
     if not user:
         await message.answer("Пользователь не найден")
@@ -294,7 +294,8 @@ async def handle_astrologer_question(
             action="typing",
         )
 
-        # Generate AI response
+        # Generate AI response (without holding a DB connection)
+        await release_current_session()
         ai_service = get_ai_service()
         response = await ai_service.chat_with_astrologer(
             user_id=user_id,
@@ -7,7 +7,6 @@ import structlog
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.callbacks.birth_data import CitySelectCallback, SkipTimeCallback
@@ -35,14 +34,13 @@ async def start_birth_data_setup(
     callback: CallbackQuery,
     session: AsyncSession,
     state: FSMContext,
+    db_user: User | None,
 ) -> None:
     """Start birth data collection flow (button in profile)."""
     await callback.answer()
 
     # Check if user is premium
-    stmt = select(User).where(User.telegram_id == callback.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if not user:
         await callback.message.edit_text(
@@ -172,6 +170,7 @@ async def select_city(
     callback_data: CitySelectCallback,
     session: AsyncSession,
     state: FSMContext,
+    db_user: User | None,
 ) -> None:
     """Handle city selection and save birth data."""
     await callback.answer()
@@ -191,9 +190,7 @@ async def select_city(
     birth_time_value = data.get("birth_time")
 
     # Update user in database
-    stmt = select(User).where(User.telegram_id == callback.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if not user:
         await callback.message.edit_text(
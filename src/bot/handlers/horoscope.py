@@ -5,7 +5,6 @@ from datetime import date
 from aiogram import Bot, Router
 from aiogram.types import CallbackQuery, Message
 from aiogram.utils.formatting import Bold, Text
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.callbacks.horoscope import ZodiacCallback
@@ -13,9 +12,11 @@ from src.bot.keyboards.horoscope import build_home_menu_keyboard, build_zodiac_k
 from src.bot.utils.horoscope import get_horoscope_text
 from src.bot.utils.progress import generate_with_feedback
 from src.bot.utils.zodiac import ZODIAC_SIGNS
+from src.core.timezones import local_today
 from src.db.models.user import User
 from src.services.ai.client import get_ai_service
 from src.services.astrology.natal_chart import calculate_full_natal_chart
+from src.services.premium_horoscope import get_stored_premium_horoscope
 
 router = Router(name="horoscope")
 
@@ -46,6 +47,7 @@ async def show_zodiac_horoscope(
     callback: CallbackQuery,
     callback_data: ZodiacCallback,
     session: AsyncSession,
+    db_user: User | None,
 ) -> None:
     """Show horoscope for selected zodiac sign."""
     sign_name = callback_data.s
@@ -56,9 +58,7 @@ async def show_zodiac_horoscope(
         return
 
     # Get user for premium check
-    stmt = select(User).where(User.telegram_id == callback.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     today = date.today()
     date_str = today.strftime("%d.%m.%Y")
@@ -67,25 +67,30 @@ async def show_zodiac_horoscope(
     if user and user.is_premium:
         if user.birth_lat and user.birth_lon and user.birth_date:
             # Premium with natal data - personalized horoscope
-            natal_data = calculate_full_natal_chart(
-                birth_date=user.birth_date,
-                birth_time=user.birth_time,
-                latitude=user.birth_lat,
-                longitude=user.birth_lon,
-                timezone_str=user.timezone or "Europe/Moscow",
-            )
-            ai_service = get_ai_service()
-            text = await generate_with_feedback(
-                message=callback.message,
-                operation_type="horoscope",
-                ai_coro=ai_service.generate_premium_horoscope(
-                    user_id=callback.from_user.id,
-                    zodiac_sign=sign_name,
-                    zodiac_sign_ru=zodiac.name_ru,
-                    date_str=date_str,
-                    natal_data=natal_data,
-                ),
+            # (precomputed for notification subscribers)
+            text = await get_stored_premium_horoscope(
+                session, user.id, local_today(user.timezone)
             )
+            if text is None:
+                natal_data = calculate_full_natal_chart(
+                    birth_date=user.birth_date,
+                    birth_time=user.birth_time,
+                    latitude=user.birth_lat,
+                    longitude=user.birth_lon,
+                    timezone_str=user.timezone or "Europe/Moscow",
+                )
+                ai_service = get_ai_service()
+                text = await generate_with_feedback(
+                    message=callback.message,
+                    operation_type="horoscope",
+                    ai_coro=ai_service.generate_premium_horoscope(
+                        user_id=callback.from_user.id,
+                        zodiac_sign=sign_name,
+                        zodiac_sign_ru=zodiac.name_ru,
+                        date_str=date_str,
+                        natal_data=natal_data,
+                    ),
+                )
             if text is None:
                 # Fallback to basic horoscope on error
                 text = await get_horoscope_text(sign_name, zodiac.name_ru)
@@ -139,6 +144,7 @@ async def show_horoscope_message(
     session: AsyncSession | None = None,
     bot: Bot | None = None,
     is_onboarding: bool = False,
+    user: User | None = None,
 ) -> None:
     """Send formatted horoscope message with inline keyboard.
 
@@ -146,9 +152,10 @@ async def show_horoscope_message(
         message: Telegram message to reply to
         sign_name: English name of zodiac sign to show (e.g., "Aries")
         user_sign: User's own sign for highlighting in keyboard (optional)
-        session: Database session for premium check (optional)
+        session: Database session for stored premium horoscopes (optional)
         bot: Bot instance for sending images (optional)
         is_onboarding: If True, use general horoscope without sections (for first horoscope)
+        user: Current user from UserContextMiddleware (db_user), None if unregistered
     """
     zodiac = ZODIAC_SIGNS.get(sign_name)
     if not zodiac:
@@ -163,38 +170,38 @@ async def show_horoscope_message(
     has_natal = False
     header = f"{zodiac.emoji} Общий гороскоп для {zodiac.name_ru}"
 
-    # Check premium status if session provided
-    user = None
-    if session and message.from_user:
-        stmt = select(User).where(User.telegram_id == message.from_user.id)
-        result = await session.execute(stmt)
-        user = result.scalar_one_or_none()
-
     if user and user.is_premium:
         is_premium = True
         has_natal = bool(user.birth_lat and user.birth_lon)
 
         if has_natal and user.birth_date:
             # Premium with natal data - personalized horoscope
-            natal_data = calculate_full_natal_chart(
-                birth_date=user.birth_date,
-                birth_time=user.birth_time,
-                latitude=user.birth_lat,
-                longitude=user.birth_lon,
-                timezone_str=user.timezone or "Europe/Moscow",
-            )
-            ai_service = get_ai_service()
-            text = await generate_with_feedback(
-                message=message,
-                operation_type="horoscope",
-                ai_coro=ai_service.generate_premium_horoscope(
-                    user_id=message.from_user.id,
-                    zodiac_sign=sign_name,
-                    zodiac_sign_ru=zodiac.name_ru,
-                    date_str=date_str,
-                    natal_data=natal_data,
-                ),
-            )
+            # (precomputed for notification subscribers)
+            text = None
+            if session:
+                text = await get_stored_premium_horoscope(
+                    session, user.id, local_today(user.timezone)
+                )
+            if text is None:
+                natal_data = calculate_full_natal_chart(
+                    birth_date=user.birth_date,
+                    birth_time=user.birth_time,
+                    latitude=user.birth_lat,
+                    longitude=user.birth_lon,
+                    timezone_str=user.timezone or "Europe/Moscow",
+                )
+                ai_service = get_ai_service()
+                text = await generate_with_feedback(
+                    message=message,
+                    operation_type="horoscope",
+                    ai_coro=ai_service.generate_premium_horoscope(
+                        user_id=message.from_user.id,
+                        zodiac_sign=sign_name,
+                        zodiac_sign_ru=zodiac.name_ru,
+                        date_str=date_str,
+                        natal_data=natal_data,
+                    ),
+                )
             if text is None:
                 # Fallback to basic horoscope on error
                 text = await get_horoscope_text(sign_name, zodiac.name_ru)
@@ -2,8 +2,6 @@
 
 from aiogram import Bot
 from aiogram.types import Message
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.keyboards.main_menu import get_main_menu_keyboard
 from src.bot.utils.natal_info_formatter import format_natal_info_for_menu
@@ -13,9 +11,8 @@ from src.services.astrology.natal_chart import calculate_full_natal_chart
 
 async def show_main_menu(
     message: Message,
-    session: AsyncSession,
+    user: User | None,
     bot: Bot | None = None,
-    user_id: int | None = None,
     chat_id: int | None = None,
 ) -> None:
     """Показать главное меню с информативным блоком.
@@ -27,14 +24,10 @@ async def show_main_menu(
 
     Args:
         message: Сообщение от пользователя
-        session: Database session
+        user: Пользователь из UserContextMiddleware (db_user)
+        bot: Bot для отправки, когда message удалено (callback)
+        chat_id: Чат для отправки через bot
     """
-    # Загрузить пользователя из БД
-    telegram_id = user_id if user_id is not None else message.from_user.id
-    stmt = select(User).where(User.telegram_id == telegram_id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
-
     if not user:
         # Пользователь не найден — показать базовое меню
         text = "Главное меню 🏠"
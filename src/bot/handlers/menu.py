@@ -2,7 +2,6 @@
 
 from aiogram import F, Router
 from aiogram.types import CallbackQuery, Message
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.callbacks.menu import MenuAction, MenuCallback
@@ -19,15 +18,15 @@ router = Router(name="menu")
 
 
 @router.message(F.text == "Гороскоп")
-async def menu_horoscope(message: Message, session: AsyncSession) -> None:
+async def menu_horoscope(message: Message, session: AsyncSession, db_user: User | None) -> None:
     """Handle 'Гороскоп' button press."""
     # Check if user has zodiac_sign
-    stmt = select(User).where(User.telegram_id == message.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if user and user.zodiac_sign:
-        await show_horoscope_message(message, user.zodiac_sign, user.zodiac_sign, session)
+        await show_horoscope_message(
+            message, user.zodiac_sign, user.zodiac_sign, session, user=user
+        )
     else:
         await message.answer(
             "Для получения гороскопа нужно указать дату рождения. "
@@ -51,12 +50,10 @@ async def menu_subscription(message: Message, session: AsyncSession) -> None:
 
 
 @router.message(F.text == "Профиль")
-async def menu_profile(message: Message, session: AsyncSession) -> None:
+async def menu_profile(message: Message, session: AsyncSession, db_user: User | None) -> None:
     """Handle 'Профиль' button press."""
     # Get user info
-    stmt = select(User).where(User.telegram_id == message.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if not user:
         await message.answer(
@@ -113,12 +110,11 @@ async def menu_profile(message: Message, session: AsyncSession) -> None:
 
 
 @router.callback_query(MenuCallback.filter(F.action == MenuAction.BACK_TO_MAIN_MENU))
-async def callback_main_menu(callback: CallbackQuery, session: AsyncSession) -> None:
+async def callback_main_menu(callback: CallbackQuery, db_user: User | None) -> None:
     """Handle '🏠 Главное меню' inline button press."""
     from src.bot.bot import get_bot
 
     # Сохранить данные ДО удаления сообщения
-    user_id = callback.from_user.id
     chat_id = callback.message.chat.id
 
     # Правильный порядок: ответить → удалить → отправить новое
@@ -127,4 +123,4 @@ async def callback_main_menu(callback: CallbackQuery, session: AsyncSession) ->
 
     # Передаем bot и сохраненные данные
     bot = get_bot()
-    await show_main_menu(callback.message, session, bot=bot, user_id=user_id, chat_id=chat_id)
+    await show_main_menu(callback.message, db_user, bot=bot, chat_id=chat_id)
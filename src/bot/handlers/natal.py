@@ -11,7 +11,7 @@ from aiogram.types import (
     InlineKeyboardMarkup,
     Message,
 )
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.callbacks.natal import NatalAction, NatalCallback
@@ -23,15 +23,17 @@ from src.bot.keyboards.natal import (
     get_natal_with_buy_keyboard,
     get_natal_with_open_keyboard,
 )
+from src.bot.utils.progress import generate_with_feedback
+from src.core.timezones import local_today
+from src.db.engine import AsyncSessionLocal
 from src.db.models.detailed_natal import DetailedNatal
 from src.db.models.user import User
-from src.bot.utils.progress import generate_with_feedback
 from src.services.ai import get_ai_service
-from src.services.payment.client import create_payment
-from src.services.payment.schemas import PLAN_PRICES_STR, PaymentPlan
 from src.services.astrology.natal_chart import calculate_full_natal_chart
 from src.services.astrology.natal_svg import generate_natal_png
-from src.services.telegraph import get_telegraph_service
+from src.services.payment.client import create_payment
+from src.services.payment.schemas import PLAN_PRICES_STR, PaymentPlan
+from src.services.telegraph import get_telegraph_publisher
 
 logger = structlog.get_logger()
 
@@ -62,10 +64,34 @@ async def show_natal_chart(
     # Get timezone (use saved or default to Europe/Moscow)
     timezone_str = user.timezone or "Europe/Moscow"
 
+    def _build_keyboard(telegraph_url: str | None):
+        """Keyboard based on user status (with Telegraph link if ready)."""
+        if user.detailed_natal_purchased_at:
+            # Already purchased - show "Open detailed" button
+            return get_natal_with_open_keyboard(telegraph_url)
+        if user.is_premium:
+            # Premium but not purchased - show "Buy detailed" button
+            return get_natal_with_buy_keyboard(telegraph_url)
+        # Free user - show subscription teaser
+        return get_free_natal_keyboard(telegraph_url)
+
+    # Telegraph page is published in the background; its link is attached
+    # to the photo's keyboard once both are ready
+    sent_photo: list[Message] = []
+    photo_done = asyncio.Event()
+
+    async def _attach_telegraph_url(telegraph_url: str | None) -> None:
+        if not telegraph_url:
+            return
+        try:
+            await asyncio.wait_for(photo_done.wait(), timeout=60.0)
+        except TimeoutError:
+            return
+        if sent_photo:
+            await sent_photo[0].edit_reply_markup(reply_markup=_build_keyboard(telegraph_url))
+
     async def _generate_natal() -> tuple[dict, bytes, tuple[str, str | None]]:
         """Inner function to generate all natal data with typing indicator."""
-        from datetime import date
-
         # Calculate full natal chart
         natal_data = calculate_full_natal_chart(
             birth_date=user.birth_date,
@@ -79,13 +105,14 @@ async def show_natal_chart(
         png_bytes = await generate_natal_png(natal_data)
 
         # Generate DAILY TRANSIT FORECAST (not static interpretation)
-        today = date.today()
+        today = local_today(timezone_str)
         ai_service = get_ai_service()
         forecast_result = await ai_service.generate_daily_transit_forecast(
             user_id=user.telegram_id,
             natal_data=natal_data,
             forecast_date=today,
             timezone_str=timezone_str,
+            on_telegraph_url=_attach_telegraph_url,
         )
 
         return natal_data, png_bytes, forecast_result
@@ -99,30 +126,23 @@ async def show_natal_chart(
         )
 
         forecast_text, telegraph_url = forecast_result
-        from datetime import date
-
-        today = date.today()
+        today = local_today(timezone_str)
         date_str = today.strftime("%d.%m.%Y")
 
-        # Determine keyboard based on user status (pass telegraph_url!)
-        if user.detailed_natal_purchased_at:
-            # Already purchased - show "Open detailed" button
-            keyboard = get_natal_with_open_keyboard(telegraph_url)
-        elif user.is_premium:
-            # Premium but not purchased - show "Buy detailed" button
-            keyboard = get_natal_with_buy_keyboard(telegraph_url)
-        else:
-            # Free user - show subscription teaser
-            keyboard = get_free_natal_keyboard(telegraph_url)
+        # Keyboard with Telegraph link if already cached, otherwise it is
+        # attached by _attach_telegraph_url when the page is published
+        keyboard = _build_keyboard(telegraph_url)
 
         # Send chart image WITH ALL BUTTONS under photo
         photo = BufferedInputFile(png_bytes, filename="natal_chart.png")
         caption = f"Твой ежедневный прогноз на {date_str}"
 
-        await message.answer_photo(
-            photo=photo,
-            caption=caption,
-            reply_markup=keyboard,
+        sent_photo.append(
+            await message.answer_photo(
+                photo=photo,
+                caption=caption,
+                reply_markup=keyboard,
+            )
         )
 
         # NO separate Telegraph link message - it's already in keyboard!
@@ -143,6 +163,8 @@ async def show_natal_chart(
             "Произошла ошибка при построении натальной карты. "
             "Попробуйте позже."
         )
+    finally:
+        photo_done.set()
 
 
 def _split_text(text: str, max_length: int) -> list[str]:
@@ -188,7 +210,7 @@ def _split_text(text: str, max_length: int) -> list[str]:
 
 
 @router.message(F.text == "Натальная карта")
-async def menu_natal_chart(message: Message, session: AsyncSession) -> None:
+async def menu_natal_chart(message: Message, session: AsyncSession, db_user: User | None) -> None:
     """Handle 'Натальная карта' button press from main menu."""
     # Check if already processing for this user
     user_id = message.from_user.id
@@ -199,10 +221,7 @@ async def menu_natal_chart(message: Message, session: AsyncSession) -> None:
     # Show immediate response to prevent multiple clicks
     loading_msg = await message.answer("Проверяю доступ...")
 
-    # Get user
-    stmt = select(User).where(User.telegram_id == message.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if not user:
         await loading_msg.delete()
@@ -265,14 +284,12 @@ async def menu_natal_chart(message: Message, session: AsyncSession) -> None:
 async def callback_show_natal_chart(
     callback: CallbackQuery,
     session: AsyncSession,
+    db_user: User | None,
 ) -> None:
     """Handle 'Show natal chart' callback."""
     await callback.answer()
 
-    # Get user
-    stmt = select(User).where(User.telegram_id == callback.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if not user or not user.is_premium:
         await callback.message.edit_text(
@@ -307,14 +324,12 @@ async def callback_back_to_menu(callback: CallbackQuery) -> None:
 async def buy_detailed_natal(
     callback: CallbackQuery,
     session: AsyncSession,
+    db_user: User | None,
 ) -> None:
     """Handle buy detailed natal interpretation button."""
     await callback.answer()
 
-    # Get user
-    stmt = select(User).where(User.telegram_id == callback.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if not user:
         await callback.message.answer("Ошибка. Попробуй /start")
@@ -364,7 +379,7 @@ async def buy_detailed_natal(
                 inline_keyboard=[
                     [InlineKeyboardButton(
                         text="Оплатить",
-                        url=payment.confirmation.confirmation_url,
+                        url=payment.confirmation_url,
                     )]
                 ]
             ),
@@ -380,14 +395,12 @@ async def buy_detailed_natal(
 async def show_detailed_natal(
     callback: CallbackQuery,
     session: AsyncSession,
+    db_user: User | None,
 ) -> None:
     """Show purchased detailed natal interpretation."""
     await callback.answer()
 
-    # Get user
-    stmt = select(User).where(User.telegram_id == callback.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if not user or not user.detailed_natal_purchased_at:
         await callback.message.answer(
@@ -397,9 +410,12 @@ async def show_detailed_natal(
         return
 
     # Check for cached interpretation
-    stmt = select(DetailedNatal).where(
-        DetailedNatal.user_id == user.id
-    ).order_by(DetailedNatal.created_at.desc())
+    stmt = (
+        select(DetailedNatal)
+        .where(DetailedNatal.user_id == user.id)
+        .order_by(DetailedNatal.created_at.desc())
+        .limit(1)
+    )
     result = await session.execute(stmt)
     cached = result.scalar_one_or_none()
 
@@ -407,102 +423,104 @@ async def show_detailed_natal(
         # Use cached Telegraph URL (no loading needed)
         await callback.message.answer(
             "Твой детальный разбор личности готов!",
-            reply_markup=InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [InlineKeyboardButton(
-                        text="Открыть разбор",
-                        url=cached.telegraph_url,
-                    )],
-                    [InlineKeyboardButton(
-                        text="Назад в меню",
-                        callback_data=NatalCallback(action=NatalAction.BACK_TO_MENU).pack(),
-                    )],
-                ]
-            ),
+            reply_markup=_detailed_natal_keyboard(cached.telegraph_url),
         )
         return
 
-    # Check birth data before generation
-    if not user.birth_lat or not user.birth_lon or not user.birth_date:
-        await callback.message.answer(
-            "Для детального разбора нужны данные рождения.",
-            reply_markup=get_natal_setup_keyboard(),
-        )
-        return
+    if cached is None:
+        # Check birth data before generation
+        if not user.birth_lat or not user.birth_lon or not user.birth_date:
+            await callback.message.answer(
+                "Для детального разбора нужны данные рождения.",
+                reply_markup=get_natal_setup_keyboard(),
+            )
+            return
 
-    # Generate or regenerate with typing indicator
-    async def _generate_detailed() -> str | None:
-        """Inner function to generate detailed natal interpretation."""
-        # Calculate natal chart
-        natal_data = calculate_full_natal_chart(
-            birth_date=user.birth_date,
-            birth_time=user.birth_time,
-            latitude=user.birth_lat,
-            longitude=user.birth_lon,
-            timezone_str=user.timezone or "Europe/Moscow",
-        )
+        # Generate with typing indicator
+        async def _generate_detailed() -> str | None:
+            """Inner function to generate detailed natal interpretation."""
+            # Calculate natal chart
+            natal_data = calculate_full_natal_chart(
+                birth_date=user.birth_date,
+                birth_time=user.birth_time,
+                latitude=user.birth_lat,
+                longitude=user.birth_lon,
+                timezone_str=user.timezone or "Europe/Moscow",
+            )
 
-        # Generate detailed interpretation
-        ai_service = get_ai_service()
-        return await ai_service.generate_detailed_natal_interpretation(
-            user_id=user.telegram_id,
-            natal_data=natal_data,
-        )
+            # Generate detailed interpretation
+            ai_service = get_ai_service()
+            return await ai_service.generate_detailed_natal_interpretation(
+                user_id=user.telegram_id,
+                natal_data=natal_data,
+            )
 
-    try:
-        interpretation = await generate_with_feedback(
-            message=callback.message,
-            operation_type="natal",
-            ai_coro=_generate_detailed(),
-        )
+        try:
+            interpretation = await generate_with_feedback(
+                message=callback.message,
+                operation_type="natal",
+                ai_coro=_generate_detailed(),
+            )
+        except Exception as e:
+            logger.error("show_detailed_natal_error", error=str(e))
+            await callback.message.answer("Ошибка. Попробуй позже.")
+            return
 
         if not interpretation:
             await callback.message.answer("Ошибка генерации. Попробуй позже.")
             return
 
-        # Publish to Telegraph
-        telegraph_url = None
-        try:
-            telegraph_service = get_telegraph_service()
-            title = f"Детальный разбор - {user.birth_date.strftime('%d.%m.%Y')}"
-            if user.birth_city:
-                title += f", {user.birth_city}"
-
-            telegraph_url = await asyncio.wait_for(
-                telegraph_service.publish_article(title, interpretation),
-                timeout=15.0,  # Longer timeout for long content
+        # Save to cache (Telegraph URL is added once published)
+        cached = DetailedNatal(user_id=user.id, interpretation=interpretation)
+        session.add(cached)
+        await session.commit()
+
+    # Answer now; the Telegraph link is attached when the page is published
+    status_message = await callback.message.answer(
+        "Твой детальный разбор личности готов! Публикую страницу...",
+        reply_markup=_detailed_natal_keyboard(None),
+    )
+
+    title = "Детальный разбор"
+    if user.birth_date:
+        title += f" - {user.birth_date.strftime('%d.%m.%Y')}"
+    if user.birth_city:
+        title += f", {user.birth_city}"
+
+    detailed_id, interpretation = cached.id, cached.interpretation
+
+    async def _attach_telegraph_url(telegraph_url: str | None) -> None:
+        if not telegraph_url:
+            # Fallback: send as text chunks
+            for chunk in _split_text(interpretation, MAX_MESSAGE_LENGTH):
+                await status_message.answer(chunk)
+            return
+
+        async with AsyncSessionLocal() as publish_session:
+            await publish_session.execute(
+                update(DetailedNatal)
+                .where(DetailedNatal.id == detailed_id)
+                .values(telegraph_url=telegraph_url)
             )
-        except Exception as e:
-            logger.error("detailed_telegraph_error", error=str(e))
+            await publish_session.commit()
 
-        # Save to cache
-        detailed = DetailedNatal(
-            user_id=user.id,
-            interpretation=interpretation,
-            telegraph_url=telegraph_url,
+        await status_message.edit_text(
+            "Твой детальный разбор личности готов!",
+            reply_markup=_detailed_natal_keyboard(telegraph_url),
         )
-        session.add(detailed)
-        await session.commit()
 
-        if telegraph_url:
-            await callback.message.answer(
-                "Твой детальный разбор личности готов!",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [InlineKeyboardButton(text="Открыть разбор", url=telegraph_url)],
-                        [InlineKeyboardButton(
-                            text="Назад в меню",
-                            callback_data=NatalCallback(action=NatalAction.BACK_TO_MENU).pack(),
-                        )],
-                    ]
-                ),
-            )
-        else:
-            # Fallback: send as text chunks
-            chunks = _split_text(interpretation, MAX_MESSAGE_LENGTH)
-            for chunk in chunks:
-                await callback.message.answer(chunk)
+    get_telegraph_publisher().submit(title, interpretation, on_done=_attach_telegraph_url)
 
-    except Exception as e:
-        logger.error("show_detailed_natal_error", error=str(e))
-        await callback.message.answer("Ошибка. Попробуй позже.")
+
+def _detailed_natal_keyboard(telegraph_url: str | None) -> InlineKeyboardMarkup:
+    """Keyboard for detailed natal message (link button once published)."""
+    rows = []
+    if telegraph_url:
+        rows.append([InlineKeyboardButton(text="Открыть разбор", url=telegraph_url)])
+    rows.append(
+        [InlineKeyboardButton(
+            text="Назад в меню",
+            callback_data=NatalCallback(action=NatalAction.BACK_TO_MENU).pack(),
+        )]
+    )
+    return InlineKeyboardMarkup(inline_keyboard=rows)
@@ -2,7 +2,6 @@
 
 from aiogram import F, Router
 from aiogram.types import CallbackQuery
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.callbacks.menu import MenuAction, MenuCallback
@@ -26,12 +25,10 @@ router = Router(name="profile_settings")
 
 @router.callback_query(MenuCallback.filter(F.action == MenuAction.PROFILE_NOTIFICATIONS))
 async def settings_notifications_callback(
-    callback: CallbackQuery, session: AsyncSession
+    callback: CallbackQuery, session: AsyncSession, db_user: User | None
 ) -> None:
     """Show notification settings from inline button."""
-    stmt = select(User).where(User.telegram_id == callback.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if not user:
         await callback.answer("Профиль не найден. Нажмите /start", show_alert=True)
@@ -66,11 +63,10 @@ async def toggle_notifications(
     callback: CallbackQuery,
     callback_data: NotificationToggleCallback,
     session: AsyncSession,
+    db_user: User | None,
 ) -> None:
     """Toggle notifications on/off."""
-    stmt = select(User).where(User.telegram_id == callback.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if not user:
         await callback.answer("Профиль не найден", show_alert=True)
@@ -105,11 +101,10 @@ async def set_notification_time(
     callback: CallbackQuery,
     callback_data: NotificationTimeCallback,
     session: AsyncSession,
+    db_user: User | None,
 ) -> None:
     """Set notification time."""
-    stmt = select(User).where(User.telegram_id == callback.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if not user:
         await callback.answer("Профиль не найден", show_alert=True)
@@ -139,11 +134,10 @@ async def set_timezone(
     callback: CallbackQuery,
     callback_data: TimezoneCallback,
     session: AsyncSession,
+    db_user: User | None,
 ) -> None:
     """Set user timezone."""
-    stmt = select(User).where(User.telegram_id == callback.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if not user:
         await callback.answer("Профиль не найден", show_alert=True)
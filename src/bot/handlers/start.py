@@ -4,7 +4,6 @@ from aiogram import Bot, F, Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.callbacks.menu import MenuAction, MenuCallback
@@ -60,16 +59,16 @@ ONBOARDING_EXPLANATION = """Теперь ты можешь получать го
 
 
 @router.message(Command("start"))
-async def cmd_start(message: Message, session: AsyncSession, bot: Bot) -> None:
+async def cmd_start(
+    message: Message, session: AsyncSession, bot: Bot, db_user: User | None
+) -> None:
     """Handle /start command."""
     # Check if user exists and has birth_date
-    stmt = select(User).where(User.telegram_id == message.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if user and user.birth_date:
         # Returning user - show menu with informative block
-        await show_main_menu(message, session)
+        await show_main_menu(message, user)
     else:
         # New user - show welcome + onboarding button
         await message.answer(
@@ -94,6 +93,7 @@ async def process_birthdate(
     state: FSMContext,
     session: AsyncSession,
     bot: Bot,
+    db_user: User | None,
 ) -> None:
     """Process birthdate input."""
     parsed_date = parse_russian_date(message.text)
@@ -105,9 +105,7 @@ async def process_birthdate(
     zodiac = get_zodiac_sign(parsed_date)
 
     # Update or create user
-    stmt = select(User).where(User.telegram_id == message.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if not user:
         user = User(
@@ -140,12 +138,11 @@ async def show_first_horoscope(
     callback: CallbackQuery,
     session: AsyncSession,
     bot: Bot,
+    db_user: User | None,
 ) -> None:
     """Show first general horoscope after onboarding."""
     # Get user from DB
-    stmt = select(User).where(User.telegram_id == callback.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if not user or not user.zodiac_sign:
         await callback.answer("Ошибка: знак не найден", show_alert=True)
@@ -160,6 +157,7 @@ async def show_first_horoscope(
         session=session,
         bot=bot,
         is_onboarding=True,  # NEW parameter
+        user=user,
     )
 
     # Offer notifications AFTER horoscope
@@ -173,12 +171,10 @@ async def show_first_horoscope(
 
 @router.callback_query(MenuCallback.filter(F.action == MenuAction.ONBOARDING_NOTIF_YES))
 async def onboarding_enable_notifications(
-    callback: CallbackQuery, session: AsyncSession
+    callback: CallbackQuery, session: AsyncSession, db_user: User | None
 ) -> None:
     """User wants notifications - show time selection."""
-    stmt = select(User).where(User.telegram_id == callback.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if user:
         user.notifications_enabled = True
@@ -193,11 +189,11 @@ async def onboarding_enable_notifications(
 
 @router.callback_query(MenuCallback.filter(F.action == MenuAction.ONBOARDING_NOTIF_NO))
 async def onboarding_skip_notifications(
-    callback: CallbackQuery, session: AsyncSession
+    callback: CallbackQuery, db_user: User | None
 ) -> None:
     """User skips notifications - show main menu."""
     await callback.message.edit_text(
         "Хорошо! Вы всегда можете включить уведомления в меню Профиль."
     )
-    await show_main_menu(callback.message, session)
+    await show_main_menu(callback.message, db_user)
     await callback.answer()
@@ -3,7 +3,6 @@
 import structlog
 from aiogram import F, Router
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.callbacks.menu import MenuAction, MenuCallback
@@ -36,12 +35,10 @@ PREMIUM_FEATURES = """
 """
 
 
-async def show_plans(message: Message, session: AsyncSession) -> None:
+async def show_plans(message: Message, session: AsyncSession, db_user: User | None) -> None:
     """Show subscription plans."""
     # Check if already premium
-    stmt = select(User).where(User.telegram_id == message.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if user and user.is_premium and user.premium_until:
         until_str = user.premium_until.strftime("%d.%m.%Y")
@@ -60,14 +57,13 @@ async def show_plans(message: Message, session: AsyncSession) -> None:
 async def menu_subscription_callback(
     callback: CallbackQuery,
     session: AsyncSession,
+    db_user: User | None,
 ) -> None:
     """Handle 'Получить премиум-гороскоп' button from horoscope keyboard."""
     await callback.answer()
 
     # Check if already premium
-    stmt = select(User).where(User.telegram_id == callback.from_user.id)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = db_user
 
     if user and user.is_premium and user.premium_until:
         until_str = user.premium_until.strftime("%d.%m.%Y")
@@ -113,7 +109,7 @@ async def handle_plan_selection(
             },
         )
 
-        confirmation_url = payment.confirmation.confirmation_url
+        confirmation_url = payment.confirmation_url
 
         # Create inline button with payment URL
         keyboard = InlineKeyboardMarkup(
@@ -1,9 +1,8 @@
 """Tarot handlers: card of the day, 3-card spread, Celtic Cross, history."""
 
 import asyncio
-from datetime import datetime
+from datetime import date
 
-import pytz
 import structlog
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
@@ -14,8 +13,9 @@ from aiogram.types import (
     InputMediaPhoto,
     Message,
 )
-from sqlalchemy import desc, func, select, update
+from sqlalchemy import desc, func, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
 from src.bot.callbacks.tarot import (
     HistoryAction,
@@ -38,6 +38,7 @@ from src.bot.utils.progress import generate_with_feedback
 from src.bot.utils.tarot_cards import (
     get_card_by_id,
     get_card_image,
+    get_card_text,
     get_deck,
     get_random_card,
     get_ten_cards,
@@ -50,10 +51,12 @@ from src.bot.utils.tarot_formatting import (
     format_spread_detail,
     format_three_card_spread_with_ai,
 )
+from src.core.timezones import local_today
 from src.db.models.tarot_spread import TarotSpread
 from src.db.models.user import User
 from src.services.ai import get_ai_service
-from src.services.telegraph import get_telegraph_service
+from src.services.card_of_day import generate_interpretation, get_pooled_interpretation
+from src.services.telegraph import get_telegraph_publisher
 
 logger = structlog.get_logger()
 
@@ -66,9 +69,7 @@ DAILY_SPREAD_LIMIT_PREMIUM = 20
 # History settings
 HISTORY_PAGE_SIZE = 5
 MAX_HISTORY_SPREADS = 100
-
-# Telegraph timeout (seconds)
-TELEGRAPH_TIMEOUT = 10.0
+HISTORY_QUESTION_PREVIEW = 15  # chars of question shown on history buttons
 
 # Celtic Cross positions
 CELTIC_CROSS_POSITIONS = [
@@ -88,17 +89,9 @@ CELTIC_CROSS_POSITIONS = [
 # ============== Helper functions ==============
 
 
-async def get_user(session: AsyncSession, telegram_id: int) -> User | None:
-    """Get user by telegram_id."""
-    stmt = select(User).where(User.telegram_id == telegram_id)
-    result = await session.execute(stmt)
-    return result.scalar_one_or_none()
-
-
-def get_user_today(user: User) -> datetime.date:
+def get_user_today(user: User) -> date:
     """Get today's date in user's timezone."""
-    user_tz = pytz.timezone(user.timezone or "Europe/Moscow")
-    return datetime.now(user_tz).date()
+    return local_today(user.timezone)
 
 
 def get_daily_limit(user: User) -> int:
@@ -155,7 +148,7 @@ async def check_and_use_tarot_limit(
 
 async def save_spread_to_history(
     session: AsyncSession,
-    user_id: int,
+    user: User,
     spread_type: str,
     question: str,
     cards: list[tuple[dict, bool]],
@@ -165,7 +158,7 @@ async def save_spread_to_history(
 
     Args:
         session: Database session
-        user_id: User's internal ID (not telegram_id)
+        user: User (attached to session)
         spread_type: "three_card" or "celtic_cross"
         question: User's question
         cards: List of (card_dict, reversed_flag) tuples
@@ -181,13 +174,15 @@ async def save_spread_to_history(
     ]
 
     spread = TarotSpread(
-        user_id=user_id,
+        user_id=user.id,
         spread_type=spread_type,
         question=question,
         cards=cards_json,
         interpretation=interpretation,
     )
     session.add(spread)
+    # History size counter for paging (instead of COUNT(*) per page)
+    user.tarot_history_count = User.tarot_history_count + 1
     await session.commit()
 
 
@@ -212,10 +207,10 @@ async def tarot_back_to_menu(callback: CallbackQuery) -> None:
 
 @router.callback_query(TarotCallback.filter(F.a == TarotAction.CARD_OF_DAY))
 async def tarot_card_of_day_start(
-    callback: CallbackQuery, session: AsyncSession
+    callback: CallbackQuery, session: AsyncSession, db_user: User | None
 ) -> None:
     """Start card of the day ritual."""
-    user = await get_user(session, callback.from_user.id)
+    user = db_user
     if not user:
         await callback.answer("Пройдите регистрацию через /start", show_alert=True)
         return
@@ -228,7 +223,7 @@ async def tarot_card_of_day_start(
         if card:
             reversed_flag = user.card_of_day_reversed or False
             await send_card_of_day(
-                callback.message, card, reversed_flag, callback.from_user.id
+                callback.message, session, card, reversed_flag, callback.from_user.id, today
             )
             await callback.answer()
             return
@@ -246,10 +241,10 @@ async def tarot_card_of_day_start(
 
 @router.callback_query(TarotCallback.filter(F.a == TarotAction.DRAW_COD))
 async def tarot_draw_card_of_day(
-    callback: CallbackQuery, session: AsyncSession
+    callback: CallbackQuery, session: AsyncSession, db_user: User | None
 ) -> None:
     """Draw and show card of the day."""
-    user = await get_user(session, callback.from_user.id)
+    user = db_user
     if not user:
         await callback.answer("Пройдите регистрацию через /start", show_alert=True)
         return
@@ -263,7 +258,7 @@ async def tarot_draw_card_of_day(
             reversed_flag = user.card_of_day_reversed or False
             await callback.message.delete()
             await send_card_of_day(
-                callback.message, card, reversed_flag, callback.from_user.id
+                callback.message, session, card, reversed_flag, callback.from_user.id, today
             )
             await callback.answer()
             return
@@ -279,13 +274,18 @@ async def tarot_draw_card_of_day(
 
     await callback.message.delete()
     await send_card_of_day(
-        callback.message, card, reversed_flag, callback.from_user.id
+        callback.message, session, card, reversed_flag, callback.from_user.id, today
     )
     await callback.answer()
 
 
 async def send_card_of_day(
-    message: Message, card: dict, reversed_flag: bool, user_id: int
+    message: Message,
+    session: AsyncSession,
+    card: dict,
+    reversed_flag: bool,
+    user_id: int,
+    today: date,
 ) -> None:
     """Send card of the day with image and AI interpretation.
 
@@ -293,21 +293,26 @@ async def send_card_of_day(
 
     Args:
         message: Telegram message
+        session: Database session
         card: Card dict from deck
         reversed_flag: Whether card is reversed
-        user_id: Telegram user ID for caching AI response
+        user_id: Telegram user ID (selects the precomputed variant)
+        today: User's local date
     """
     # Send image
     photo = get_card_image(card["name_short"], reversed_flag)
     await message.answer_photo(photo)
 
-    # Get AI interpretation (with caching and progress indicator)
-    ai = get_ai_service()
-    interpretation = await generate_with_feedback(
-        message=message,
-        operation_type="card_of_day",
-        ai_coro=ai.generate_card_of_day(user_id, card, reversed_flag),
+    # Precomputed interpretation (nightly pool); generate only on a miss
+    interpretation = await get_pooled_interpretation(
+        session, user_id, card["name_short"], reversed_flag, today
     )
+    if interpretation is None:
+        interpretation = await generate_with_feedback(
+            message=message,
+            operation_type="card_of_day",
+            ai_coro=generate_interpretation(user_id, card, reversed_flag, today),
+        )
 
     # Send formatted message (AI or fallback to static meaning)
     content = format_card_of_day_with_ai(card, reversed_flag, interpretation)
@@ -324,9 +329,10 @@ async def tarot_three_card_start(
     callback: CallbackQuery,
     session: AsyncSession,
     state: FSMContext,
+    db_user: User | None,
 ) -> None:
     """Start 3-card spread - check limit and ask for question."""
-    user = await get_user(session, callback.from_user.id)
+    user = db_user
     if not user:
         await callback.answer("Пройдите регистрацию через /start", show_alert=True)
         return
@@ -363,9 +369,10 @@ async def tarot_question_received(
     message: Message,
     session: AsyncSession,
     state: FSMContext,
+    db_user: User | None,
 ) -> None:
     """Receive question and show ritual."""
-    user = await get_user(session, message.from_user.id)
+    user = db_user
     if not user:
         await message.answer("Пройдите регистрацию через /start")
         await state.clear()
@@ -399,7 +406,10 @@ async def tarot_question_received(
 
 @router.callback_query(TarotCallback.filter(F.a == TarotAction.DRAW_THREE))
 async def tarot_draw_three_cards(
-    callback: CallbackQuery, session: AsyncSession, state: FSMContext
+    callback: CallbackQuery,
+    session: AsyncSession,
+    state: FSMContext,
+    db_user: User | None,
 ) -> None:
     """Draw and show 3 cards."""
     data = await state.get_data()
@@ -426,8 +436,7 @@ async def tarot_draw_three_cards(
     positions = ["Прошлое", "Настоящее", "Будущее"]
     for i, (card, reversed_flag) in enumerate(cards):
         photo = get_card_image(card["name_short"], reversed_flag)
-        reversed_text = " (перевернутая)" if reversed_flag else ""
-        caption = f"{positions[i]}: {card['name']}{reversed_text}"
+        caption = f"{positions[i]}: {get_card_text(card).label[reversed_flag]}"
         await callback.message.answer_photo(photo, caption=caption)
         if i < 2:  # Don't sleep after last card
             await asyncio.sleep(1)
@@ -443,10 +452,10 @@ async def tarot_draw_three_cards(
     )
 
     # Save to history
-    if user_db_id:
+    if db_user and db_user.id == user_db_id:
         await save_spread_to_history(
             session=session,
-            user_id=user_db_id,
+            user=db_user,
             spread_type="three_card",
             question=question,
             cards=cards,
@@ -476,9 +485,10 @@ async def tarot_celtic_cross_start(
     callback: CallbackQuery,
     session: AsyncSession,
     state: FSMContext,
+    db_user: User | None,
 ) -> None:
     """Start Celtic Cross - check premium and ask for question."""
-    user = await get_user(session, callback.from_user.id)
+    user = db_user
     if not user:
         await callback.answer("Пройдите регистрацию через /start", show_alert=True)
         return
@@ -534,9 +544,10 @@ async def tarot_celtic_question_received(
     message: Message,
     session: AsyncSession,
     state: FSMContext,
+    db_user: User | None,
 ) -> None:
     """Receive Celtic Cross question and show ritual."""
-    user = await get_user(session, message.from_user.id)
+    user = db_user
     if not user:
         await message.answer("Пройдите регистрацию через /start")
         await state.clear()
@@ -581,7 +592,10 @@ async def tarot_celtic_question_received(
 
 @router.callback_query(TarotCallback.filter(F.a == TarotAction.DRAW_CELTIC))
 async def tarot_draw_celtic_cards(
-    callback: CallbackQuery, session: AsyncSession, state: FSMContext
+    callback: CallbackQuery,
+    session: AsyncSession,
+    state: FSMContext,
+    db_user: User | None,
 ) -> None:
     """Draw and show 10 cards as album."""
     data = await state.get_data()
@@ -608,9 +622,8 @@ async def tarot_draw_celtic_cards(
     media_group = []
     for i, (card, reversed_flag) in enumerate(cards):
         photo = get_card_image(card["name_short"], reversed_flag)
-        reversed_text = " (перевернутая)" if reversed_flag else ""
         position = CELTIC_CROSS_POSITIONS[i]
-        caption = f"{i + 1}. {position}: {card['name']}{reversed_text}"
+        caption = f"{i + 1}. {position}: {get_card_text(card).label[reversed_flag]}"
 
         media_group.append(InputMediaPhoto(media=photo, caption=caption))
 
@@ -636,61 +649,49 @@ async def tarot_draw_celtic_cards(
     short_summary, full_interpretation = result  # Unpack tuple
 
     # Save FULL interpretation to history
-    if user_db_id:
+    if db_user and db_user.id == user_db_id:
         await save_spread_to_history(
             session=session,
-            user_id=user_db_id,
+            user=db_user,
             spread_type="celtic_cross",
             question=question,
             cards=cards,
             interpretation=full_interpretation,  # Сохраняем полную версию
         )
 
-    # Publish FULL interpretation to Telegraph (always, not fallback)
-    telegraph_url = None
-    try:
-        telegraph_service = get_telegraph_service()
-        # Truncate question for title if too long
-        question_short = question[:50] + "..." if len(question) > 50 else question
-        title = f"Кельтский крест — {question_short}"
-
-        telegraph_url = await asyncio.wait_for(
-            telegraph_service.publish_article(title, full_interpretation),
-            timeout=TELEGRAPH_TIMEOUT,
-        )
-    except asyncio.TimeoutError:
-        logger.warning("telegraph_celtic_timeout", question=question[:30])
-    except Exception as e:
-        logger.error("telegraph_celtic_error", error=str(e))
-
-    # Show SHORT summary in Telegram + Telegraph link
-    if telegraph_url:
-        # Success: show short summary + button to full interpretation
-        keyboard = InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        text="📖 Открыть полное толкование",
-                        url=telegraph_url,
-                    )
+    # Show SHORT summary in Telegram right away; the FULL interpretation is
+    # published to Telegraph in the background and linked when ready
+    summary_message = await callback.message.answer(short_summary)
+
+    async def _attach_telegraph_url(telegraph_url: str | None) -> None:
+        if telegraph_url:
+            # Success: button to full interpretation under the summary
+            keyboard = InlineKeyboardMarkup(
+                inline_keyboard=[
+                    [
+                        InlineKeyboardButton(
+                            text="📖 Открыть полное толкование",
+                            url=telegraph_url,
+                        )
+                    ]
                 ]
-            ]
-        )
-        await callback.message.answer(
-            short_summary,  # Краткое резюме вместо generic сообщения
-            reply_markup=keyboard,
-        )
-    else:
-        # Telegraph failed - show short summary + full in chunks
-        await callback.message.answer(short_summary)
+            )
+            await summary_message.edit_reply_markup(reply_markup=keyboard)
+            return
 
-        # Send full interpretation in chunks (Telegram 4096 char limit)
+        # Telegraph failed - send full interpretation in chunks (4096 char limit)
+        logger.warning("telegraph_celtic_failed", question=question[:30])
         chunks = [
             full_interpretation[i : i + 4000]
             for i in range(0, len(full_interpretation), 4000)
         ]
         for chunk in chunks:
-            await callback.message.answer(chunk)
+            await summary_message.answer(chunk)
+
+    # Truncate question for title if too long
+    question_short = question[:50] + "..." if len(question) > 50 else question
+    title = f"Кельтский крест — {question_short}"
+    get_telegraph_publisher().submit(title, full_interpretation, on_done=_attach_telegraph_url)
 
     # Show limit
     limit_text = format_limit_message(remaining, is_premium)
@@ -706,71 +707,82 @@ async def tarot_draw_celtic_cards(
 
 @router.callback_query(TarotCallback.filter(F.a == TarotAction.HISTORY))
 async def tarot_history_start(
-    callback: CallbackQuery, session: AsyncSession
+    callback: CallbackQuery, session: AsyncSession, db_user: User | None
 ) -> None:
     """Show spread history list."""
-    user = await get_user(session, callback.from_user.id)
+    user = db_user
     if not user:
         await callback.answer("Пройдите регистрацию через /start", show_alert=True)
         return
 
-    await show_history_page(callback, session, user.id, page=0)
+    await show_history_page(callback, session, user, page=0)
     await callback.answer()
 
 
 @router.callback_query(HistoryCallback.filter(F.a == HistoryAction.LIST))
 async def tarot_history_list(
-    callback: CallbackQuery, session: AsyncSession
+    callback: CallbackQuery, session: AsyncSession, db_user: User | None
 ) -> None:
     """Return to history list."""
-    user = await get_user(session, callback.from_user.id)
+    user = db_user
     if not user:
         await callback.answer("Пройдите регистрацию через /start", show_alert=True)
         return
 
-    await show_history_page(callback, session, user.id, page=0)
+    await show_history_page(callback, session, user, page=0)
     await callback.answer()
 
 
-@router.callback_query(HistoryCallback.filter(F.a == HistoryAction.PAGE))
+@router.callback_query(
+    HistoryCallback.filter(F.a.in_({HistoryAction.PAGE, HistoryAction.PAGE_BACK}))
+)
 async def tarot_history_page(
     callback: CallbackQuery,
     callback_data: HistoryCallback,
     session: AsyncSession,
+    db_user: User | None,
 ) -> None:
     """Handle history pagination."""
-    user = await get_user(session, callback.from_user.id)
+    user = db_user
     if not user:
         await callback.answer("Пройдите регистрацию через /start", show_alert=True)
         return
 
     page = callback_data.p or 0
-    await show_history_page(callback, session, user.id, page=page)
+    await show_history_page(
+        callback,
+        session,
+        user,
+        page=page,
+        anchor_id=callback_data.i,
+        backward=callback_data.a == HistoryAction.PAGE_BACK,
+    )
     await callback.answer()
 
 
 async def show_history_page(
     callback: CallbackQuery,
     session: AsyncSession,
-    user_id: int,
+    user: User,
     page: int,
+    anchor_id: int | None = None,
+    backward: bool = False,
 ) -> None:
     """Show history page with spreads list.
 
+    Keyset paging over (created_at, id): the next page starts after the
+    last spread shown, the previous page ends before the first one.
+    Only the columns needed for button labels are fetched.
+
     Args:
         callback: Callback query
         session: Database session
-        user_id: User's internal ID
-        page: Page number (0-indexed)
+        user: User (total comes from user.tarot_history_count)
+        page: Page number (0-indexed), for numbering
+        anchor_id: Spread ID to page from (None = first page)
+        backward: True to load the page before anchor_id
     """
-    # Count total spreads
-    count_stmt = (
-        select(func.count())
-        .select_from(TarotSpread)
-        .where(TarotSpread.user_id == user_id)
-    )
-    total_result = await session.execute(count_stmt)
-    total_count = min(total_result.scalar_one(), MAX_HISTORY_SPREADS)
+    total_count = min(user.tarot_history_count, MAX_HISTORY_SPREADS)
 
     if total_count == 0:
         await callback.message.edit_text(
@@ -782,23 +794,48 @@ async def show_history_page(
         return
 
     total_pages = (total_count + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+    page = max(0, min(page, total_pages - 1))
+
+    stmt = select(
+        TarotSpread.id,
+        TarotSpread.created_at,
+        TarotSpread.spread_type,
+        # Label preview only needs the first characters
+        func.substr(TarotSpread.question, 1, HISTORY_QUESTION_PREVIEW + 1).label("question"),
+    ).where(TarotSpread.user_id == user.id)
+
+    if page == 0 or anchor_id is None:
+        # First page (or legacy offset-only callback)
+        stmt = stmt.order_by(desc(TarotSpread.created_at), desc(TarotSpread.id))
+        if page > 0:
+            stmt = stmt.offset(page * HISTORY_PAGE_SIZE)
+    else:
+        anchor_created_at = (
+            select(TarotSpread.created_at)
+            .where(TarotSpread.id == anchor_id)
+            .scalar_subquery()
+        )
+        position = tuple_(TarotSpread.created_at, TarotSpread.id)
+        anchor = tuple_(anchor_created_at, anchor_id)
+        if backward:
+            stmt = stmt.where(position > anchor).order_by(
+                TarotSpread.created_at, TarotSpread.id
+            )
+        else:
+            stmt = stmt.where(position < anchor).order_by(
+                desc(TarotSpread.created_at), desc(TarotSpread.id)
+            )
 
-    # Get spreads for current page
-    offset = page * HISTORY_PAGE_SIZE
-    stmt = (
-        select(TarotSpread)
-        .where(TarotSpread.user_id == user_id)
-        .order_by(desc(TarotSpread.created_at))
-        .limit(HISTORY_PAGE_SIZE)
-        .offset(offset)
-    )
-    result = await session.execute(stmt)
-    spreads = result.scalars().all()
+    result = await session.execute(stmt.limit(HISTORY_PAGE_SIZE))
+    spreads = list(result.all())
+    if backward:
+        spreads.reverse()
 
+    offset = page * HISTORY_PAGE_SIZE
     await callback.message.edit_text(
         f"История раскладов ({total_count} всего)\n"
         f"Страница {page + 1}/{total_pages}",
-        reply_markup=get_history_keyboard(list(spreads), page, total_pages, offset),
+        reply_markup=get_history_keyboard(spreads, page, total_pages, offset),
     )
 
 
@@ -807,9 +844,10 @@ async def tarot_history_view(
     callback: CallbackQuery,
     callback_data: HistoryCallback,
     session: AsyncSession,
+    db_user: User | None,
 ) -> None:
     """View spread detail from history."""
-    user = await get_user(session, callback.from_user.id)
+    user = db_user
     if not user:
         await callback.answer("Пройдите регистрацию через /start", show_alert=True)
         return
@@ -820,9 +858,13 @@ async def tarot_history_view(
         return
 
     # Get spread (verify ownership)
-    stmt = select(TarotSpread).where(
-        TarotSpread.id == spread_id,
-        TarotSpread.user_id == user.id,
+    stmt = (
+        select(TarotSpread)
+        .where(
+            TarotSpread.id == spread_id,
+            TarotSpread.user_id == user.id,
+        )
+        .options(undefer(TarotSpread.interpretation))
     )
     result = await session.execute(stmt)
     spread = result.scalar_one_or_none()
@@ -831,11 +873,8 @@ async def tarot_history_view(
         await callback.answer("Расклад не найден", show_alert=True)
         return
 
-    # Get deck for card names
-    deck = get_deck()
-
-    # Format and show
-    content = format_spread_detail(spread, deck)
+    # Format and show (card names resolved through the deck index)
+    content = format_spread_detail(spread, get_deck())
     await callback.message.edit_text(
         **content.as_kwargs(),
         reply_markup=get_spread_detail_keyboard(),
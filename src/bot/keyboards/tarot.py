@@ -81,7 +81,8 @@ def get_history_keyboard(spreads: list, page: int, total_pages: int, offset: int
     Keyboard for spread history list.
 
     Args:
-        spreads: List of TarotSpread objects for current page
+        spreads: Spreads for current page (rows with id, created_at,
+            spread_type, question preview)
         page: Current page number (0-indexed)
         total_pages: Total number of pages
         offset: Offset for numbering (page * page_size)
@@ -101,17 +102,23 @@ def get_history_keyboard(spreads: list, page: int, total_pages: int, offset: int
             callback_data=HistoryCallback(a=HistoryAction.VIEW, i=spread.id),
         )
 
-    # Add pagination if needed
+    # Add pagination if needed (keyset anchors: first/last spread on this page)
+    has_prev = bool(spreads) and page > 0
+    has_next = bool(spreads) and page < total_pages - 1
     if total_pages > 1:
-        if page > 0:
+        if has_prev:
             builder.button(
                 text="<< Назад",
-                callback_data=HistoryCallback(a=HistoryAction.PAGE, p=page - 1),
+                callback_data=HistoryCallback(
+                    a=HistoryAction.PAGE_BACK, i=spreads[0].id, p=page - 1
+                ),
             )
-        if page < total_pages - 1:
+        if has_next:
             builder.button(
                 text="Вперед >>",
-                callback_data=HistoryCallback(a=HistoryAction.PAGE, p=page + 1),
+                callback_data=HistoryCallback(
+                    a=HistoryAction.PAGE, i=spreads[-1].id, p=page + 1
+                ),
             )
 
     # Back to tarot menu
@@ -124,11 +131,7 @@ def get_history_keyboard(spreads: list, page: int, total_pages: int, offset: int
     rows = [1] * len(spreads)  # Each spread on its own row
     if total_pages > 1:
         # Pagination buttons in one row
-        nav_buttons = 0
-        if page > 0:
-            nav_buttons += 1
-        if page < total_pages - 1:
-            nav_buttons += 1
+        nav_buttons = int(has_prev) + int(has_next)
         if nav_buttons > 0:
             rows.append(nav_buttons)
     rows.append(1)  # Back button
@@ -1,5 +1,5 @@
 """Bot middlewares."""
 
-from src.bot.middlewares.db import DbSessionMiddleware
+from src.bot.middlewares.db import DbSessionMiddleware, UserContextMiddleware
 
-__all__ = ["DbSessionMiddleware"]
+__all__ = ["DbSessionMiddleware", "UserContextMiddleware"]
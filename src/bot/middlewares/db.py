@@ -1,15 +1,22 @@
-"""Database session middleware for aiogram."""
+"""Database session and user context middlewares for aiogram."""
 
 from typing import Any, Awaitable, Callable
 
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
+from sqlalchemy import select
 
-from src.db.engine import AsyncSessionLocal
+from src.db.lazy_session import LazySession, reset_current_session, set_current_session
+from src.db.models.user import User
+from src.services.user_cache import cache_user, get_cached_user
 
 
 class DbSessionMiddleware(BaseMiddleware):
-    """Middleware that injects database session into handler data."""
+    """Middleware that injects database session into handler data.
+
+    The session is a LazySession: no AsyncSession is created (and no
+    connection checked out) unless the handler actually queries.
+    """
 
     async def __call__(
         self,
@@ -17,6 +24,47 @@ class DbSessionMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict[str, Any],
     ) -> Any:
-        async with AsyncSessionLocal() as session:
-            data["session"] = session
+        session = LazySession()
+        token = set_current_session(session)
+        data["session"] = session
+        try:
             return await handler(event, data)
+        finally:
+            reset_current_session(token)
+            await session.close()
+
+
+class UserContextMiddleware(BaseMiddleware):
+    """Middleware that loads the current User once per update.
+
+    Must be registered after DbSessionMiddleware. Injects ``db_user``
+    (User attached to the update's session, or None for unregistered
+    users) so handlers don't repeat ``select(User)`` lookups.
+    Recent users are served from a short-TTL cache (see
+    src/services/user_cache.py).
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        from_user = data.get("event_from_user")
+        session = data.get("session")
+        db_user: User | None = None
+
+        if from_user is not None and session is not None:
+            db_user = get_cached_user(session.sync_session, from_user.id)
+            if db_user is None:
+                result = await session.execute(
+                    select(User).where(User.telegram_id == from_user.id)
+                )
+                db_user = result.scalar_one_or_none()
+                if db_user is not None:
+                    cache_user(db_user)
+                # Don't hold the connection until the handler's next query
+                await session.release()
+
+        data["db_user"] = db_user
+        return await handler(event, data)
@@ -0,0 +1,192 @@
+"""Asynchronous Telegram update intake with a bounded worker pool.
+
+The webhook endpoint validates an update, hands it to ``UpdateQueue.submit``
+and returns immediately, so slow handlers (LLM calls of 30 s+) no longer
+hold Telegram's webhook request open.
+
+Guarantees:
+- Per-chat ordering: updates of one chat are processed strictly in arrival
+  order; different chats are processed in parallel.
+- Bounded memory: at most ``max_pending`` updates are queued; beyond that
+  updates are shed (counted in metrics) and the webhook answers 503 so
+  Telegram redelivers later.
+- Dedupe: recently seen ``update_id``s (Telegram retries) are dropped.
+
+All three hold per process: the queue, the ordering and the seen
+``update_id``s live in memory. With several uvicorn workers a Telegram retry
+or the next update of a chat can land in another worker, so duplicates and
+reordering become possible. Keep the webhook in one worker
+(``WEB_CONCURRENCY=1``) and scale handler concurrency with
+``UPDATE_WORKERS``.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any
+
+import structlog
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from src.monitoring.metrics import (
+    UPDATE_PROCESSING_DURATION,
+    UPDATE_QUEUE_DEPTH,
+    UPDATES_DROPPED_TOTAL,
+)
+
+logger = structlog.get_logger()
+
+# How many recent update_ids to remember for retry dedupe
+DEDUPE_WINDOW = 10_000
+
+
+def get_ordering_key(update: Update) -> int:
+    """Key that must be processed sequentially (chat id, then user id).
+
+    Falls back to update_id for update types without chat or user,
+    which effectively means "no ordering constraint".
+    """
+    event: Any = update.event if update.event_type else None
+    if event is not None:
+        chat = getattr(event, "chat", None)
+        if chat is None:
+            message = getattr(event, "message", None)
+            chat = getattr(message, "chat", None)
+        if chat is not None:
+            return chat.id
+        user = getattr(event, "from_user", None) or getattr(event, "user", None)
+        if user is not None:
+            return user.id
+    return -update.update_id
+
+
+class UpdateQueue:
+    """Bounded per-chat ordered update queue with a worker pool."""
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.worker_count = workers
+        self.max_pending = max_pending
+
+        self._pending: dict[int, deque[Update]] = {}
+        self._ready: asyncio.Queue[int] = asyncio.Queue()
+        self._active: set[int] = set()
+        self._size = 0
+        self._seen: OrderedDict[int, None] = OrderedDict()
+
+        self._dp: Dispatcher | None = None
+        self._bot: Bot | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def size(self) -> int:
+        """Number of queued (not yet started) updates."""
+        return self._size
+
+    def start(self, dp: Dispatcher, bot: Bot) -> None:
+        """Start worker tasks."""
+        self._dp = dp
+        self._bot = bot
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"update-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+
+    async def stop(self, timeout: float = 25.0) -> None:
+        """Drain queued updates (up to timeout), then cancel workers."""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+        except TimeoutError:
+            await logger.awarning("Update queue not drained on shutdown", pending=self._size)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _mark_seen(self, update_id: int) -> bool:
+        """Record update_id; returns False if it was already seen."""
+        if update_id in self._seen:
+            return False
+        self._seen[update_id] = None
+        if len(self._seen) > DEDUPE_WINDOW:
+            self._seen.popitem(last=False)
+        return True
+
+    def submit(self, update: Update) -> bool:
+        """Enqueue update for processing.
+
+        Returns:
+            False if the update was shed because the queue is full
+            (caller should ask Telegram to retry). Duplicates return True.
+        """
+        if update.update_id in self._seen:
+            UPDATES_DROPPED_TOTAL.labels(reason="duplicate").inc()
+            return True
+
+        if self._size >= self.max_pending:
+            UPDATES_DROPPED_TOTAL.labels(reason="queue_full").inc()
+            return False
+
+        self._mark_seen(update.update_id)
+        key = get_ordering_key(update)
+        chat_queue = self._pending.get(key)
+        if chat_queue is None:
+            chat_queue = self._pending[key] = deque()
+        chat_queue.append(update)
+        self._size += 1
+        self._idle.clear()
+        UPDATE_QUEUE_DEPTH.set(self._size)
+
+        # Schedule the chat unless a worker already owns it or it's scheduled
+        if key not in self._active and len(chat_queue) == 1:
+            self._ready.put_nowait(key)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._ready.get()
+            self._active.add(key)
+            try:
+                chat_queue = self._pending.get(key)
+                while chat_queue:
+                    update = chat_queue.popleft()
+                    self._size -= 1
+                    UPDATE_QUEUE_DEPTH.set(self._size)
+                    await self._process(update)
+            finally:
+                self._active.discard(key)
+                if not self._pending.get(key):
+                    self._pending.pop(key, None)
+                if self._size == 0 and not self._active:
+                    self._idle.set()
+
+    async def _process(self, update: Update) -> None:
+        start = time.monotonic()
+        try:
+            await self._dp.feed_update(self._bot, update)
+        except Exception as e:
+            await logger.aerror(
+                "Update processing failed",
+                update_id=update.update_id,
+                error=str(e),
+            )
+        finally:
+            UPDATE_PROCESSING_DURATION.observe(time.monotonic() - start)
+
+
+_update_queue: UpdateQueue | None = None
+
+
+def get_update_queue() -> UpdateQueue:
+    """Get update queue singleton (sized from settings)."""
+    global _update_queue
+    if _update_queue is None:
+        from src.config import settings
+
+        _update_queue = UpdateQueue(
+            workers=settings.update_workers,
+            max_pending=settings.update_queue_max_pending,
+        )
+    return _update_queue
@@ -8,6 +8,8 @@ from typing import Any, Coroutine
 from aiogram.types import Message
 from aiogram.utils.chat_action import ChatActionSender
 
+from src.db.lazy_session import release_current_session
+
 # Progress message templates for different operation types
 PROGRESS_MESSAGES: dict[str, str] = {
     "horoscope": "Генерирую гороскоп...",
@@ -46,6 +48,9 @@ async def generate_with_feedback(
     # Get progress message text
     progress_text = PROGRESS_MESSAGES.get(operation_type, PROGRESS_MESSAGES["default"])
 
+    # Return the update's DB connection to the pool while waiting on the LLM
+    await release_current_session()
+
     # Send progress message
     progress_msg = await message.answer(progress_text)
 
@@ -1,35 +1,20 @@
-"""Tarot card utilities: deck loading, random selection, image handling."""
+"""Tarot card utilities: random selection, card lookup, image handling.
+
+The deck itself lives in ``src.services.tarot_deck``.
+"""
 
-import json
 import random
+from collections.abc import Mapping
 from io import BytesIO
-from pathlib import Path
+from typing import Any
 
 from PIL import Image
 from aiogram.types import BufferedInputFile, FSInputFile
 
-
-def load_tarot_deck() -> list[dict]:
-    """Load 78 tarot cards from JSON."""
-    deck_path = Path(__file__).parent.parent.parent / "data" / "tarot" / "cards.json"
-    with open(deck_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data["cards"]
-
-
-# Singleton deck (loaded once)
-_DECK: list[dict] | None = None
+from src.services.tarot_deck import DECK_PATH, get_card_text, get_deck  # noqa: F401 - re-export
 
 
-def get_deck() -> list[dict]:
-    """Get tarot deck (lazy load singleton)."""
-    global _DECK
-    if _DECK is None:
-        _DECK = load_tarot_deck()
-    return _DECK
-
-
-def get_random_card() -> tuple[dict, bool]:
+def get_random_card() -> tuple[Mapping[str, Any], bool]:
     """
     Return random card + reversed flag (50% chance).
 
@@ -37,40 +22,36 @@ def get_random_card() -> tuple[dict, bool]:
         (card_dict, is_reversed)
     """
     deck = get_deck()
-    card = random.choice(deck)
+    card = random.choice(deck.cards)
     reversed_flag = random.choice([True, False])
     return card, reversed_flag
 
 
-def get_three_cards() -> list[tuple[dict, bool]]:
+def get_three_cards() -> list[tuple[Mapping[str, Any], bool]]:
     """
     Return 3 unique cards with reversed flags.
 
     Uses random.sample() to guarantee uniqueness.
     """
     deck = get_deck()
-    cards = random.sample(deck, 3)
+    cards = random.sample(deck.cards, 3)
     return [(card, random.choice([True, False])) for card in cards]
 
 
-def get_ten_cards() -> list[tuple[dict, bool]]:
+def get_ten_cards() -> list[tuple[Mapping[str, Any], bool]]:
     """
     Return 10 unique cards with reversed flags for Celtic Cross spread.
 
     Uses random.sample() to guarantee uniqueness.
     """
     deck = get_deck()
-    cards = random.sample(deck, 10)
+    cards = random.sample(deck.cards, 10)
     return [(card, random.choice([True, False])) for card in cards]
 
 
-def get_card_by_id(name_short: str) -> dict | None:
+def get_card_by_id(name_short: str | None) -> Mapping[str, Any] | None:
     """Get card by name_short (e.g., 'ar00')."""
-    deck = get_deck()
-    for card in deck:
-        if card["name_short"] == name_short:
-            return card
-    return None
+    return get_deck().get(name_short)
 
 
 def get_card_image(
@@ -86,9 +67,7 @@ def get_card_image(
     Returns:
         BufferedInputFile (rotated) or FSInputFile (upright)
     """
-    image_path = (
-        Path(__file__).parent.parent.parent / "data" / "tarot" / "images" / f"{name_short}.jpg"
-    )
+    image_path = DECK_PATH.parent / "images" / f"{name_short}.jpg"
 
     if not reversed_flag:
         # Upright card - send directly
@@ -1,14 +1,15 @@
-"""Tarot message formatting with entity-based approach."""
+"""Tarot message formatting with entity-based approach.
 
+Card names, reversed labels, meanings and type names come preformatted from
+the deck (``CardText``), so rendering only assembles fragments.
+"""
 
-from aiogram.utils.formatting import BlockQuote, Bold, Text
+from collections.abc import Mapping
+from typing import Any
 
+from aiogram.utils.formatting import BlockQuote, Bold, Text
 
-# Russian card type names
-CARD_TYPE_RU = {
-    "major": "Старший Аркан",
-    "minor": "Младший Аркан",
-}
+from src.services.tarot_deck import REVERSED_LABEL, TarotDeck, get_card_text
 
 # Position names for 3-card spread (Past, Present, Future)
 SPREAD_POSITIONS = ["Прошлое", "Настоящее", "Будущее"]
@@ -28,7 +29,7 @@ CELTIC_CROSS_POSITIONS = [
 ]
 
 
-def format_card_of_day(card: dict, reversed_flag: bool) -> Text:
+def format_card_of_day(card: Mapping[str, Any], reversed_flag: bool) -> Text:
     """
     Format Card of the Day message.
 
@@ -41,26 +42,23 @@ def format_card_of_day(card: dict, reversed_flag: bool) -> Text:
         *Значение:*
         > {meaning}
     """
-    card_name = card["name"]
-    card_type = CARD_TYPE_RU.get(card["type"], card["type"])
-    meaning = card["meaning_rev"] if reversed_flag else card["meaning_up"]
-    reversed_text = " (перевернутая)" if reversed_flag else ""
+    text = get_card_text(card)
 
     return Text(
         Bold("Карта дня"),
         "\n\n",
-        Bold(f"{card_name}{reversed_text}"),
+        Bold(text.label[reversed_flag]),
         "\n",
-        card_type,
+        text.type_ru,
         "\n\n",
         Bold("Значение:"),
         "\n",
-        BlockQuote(meaning),
+        BlockQuote(text.meaning[reversed_flag]),
     )
 
 
 def format_three_card_spread(
-    cards: list[tuple[dict, bool]],
+    cards: list[tuple[Mapping[str, Any], bool]],
     question: str,
 ) -> Text:
     """
@@ -88,16 +86,14 @@ def format_three_card_spread(
 
     for i, (card, reversed_flag) in enumerate(cards):
         position = SPREAD_POSITIONS[i]
-        card_name = card["name"]
-        meaning = card["meaning_rev"] if reversed_flag else card["meaning_up"]
-        reversed_text = " (перевернутая)" if reversed_flag else ""
+        text = get_card_text(card)
 
         content.extend(
             [
                 Bold(f"{position}:"),
-                f" {card_name}{reversed_text}",
+                f" {text.label[reversed_flag]}",
                 "\n",
-                BlockQuote(meaning),
+                BlockQuote(text.meaning[reversed_flag]),
                 "\n\n",
             ]
         )
@@ -142,22 +138,20 @@ def format_ai_interpretation(interpretation: str) -> Text:
 
 
 def format_card_of_day_with_ai(
-    card: dict, reversed_flag: bool, ai_interpretation: str | None
+    card: Mapping[str, Any], reversed_flag: bool, ai_interpretation: str | None
 ) -> Text:
     """Format Card of the Day with AI interpretation.
 
     If AI interpretation available, show it instead of static meaning.
     """
-    card_name = card["name"]
-    card_type = CARD_TYPE_RU.get(card["type"], card["type"])
-    reversed_text = " (перевернутая)" if reversed_flag else ""
+    text = get_card_text(card)
 
     parts: list = [
         Bold("Карта дня"),
         "\n\n",
-        Bold(f"{card_name}{reversed_text}"),
+        Bold(text.label[reversed_flag]),
         "\n",
-        card_type,
+        text.type_ru,
         "\n\n",
     ]
 
@@ -165,12 +159,11 @@ def format_card_of_day_with_ai(
         parts.append(ai_interpretation)
     else:
         # Fallback to static meaning
-        meaning = card["meaning_rev"] if reversed_flag else card["meaning_up"]
         parts.extend(
             [
                 Bold("Значение:"),
                 "\n",
-                BlockQuote(meaning),
+                BlockQuote(text.meaning[reversed_flag]),
             ]
         )
 
@@ -178,7 +171,7 @@ def format_card_of_day_with_ai(
 
 
 def format_three_card_spread_with_ai(
-    cards: list[tuple[dict, bool]],
+    cards: list[tuple[Mapping[str, Any], bool]],
     question: str,
     ai_interpretation: str | None,
 ) -> Text:
@@ -197,11 +190,9 @@ def format_three_card_spread_with_ai(
     # Show cards with names
     content.append(Bold("Карты расклада:"))
     content.append("\n")
-    for i, (card, reversed_flag) in enumerate(cards):
-        position = SPREAD_POSITIONS[i]
-        card_name = card["name"]
-        reversed_text = " (перевернутая)" if reversed_flag else ""
-        content.append(f"{position}: {card_name}{reversed_text}\n")
+    texts = [get_card_text(card) for card, _ in cards]
+    for i, (text, (_, reversed_flag)) in enumerate(zip(texts, cards)):
+        content.append(f"{SPREAD_POSITIONS[i]}: {text.label[reversed_flag]}\n")
 
     content.append("\n")
 
@@ -209,14 +200,12 @@ def format_three_card_spread_with_ai(
         content.append(ai_interpretation)
     else:
         # Fallback to static meanings (same as original format_three_card_spread)
-        for i, (card, reversed_flag) in enumerate(cards):
-            position = SPREAD_POSITIONS[i]
-            meaning = card["meaning_rev"] if reversed_flag else card["meaning_up"]
+        for i, (text, (_, reversed_flag)) in enumerate(zip(texts, cards)):
             content.extend(
                 [
-                    Bold(f"{position}:"),
+                    Bold(f"{SPREAD_POSITIONS[i]}:"),
                     "\n",
-                    BlockQuote(meaning),
+                    BlockQuote(text.meaning[reversed_flag]),
                     "\n\n",
                 ]
             )
@@ -228,7 +217,7 @@ def format_three_card_spread_with_ai(
 
 
 def format_celtic_cross_with_ai(
-    cards: list[tuple[dict, bool]],
+    cards: list[tuple[Mapping[str, Any], bool]],
     question: str,
     ai_interpretation: str | None,
 ) -> Text:
@@ -249,11 +238,9 @@ def format_celtic_cross_with_ai(
     # Show cards with positions
     content.append(Bold("Карты расклада:"))
     content.append("\n")
-    for i, (card, reversed_flag) in enumerate(cards):
-        position = CELTIC_CROSS_POSITIONS[i]
-        card_name = card["name"]
-        reversed_text = " (перевернутая)" if reversed_flag else ""
-        content.append(f"{i + 1}. {position}: {card_name}{reversed_text}\n")
+    texts = [get_card_text(card) for card, _ in cards]
+    for i, (text, (_, reversed_flag)) in enumerate(zip(texts, cards)):
+        content.append(f"{i + 1}. {CELTIC_CROSS_POSITIONS[i]}: {text.label[reversed_flag]}\n")
 
     content.append("\n")
 
@@ -261,14 +248,12 @@ def format_celtic_cross_with_ai(
         content.append(ai_interpretation)
     else:
         # Fallback to static meanings
-        for i, (card, reversed_flag) in enumerate(cards):
-            position = CELTIC_CROSS_POSITIONS[i]
-            meaning = card["meaning_rev"] if reversed_flag else card["meaning_up"]
+        for i, (text, (_, reversed_flag)) in enumerate(zip(texts, cards)):
             content.extend(
                 [
-                    Bold(f"{position}:"),
+                    Bold(f"{CELTIC_CROSS_POSITIONS[i]}:"),
                     "\n",
-                    BlockQuote(meaning),
+                    BlockQuote(text.meaning[reversed_flag]),
                     "\n\n",
                 ]
             )
@@ -296,12 +281,12 @@ def format_history_item(spread) -> str:
     return f"{date_str} [{type_label}] {question_preview}"
 
 
-def format_spread_detail(spread, cards_data: list[dict]) -> Text:
+def format_spread_detail(spread, deck: TarotDeck) -> Text:
     """Format spread detail view from history.
 
     Args:
         spread: TarotSpread object with cards JSON
-        cards_data: List of card dicts from get_card_by_id
+        deck: Tarot deck (cards looked up by name_short)
 
     Returns:
         Formatted Text with cards and interpretation
@@ -330,23 +315,16 @@ def format_spread_detail(spread, cards_data: list[dict]) -> Text:
     # Show cards
     for i, card_info in enumerate(spread.cards):
         card_id = card_info.get("card_id")
-        reversed_flag = card_info.get("reversed", False)
-
-        # Find card in cards_data
-        card = None
-        for c in cards_data:
-            if c["name_short"] == card_id:
-                card = c
-                break
+        reversed_flag = bool(card_info.get("reversed", False))
 
-        if card:
-            card_name = card["name"]
+        text = deck.text(card_id)
+        if text is not None:
+            card_label = text.label[reversed_flag]
         else:
-            card_name = card_id or "Неизвестная карта"
+            card_label = (card_id or "Неизвестная карта") + (REVERSED_LABEL if reversed_flag else "")
 
-        reversed_text = " (перевернутая)" if reversed_flag else ""
         position = positions[i] if i < len(positions) else f"Карта {i + 1}"
-        content.append(f"{i + 1}. {position}: {card_name}{reversed_text}\n")
+        content.append(f"{i + 1}. {position}: {card_label}\n")
 
     content.append("\n")
 
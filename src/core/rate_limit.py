@@ -0,0 +1,52 @@
+"""Async rate limiting primitives shared by background jobs and services."""
+
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """Token bucket rate limiter for asyncio code.
+
+    Allows short bursts up to ``burst`` acquisitions and refills at
+    ``rate`` tokens per second. Callers wait (without blocking the loop)
+    until a token is available.
+
+    Example:
+        limiter = AsyncRateLimiter(rate=25, burst=25)
+        async with limiter:
+            await bot.send_message(...)
+    """
+
+    def __init__(self, rate: float, burst: int | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until ``tokens`` can be taken from the bucket."""
+        # A single request larger than the bucket would never fit - cap it
+        tokens = min(tokens, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
@@ -0,0 +1,111 @@
+"""Shared timezone resolution for user-local date computations.
+
+Users store an IANA timezone name (``User.timezone``, None = Moscow).
+Resolving it and computing "today" for that user used to happen per call
+with pytz; this module keeps it cheap:
+- ``get_zone`` caches ZoneInfo objects by name (unknown names are logged
+  once and fall back to DEFAULT_TIMEZONE instead of raising).
+- UTC offsets are cached per zone for the current 15-minute UTC window.
+  Real-world DST transitions happen on quarter-hour boundaries, so an
+  offset computed at the start of a window holds for all of it.
+- ``local_dates`` answers "local date for N users" with one offset lookup
+  per distinct zone, so batch jobs are O(zones), not O(users).
+"""
+
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, time, timedelta
+from functools import cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import structlog
+
+logger = structlog.get_logger()
+
+DEFAULT_TIMEZONE = "Europe/Moscow"
+
+_OFFSET_WINDOW = 15 * 60  # seconds
+
+# Zone name -> UTC offset, valid for window _offsets_window only
+_offsets: dict[str, timedelta] = {}
+_offsets_window = -1
+
+
+@cache
+def _load_zone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning("Unknown timezone, using default", timezone=name, default=DEFAULT_TIMEZONE)
+        return ZoneInfo(DEFAULT_TIMEZONE)
+
+
+def get_zone(name: str | None) -> ZoneInfo:
+    """Cached ZoneInfo for a timezone name (None/invalid = Moscow)."""
+    return _load_zone(name or DEFAULT_TIMEZONE)
+
+
+def utc_offset(name: str | None, now: datetime | None = None) -> timedelta:
+    """UTC offset of zone at ``now`` (default: current time).
+
+    Offsets for the current window are cached; explicit ``now`` values
+    outside it are computed directly.
+    """
+    global _offsets_window
+
+    current = datetime.now(UTC)
+    if now is None:
+        now = current
+    window = int(now.timestamp()) // _OFFSET_WINDOW
+    if window != int(current.timestamp()) // _OFFSET_WINDOW:
+        return now.astimezone(get_zone(name)).utcoffset()
+
+    if window != _offsets_window:
+        _offsets.clear()
+        _offsets_window = window
+
+    key = name or DEFAULT_TIMEZONE
+    offset = _offsets.get(key)
+    if offset is None:
+        window_start = datetime.fromtimestamp(window * _OFFSET_WINDOW, UTC)
+        offset = window_start.astimezone(get_zone(name)).utcoffset()
+        _offsets[key] = offset
+    return offset
+
+
+def local_now(name: str | None) -> datetime:
+    """Current aware datetime in zone."""
+    return datetime.now(get_zone(name))
+
+
+def local_today(name: str | None, now: datetime | None = None) -> date:
+    """Today's date in zone."""
+    if now is None:
+        now = datetime.now(UTC)
+    return (now.astimezone(UTC) + utc_offset(name, now)).date()
+
+
+def local_dates(names: Iterable[str | None], now: datetime | None = None) -> dict[str | None, date]:
+    """Today's date for each distinct zone name (one lookup per zone).
+
+    Example:
+        dates = local_dates(u.timezone for u in users)
+        for user in users:
+            today = dates[user.timezone]
+    """
+    if now is None:
+        now = datetime.now(UTC)
+    return {name: local_today(name, now) for name in set(names)}
+
+
+def local_to_utc(day: date, at: time, name: str | None) -> datetime:
+    """Convert local wall-clock date+time in zone to aware UTC datetime.
+
+    Like pytz ``localize(is_dst=False)``, times around DST transitions
+    resolve to standard time: an ambiguous time (fall-back) to its second
+    occurrence (fold=1), a non-existent time (spring-forward gap) to the
+    offset before the transition (fold=0).
+    """
+    local = datetime.combine(day, at, tzinfo=get_zone(name)).replace(fold=1)
+    if local.dst():
+        local = local.replace(fold=0)
+    return local.astimezone(UTC)
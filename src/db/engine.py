@@ -1,6 +1,7 @@
 from collections.abc import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from src.config import settings
 
@@ -8,6 +9,19 @@ engine = create_async_engine(
     settings.async_database_url,
     echo=settings.debug,
     pool_pre_ping=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+)
+
+# Unpooled engine for long-lived session-scoped connections (leader
+# advisory lock): no app pool slot is held, and closing really
+# disconnects, so session settings never leak into pooled connections
+lock_engine = create_async_engine(
+    settings.async_database_url,
+    echo=settings.debug,
+    poolclass=NullPool,
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -0,0 +1,115 @@
+"""Lazily-connecting session proxy for bot updates.
+
+DbSessionMiddleware hands every handler a ``LazySession`` instead of an
+``AsyncSession``:
+- The underlying AsyncSession is only created when the handler touches it,
+  so updates that never use the DB (menu navigation, "back" buttons) cost
+  nothing.
+- ``release()`` ends a read-only transaction and returns its connection to
+  the pool while keeping loaded objects attached (expire_on_commit=False).
+  ``generate_with_feedback`` calls it before waiting on the LLM, so a
+  handler no longer holds a pooled connection for 30 s+ of OpenRouter time.
+  The next query transparently checks out a new connection.
+"""
+
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, SessionTransaction
+
+from src.db.engine import AsyncSessionLocal
+
+# Session info flag: transaction has flushed writes not yet committed
+_FLUSHED_WRITES = "flushed_writes"
+
+_current_session: ContextVar["LazySession | None"] = ContextVar(
+    "current_db_session", default=None
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_writes(session: Session, flush_context) -> None:
+    session.info[_FLUSHED_WRITES] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_flushed_writes(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_FLUSHED_WRITES, None)
+
+
+class LazySession:
+    """AsyncSession proxy created on first use, with connection release."""
+
+    def __init__(self, factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal) -> None:
+        self._factory = factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def session(self) -> AsyncSession:
+        """Underlying AsyncSession (created on first access)."""
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    @property
+    def is_active(self) -> bool:
+        """True if the underlying session has been created."""
+        return self._session is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+    def has_pending_writes(self) -> bool:
+        """True if the session holds unflushed or uncommitted changes."""
+        session = self._session
+        if session is None:
+            return False
+        return bool(
+            session.new
+            or session.dirty
+            or session.deleted
+            or session.sync_session.info.get(_FLUSHED_WRITES)
+        )
+
+    async def release(self) -> bool:
+        """Return the connection to the pool if the transaction is read-only.
+
+        Transactions with pending writes are left untouched - the handler
+        owns their commit/rollback.
+
+        Returns:
+            True if a transaction was ended
+        """
+        session = self._session
+        if session is None or not session.in_transaction() or self.has_pending_writes():
+            return False
+        # Commit (not rollback) keeps loaded objects unexpired
+        await session.commit()
+        return True
+
+    async def close(self) -> None:
+        """Close underlying session, if it was ever created."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def set_current_session(session: LazySession | None) -> Any:
+    """Bind session to the current update context; returns reset token."""
+    return _current_session.set(session)
+
+
+def reset_current_session(token: Any) -> None:
+    """Undo set_current_session."""
+    _current_session.reset(token)
+
+
+async def release_current_session() -> bool:
+    """Release the current update's DB connection before a slow await."""
+    session = _current_session.get()
+    if session is None:
+        return False
+    return await session.release()
@@ -1,25 +1,34 @@
 from src.db.models.ai_usage import AIUsage
 from src.db.models.base import Base
+from src.db.models.card_of_day import CardOfDayInterpretation
 from src.db.models.detailed_natal import DetailedNatal
-from src.db.models.horoscope_cache import HoroscopeCache, HoroscopeView
+from src.db.models.fsm_state import FSMState
+from src.db.models.horoscope_cache import HoroscopeCache, HoroscopeView, PremiumHoroscope
 from src.db.models.payment import Payment, PaymentStatus
+from src.db.models.payment_webhook import PaymentWebhookEvent
 from src.db.models.promo import PromoCode
 from src.db.models.subscription import Subscription, SubscriptionPlan, SubscriptionStatus
 from src.db.models.tarot_spread import TarotSpread
+from src.db.models.telegraph_account import TelegraphAccount
 from src.db.models.user import User
 
 __all__ = [
     "AIUsage",
     "Base",
+    "CardOfDayInterpretation",
     "DetailedNatal",
+    "FSMState",
     "HoroscopeCache",
     "HoroscopeView",
     "Payment",
     "PaymentStatus",
+    "PaymentWebhookEvent",
+    "PremiumHoroscope",
     "PromoCode",
     "Subscription",
     "SubscriptionPlan",
     "SubscriptionStatus",
     "TarotSpread",
+    "TelegraphAccount",
     "User",
 ]
@@ -21,6 +21,9 @@ class AIUsage(Base):
     )  # horoscope, tarot, natal_chart, card_of_day, celtic_cross
     model = Column(String(100))  # openai/gpt-4o-mini
     prompt_tokens = Column(Integer, default=0)
+    cached_tokens = Column(
+        Integer, default=0, server_default="0", nullable=False
+    )  # part of prompt_tokens served from the provider prompt cache
     completion_tokens = Column(Integer, default=0)
     total_tokens = Column(Integer, default=0)
     cost_dollars = Column(Float, nullable=True)  # from OpenRouter response or calculated
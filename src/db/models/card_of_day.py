@@ -0,0 +1,55 @@
+"""Precomputed card of the day interpretations."""
+
+from datetime import date, datetime
+
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Integer,
+    SmallInteger,
+    String,
+    Text,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.models.base import Base
+
+
+class CardOfDayInterpretation(Base):
+    """One variant of the AI interpretation for (card, orientation, date).
+
+    Filled by a nightly job ahead of demand (and on demand as fallback).
+    Users are assigned a variant deterministically, so serving card of day
+    is a single unique-key lookup.
+    """
+
+    __tablename__ = "card_of_day_interpretations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    card_id: Mapped[str] = mapped_column(String(20))  # name_short
+    is_reversed: Mapped[bool] = mapped_column(Boolean)
+    pool_date: Mapped[date] = mapped_column(Date, index=True)
+    variant: Mapped[int] = mapped_column(SmallInteger)
+    content: Mapped[str] = mapped_column(Text)
+    generated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default="now()",
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "card_id",
+            "is_reversed",
+            "pool_date",
+            "variant",
+            name="uq_card_of_day_card_date_variant",
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<CardOfDayInterpretation(card={self.card_id}, reversed={self.is_reversed}, "
+            f"date={self.pool_date}, variant={self.variant})>"
+        )
@@ -0,0 +1,29 @@
+"""Persistent aiogram FSM state storage model."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.models.base import Base
+
+
+class FSMState(Base):
+    """FSM state and data for one aiogram StorageKey.
+
+    Shared by all bot instances, survives deploys. Written in batches by
+    PostgresFSMStorage; rows untouched longer than the state TTL are purged.
+    """
+
+    __tablename__ = "fsm_states"
+
+    # "bot_id:chat_id:user_id:thread_id:business_connection_id:destiny"
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    state: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # JSON-encoded FSM data (see src/bot/fsm_storage.py for type tagging)
+    data: Mapped[str] = mapped_column(Text, default="{}", server_default="{}")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        index=True,
+    )
@@ -2,7 +2,7 @@
 
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.db.models.base import Base
@@ -58,3 +58,34 @@ class HoroscopeView(Base):
 
     def __repr__(self) -> str:
         return f"<HoroscopeView(sign={self.zodiac_sign}, date={self.view_date}, count={self.view_count})>"
+
+
+class PremiumHoroscope(Base):
+    """Personalized premium horoscope precomputed for a user's day.
+
+    Generated in the hours before the user's notification time, so the
+    notification job only reads and sends. Unique per (user, date).
+    """
+
+    __tablename__ = "premium_horoscopes"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+    )
+    horoscope_date: Mapped[date] = mapped_column(Date, index=True)
+    content: Mapped[str] = mapped_column(Text)
+    generated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default="now()",
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "horoscope_date", name="uq_premium_horoscopes_user_date"
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return f"<PremiumHoroscope(user_id={self.user_id}, date={self.horoscope_date})>"
@@ -0,0 +1,56 @@
+"""Inbox table for durable YooKassa webhook processing."""
+
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.models.base import Base
+
+
+class PaymentWebhookEvent(Base):
+    """YooKassa notification persisted before processing.
+
+    The webhook endpoint only inserts a row (deduplicated by
+    ``dedupe_key`` = event type + payment id) and returns 200. Workers
+    claim pending rows with ``FOR UPDATE SKIP LOCKED``, call
+    ``process_webhook_event`` and record the outcome, retrying with
+    backoff on failure (at-least-once processing).
+    """
+
+    __tablename__ = "payment_webhook_events"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    dedupe_key: Mapped[str] = mapped_column(String(120), unique=True)
+    event_type: Mapped[str] = mapped_column(String(50))
+    payment_id: Mapped[str] = mapped_column(String(50), index=True)
+    payload: Mapped[dict] = mapped_column(JSON)
+
+    # Status: pending, processing, done, failed
+    status: Mapped[str] = mapped_column(
+        String(20), default="pending", server_default="pending"
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+    locked_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    # Result of processing: processed, skipped, or last error message
+    outcome: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+    processed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    __table_args__ = (
+        Index("ix_payment_webhook_events_status_next_attempt", "status", "next_attempt_at"),
+    )
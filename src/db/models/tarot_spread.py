@@ -2,7 +2,8 @@
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, JSON, String, Text, func
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, String, Text, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.db.models.base import Base
@@ -12,11 +13,23 @@ class TarotSpread(Base):
     """Store tarot spread history for users."""
 
     __tablename__ = "tarot_spreads"
+    __table_args__ = (
+        # History list: WHERE user_id = ? ORDER BY created_at DESC (keyset)
+        Index("ix_tarot_spreads_user_id_created_at", "user_id", text("created_at DESC")),
+        # Admin substring search: question ILIKE '%term%' (pg_trgm)
+        Index(
+            "ix_tarot_spreads_question_trgm",
+            "question",
+            postgresql_using="gin",
+            postgresql_ops={"question": "gin_trgm_ops"},
+        ),
+        # Admin full-text search over question + interpretation
+        Index("ix_tarot_spreads_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
-        index=True,
     )
 
     # Spread type: "three_card" | "celtic_cross"
@@ -28,8 +41,16 @@ class TarotSpread(Base):
     # Cards drawn: [{"card_id": "ar01", "reversed": false, "position": 1}, ...]
     cards: Mapped[dict] = mapped_column(JSON)
 
-    # Stored AI interpretation for history viewing
-    interpretation: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Stored AI interpretation for history viewing (loaded only on detail view)
+    interpretation: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)
+
+    # Full-text document (question + interpretation, Russian stemming),
+    # maintained by a database trigger (migration e6a3c9d1b048)
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        nullable=True,
+        deferred=True,
+    )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -0,0 +1,25 @@
+"""Persisted Telegraph account model."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.models.base import Base
+
+
+class TelegraphAccount(Base):
+    """Telegraph access token shared by all bot instances.
+
+    Created once on first publish; keeps pages under one account across
+    restarts instead of creating a new anonymous account per process.
+    """
+
+    __tablename__ = "telegraph_accounts"
+
+    short_name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    access_token: Mapped[str] = mapped_column(String(128), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
@@ -1,6 +1,18 @@
 from datetime import date, datetime, time
 
-from sqlalchemy import BigInteger, Boolean, Date, DateTime, Float, SmallInteger, String, Time, func
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    Time,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.db.models.base import Base
@@ -8,6 +20,15 @@ from src.db.models.base import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin username search: ILIKE '%term%' (pg_trgm)
+        Index(
+            "ix_users_username_trgm",
+            "username",
+            postgresql_using="gin",
+            postgresql_ops={"username": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     telegram_id: Mapped[int] = mapped_column(BigInteger, unique=True, index=True)
@@ -69,6 +90,9 @@ class User(Base):
     spread_reset_date: Mapped[date | None] = mapped_column(
         Date, nullable=True
     )  # Date of last reset (user timezone)
+    tarot_history_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0"
+    )  # Spreads saved to history (incremented on insert)
 
     # Subscription status (denormalized for quick access)
     is_premium: Mapped[bool] = mapped_column(
@@ -1,30 +1,40 @@
+import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 import structlog
 from aiogram.types import Update
-from fastapi import BackgroundTasks, Depends, FastAPI, Request, Response, status
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
-from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.staticfiles import StaticFiles
-from prometheus_client import make_asgi_app
+from prometheus_client import REGISTRY, CollectorRegistry, make_asgi_app, multiprocess
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from src.admin.router import admin_router
 from src.bot.bot import dp, get_bot
-from src.bot.middlewares.db import DbSessionMiddleware
+from src.bot.middlewares.db import DbSessionMiddleware, UserContextMiddleware
+from src.bot.update_queue import get_update_queue
 from src.bot.utils.zodiac import ZODIAC_SIGNS
 from src.config import settings
 from src.core.logging import configure_logging
-from src.db.engine import AsyncSessionLocal, engine, get_session
-from src.monitoring.health import run_all_checks
+from src.db.engine import AsyncSessionLocal, engine, lock_engine
+from src.monitoring.health import get_health_monitor
+from src.services.ai.prompt_budget import load_encoding
+from src.services.astrology.geocoding import get_geocoding_service
 from src.services.horoscope_cache import get_horoscope_cache_service
-from src.services.payment.service import is_yookassa_ip, process_webhook_event
-from src.services.scheduler import get_scheduler
+from src.services.payment.client import close_yookassa_client
+from src.services.payment.inbox import enqueue_webhook_event, get_payment_inbox_worker
+from src.services.payment.service import is_yookassa_ip
+from src.services.scheduler import get_scheduler, get_scheduler_leader
+from src.services.tarot_deck import load_deck
+from src.services.telegraph import close_telegraph
 
 logger = structlog.get_logger()
 
+# Set (by scripts/start.sh) when running several uvicorn workers
+METRICS_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
 
 async def warm_horoscope_cache() -> None:
     """Preload horoscope cache from PostgreSQL on startup (PERF-07).
@@ -47,6 +57,18 @@ async def warm_horoscope_cache() -> None:
     logger.info("Horoscope cache warming complete")
 
 
+async def register_webhook(bot) -> None:
+    """Point Telegram at our webhook (runs in the elected leader only).
+
+    Pending updates are kept: on a restart or failover the other workers
+    may still be serving, and queued updates are delivered once the
+    webhook is back.
+    """
+    webhook_url = f"{settings.webhook_base_url}/webhook"
+    await bot.set_webhook(url=webhook_url, secret_token=settings.webhook_secret)
+    await logger.ainfo("Webhook set", url=webhook_url)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan: startup and shutdown events."""
@@ -58,41 +80,93 @@ async def lifespan(app: FastAPI):
 
     # Register bot middlewares
     dp.update.middleware(DbSessionMiddleware())
+    dp.update.middleware(UserContextMiddleware())
 
-    # Start scheduler
-    scheduler = get_scheduler()
-    scheduler.start()
-    await logger.ainfo("Scheduler started")
+    # Start payment webhook inbox workers
+    payment_inbox = get_payment_inbox_worker()
+    payment_inbox.start()
+    await logger.ainfo("Payment inbox workers started", workers=payment_inbox.worker_count)
+
+    # Start background health checks (/health serves the cached snapshot)
+    health_monitor = get_health_monitor()
+    health_monitor.start()
+
+    # Load the tokenizer before the first prompt is built
+    await load_encoding()
 
     # Warm horoscope cache (PERF-07)
     await warm_horoscope_cache()
 
-    # Set webhook (only if token configured)
+    # Parse tarot deck now rather than on the first tarot request
+    deck = load_deck()
+    await logger.ainfo("Tarot deck loaded", cards=len(deck))
+
+    # Load the city index now rather than on the first city search
+    await get_geocoding_service().get_index()
+
     bot = None
     if settings.telegram_bot_token and settings.webhook_base_url:
         bot = get_bot()
-        webhook_url = f"{settings.webhook_base_url}/webhook"
-        await bot.set_webhook(
-            url=webhook_url,
-            secret_token=settings.webhook_secret,
-            drop_pending_updates=True,
-        )
-        await logger.ainfo("Webhook set", url=webhook_url)
+        if settings.webhook_async_processing:
+            update_queue = get_update_queue()
+            update_queue.start(dp, bot)
+            await logger.ainfo("Update workers started", workers=update_queue.worker_count)
+            if settings.web_concurrency > 1:
+                await logger.awarning(
+                    "Update ordering and dedupe are per worker process",
+                    web_concurrency=settings.web_concurrency,
+                )
+
+    # Start scheduler paused: every worker can add jobs to the shared
+    # jobstore, only the elected leader resumes it and runs them
+    scheduler = get_scheduler()
+    scheduler.start(paused=True)
+    scheduler_leader = get_scheduler_leader()
+    if bot is not None:
+        # Set webhook once, from the leader
+        scheduler_leader.add_elected_hook(lambda: register_webhook(bot))
+    scheduler_leader.start()
+    await logger.ainfo("Scheduler started", pid=os.getpid())
 
     yield
 
-    # Shutdown: cleanup scheduler
+    # Shutdown: hand over leadership, then cleanup scheduler
+    await scheduler_leader.stop()
     scheduler.shutdown(wait=False)
     await logger.ainfo("Scheduler shutdown")
 
+    # Shutdown: stop health monitor
+    await health_monitor.stop()
+
+    # Shutdown: stop payment inbox workers (unfinished events stay in inbox)
+    await payment_inbox.stop()
+
     # Shutdown: cleanup bot
     if bot is not None:
-        await bot.delete_webhook()
+        # Other workers keep serving the webhook in multi-worker mode
+        if settings.web_concurrency == 1:
+            await bot.delete_webhook()
+        if settings.webhook_async_processing:
+            await get_update_queue().stop()
         await bot.session.close()
-        await logger.ainfo("Bot webhook deleted and session closed")
+        await logger.ainfo("Bot session closed")
+
+    # Shutdown: flush pending FSM writes
+    await dp.storage.close()
+
+    # Shutdown: close pooled YooKassa connections
+    await close_yookassa_client()
+
+    # Shutdown: stop Telegraph publishing workers and close connections
+    await close_telegraph()
 
-    # Shutdown: dispose engine
+    # Shutdown: dispose engines
     await engine.dispose()
+    await lock_engine.dispose()
+
+    # Shutdown: drop this worker's live gauge values from /metrics
+    if METRICS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
 
 
 app = FastAPI(lifespan=lifespan)
@@ -102,14 +176,20 @@ instrumentator = Instrumentator(
     should_group_status_codes=True,
     should_ignore_untemplated=True,
     should_instrument_requests_inprogress=True,
-    excluded_handlers=["/health", "/metrics"],
+    excluded_handlers=["/health", "/health/live", "/health/ready", "/metrics"],
     inprogress_name="adtrobot_requests_in_progress",
     inprogress_labels=True,
 )
 instrumentator.instrument(app)
 
-# Mount /metrics endpoint (no auth - standard Prometheus scraping)
-metrics_app = make_asgi_app()
+# Mount /metrics endpoint (no auth - standard Prometheus scraping).
+# In multiprocess mode any worker answers with values aggregated over all.
+if METRICS_MULTIPROC_DIR:
+    metrics_registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(metrics_registry)
+else:
+    metrics_registry = REGISTRY
+metrics_app = make_asgi_app(registry=metrics_registry)
 app.mount("/metrics", metrics_app)
 
 # CORS middleware for admin panel
@@ -158,31 +238,38 @@ else:
     )
 
 
+@app.get("/health/live")
+async def health_live() -> JSONResponse:
+    """Liveness probe: the process and event loop are responsive. No I/O."""
+    return JSONResponse(content={"status": "alive"})
+
+
 @app.get("/health")
-async def health_check(
-    session: AsyncSession = Depends(get_session),
-) -> JSONResponse:
+async def health_check() -> JSONResponse:
     """
-    Comprehensive health check endpoint.
-    Returns 200 if all checks pass, 503 if any fails.
+    Composite health check from the background monitor's cached snapshot.
+    Returns 200 if all checks passed on the last run, 503 otherwise
+    (including before the first run and when the monitor is stuck).
     """
-    all_healthy, checks = await run_all_checks(session)
-
-    response_data = {
-        "status": "healthy" if all_healthy else "unhealthy",
-        "checks": {
-            c.name: {
-                "healthy": c.healthy,
-                "message": c.message,
-                "latency_ms": c.latency_ms,
-            }
-            for c in checks
-        },
-    }
-
+    response_data, healthy = get_health_monitor().cached_status()
     return JSONResponse(
         content=response_data,
-        status_code=status.HTTP_200_OK if all_healthy else status.HTTP_503_SERVICE_UNAVAILABLE,
+        status_code=status.HTTP_200_OK if healthy else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+@app.get("/health/ready")
+async def health_ready() -> JSONResponse:
+    """
+    Deep readiness check: runs all dependency checks now.
+    Concurrent calls share one run. Not intended for high-frequency probes.
+    """
+    snapshot = await get_health_monitor().refresh()
+    return JSONResponse(
+        content=snapshot.to_dict(),
+        status_code=(
+            status.HTTP_200_OK if snapshot.healthy else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
     )
 
 
@@ -195,19 +282,26 @@ async def webhook(request: Request) -> Response:
 
     bot = get_bot()
     update = Update.model_validate(await request.json(), context={"bot": bot})
-    await dp.feed_update(bot, update)
+
+    if not settings.webhook_async_processing:
+        await dp.feed_update(bot, update)
+        return Response(status_code=200)
+
+    # Enqueue and answer immediately; 503 asks Telegram to redeliver later
+    if not get_update_queue().submit(update):
+        await logger.awarning("Update queue full, shedding update", update_id=update.update_id)
+        return Response(status_code=503)
     return Response(status_code=200)
 
 
 @app.post("/webhook/yookassa")
-async def yookassa_webhook(
-    request: Request,
-    background_tasks: BackgroundTasks,
-) -> Response:
+async def yookassa_webhook(request: Request) -> Response:
     """
     Handle YooKassa webhook notifications.
 
-    Returns 200 immediately, processes in background.
+    Persists the event to the payment inbox and returns 200; inbox workers
+    process it with retries. Returns 500 if the event could not be stored,
+    so YooKassa redelivers it.
     """
     # IP verification
     client_ip = request.client.host if request.client else ""
@@ -223,12 +317,12 @@ async def yookassa_webhook(
     except Exception:
         return Response(status_code=200)
 
-    # Process in background
-    async def process_event():
+    try:
         async with AsyncSessionLocal() as session:
-            await process_webhook_event(session, event)
-
-    background_tasks.add_task(process_event)
+            await enqueue_webhook_event(session, event)
+    except Exception as e:
+        await logger.aerror("Failed to persist YooKassa webhook", error=str(e))
+        return Response(status_code=500)
 
-    # Return 200 immediately
+    get_payment_inbox_worker().notify()
     return Response(status_code=200)
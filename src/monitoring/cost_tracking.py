@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.db.models.ai_usage import AIUsage
 from src.monitoring.metrics import (
     AI_COST_TOTAL,
+    AI_PROMPT_TOKENS,
     AI_REQUEST_DURATION,
     AI_REQUESTS_TOTAL,
     AI_TOKENS_TOTAL,
@@ -17,11 +18,22 @@ logger = structlog.get_logger()
 
 # GPT-4o-mini pricing (per 1M tokens) - fallback if cost not in response
 GPT4O_MINI_PRICING = {
-    "prompt": 0.15 / 1_000_000,      # $0.15 per 1M input tokens
-    "completion": 0.60 / 1_000_000,  # $0.60 per 1M output tokens
+    "prompt": 0.15 / 1_000_000,           # $0.15 per 1M input tokens
+    "cached_prompt": 0.075 / 1_000_000,   # $0.075 per 1M cached input tokens
+    "completion": 0.60 / 1_000_000,       # $0.60 per 1M output tokens
 }
 
 
+def _cached_tokens(usage: Any) -> int:
+    """Prompt tokens served from the provider's prompt cache."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    if details is None:
+        return 0
+    if isinstance(details, dict):
+        return details.get("cached_tokens") or 0
+    return getattr(details, "cached_tokens", None) or 0
+
+
 async def record_ai_usage(
     session: AsyncSession,
     user_id: int | None,
@@ -45,16 +57,18 @@ async def record_ai_usage(
         prompt_tokens = usage.prompt_tokens
         completion_tokens = usage.completion_tokens
         total_tokens = usage.total_tokens
+        cached_tokens = min(_cached_tokens(usage), prompt_tokens)
 
         # Try to get cost from OpenRouter response, fallback to calculation
-        cost_dollars = None
-        if hasattr(response, "x_openrouter"):
+        cost_dollars = getattr(usage, "cost", None)
+        if cost_dollars is None and hasattr(response, "x_openrouter"):
             cost_dollars = response.x_openrouter.get("cost")
 
         if cost_dollars is None:
             # Calculate based on token pricing
             cost_dollars = (
-                prompt_tokens * GPT4O_MINI_PRICING["prompt"] +
+                (prompt_tokens - cached_tokens) * GPT4O_MINI_PRICING["prompt"] +
+                cached_tokens * GPT4O_MINI_PRICING["cached_prompt"] +
                 completion_tokens * GPT4O_MINI_PRICING["completion"]
             )
 
@@ -66,6 +80,7 @@ async def record_ai_usage(
             operation=operation,
             model=model,
             prompt_tokens=prompt_tokens,
+            cached_tokens=cached_tokens,
             completion_tokens=completion_tokens,
             total_tokens=total_tokens,
             cost_dollars=cost_dollars,
@@ -82,7 +97,13 @@ async def record_ai_usage(
             operation=operation,
             model=model_short,
             token_type="prompt"
-        ).inc(prompt_tokens)
+        ).inc(prompt_tokens - cached_tokens)
+
+        AI_TOKENS_TOTAL.labels(
+            operation=operation,
+            model=model_short,
+            token_type="prompt_cached"
+        ).inc(cached_tokens)
 
         AI_TOKENS_TOTAL.labels(
             operation=operation,
@@ -90,6 +111,8 @@ async def record_ai_usage(
             token_type="completion"
         ).inc(completion_tokens)
 
+        AI_PROMPT_TOKENS.labels(operation=operation).observe(prompt_tokens)
+
         if cost_dollars:
             AI_COST_TOTAL.labels(
                 operation=operation,
@@ -112,6 +135,7 @@ async def record_ai_usage(
             user_id=user_id,
             operation=operation,
             tokens=total_tokens,
+            cached_tokens=cached_tokens,
             cost=cost_dollars,
             latency_ms=latency_ms,
         )
@@ -1,18 +1,30 @@
-"""Health check functions for /health endpoint."""
+"""Health check functions for /health endpoints.
+
+Dependency checks (DB, scheduler jobstore, OpenRouter, Telegram) are run by
+``HealthMonitor`` in the background every REFRESH_INTERVAL seconds.
+``/health`` only reads the cached snapshot, so load balancer probes never
+trigger external calls; ``/health/ready`` forces a fresh (coalesced) run.
+"""
 
 import asyncio
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
 
 import httpx
 import structlog
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.db.engine import AsyncSessionLocal
 from src.monitoring.metrics import HEALTH_CHECK_STATUS
 
 logger = structlog.get_logger()
 
+REFRESH_INTERVAL = 30.0  # seconds between background check runs
+# Snapshot older than this means the monitor itself is stuck
+STALE_AFTER = REFRESH_INTERVAL * 4
+
 
 @dataclass
 class HealthCheckResult:
@@ -32,7 +44,7 @@ async def check_database(session: AsyncSession, timeout: float = 3.0) -> HealthC
         latency = (time.monotonic() - start) * 1000
         HEALTH_CHECK_STATUS.labels(check="database").set(1)
         return HealthCheckResult("database", True, latency_ms=round(latency, 2))
-    except asyncio.TimeoutError:
+    except TimeoutError:
         HEALTH_CHECK_STATUS.labels(check="database").set(0)
         return HealthCheckResult("database", False, "Timeout")
     except Exception as e:
@@ -43,13 +55,14 @@ async def check_database(session: AsyncSession, timeout: float = 3.0) -> HealthC
 async def check_scheduler(timeout: float = 2.0) -> HealthCheckResult:
     """Check APScheduler status."""
     try:
-        from src.services.scheduler import get_scheduler
+        from src.services.scheduler import get_scheduler, get_scheduler_leader
 
         scheduler = get_scheduler()
         if scheduler.running:
             jobs_count = len(scheduler.get_jobs())
+            role = "leader" if get_scheduler_leader().is_leader else "standby"
             HEALTH_CHECK_STATUS.labels(check="scheduler").set(1)
-            return HealthCheckResult("scheduler", True, f"{jobs_count} jobs scheduled")
+            return HealthCheckResult("scheduler", True, f"{jobs_count} jobs scheduled ({role})")
         HEALTH_CHECK_STATUS.labels(check="scheduler").set(0)
         return HealthCheckResult("scheduler", False, "Scheduler not running")
     except Exception as e:
@@ -91,7 +104,7 @@ async def check_telegram_bot(timeout: float = 10.0) -> HealthCheckResult:
         latency = (time.monotonic() - start) * 1000
         HEALTH_CHECK_STATUS.labels(check="telegram").set(1)
         return HealthCheckResult("telegram", True, f"@{me.username}", latency_ms=round(latency, 2))
-    except asyncio.TimeoutError:
+    except TimeoutError:
         HEALTH_CHECK_STATUS.labels(check="telegram").set(0)
         return HealthCheckResult("telegram", False, "Timeout")
     except Exception as e:
@@ -113,3 +126,122 @@ async def run_all_checks(session: AsyncSession) -> tuple[bool, list[HealthCheckR
     )
     all_healthy = all(c.healthy for c in checks)
     return all_healthy, list(checks)
+
+
+@dataclass
+class HealthSnapshot:
+    """Result of one full check run."""
+
+    healthy: bool
+    checks: list[HealthCheckResult]
+    checked_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    monotonic: float = field(default_factory=time.monotonic)
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.monotonic
+
+    def to_dict(self) -> dict:
+        """JSON body for health endpoints."""
+        return {
+            "status": "healthy" if self.healthy else "unhealthy",
+            "checked_at": self.checked_at.isoformat(),
+            "age_seconds": round(self.age_seconds, 1),
+            "checks": {
+                c.name: {
+                    "healthy": c.healthy,
+                    "message": c.message,
+                    "latency_ms": c.latency_ms,
+                }
+                for c in self.checks
+            },
+        }
+
+
+class HealthMonitor:
+    """Background refresher of dependency health checks.
+
+    Concurrent ``refresh()`` calls share one in-flight run, so deep
+    readiness probes can't stack up external requests either.
+    """
+
+    def __init__(self, interval: float = REFRESH_INTERVAL) -> None:
+        self.interval = interval
+        self.snapshot: HealthSnapshot | None = None
+        self._task: asyncio.Task | None = None
+        self._inflight: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start background refresh loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="health-monitor")
+
+    async def stop(self) -> None:
+        """Stop background refresh loop."""
+        for task in (self._task, self._inflight):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(
+            *(t for t in (self._task, self._inflight) if t is not None),
+            return_exceptions=True,
+        )
+        self._task = None
+        self._inflight = None
+
+    def is_stale(self) -> bool:
+        """True if there is no snapshot or it hasn't been refreshed recently."""
+        return self.snapshot is None or self.snapshot.age_seconds > STALE_AFTER
+
+    def cached_status(self) -> tuple[dict, bool]:
+        """Body and health of the cached snapshot, without running checks.
+
+        Unhealthy before the first run ("starting") and when the snapshot
+        is stale (monitor stuck).
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return {"status": "starting", "checks": {}}, False
+
+        body = snapshot.to_dict()
+        stale = self.is_stale()
+        if stale:
+            body["status"] = "stale"
+        return body, snapshot.healthy and not stale
+
+    async def refresh(self) -> HealthSnapshot:
+        """Run all checks now (joining a run already in progress)."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._check())
+        return await asyncio.shield(self._inflight)
+
+    async def _check(self) -> HealthSnapshot:
+        async with AsyncSessionLocal() as session:
+            healthy, checks = await run_all_checks(session)
+        self.snapshot = HealthSnapshot(healthy, checks)
+        return self.snapshot
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                snapshot = await self.refresh()
+                if not snapshot.healthy:
+                    await logger.awarning(
+                        "Health check failed",
+                        failed=[c.name for c in snapshot.checks if not c.healthy],
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await logger.aerror("Health monitor error", error=str(e))
+            await asyncio.sleep(self.interval)
+
+
+_health_monitor: HealthMonitor | None = None
+
+
+def get_health_monitor() -> HealthMonitor:
+    """Get health monitor singleton."""
+    global _health_monitor
+    if _health_monitor is None:
+        _health_monitor = HealthMonitor()
+    return _health_monitor
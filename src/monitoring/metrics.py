@@ -1,4 +1,9 @@
-"""Custom Prometheus metrics for AdtroBot."""
+"""Custom Prometheus metrics for AdtroBot.
+
+With several uvicorn workers, PROMETHEUS_MULTIPROC_DIR makes prometheus_client
+keep values in per-process files; /metrics aggregates them. Gauges declare
+how to combine per-process values (multiprocess_mode).
+"""
 
 from prometheus_client import Counter, Gauge, Histogram
 
@@ -26,7 +31,15 @@ AI_REQUEST_DURATION = Histogram(
 AI_TOKENS_TOTAL = Counter(
     "adtrobot_ai_tokens_total",
     "Total AI tokens used",
-    labelnames=["operation", "model", "token_type"],  # token_type: prompt/completion
+    # token_type: prompt (uncached)/prompt_cached/completion
+    labelnames=["operation", "model", "token_type"],
+)
+
+AI_PROMPT_TOKENS = Histogram(
+    "adtrobot_ai_prompt_tokens",
+    "Prompt tokens per AI request",
+    labelnames=["operation"],
+    buckets=[100, 250, 500, 750, 1000, 1500, 2000, 3000, 4000, 6000, 8000],
 )
 
 AI_COST_TOTAL = Counter(
@@ -41,11 +54,32 @@ AI_REQUESTS_TOTAL = Counter(
     labelnames=["operation", "model", "status"],  # status: success/error
 )
 
+AI_RESPONSE_CACHE_TOTAL = Counter(
+    "adtrobot_ai_response_cache_total",
+    "Lookups in the shared LLM response cache",
+    labelnames=["operation", "result"],  # result: hit/miss
+)
+
+LLM_QUEUE_WAIT = Histogram(
+    "adtrobot_llm_queue_wait_seconds",
+    "Time an LLM request waited for dispatcher admission",
+    labelnames=["lane"],  # interactive/report/batch
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0],
+)
+
+LLM_IN_FLIGHT = Gauge(
+    "adtrobot_llm_in_flight",
+    "LLM requests currently admitted by the dispatcher",
+    labelnames=["lane"],
+    multiprocess_mode="livesum",
+)
+
 # === Active Users Metrics ===
 ACTIVE_USERS = Gauge(
     "adtrobot_active_users",
     "Active users count",
     labelnames=["period"],  # dau/wau/mau
+    multiprocess_mode="livemax",
 )
 
 # === Business Metrics ===
@@ -64,6 +98,48 @@ QUEUE_DEPTH = Gauge(
     "adtrobot_queue_depth",
     "Background queue depth",
     labelnames=["status"],  # pending/failed/completed
+    multiprocess_mode="livemax",
+)
+
+# === Telegram Update Queue Metrics ===
+UPDATE_QUEUE_DEPTH = Gauge(
+    "adtrobot_update_queue_depth",
+    "Telegram updates waiting for a worker",
+    multiprocess_mode="livesum",
+)
+
+UPDATES_DROPPED_TOTAL = Counter(
+    "adtrobot_updates_dropped_total",
+    "Telegram updates not enqueued",
+    labelnames=["reason"],  # queue_full/duplicate
+)
+
+UPDATE_PROCESSING_DURATION = Histogram(
+    "adtrobot_update_processing_seconds",
+    "Time spent processing a Telegram update in a worker",
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0],
+)
+
+# === Admin API Metrics ===
+ADMIN_REQUEST_DURATION = Histogram(
+    "adtrobot_admin_request_duration_seconds",
+    "Admin API request duration in seconds (including auth)",
+    labelnames=["endpoint", "method"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0],
+)
+
+# === Leader Election Metrics ===
+LEADER_STATUS = Gauge(
+    "adtrobot_leader",
+    "1 if this process holds the leader role",
+    labelnames=["role"],  # scheduler
+    multiprocess_mode="livesum",
+)
+
+LEADER_TRANSITIONS = Counter(
+    "adtrobot_leader_transitions_total",
+    "Leader role changes in this process",
+    labelnames=["role", "event"],  # elected/stepped_down/lost
 )
 
 # === Health Metrics ===
@@ -71,4 +147,5 @@ HEALTH_CHECK_STATUS = Gauge(
     "adtrobot_health_check_status",
     "Health check status (1=healthy, 0=unhealthy)",
     labelnames=["check"],  # database/scheduler/openrouter/telegram
+    multiprocess_mode="livemin",
 )
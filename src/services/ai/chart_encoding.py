@@ -0,0 +1,184 @@
+"""Compact chart encoding shared by natal-data prompts.
+
+Premium horoscope, detailed natal, daily transit and astrologer chat
+prompts all include the user's chart. They use one canonical encoding,
+one short line per item instead of labelled Russian sentences:
+
+    Солнце Овен 12° д5
+    Асц Рак 3°, MC Рыбы 10°
+    Дома: 1 Рак, 4 Весы, 7 Козерог, 10 Овен
+    Аспекты (орб°): Солнце трин Луна 0.5; Венера квадрат Марс 1.2
+
+Houses are omitted when the birth time is unknown (they would be
+computed for 12:00 and mislead the model). Aspects come sorted by orb,
+so trimming from the end drops the least significant ones first;
+``fit_chart`` trims aspects until the chart fits a token budget.
+"""
+
+from src.services.ai.prompt_budget import count_tokens
+from src.services.astrology.transits import natal_house
+
+PLANET_RU = {
+    "sun": "Солнце",
+    "moon": "Луна",
+    "mercury": "Меркурий",
+    "venus": "Венера",
+    "mars": "Марс",
+    "jupiter": "Юпитер",
+    "saturn": "Сатурн",
+    "uranus": "Уран",
+    "neptune": "Нептун",
+    "pluto": "Плутон",
+    "north_node": "Сев. узел",
+}
+
+# Angular houses: self, home, partnership, career
+KEY_HOUSES = (1, 4, 7, 10)
+
+
+def planet_ru(key: str) -> str:
+    """Russian planet name from key."""
+    return PLANET_RU.get(key, key.capitalize())
+
+
+def _position(pos: dict) -> str:
+    return f"{pos['sign_ru']} {pos['degree']:.0f}°"
+
+
+def encode_planets(natal_data: dict) -> list[str]:
+    """One line per natal planet: name, sign, degree and (time known) house."""
+    houses = natal_data["houses"] if natal_data.get("time_known", True) else None
+    lines = []
+    for name, pos in natal_data["planets"].items():
+        line = f"{planet_ru(name)} {_position(pos)}"
+        house = natal_house(pos["longitude"], houses) if houses else 0
+        if house:
+            line += f" д{house}"
+        lines.append(line)
+    return lines
+
+
+def encode_aspects(aspects: list[dict]) -> str:
+    """Natal aspects on one line, orb in degrees."""
+    return "; ".join(
+        f"{asp['planet1_ru']} {asp['aspect_ru']} {asp['planet2_ru']} {asp['orb']:.1f}"
+        for asp in aspects
+    )
+
+
+def encode_chart(
+    natal_data: dict,
+    max_aspects: int | None = None,
+    max_orb: float | None = None,
+) -> str:
+    """Canonical compact encoding of a natal chart.
+
+    Args:
+        natal_data: FullNatalChartResult
+        max_aspects: Keep at most this many (tightest) aspects
+        max_orb: Keep only aspects with a smaller orb
+    """
+    time_known = natal_data.get("time_known", True)
+    lines = [
+        "Время рождения известно"
+        if time_known
+        else "Время рождения неизвестно (дома и Асцендент не учитывать)"
+    ]
+    lines.extend(encode_planets(natal_data))
+
+    if time_known:
+        angles = natal_data.get("angles", {})
+        if "ascendant" in angles and "mc" in angles:
+            lines.append(f"Асц {_position(angles['ascendant'])}, MC {_position(angles['mc'])}")
+        houses = natal_data["houses"]
+        lines.append(
+            "Дома: "
+            + ", ".join(f"{num} {houses[num]['sign_ru']}" for num in KEY_HOUSES if num in houses)
+        )
+
+    aspects = natal_data.get("aspects", [])
+    if max_orb is not None:
+        aspects = [asp for asp in aspects if asp["orb"] < max_orb]
+    if max_aspects is not None:
+        aspects = aspects[:max_aspects]
+    if aspects:
+        lines.append(f"Аспекты (орб°): {encode_aspects(aspects)}")
+
+    return "\n".join(lines)
+
+
+def encode_transits(
+    transit_data: dict,
+    max_aspects: int | None = None,
+    exact_only: bool = False,
+) -> str:
+    """Compact encoding of daily transits to a natal chart.
+
+    Args:
+        transit_data: DailyTransitResult
+        max_aspects: Keep at most this many (tightest) aspects
+        exact_only: Keep only exact (orb < 1°) aspects
+    """
+    lines = []
+    for name, pos in transit_data["transits"].items():
+        line = f"{planet_ru(name)} {_position(pos)}"
+        if pos["house"] > 0:
+            line += f" д{pos['house']}"
+        lines.append(line)
+
+    aspects = transit_data["aspects"]
+    if exact_only:
+        aspects = [asp for asp in aspects if asp["exact"]]
+    if max_aspects is not None:
+        aspects = aspects[:max_aspects]
+    if aspects:
+        lines.append(
+            "Аспекты к натальным (орб°, ! = точный): "
+            + "; ".join(
+                f"{asp['transit_planet_ru']} {asp['aspect_ru']} {asp['natal_planet_ru']} "
+                f"{asp['orb']:.1f}{'!' if asp['exact'] else ''}"
+                for asp in aspects
+            )
+        )
+    return "\n".join(lines)
+
+
+def fit_chart(
+    natal_data: dict,
+    budget: int,
+    max_aspects: int | None = None,
+    max_orb: float | None = None,
+) -> str:
+    """``encode_chart`` with the widest aspects dropped until it fits ``budget`` tokens.
+
+    Planets, angles and houses are always kept.
+    """
+    aspects = natal_data.get("aspects", [])
+    if max_orb is not None:
+        aspects = [asp for asp in aspects if asp["orb"] < max_orb]
+    keep = len(aspects) if max_aspects is None else min(max_aspects, len(aspects))
+
+    text = encode_chart(natal_data, max_aspects=keep, max_orb=max_orb)
+    while keep > 0 and count_tokens(text) > budget:
+        keep -= 1
+        text = encode_chart(natal_data, max_aspects=keep, max_orb=max_orb)
+    return text
+
+
+def fit_transits(
+    transit_data: dict,
+    budget: int,
+    max_aspects: int | None = None,
+    exact_only: bool = False,
+) -> str:
+    """``encode_transits`` with the widest aspects dropped until it fits ``budget`` tokens."""
+    aspects = transit_data["aspects"]
+    if exact_only:
+        aspects = [asp for asp in aspects if asp["exact"]]
+    keep = len(aspects) if max_aspects is None else min(max_aspects, len(aspects))
+
+    text = encode_transits(transit_data, max_aspects=keep, exact_only=exact_only)
+    while keep > 0 and count_tokens(text) > budget:
+        keep -= 1
+        text = encode_transits(transit_data, max_aspects=keep, exact_only=exact_only)
+    return text
@@ -1,15 +1,16 @@
 """AI service client for OpenRouter API."""
 
+import asyncio
 import time
+from collections.abc import Awaitable, Callable
 from datetime import date
 
 import structlog
 from openai import APIError, AsyncOpenAI
 
+from src.config import settings
 from src.db.engine import AsyncSessionLocal
 from src.monitoring.cost_tracking import record_ai_error, record_ai_usage
-
-from src.config import settings
 from src.services.ai.cache import (
     get_cached_card_of_day,
     get_cached_horoscope,
@@ -20,6 +21,8 @@ from src.services.ai.cache import (
     set_cached_natal_interpretation,
     set_cached_premium_horoscope,
 )
+from src.services.ai.dispatcher import Lane, estimate_tokens, get_llm_dispatcher, llm_lane
+from src.services.ai.prompt_budget import fit_history
 from src.services.ai.prompts import (
     CardOfDayPrompt,
     CelticCrossPrompt,
@@ -30,6 +33,7 @@ from src.services.ai.prompts import (
     PremiumHoroscopePrompt,
     TarotSpreadPrompt,
 )
+from src.services.ai.response_cache import get_response_cache, response_key
 from src.services.ai.validators import (
     validate_card_of_day,
     validate_detailed_natal_section,
@@ -41,11 +45,37 @@ from src.services.ai.validators import (
 
 logger = structlog.get_logger()
 
+# OpenRouter providers that cache prompt prefixes only at explicit
+# cache_control breakpoints; OpenAI models cache prefixes automatically.
+# Prefixes below the provider's minimum are simply not cached.
+EXPLICIT_CACHE_PROVIDERS = ("anthropic/", "google/")
+
 # Cache for detailed natal interpretations (7 days)
 _detailed_natal_cache: dict[int, tuple[str, float]] = {}
 DETAILED_NATAL_CACHE_TTL = 604800  # 7 days
 
 
+def _with_cache_breakpoint(model: str, messages: list[dict]) -> list[dict]:
+    """Mark the system message as a cacheable prefix for providers that need it.
+
+    Prompts are built with the stable part (instructions, chart) in the
+    system message, so it is the prefix shared between calls.
+    """
+    if not model.startswith(EXPLICIT_CACHE_PROVIDERS) or messages[0]["role"] != "system":
+        return messages
+    marked = {
+        "role": "system",
+        "content": [
+            {
+                "type": "text",
+                "text": messages[0]["content"],
+                "cache_control": {"type": "ephemeral"},
+            },
+        ],
+    }
+    return [marked, *messages[1:]]
+
+
 def _clean_markdown(text: str) -> str:
     """Remove markdown formatting from text.
 
@@ -129,11 +159,14 @@ class AIService:
     Uses OpenRouter API with GPT-4o-mini model.
     Features:
     - Built-in retry for API errors (429, 5xx, timeouts)
+    - Priority admission via the LLM dispatcher (lane from ``llm_lane``)
+    - Provider prompt caching of long system prompts
     - Validation retry for malformed outputs
     - Caching for horoscopes and card of day
     """
 
     MAX_VALIDATION_RETRIES = 2
+    TEMPERATURE = 0.8  # Creativity for horoscopes/tarot
 
     def __init__(self) -> None:
         """Initialize AI service with OpenRouter client."""
@@ -147,6 +180,43 @@ class AIService:
         # Model for astrologer chat (free on OpenRouter!)
         self.chat_model = "google/gemini-2.0-flash-001"
 
+    async def _complete(
+        self,
+        model: str,
+        messages: list[dict],
+        max_tokens: int,
+        temperature: float,
+        title: str,
+    ):
+        """Chat completion admitted by the LLM dispatcher (lane from context)."""
+        estimate = estimate_tokens(messages, max_tokens)
+        async with get_llm_dispatcher().slot(model, estimate) as grant:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=_with_cache_breakpoint(model, messages),
+                max_tokens=max_tokens,
+                temperature=temperature,
+                extra_headers={
+                    "HTTP-Referer": "https://t.me/adtrobot",
+                    "X-Title": title,
+                },
+                # Usage accounting: cost and cached prompt tokens
+                extra_body={"usage": {"include": True}},
+            )
+            usage = getattr(response, "usage", None)
+            grant.settle(usage.total_tokens if usage else None)
+        return response
+
+    def _response_key(self, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+        """Shared response cache key for a ``_generate`` call."""
+        return response_key(
+            self.model,
+            system_prompt,
+            user_prompt,
+            max_tokens=max_tokens,
+            temperature=self.TEMPERATURE,
+        )
+
     async def _generate(
         self,
         system_prompt: str,
@@ -169,18 +239,15 @@ class AIService:
         """
         start_time = time.monotonic()
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._complete(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
                 ],
                 max_tokens=max_tokens,
-                temperature=0.8,  # Creativity for horoscopes/tarot
-                extra_headers={
-                    "HTTP-Referer": "https://t.me/adtrobot",
-                    "X-Title": "AdtroBot - Astrology & Tarot",
-                },
+                temperature=self.TEMPERATURE,
+                title="AdtroBot - Astrology & Tarot",
             )
             latency_ms = int((time.monotonic() - start_time) * 1000)
 
@@ -280,7 +347,8 @@ class AIService:
         """Generate general horoscope without sections for onboarding.
 
         Used for onboarding to show users the difference between general and premium horoscopes.
-        NO CACHING - one-time operation per user.
+        The prompt depends only on sign and date, so responses come from the
+        shared response cache once its variant pool is full.
 
         Args:
             zodiac_sign: English zodiac sign (e.g., "aries")
@@ -291,15 +359,30 @@ class AIService:
         Returns:
             General horoscope text or None if all retries fail
         """
+        user_prompt = GeneralHoroscopePrompt.user(
+            zodiac_sign_ru=zodiac_sign_ru,
+            date_str=date_str,
+            zodiac_sign_en=zodiac_sign,
+        )
+        cache_key = self._response_key(GeneralHoroscopePrompt.SYSTEM, user_prompt, 1000)
+        return await get_response_cache().get_or_generate(
+            cache_key,
+            lambda: self._generate_general_horoscope(user_prompt, zodiac_sign, user_id),
+            operation="general_horoscope",
+        )
+
+    async def _generate_general_horoscope(
+        self,
+        user_prompt: str,
+        zodiac_sign: str,
+        user_id: int | None,
+    ) -> str | None:
+        """Validated general horoscope for a prepared prompt."""
         # Generate with validation retry
         for attempt in range(self.MAX_VALIDATION_RETRIES + 1):
             text = await self._generate(
                 system_prompt=GeneralHoroscopePrompt.SYSTEM,
-                user_prompt=GeneralHoroscopePrompt.user(
-                    zodiac_sign_ru=zodiac_sign_ru,
-                    date_str=date_str,
-                    zodiac_sign_en=zodiac_sign,
-                ),
+                user_prompt=user_prompt,
                 max_tokens=1000,
                 operation="general_horoscope",
                 user_id=user_id,
@@ -398,6 +481,36 @@ class AIService:
             logger.debug("card_of_day_cache_hit", user_id=user_id)
             return cached[0]  # Just the interpretation text
 
+        # Same card + orientation = same prompt for every user
+        user_prompt = CardOfDayPrompt.user(card, is_reversed)
+        cache_key = self._response_key(CardOfDayPrompt.SYSTEM, user_prompt, 800)
+        text = await get_response_cache().get_or_generate(
+            cache_key,
+            lambda: self.interpret_card_of_day(card, is_reversed, user_id=user_id),
+            operation="card_of_day",
+        )
+        if text:
+            await set_cached_card_of_day(user_id, text, card, is_reversed)
+        return text
+
+    async def interpret_card_of_day(
+        self,
+        card: dict,
+        is_reversed: bool,
+        user_id: int | None = None,
+    ) -> str | None:
+        """Generate a fresh card of day interpretation (no caching).
+
+        Used directly to fill the precomputed card of day pool.
+
+        Args:
+            card: Card dictionary
+            is_reversed: Whether the card is reversed
+            user_id: User ID for cost tracking (None for scheduled generation)
+
+        Returns:
+            Interpretation text or None if all retries fail
+        """
         for attempt in range(self.MAX_VALIDATION_RETRIES + 1):
             text = await self._generate(
                 system_prompt=CardOfDayPrompt.SYSTEM,
@@ -412,7 +525,6 @@ class AIService:
 
             is_valid, error = validate_card_of_day(text)
             if is_valid:
-                await set_cached_card_of_day(user_id, text, card, is_reversed)
                 logger.info(
                     "card_of_day_generated",
                     user_id=user_id,
@@ -583,11 +695,29 @@ class AIService:
             logger.debug("natal_interpretation_cache_hit", user_id=user_id)
             return cached
 
+        # Identical charts (same birth data) share generations
+        user_prompt = NatalChartPrompt.user(natal_data)
+        cache_key = self._response_key(NatalChartPrompt.SYSTEM, user_prompt, 1500)
+        text = await get_response_cache().get_or_generate(
+            cache_key,
+            lambda: self._generate_natal_interpretation(user_prompt, user_id),
+            operation="natal_interpretation",
+        )
+        if text:
+            await set_cached_natal_interpretation(user_id, text)
+        return text
+
+    async def _generate_natal_interpretation(
+        self,
+        user_prompt: str,
+        user_id: int,
+    ) -> str | None:
+        """Validated natal interpretation for a prepared prompt."""
         # Generate with validation retry
         for attempt in range(self.MAX_VALIDATION_RETRIES + 1):
             text = await self._generate(
                 system_prompt=NatalChartPrompt.SYSTEM,
-                user_prompt=NatalChartPrompt.user(natal_data),
+                user_prompt=user_prompt,
                 max_tokens=1500,  # 400-500 words - reduced
                 operation="natal_interpretation",
                 user_id=user_id,
@@ -599,7 +729,6 @@ class AIService:
             # Use natal chart validation (checks correct sections)
             is_valid, error = validate_natal_chart(text)
             if is_valid:
-                await set_cached_natal_interpretation(user_id, text)
                 logger.info(
                     "natal_interpretation_generated",
                     user_id=user_id,
@@ -647,46 +776,51 @@ class AIService:
 
         sections_text = []
 
-        for section in DetailedNatalPrompt.SECTIONS:
-            section_prompt = DetailedNatalPrompt.section_prompt(section, natal_data)
-
-            # Generate section with higher max_tokens
-            max_tokens = max(1500, section["min_words"] * 3)  # ~3 tokens per word
-
-            response = None
-            for attempt in range(3):  # Retry up to 3 times
-                try:
-                    response = await self._generate(
-                        system_prompt=DetailedNatalPrompt.SYSTEM,
-                        user_prompt=section_prompt,
-                        max_tokens=max_tokens,
-                        operation="detailed_natal",
-                        user_id=user_id,
-                    )
+        # Same system prefix (instructions + chart) for every section
+        system_prompt = DetailedNatalPrompt.system_with_chart(natal_data)
+
+        # Paid report: yields to interactive requests, ahead of batch jobs
+        with llm_lane(Lane.REPORT):
+            for section in DetailedNatalPrompt.SECTIONS:
+                section_prompt = DetailedNatalPrompt.section_prompt(section)
+
+                # Generate section with higher max_tokens
+                max_tokens = max(1500, section["min_words"] * 3)  # ~3 tokens per word
+
+                response = None
+                for attempt in range(3):  # Retry up to 3 times
+                    try:
+                        response = await self._generate(
+                            system_prompt=system_prompt,
+                            user_prompt=section_prompt,
+                            max_tokens=max_tokens,
+                            operation="detailed_natal",
+                            user_id=user_id,
+                        )
 
-                    if response and validate_detailed_natal_section(response, section["min_words"]):
-                        sections_text.append(f"## {section['title']}\n\n{response}")
-                        break
-                    else:
-                        logger.warning(
-                            "detailed_natal_section_short",
+                        if response and validate_detailed_natal_section(response, section["min_words"]):
+                            sections_text.append(f"## {section['title']}\n\n{response}")
+                            break
+                        else:
+                            logger.warning(
+                                "detailed_natal_section_short",
+                                section=section["id"],
+                                attempt=attempt + 1,
+                                length=len(response) if response else 0,
+                            )
+                    except Exception as e:
+                        logger.error(
+                            "detailed_natal_section_error",
                             section=section["id"],
-                            attempt=attempt + 1,
-                            length=len(response) if response else 0,
+                            error=str(e),
                         )
-                except Exception as e:
-                    logger.error(
-                        "detailed_natal_section_error",
-                        section=section["id"],
-                        error=str(e),
-                    )
 
-                if attempt == 2:
-                    # Use whatever we got on last attempt
-                    if response:
-                        sections_text.append(f"## {section['title']}\n\n{response}")
-                    else:
-                        logger.error("detailed_natal_section_failed", section=section["id"])
+                    if attempt == 2:
+                        # Use whatever we got on last attempt
+                        if response:
+                            sections_text.append(f"## {section['title']}\n\n{response}")
+                        else:
+                            logger.error("detailed_natal_section_failed", section=section["id"])
 
         if not sections_text:
             return None
@@ -710,6 +844,7 @@ class AIService:
         natal_data: dict,
         forecast_date: date,
         timezone_str: str,
+        on_telegraph_url: Callable[[str | None], Awaitable[None]] | None = None,
     ) -> tuple[str, str | None]:
         """Generate daily transit forecast and publish to Telegraph.
 
@@ -718,6 +853,9 @@ class AIService:
             natal_data: User's natal chart (FullNatalChartResult)
             forecast_date: Date to forecast (usually today)
             timezone_str: User's timezone (e.g., "Europe/Moscow")
+            on_telegraph_url: If given, don't wait for Telegraph: return
+                (text, None) right away and call this with the URL once
+                the page is published (None if publishing failed)
 
         Returns:
             Tuple of (forecast_text, telegraph_url)
@@ -727,7 +865,7 @@ class AIService:
             2. Calculate transits for forecast_date
             3. Generate AI interpretation with DailyTransitPrompt
             4. Publish to Telegraph with title "Транзитный прогноз на {date}"
-            5. Cache result for 24 hours
+            5. Cache result for 24 hours (URL added when published)
             6. Return text + Telegraph URL
         """
         from src.services.ai.cache import (
@@ -736,7 +874,7 @@ class AIService:
         )
         from src.services.ai.prompts import DailyTransitPrompt
         from src.services.astrology.transits import calculate_daily_transits
-        from src.services.telegraph import get_telegraph_service
+        from src.services.telegraph import get_telegraph_publisher
 
         # Check cache first
         cached = await get_cached_transit_forecast(user_id, forecast_date)
@@ -774,38 +912,39 @@ class AIService:
         if not text:
             return ("", None)  # API error, already logged
 
-        # Publish to Telegraph
-        telegraph_url = None
-        try:
-            import asyncio
+        # Cache text right away (even if Telegraph fails, the text is reusable)
+        await set_cached_transit_forecast(user_id, forecast_date, text, "")
 
-            telegraph_service = get_telegraph_service()
-            title = f"Транзитный прогноз на {date_str}"
-
-            telegraph_url = await asyncio.wait_for(
-                telegraph_service.publish_article(title, text),
-                timeout=15.0,  # Longer timeout for long content
-            )
-
-            if telegraph_url:
+        async def _on_published(url: str | None) -> None:
+            if url:
+                await set_cached_transit_forecast(user_id, forecast_date, text, url)
                 logger.info(
                     "transit_forecast_published",
                     user_id=user_id,
                     date=str(forecast_date),
                     chars=len(text),
-                    url=telegraph_url,
+                    url=url,
                 )
-        except Exception as e:
-            logger.error(
-                "transit_forecast_telegraph_error",
-                user_id=user_id,
-                error=str(e),
-            )
+            if on_telegraph_url is not None:
+                await on_telegraph_url(url)
 
-        # Cache result (even if Telegraph failed, cache the text)
-        await set_cached_transit_forecast(
-            user_id, forecast_date, text, telegraph_url or ""
-        )
+        # Publish to Telegraph via the shared publishing queue
+        title = f"Транзитный прогноз на {date_str}"
+        published = get_telegraph_publisher().submit(title, text, on_done=_on_published)
+
+        telegraph_url = None
+        if on_telegraph_url is None:
+            try:
+                telegraph_url = await asyncio.wait_for(
+                    asyncio.shield(published),
+                    timeout=15.0,  # Longer timeout for long content
+                )
+            except Exception as e:
+                logger.error(
+                    "transit_forecast_telegraph_error",
+                    user_id=user_id,
+                    error=str(e),
+                )
 
         logger.info(
             "transit_forecast_generated",
@@ -847,25 +986,29 @@ class AIService:
             transit_data=transit_data,
         )
 
+        # The handler stores the question in history before calling us
+        if conversation_history and conversation_history[-1] == {
+            "role": "user",
+            "content": question,
+        }:
+            conversation_history = conversation_history[:-1]
+
         # Build messages array
         messages = [{"role": "system", "content": system_prompt}]
-        # Add conversation history
-        messages.extend(conversation_history)
+        # Add conversation history (oldest turns dropped to fit the budget)
+        messages.extend(fit_history(conversation_history, AstrologerChatPrompt.HISTORY_BUDGET))
         # Add current question
         messages.append({"role": "user", "content": question})
 
         # Try Gemini first (free!)
         start_time = time.monotonic()
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._complete(
                 model=self.chat_model,
                 messages=messages,
                 max_tokens=500,  # 3-7 sentences
                 temperature=0.7,  # Slightly less creative than horoscopes
-                extra_headers={
-                    "HTTP-Referer": "https://t.me/adtrobot",
-                    "X-Title": "AdtroBot - Astrology Chat",
-                },
+                title="AdtroBot - Astrology Chat",
             )
             latency_ms = int((time.monotonic() - start_time) * 1000)
 
@@ -918,15 +1061,12 @@ class AIService:
 
             # Fallback to GPT-4o-mini
             try:
-                response = await self.client.chat.completions.create(
+                response = await self._complete(
                     model=self.model,  # gpt-4o-mini
                     messages=messages,
                     max_tokens=500,
                     temperature=0.7,
-                    extra_headers={
-                        "HTTP-Referer": "https://t.me/adtrobot",
-                        "X-Title": "AdtroBot - Astrology Chat",
-                    },
+                    title="AdtroBot - Astrology Chat",
                 )
                 latency_ms = int((time.monotonic() - start_time) * 1000)
 
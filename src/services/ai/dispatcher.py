@@ -0,0 +1,282 @@
+"""Priority dispatcher for LLM requests.
+
+Every OpenRouter call goes through ``LLMDispatcher.slot()``, which admits
+requests by priority lane:
+
+- ``Lane.INTERACTIVE``: a user is waiting for the answer (default)
+- ``Lane.REPORT``: paid long-form reports (detailed natal chart)
+- ``Lane.BATCH``: scheduler jobs (nightly horoscopes, transit forecasts)
+
+Admission needs a free concurrency slot and enough tokens-per-minute
+budget. Lower lanes are capped below the global limits (slots and budget
+headroom are reserved), so interactive requests always find capacity
+while a batch runs. Waiters are served highest lane first, FIFO within a
+lane. After admission, a per-model request rate limit applies.
+
+The lane comes from context: jobs wrap their body in ``llm_lane(Lane.BATCH)``
+and every LLM call made underneath (including tasks it spawns) is
+dispatched in that lane.
+
+Limits are per process; ``get_llm_dispatcher`` divides the configured
+budgets between ``WEB_CONCURRENCY`` workers.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from src.config import settings
+from src.core.rate_limit import AsyncRateLimiter
+from src.monitoring.metrics import LLM_IN_FLIGHT, LLM_QUEUE_WAIT
+
+
+class Lane(IntEnum):
+    """Priority classes, lower value = served first."""
+
+    INTERACTIVE = 0
+    REPORT = 1
+    BATCH = 2
+
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+
+# Share of global concurrency each lane may occupy
+LANE_CONCURRENCY_SHARE = {
+    Lane.INTERACTIVE: 1.0,
+    Lane.REPORT: 0.75,
+    Lane.BATCH: 0.5,
+}
+
+# Share of the token budget a lane must leave untouched
+LANE_BUDGET_RESERVE = {
+    Lane.INTERACTIVE: 0.0,
+    Lane.REPORT: 0.1,
+    Lane.BATCH: 0.3,
+}
+
+CHARS_PER_TOKEN = 3  # conservative for mixed Russian/English prompts
+
+_current_lane: ContextVar[Lane] = ContextVar("llm_lane", default=Lane.INTERACTIVE)
+
+
+@contextmanager
+def llm_lane(lane: Lane) -> Iterator[None]:
+    """Dispatch LLM calls made in this context in ``lane``."""
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane() -> Lane:
+    return _current_lane.get()
+
+
+def estimate_tokens(messages: list[dict], max_tokens: int) -> int:
+    """Upper-bound token estimate for budget admission."""
+    prompt_chars = sum(len(message["content"]) for message in messages)
+    return prompt_chars // CHARS_PER_TOKEN + max_tokens
+
+
+@dataclass(order=True)
+class _Waiter:
+    lane: Lane
+    seq: int
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+@dataclass
+class Grant:
+    """Admission ticket; report actual usage with ``settle``."""
+
+    dispatcher: "LLMDispatcher"
+    lane: Lane
+    reserved: int
+
+    def settle(self, used_tokens: int | None) -> None:
+        """Refund (or charge) the difference between estimate and usage."""
+        if used_tokens is not None:
+            self.dispatcher._adjust_budget(self.reserved - used_tokens)
+            self.reserved = used_tokens
+
+
+class LLMDispatcher:
+    """Priority admission control for LLM calls in one process."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        tokens_per_minute: int,
+        requests_per_minute: int,
+    ) -> None:
+        if max_concurrency < 1 or tokens_per_minute < 1 or requests_per_minute < 1:
+            raise ValueError("dispatcher limits must be positive")
+        self.max_concurrency = max_concurrency
+        self.lane_limits = {
+            lane: max(1, int(max_concurrency * share))
+            for lane, share in LANE_CONCURRENCY_SHARE.items()
+        }
+        self.requests_per_minute = requests_per_minute
+
+        # Token bucket: refills tokens_per_minute over a minute
+        self.budget_capacity = float(tokens_per_minute)
+        self._budget = self.budget_capacity
+        self._refill_rate = tokens_per_minute / 60.0
+        self._refilled_at = time.monotonic()
+
+        self._active = 0
+        self._active_by_lane = {lane: 0 for lane in Lane}
+        self._waiters: list[_Waiter] = []
+        self._seq = 0
+        self._wakeup: asyncio.TimerHandle | None = None
+        self._model_limiters: dict[str, AsyncRateLimiter] = {}
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.future.done())
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        model: str,
+        estimated_tokens: int,
+        lane: Lane | None = None,
+    ) -> AsyncIterator[Grant]:
+        """Wait for admission, then hold a concurrency slot for one call."""
+        lane = current_lane() if lane is None else lane
+        # Larger estimates could never fit the lane's budget and would
+        # block every waiter queued behind them
+        tokens = min(estimated_tokens, self._lane_budget(lane))
+
+        started = time.monotonic()
+        await self._admit(lane, tokens)
+        try:
+            await self._model_limiter(model).acquire()
+            LLM_QUEUE_WAIT.labels(lane=lane.label).observe(time.monotonic() - started)
+            LLM_IN_FLIGHT.labels(lane=lane.label).inc()
+            try:
+                yield Grant(self, lane, tokens)
+            finally:
+                LLM_IN_FLIGHT.labels(lane=lane.label).dec()
+        finally:
+            self._release(lane)
+
+    def _model_limiter(self, model: str) -> AsyncRateLimiter:
+        limiter = self._model_limiters.get(model)
+        if limiter is None:
+            rate = self.requests_per_minute / 60.0
+            limiter = AsyncRateLimiter(rate=rate, burst=max(1, int(rate)))
+            self._model_limiters[model] = limiter
+        return limiter
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._budget = min(self.budget_capacity, self._budget + elapsed * self._refill_rate)
+
+    def _adjust_budget(self, delta: float) -> None:
+        self._refill()
+        self._budget = min(self.budget_capacity, self._budget + delta)
+        if delta > 0:
+            self._dispatch()
+
+    def _slot_free(self, lane: Lane) -> bool:
+        return (
+            self._active < self.max_concurrency
+            and self._active_by_lane[lane] < self.lane_limits[lane]
+        )
+
+    def _lane_budget(self, lane: Lane) -> int:
+        """Most tokens a single request in ``lane`` can be admitted with."""
+        reserve = self.budget_capacity * LANE_BUDGET_RESERVE[lane]
+        return int(self.budget_capacity - reserve)
+
+    def _budget_free(self, lane: Lane, tokens: int) -> bool:
+        reserve = self.budget_capacity * LANE_BUDGET_RESERVE[lane]
+        return self._budget - min(tokens, self._lane_budget(lane)) >= reserve
+
+    def _start(self, lane: Lane, tokens: int) -> None:
+        self._active += 1
+        self._active_by_lane[lane] += 1
+        self._budget -= tokens
+
+    async def _admit(self, lane: Lane, tokens: int) -> None:
+        self._refill()
+        if not self._waiters and self._slot_free(lane) and self._budget_free(lane, tokens):
+            self._start(lane, tokens)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        self._waiters.append(_Waiter(lane, self._seq, tokens, future))
+        self._waiters.sort()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just before cancellation - give the slot back
+                self._release(lane)
+            raise
+
+    def _release(self, lane: Lane) -> None:
+        self._active -= 1
+        self._active_by_lane[lane] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Admit waiters in priority order while capacity allows."""
+        self._refill()
+        self._waiters = [waiter for waiter in self._waiters if not waiter.future.done()]
+        budget_wait = None
+
+        for waiter in list(self._waiters):
+            if self._active >= self.max_concurrency:
+                break
+            if not self._slot_free(waiter.lane):
+                # Lane at its cap; lower lanes may still have room
+                continue
+            if not self._budget_free(waiter.lane, waiter.tokens):
+                reserve = self.budget_capacity * LANE_BUDGET_RESERVE[waiter.lane]
+                shortfall = waiter.tokens + reserve - self._budget
+                budget_wait = shortfall / self._refill_rate
+                # Don't let smaller, lower-priority requests starve this one
+                break
+            self._start(waiter.lane, waiter.tokens)
+            waiter.future.set_result(None)
+            self._waiters.remove(waiter)
+
+        if budget_wait is not None and self._wakeup is None:
+            self._wakeup = asyncio.get_running_loop().call_later(
+                budget_wait, self._on_wakeup
+            )
+
+    def _on_wakeup(self) -> None:
+        self._wakeup = None
+        self._dispatch()
+
+
+# Singleton instance
+_dispatcher: LLMDispatcher | None = None
+
+
+def get_llm_dispatcher() -> LLMDispatcher:
+    """Get the process-wide LLM dispatcher."""
+    global _dispatcher
+    if _dispatcher is None:
+        workers = max(1, settings.web_concurrency)
+        _dispatcher = LLMDispatcher(
+            max_concurrency=max(1, settings.llm_max_concurrency // workers),
+            tokens_per_minute=max(1, settings.llm_tokens_per_minute // workers),
+            requests_per_minute=max(1, settings.llm_requests_per_minute // workers),
+        )
+    return _dispatcher
@@ -0,0 +1,73 @@
+"""Prompt token counting and budgets.
+
+Tokens are counted with tiktoken's ``o200k_base`` (the GPT-4o tokenizer)
+once ``load_encoding`` has loaded it at startup. The Docker image
+pre-downloads the encoding file into ``TIKTOKEN_CACHE_DIR``; elsewhere
+tiktoken downloads it on first load, which is kept out of the request
+path. Until it is loaded (or if the download fails) a character estimate
+is used. Other models tokenize differently, so budgets are targets with
+some slack, not hard limits.
+"""
+
+import asyncio
+
+import structlog
+import tiktoken
+
+from src.services.ai.dispatcher import CHARS_PER_TOKEN
+
+logger = structlog.get_logger()
+
+ENCODING = "o200k_base"
+
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+_encoding = None
+
+
+async def load_encoding() -> None:
+    """Load the tokenizer in a thread (call once at startup)."""
+    global _encoding
+    if _encoding is not None:
+        return
+    try:
+        _encoding = await asyncio.to_thread(tiktoken.get_encoding, ENCODING)
+    except Exception as e:
+        # Offline hosts keep the character estimate
+        await logger.awarning("tiktoken_unavailable", error=str(e))
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in ``text`` (estimated if tiktoken is unavailable)."""
+    if _encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: list[dict]) -> int:
+    """Prompt tokens for a chat messages array."""
+    return sum(
+        count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS for message in messages
+    )
+
+
+def fit_history(history: list[dict], budget: int) -> list[dict]:
+    """Most recent messages of ``history`` that fit in ``budget`` tokens.
+
+    Whole messages are dropped oldest first, and the kept history starts
+    with a user message so the dialog stays well-formed.
+    """
+    kept: list[dict] = []
+    used = 0
+    for message in reversed(history):
+        used += count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+        if used > budget:
+            break
+        kept.append(message)
+    kept.reverse()
+
+    while kept and kept[0]["role"] != "user":
+        kept.pop(0)
+    return kept
@@ -1,6 +1,12 @@
 """Prompt templates for AI-generated horoscopes and tarot interpretations."""
 
+from collections.abc import Mapping
 from dataclasses import dataclass
+from typing import Any
+
+from src.services.ai.chart_encoding import fit_chart, fit_transits, planet_ru
+from src.services.astrology.transits import natal_house
+from src.services.tarot_deck import REVERSED_PROMPT_LABEL, get_deck
 
 # Zodiac signs with grammatical gender (masculine/feminine for Russian address)
 ZODIAC_GENDER = {
@@ -117,6 +123,15 @@ class GeneralHoroscopePrompt:
 ВАЖНО: Пиши про ЗНАК в целом, без разделения на секции."""
 
 
+def _card_prompt_label(card: Mapping[str, Any], reversed_flag: bool) -> str:
+    """Card name with reversed marker, preformatted by the deck when available."""
+    text = get_deck().text(card.get("name_short"))
+    if text is not None:
+        return text.prompt_label[reversed_flag]
+    card_name = card.get("name", "Неизвестная карта")
+    return f"{card_name}{REVERSED_PROMPT_LABEL}" if reversed_flag else card_name
+
+
 @dataclass
 class TarotSpreadPrompt:
     """Prompt for 3-card tarot spread interpretation."""
@@ -165,12 +180,11 @@ class TarotSpreadPrompt:
         # Sanitize question: limit length, remove newlines
         clean_question = question[:500].replace("\n", " ").replace("\r", "").strip()
 
-        cards_text = []
         positions = ["Прошлое", "Настоящее", "Будущее"]
-        for i, (card, reversed_flag) in enumerate(zip(cards, is_reversed)):
-            status = " (перевернута)" if reversed_flag else ""
-            card_name = card.get("name", "Неизвестная карта")
-            cards_text.append(f"{positions[i]}: {card_name}{status}")
+        cards_text = [
+            f"{positions[i]}: {_card_prompt_label(card, reversed_flag)}"
+            for i, (card, reversed_flag) in enumerate(zip(cards, is_reversed))
+        ]
 
         return f"""Вопрос пользователя: {clean_question}
 
@@ -234,31 +248,6 @@ class CardOfDayPrompt:
         return f"Карта дня: {card_name}{status} ({type_text})"
 
 
-def _get_planet_name_ru(planet_en: str) -> str:
-    """Convert English planet name to Russian.
-
-    Args:
-        planet_en: English planet name (e.g., 'sun', 'moon', 'venus')
-
-    Returns:
-        Russian planet name
-    """
-    planet_names = {
-        "sun": "Солнце",
-        "moon": "Луна",
-        "mercury": "Меркурий",
-        "venus": "Венера",
-        "mars": "Марс",
-        "jupiter": "Юпитер",
-        "saturn": "Сатурн",
-        "uranus": "Уран",
-        "neptune": "Нептун",
-        "pluto": "Плутон",
-        "north_node": "Северный Узел",
-    }
-    return planet_names.get(planet_en, planet_en.capitalize())
-
-
 @dataclass
 class PremiumHoroscopePrompt:
     """Prompt for premium personalized horoscope with natal chart data."""
@@ -296,6 +285,10 @@ class PremiumHoroscopePrompt:
 - НЕ используй markdown символы (**, *, _, `, [])
 - Используй ТОЛЬКО текст и эмодзи для структуры"""
 
+    # Token budget for the chart; widest aspects are dropped to fit
+    CHART_BUDGET = 300
+    MAX_ASPECTS = 8
+
     @staticmethod
     def user(
         zodiac_sign_ru: str,
@@ -303,7 +296,7 @@ class PremiumHoroscopePrompt:
         natal_data: dict,
         zodiac_sign_en: str = "",
     ) -> str:
-        """Generate user prompt with FULL natal chart data.
+        """Generate user prompt with compact natal chart data.
 
         Args:
             zodiac_sign_ru: Russian zodiac name (e.g., "Овен")
@@ -314,62 +307,30 @@ class PremiumHoroscopePrompt:
         greeting = get_zodiac_greeting(zodiac_sign_en, zodiac_sign_ru) if zodiac_sign_en else ""
         greeting_instruction = f'\nНачни с обращения: "{greeting}"' if greeting else ""
 
-        # === ПЛАНЕТЫ (все 11!) ===
-        planets = natal_data["planets"]
-        planet_lines = []
-        for name, pos in planets.items():
-            planet_ru = _get_planet_name_ru(name)
-            house = pos.get("house", "?")
-            planet_lines.append(
-                f"- {planet_ru}: {pos['sign_ru']} {pos['degree']:.0f}° (дом {house})"
-            )
-
-        # === КЛЮЧЕВЫЕ ДОМА ===
-        houses = natal_data["houses"]
-        house_lines = []
-        for house_num in [1, 4, 7, 10]:  # Ключевые дома
-            if house_num in houses:
-                cusp = houses[house_num]
-                house_lines.append(f"- {house_num} дом: {cusp['sign_ru']}")
-
-        # === ВАЖНЫЕ АСПЕКТЫ ===
-        aspects = natal_data.get("aspects", [])[:5]  # Топ-5 аспектов
-        aspect_lines = []
-        for asp in aspects:
-            aspect_lines.append(
-                f"- {asp['planet1_ru']} {asp['aspect_ru']} {asp['planet2_ru']} (орб {asp['orb']:.1f}°)"
-            )
-
-        # === ВРЕМЯ РОЖДЕНИЯ ===
-        time_known = natal_data.get("time_known", True)
-        time_note = "известно" if time_known else "неизвестно (дома приблизительные)"
-
-        # Собираем всё вместе
-        planets_str = "\n".join(planet_lines)
-        houses_str = "\n".join(house_lines)
-        aspects_str = "\n".join(aspect_lines) if aspect_lines else "(аспекты не указаны)"
+        chart = fit_chart(
+            natal_data,
+            PremiumHoroscopePrompt.CHART_BUDGET,
+            max_aspects=PremiumHoroscopePrompt.MAX_ASPECTS,
+        )
 
         # Пример для AI (показываем как использовать данные)
+        planets = natal_data["planets"]
         example_planet = "venus" if "venus" in planets else "sun"
         example_pos = planets[example_planet]
-        example_ru = _get_planet_name_ru(example_planet)
-        example_house = example_pos.get("house", "?")
+        example_house = (
+            natal_house(example_pos["longitude"], natal_data["houses"])
+            if natal_data.get("time_known", True)
+            else 0
+        )
+        example_house_str = f" в {example_house}-м доме" if example_house else ""
 
         return f"""Создай персональный гороскоп на {date_str} для {zodiac_sign_ru}.
 
-НАТАЛЬНАЯ КАРТА (время рождения {time_note}):
-
-ПЛАНЕТЫ:
-{planets_str}
-
-КЛЮЧЕВЫЕ ДОМА:
-{houses_str}
-
-ВАЖНЫЕ АСПЕКТЫ:
-{aspects_str}
+НАТАЛЬНАЯ КАРТА (планета знак градус дом):
+{chart}
 
 ВАЖНО: Используй эти КОНКРЕТНЫЕ данные в прогнозе!
-Например: "Твоя {example_ru} в {example_pos['sign_ru']} в {example_house}-м доме делает тебя особенно чувствительной к красоте сегодня"
+Например: "Твоя {planet_ru(example_planet)} в {example_pos['sign_ru']}{example_house_str} делает тебя особенно чувствительной к красоте сегодня"
 {greeting_instruction}"""
 
 
@@ -469,12 +430,10 @@ class CelticCrossPrompt:
         # Sanitize question: limit length, remove newlines
         clean_question = question[:500].replace("\n", " ").replace("\r", "").strip()
 
-        cards_text = []
-        for i, (card, reversed_flag) in enumerate(zip(cards, is_reversed)):
-            status = " (перевернута)" if reversed_flag else ""
-            card_name = card.get("name", "Неизвестная карта")
-            position = CELTIC_CROSS_POSITIONS[i]
-            cards_text.append(f"{i + 1}. {position}: {card_name}{status}")
+        cards_text = [
+            f"{i + 1}. {CELTIC_CROSS_POSITIONS[i]}: {_card_prompt_label(card, reversed_flag)}"
+            for i, (card, reversed_flag) in enumerate(zip(cards, is_reversed))
+        ]
 
         return f"""Вопрос пользователя: {clean_question}
 
@@ -626,49 +585,36 @@ class DetailedNatalPrompt:
         },
     ]
 
-    @staticmethod
-    def format_natal_for_prompt(natal_data: dict) -> str:
-        """Format natal data for inclusion in prompt."""
-        planets = natal_data["planets"]
-        angles = natal_data["angles"]
-
-        lines = []
-        # Planets
-        for name, data in planets.items():
-            sign_ru = data.get("sign_ru", data["sign"])
-            degree = data["degree"]
-            lines.append(f"{name.title()}: {sign_ru} {degree:.0f}°")
+    # Token budget for the chart, sent with each of the 8 sections
+    CHART_BUDGET = 400
+    MAX_ASPECTS = 12
 
-        # Angles
-        lines.append(f"Асцендент: {angles['ascendant']['sign_ru']} {angles['ascendant']['degree']:.0f}°")
-        lines.append(f"MC: {angles['mc']['sign_ru']} {angles['mc']['degree']:.0f}°")
+    @classmethod
+    def format_natal_for_prompt(cls, natal_data: dict) -> str:
+        """Format natal data for inclusion in prompt."""
+        return fit_chart(natal_data, cls.CHART_BUDGET, max_aspects=cls.MAX_ASPECTS)
 
-        # Top aspects
-        aspects = natal_data["aspects"][:10]
-        if aspects:
-            lines.append("\nОсновные аспекты:")
-            for asp in aspects:
-                lines.append(f"  {asp['planet1_ru']} {asp['aspect_ru']} {asp['planet2_ru']}")
+    @classmethod
+    def system_with_chart(cls, natal_data: dict) -> str:
+        """System prompt with the chart, shared by all sections.
 
-        time_note = "известно" if natal_data["time_known"] else "неизвестно (12:00)"
-        lines.append(f"\nВремя рождения: {time_note}")
+        The chart goes in the system message so every section request
+        starts with the same prefix (cacheable by the provider).
+        """
+        return f"""{cls.SYSTEM}
 
-        return "\n".join(lines)
+НАТАЛЬНАЯ КАРТА КЛИЕНТА (планета знак градус дом):
+{cls.format_natal_for_prompt(natal_data)}"""
 
-    @classmethod
-    def section_prompt(cls, section: dict, natal_data: dict) -> str:
+    @staticmethod
+    def section_prompt(section: dict) -> str:
         """Generate prompt for a specific section."""
-        natal_text = cls.format_natal_for_prompt(natal_data)
-
         return f"""Напиши секцию "{section['title']}" для детальной интерпретации натальной карты.
 
 Фокус этой секции: {section['focus']}
 
 ВАЖНО: Напиши МИНИМУМ {section['min_words']} слов. Это платный продукт, клиент ожидает глубокий анализ.
 
-Натальная карта:
-{natal_text}
-
 Пиши детально, с примерами из жизни. Начни сразу с содержания, без повторения заголовка."""
 
 
@@ -730,6 +676,10 @@ class DailyTransitPrompt:
 - НЕ используй markdown символы (####, **, *, _, `, [], ||)
 - Используй ТОЛЬКО простой текст и эмодзи для структуры"""
 
+    # Token budgets; transit aspects (widest first) are dropped to fit
+    NATAL_BUDGET = 250
+    TRANSIT_BUDGET = 600
+
     @staticmethod
     def user(
         natal_data: dict,
@@ -746,73 +696,27 @@ class DailyTransitPrompt:
         Returns:
             Formatted prompt for AI
         """
-        # Format natal planets (reference)
-        natal_lines = []
-        for name, pos in natal_data["planets"].items():
-            natal_lines.append(
-                f"{_get_planet_name_ru(name)}: {pos['sign_ru']} {pos['degree']:.0f}°"
-            )
-
-        # Format transit positions with houses
-        transit_lines = []
-        for name, pos in transit_data["transits"].items():
-            house_info = f" (в твоем {pos['house']}-м доме)" if pos["house"] > 0 else ""
-            transit_lines.append(
-                f"{_get_planet_name_ru(name)}: {pos['sign_ru']} {pos['degree']:.0f}°{house_info}"
-            )
-
-        # Format aspects
-        aspect_lines = []
-        for asp in transit_data["aspects"]:
-            exact_mark = " (ТОЧНЫЙ!)" if asp["exact"] else ""
-            aspect_lines.append(
-                f"{asp['transit_planet_ru']} {asp['aspect_ru']} {asp['natal_planet_ru']} "
-                f"(орб {asp['orb']}°){exact_mark}"
-            )
-
-        natal_text = "\n".join(natal_lines)
-        transit_text = "\n".join(transit_lines)
-        aspect_text = "\n".join(aspect_lines) if aspect_lines else "Нет значимых аспектов"
+        natal_text = fit_chart(natal_data, DailyTransitPrompt.NATAL_BUDGET, max_aspects=0)
+        transit_text = fit_transits(transit_data, DailyTransitPrompt.TRANSIT_BUDGET)
 
         return f"""Создай профессиональный транзитный прогноз на {date_str}.
 
-НАТАЛЬНАЯ КАРТА (для справки):
+НАТАЛЬНАЯ КАРТА (для справки; планета знак градус дом):
 {natal_text}
 
-ТРАНЗИТЫ НА СЕГОДНЯ:
+ТРАНЗИТЫ НА СЕГОДНЯ (дом = натальный дом):
 {transit_text}
 
-АСПЕКТЫ ТРАНЗИТОВ К НАТАЛЬНЫМ ПЛАНЕТАМ:
-{aspect_text}
-
 Напиши МАКСИМАЛЬНО ПОЛНЫЙ и ПРОФЕССИОНАЛЬНЫЙ прогноз (1500-2500 слов).
 Объясни, как транзиты влияют на ЕГО/ЕЁ жизнь СЕГОДНЯ."""
 
 
-def _get_planet_name_ru(planet_key: str) -> str:
-    """Helper to get Russian planet name from key."""
-    names = {
-        "sun": "Солнце",
-        "moon": "Луна",
-        "mercury": "Меркурий",
-        "venus": "Венера",
-        "mars": "Марс",
-        "jupiter": "Юпитер",
-        "saturn": "Сатурн",
-        "uranus": "Уран",
-        "neptune": "Нептун",
-        "pluto": "Плутон",
-        "north_node": "Сев. узел",
-    }
-    return names.get(planet_key, planet_key)
-
-
 @dataclass
 class AstrologerChatPrompt:
     """Prompt for conversational AI astrologer chat.
 
     Used for interactive dialog where user asks questions about their natal chart.
-    Optimized for token efficiency (~600 tokens for chart data).
+    Optimized for token efficiency (chart data within CHART_BUDGET tokens).
     """
 
     SYSTEM = """Ты - профессиональный астролог с 20-летним опытом.
@@ -850,15 +754,20 @@ class AstrologerChatPrompt:
 - Обсуждать кармические уроки и жизненные задачи
 - Отвечать на вопросы о совместимости (в общих чертах)"""
 
+    # Token budgets; the system prompt is resent on every turn
+    CHART_BUDGET = 300
+    TRANSIT_BUDGET = 200
+    HISTORY_BUDGET = 1500
+    MAX_ASPECTS = 8
+    MAX_TRANSIT_ASPECTS = 5
+
     @staticmethod
     def system_with_chart(natal_data: dict, transit_data: dict | None) -> str:
-        """Generate system prompt with compressed natal chart data.
+        """Generate system prompt with compact natal chart data.
 
-        Compresses full natal chart to ~600 tokens (from ~1500) by:
-        - Planets: only sign + degree (no house duplication)
-        - Houses: only key houses (1, 4, 7, 10)
-        - Aspects: only tight aspects (orb < 3°)
-        - Transits: only through important houses + exact aspects
+        - Chart: planets with houses, angles, key houses (1, 4, 7, 10)
+        - Aspects: only tight aspects (orb < 3°), trimmed to CHART_BUDGET
+        - Transits: positions + exact aspects, trimmed to TRANSIT_BUDGET
 
         Args:
             natal_data: FullNatalChartResult
@@ -867,84 +776,26 @@ class AstrologerChatPrompt:
         Returns:
             Complete system prompt with chart data
         """
-        planets = natal_data["planets"]
-        houses = natal_data["houses"]
-        aspects = natal_data["aspects"]
-
-        # Format planets (sign + degree only)
-        planets_lines = []
-        for name, pos in planets.items():
-            planet_ru = _get_planet_name_ru(name)
-            planets_lines.append(
-                f"- {planet_ru}: {pos['sign_ru']} {pos['degree']:.0f}° (дом {pos.get('house', '?')})"
-            )
+        chart = fit_chart(
+            natal_data,
+            AstrologerChatPrompt.CHART_BUDGET,
+            max_aspects=AstrologerChatPrompt.MAX_ASPECTS,
+            max_orb=3.0,
+        )
 
-        # Format key houses (angular houses only: 1, 4, 7, 10)
-        houses_lines = []
-        for house_num in [1, 4, 7, 10]:
-            if house_num in houses:
-                cusp = houses[house_num]
-                houses_lines.append(f"- {house_num} дом: {cusp['sign_ru']}")
-
-        # Format tight aspects (orb < 3°)
-        tight_aspects = [asp for asp in aspects if asp["orb"] < 3.0]
-        aspects_lines = []
-        for asp in tight_aspects[:8]:  # Max 8 aspects
-            aspects_lines.append(
-                f"- {asp['planet1_ru']} {asp['aspect_ru']} {asp['planet2_ru']} "
-                f"(орб {asp['orb']:.1f}°)"
-            )
-
-        # Format transits (if available)
-        transits_text = ""
         if transit_data:
-            transits = transit_data["transits"]
-            transit_aspects = transit_data["aspects"]
-
-            # Only transits through important houses (1, 4, 7, 10)
-            important_transits = []
-            for name, pos in transits.items():
-                if pos["house"] in [1, 4, 7, 10]:
-                    planet_ru = _get_planet_name_ru(name)
-                    important_transits.append(
-                        f"- {planet_ru}: {pos['sign_ru']} {pos['degree']:.0f}° "
-                        f"(в твоем {pos['house']}-м доме)"
-                    )
-
-            # Only exact aspects (orb < 1°)
-            exact_aspects = [asp for asp in transit_aspects if asp["exact"]]
-            transit_aspects_lines = []
-            for asp in exact_aspects[:5]:  # Max 5 exact aspects
-                transit_aspects_lines.append(
-                    f"- {asp['transit_planet_ru']} {asp['aspect_ru']} "
-                    f"твой {asp['natal_planet_ru']} (ТОЧНЫЙ!)"
-                )
-
-            if important_transits or transit_aspects_lines:
-                transits_text = "\n\nТРАНЗИТЫ СЕГОДНЯ:\n"
-                if important_transits:
-                    transits_text += "Позиции:\n" + "\n".join(important_transits[:6])
-                if transit_aspects_lines:
-                    transits_text += (
-                        "\n\nТочные аспекты:\n" + "\n".join(transit_aspects_lines)
-                    )
+            transits_text = "\n\nТРАНЗИТЫ СЕГОДНЯ (дом = натальный дом):\n" + fit_transits(
+                transit_data,
+                AstrologerChatPrompt.TRANSIT_BUDGET,
+                max_aspects=AstrologerChatPrompt.MAX_TRANSIT_ASPECTS,
+                exact_only=True,
+            )
         else:
             transits_text = "\n\n(транзиты не загружены)"
 
-        # Build full system prompt
-        planets_str = "\n".join(planets_lines)
-        houses_str = "\n".join(houses_lines)
-        aspects_str = "\n".join(aspects_lines) if aspects_lines else "(нет тесных аспектов)"
-
         return f"""{AstrologerChatPrompt.SYSTEM}
 
-НАТАЛЬНАЯ КАРТА КЛИЕНТА:
-{planets_str}
-
-КЛЮЧЕВЫЕ ДОМА:
-{houses_str}
-
-ТЕСНЫЕ АСПЕКТЫ (орб < 3°):
-{aspects_str}{transits_text}
+НАТАЛЬНАЯ КАРТА КЛИЕНТА (планета знак градус дом; аспекты с орбом < 3°):
+{chart}{transits_text}
 
 Отвечай на вопросы клиента кратко (3-7 предложений), используя эти данные."""
@@ -0,0 +1,137 @@
+"""Content-addressed cache for LLM responses to deterministic prompts.
+
+Many prompts are identical across users: card of day has 78 cards x 2
+orientations, the general horoscope depends only on sign and date. Responses
+are cached by a hash of (model, system prompt, user prompt, params), so the
+same prompt is answered from the cache no matter who asks.
+
+Each key holds a pool of up to ``variants`` responses. Until the pool is
+full a lookup misses and the caller generates (and adds) a new variant;
+after that lookups return a random variant, so users still see some
+variety while LLM calls per key are bounded by ``variants`` per TTL.
+``get_or_generate`` also shares one in-flight generation between
+concurrent misses for the same key, so a burst on a cold key makes a
+single LLM call.
+
+Only validated responses should be added. In-memory and per process, like
+the other AI caches.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from src.config import settings
+from src.monitoring.metrics import AI_RESPONSE_CACHE_TOTAL
+
+RESPONSE_CACHE_TTL = 86400  # 24 hours
+MAX_KEYS = 4096
+
+
+def response_key(model: str, system_prompt: str, user_prompt: str, **params) -> str:
+    """Hash of everything that determines the model's output distribution."""
+    payload = json.dumps(
+        [model, system_prompt, user_prompt, params],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class _Pool:
+    expires_at: float
+    texts: list[str] = field(default_factory=list)
+
+
+class ResponseCache:
+    """LRU of response pools keyed by ``response_key``."""
+
+    def __init__(self, variants: int = 3, max_keys: int = MAX_KEYS) -> None:
+        self.variants = max(1, variants)
+        self.max_keys = max_keys
+        self._pools: OrderedDict[str, _Pool] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[str | None]] = {}
+
+    def get(self, key: str, operation: str = "unknown") -> str | None:
+        """Random cached variant, or None while the pool is still filling."""
+        pool = self._pools.get(key)
+        if pool is not None and pool.expires_at <= time.monotonic():
+            del self._pools[key]
+            pool = None
+
+        if pool is None or len(pool.texts) < self.variants:
+            AI_RESPONSE_CACHE_TOTAL.labels(operation=operation, result="miss").inc()
+            return None
+
+        self._pools.move_to_end(key)
+        AI_RESPONSE_CACHE_TOTAL.labels(operation=operation, result="hit").inc()
+        return random.choice(pool.texts)
+
+    def add(self, key: str, text: str, ttl: float = RESPONSE_CACHE_TTL) -> None:
+        """Add a validated response to the key's pool."""
+        pool = self._pools.get(key)
+        if pool is None or pool.expires_at <= time.monotonic():
+            pool = _Pool(expires_at=time.monotonic() + ttl)
+            self._pools[key] = pool
+        if len(pool.texts) < self.variants:
+            pool.texts.append(text)
+        self._pools.move_to_end(key)
+
+        while len(self._pools) > self.max_keys:
+            self._pools.popitem(last=False)
+
+    async def get_or_generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[str | None]],
+        operation: str = "unknown",
+    ) -> str | None:
+        """Cached variant, or a new one from ``generate`` added to the pool.
+
+        ``generate`` must return a validated response (or None on failure).
+        Concurrent misses for the same key await one shared generation.
+        """
+        cached = self.get(key, operation=operation)
+        if cached:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._generate(key, generate))
+            self._inflight[key] = task
+        # One caller's cancellation must not cancel the others' generation
+        return await asyncio.shield(task)
+
+    async def _generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[str | None]],
+    ) -> str | None:
+        try:
+            text = await generate()
+            if text:
+                self.add(key, text)
+            return text
+        finally:
+            del self._inflight[key]
+
+    def __len__(self) -> int:
+        return len(self._pools)
+
+
+# Singleton instance
+_response_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide LLM response cache."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(variants=settings.llm_response_variants)
+    return _response_cache
@@ -1,8 +1,21 @@
-"""Validation for AI-generated outputs."""
+"""Validation for AI-generated outputs.
+
+Validation runs on every generation and retry, so the work per text is kept
+to a minimum:
+- The text is lowercased once per validation.
+- FORBIDDEN_PATTERNS are merged at import time into one alternation matched
+  case-sensitively against the lowercased text (IGNORECASE on Cyrillic is
+  ~15x slower in ``re``), so the text is scanned once, not once per pattern.
+- Keyword lists (required sections, AI phrases) live in ``KeywordMatcher``;
+  for a handful of short literals, ``str`` substring search beats a regex
+  alternation, so they use ``in`` on the shared lowercased text.
+- Each output type is described by ``OutputRules``; ``collect_violations``
+  reports every violation in one pass, ``validate_*`` return the first one.
+"""
 
 import re
-
-from pydantic import BaseModel, ValidationError, field_validator
+from collections.abc import Iterable
+from dataclasses import dataclass
 
 
 # Forbidden patterns - AI self-references that should not appear in output
@@ -17,104 +30,181 @@ FORBIDDEN_PATTERNS = [
     r"(?i)я\s+искусственный\s+интеллект",
 ]
 
+FORBIDDEN_MESSAGE = "Обнаружен AI-специфичный текст"
 
-def _check_forbidden_patterns(text: str) -> str | None:
-    """Check for forbidden AI self-reference patterns.
 
-    Returns error message if found, None otherwise.
+def _compile_lowercase_alternation(patterns: Iterable[str]) -> re.Pattern[str]:
+    """Merge ``(?i)`` regexes into one alternation for lowercased text.
+
+    Patterns are lowercased instead of using IGNORECASE, so they must not
+    contain uppercase escapes (``\\S``, ``\\W``, ``\\D``).
     """
-    for pattern in FORBIDDEN_PATTERNS:
-        if re.search(pattern, text):
-            return "Обнаружен AI-специфичный текст"
-    return None
+    parts = [p.removeprefix("(?i)").lower() for p in patterns]
+    return re.compile("|".join(f"(?:{p})" for p in parts))
 
 
-class HoroscopeOutput(BaseModel):
-    """Validation for horoscope output."""
+_FORBIDDEN_RE = _compile_lowercase_alternation(FORBIDDEN_PATTERNS)
 
-    text: str
 
-    @field_validator("text")
-    @classmethod
-    def validate_structure(cls, v: str) -> str:
-        """Validate horoscope text structure and content."""
-        # Check minimum length (300 words ~ 800 chars in Russian)
-        if len(v) < 800:
-            raise ValueError("Гороскоп слишком короткий")
+class KeywordMatcher:
+    """Fixed set of literal substrings, normalized once at import time."""
 
-        # Check maximum length
-        if len(v) > 4000:
-            raise ValueError("Гороскоп слишком длинный")
+    def __init__(self, keywords: Iterable[str], ignore_case: bool = True) -> None:
+        self.ignore_case = ignore_case
+        self.keywords = tuple(kw.lower() if ignore_case else kw for kw in keywords)
 
-        # Check for required sections (flexible matching)
-        # At least 3 of 4 section keywords should be present
-        required_keywords = ["любовь", "карьер", "здоровь", "финанс"]
-        found = sum(1 for kw in required_keywords if kw.lower() in v.lower())
-        if found < 3:
-            raise ValueError(f"Отсутствуют разделы гороскопа (найдено {found}/4)")
+    def count(self, text: str) -> int:
+        """Number of keywords present (text lowercased if ignore_case)."""
+        return sum(1 for kw in self.keywords if kw in text)
 
-        # Check for forbidden AI self-references
-        error = _check_forbidden_patterns(v)
-        if error:
-            raise ValueError(error)
+    def first(self, text: str) -> str | None:
+        """First keyword (in list order) present in text, or None."""
+        for kw in self.keywords:
+            if kw in text:
+                return kw
+        return None
 
-        return v
+    def any(self, text: str) -> bool:
+        """True if any keyword is present."""
+        return any(kw in text for kw in self.keywords)
 
 
-class TarotOutput(BaseModel):
-    """Validation for tarot interpretation output."""
+@dataclass(frozen=True)
+class OutputRules:
+    """Structural rules for one AI output type."""
 
-    text: str
+    min_len: int
+    max_len: int
+    too_short: str
+    too_long: str
+    # Required keywords (case-insensitive): at least required_min must be present
+    required: KeywordMatcher | None = None
+    required_min: int = 0
+    missing_message: str = ""
+    # Literal markers (case-sensitive) that must NOT be present
+    banned: KeywordMatcher | None = None
+    banned_message: str = ""
+    check_forbidden: bool = True
 
-    @field_validator("text")
-    @classmethod
-    def validate_structure(cls, v: str) -> str:
-        """Validate tarot interpretation structure and content."""
-        # Check minimum length
-        if len(v) < 500:
-            raise ValueError("Интерпретация слишком короткая")
 
-        # Check maximum length
-        if len(v) > 4000:
-            raise ValueError("Интерпретация слишком длинная")
+def collect_violations(text: str, rules: OutputRules) -> list[str]:
+    """Return all rule violations for text, in check order."""
+    violations: list[str] = []
+    text_lower = text.lower()
 
-        # Check for position references (at least 2 of 3)
-        positions = ["прошл", "настоящ", "будущ"]
-        found = sum(1 for pos in positions if pos.lower() in v.lower())
-        if found < 2:
-            raise ValueError("Отсутствуют позиции расклада")
+    length = len(text)
+    if length < rules.min_len:
+        violations.append(rules.too_short)
+    if length > rules.max_len:
+        violations.append(rules.too_long)
 
-        # Check for forbidden AI self-references
-        error = _check_forbidden_patterns(v)
-        if error:
-            raise ValueError(error)
+    if rules.required is not None:
+        found = rules.required.count(text_lower)
+        if found < rules.required_min:
+            violations.append(
+                rules.missing_message.format(found=found, total=len(rules.required.keywords))
+            )
 
-        return v
+    if rules.banned is not None:
+        marker = rules.banned.first(text)
+        if marker is not None:
+            violations.append(rules.banned_message.format(marker=marker))
 
+    if rules.check_forbidden and _FORBIDDEN_RE.search(text_lower):
+        violations.append(FORBIDDEN_MESSAGE)
 
-class CardOfDayOutput(BaseModel):
-    """Validation for card of day interpretation."""
+    return violations
 
-    text: str
 
-    @field_validator("text")
-    @classmethod
-    def validate_structure(cls, v: str) -> str:
-        """Validate card of day interpretation."""
-        # Check minimum length
-        if len(v) < 300:
-            raise ValueError("Интерпретация слишком короткая")
+def _validate(text: str, rules: OutputRules) -> tuple[bool, str | None]:
+    violations = collect_violations(text, rules)
+    if violations:
+        return False, violations[0]
+    return True, None
 
-        # Check maximum length
-        if len(v) > 2000:
-            raise ValueError("Интерпретация слишком длинная")
 
-        # Check for forbidden AI self-references
-        error = _check_forbidden_patterns(v)
-        if error:
-            raise ValueError(error)
+def _check_forbidden_patterns(text: str) -> str | None:
+    """Check for forbidden AI self-reference patterns.
 
-        return v
+    Returns error message if found, None otherwise.
+    """
+    if _FORBIDDEN_RE.search(text.lower()):
+        return FORBIDDEN_MESSAGE
+    return None
+
+
+HOROSCOPE_RULES = OutputRules(
+    # 300 words ~ 800 chars in Russian
+    min_len=800,
+    max_len=4000,
+    too_short="Гороскоп слишком короткий",
+    too_long="Гороскоп слишком длинный",
+    # At least 3 of 4 section keywords should be present (flexible matching)
+    required=KeywordMatcher(["любовь", "карьер", "здоровь", "финанс"]),
+    required_min=3,
+    missing_message="Отсутствуют разделы гороскопа (найдено {found}/{total})",
+)
+
+TAROT_RULES = OutputRules(
+    min_len=500,
+    max_len=4000,
+    too_short="Интерпретация слишком короткая",
+    too_long="Интерпретация слишком длинная",
+    # Position references (at least 2 of 3)
+    required=KeywordMatcher(["прошл", "настоящ", "будущ"]),
+    required_min=2,
+    missing_message="Отсутствуют позиции расклада",
+)
+
+CARD_OF_DAY_RULES = OutputRules(
+    min_len=300,
+    max_len=2000,
+    too_short="Интерпретация слишком короткая",
+    too_long="Интерпретация слишком длинная",
+)
+
+GENERAL_HOROSCOPE_RULES = OutputRules(
+    # 200 words ~ 500 chars in Russian
+    min_len=500,
+    max_len=2000,
+    too_short="Гороскоп слишком короткий",
+    too_long="Гороскоп слишком длинный",
+    # Onboarding horoscope must NOT have premium sections
+    banned=KeywordMatcher(
+        ["[ЛЮБОВЬ]", "[КАРЬЕРА]", "[ЗДОРОВЬЕ]", "[ФИНАНСЫ]"], ignore_case=False
+    ),
+    banned_message="Обнаружена секция {marker}",
+)
+
+NATAL_CHART_RULES = OutputRules(
+    # 400-500 words ~ 800 chars in Russian
+    min_len=800,
+    max_len=3000,
+    too_short="Интерпретация натальной карты слишком короткая",
+    too_long="Интерпретация натальной карты слишком длинная",
+    # At least 3 of 5 sections from NatalChartPrompt:
+    # БОЛЬШАЯ ТРОЙКА, ЛИЧНОСТЬ, ПУТЬ РАЗВИТИЯ, КЛЮЧЕВЫЕ АСПЕКТЫ, ИТОГ
+    required=KeywordMatcher(
+        [
+            "большая тройка",
+            "личность",
+            "развити",  # Matches "ПУТЬ РАЗВИТИЯ" and "развитие"
+            "аспект",  # Matches "КЛЮЧЕВЫЕ АСПЕКТЫ"
+            "итог",
+        ]
+    ),
+    required_min=3,
+    missing_message="Отсутствуют разделы натальной карты (найдено {found}/{total})",
+)
+
+# AI self-references in detailed natal output (substring, case-insensitive)
+DETAILED_NATAL_AI_PHRASES = KeywordMatcher(
+    [
+        "как ai", "как ии", "языковая модель", "искусственный интеллект",
+        "я не могу", "я не в состоянии", "к сожалению, я",
+    ]
+)
+DETAILED_SECTION_AI_PHRASES = KeywordMatcher(["как ai", "как ии", "языковая модель"])
 
 
 def validate_horoscope(text: str) -> tuple[bool, str | None]:
@@ -126,15 +216,7 @@ def validate_horoscope(text: str) -> tuple[bool, str | None]:
     Returns:
         Tuple of (is_valid, error_message or None)
     """
-    try:
-        HoroscopeOutput(text=text)
-        return True, None
-    except ValidationError as e:
-        # Extract the first error message
-        errors = e.errors()
-        if errors:
-            return False, str(errors[0].get("msg", "Validation failed"))
-        return False, "Validation failed"
+    return _validate(text, HOROSCOPE_RULES)
 
 
 def validate_tarot(text: str) -> tuple[bool, str | None]:
@@ -146,14 +228,7 @@ def validate_tarot(text: str) -> tuple[bool, str | None]:
     Returns:
         Tuple of (is_valid, error_message or None)
     """
-    try:
-        TarotOutput(text=text)
-        return True, None
-    except ValidationError as e:
-        errors = e.errors()
-        if errors:
-            return False, str(errors[0].get("msg", "Validation failed"))
-        return False, "Validation failed"
+    return _validate(text, TAROT_RULES)
 
 
 def validate_card_of_day(text: str) -> tuple[bool, str | None]:
@@ -165,106 +240,21 @@ def validate_card_of_day(text: str) -> tuple[bool, str | None]:
     Returns:
         Tuple of (is_valid, error_message or None)
     """
-    try:
-        CardOfDayOutput(text=text)
-        return True, None
-    except ValidationError as e:
-        errors = e.errors()
-        if errors:
-            return False, str(errors[0].get("msg", "Validation failed"))
-        return False, "Validation failed"
-
-
-class GeneralHoroscopeOutput(BaseModel):
-    """Validation for general horoscope without sections.
-
-    Used for onboarding to show difference between general and premium horoscopes.
-    """
-
-    text: str
-
-    @field_validator("text")
-    @classmethod
-    def validate_structure(cls, v: str) -> str:
-        """Validate general horoscope text structure and content."""
-        # Check minimum length (200 words ~ 500 chars in Russian)
-        if len(v) < 500:
-            raise ValueError("Гороскоп слишком короткий")
-
-        # Check maximum length
-        if len(v) > 2000:
-            raise ValueError("Гороскоп слишком длинный")
-
-        # Check NO sections present (forbidden sections)
-        forbidden_sections = ["[ЛЮБОВЬ]", "[КАРЬЕРА]", "[ЗДОРОВЬЕ]", "[ФИНАНСЫ]"]
-        for section in forbidden_sections:
-            if section in v:
-                raise ValueError(f"Обнаружена секция {section}")
-
-        # Check for forbidden AI self-references
-        error = _check_forbidden_patterns(v)
-        if error:
-            raise ValueError(error)
-
-        return v
+    return _validate(text, CARD_OF_DAY_RULES)
 
 
 def validate_general_horoscope(text: str) -> tuple[bool, str | None]:
     """Validate general horoscope output.
 
+    Used for onboarding to show difference between general and premium horoscopes.
+
     Args:
         text: The generated general horoscope text
 
     Returns:
         Tuple of (is_valid, error_message or None)
     """
-    try:
-        GeneralHoroscopeOutput(text=text)
-        return True, None
-    except ValidationError as e:
-        errors = e.errors()
-        if errors:
-            return False, str(errors[0].get("msg", "Validation failed"))
-        return False, "Validation failed"
-
-
-class NatalChartOutput(BaseModel):
-    """Validation for natal chart interpretation output."""
-
-    text: str
-
-    @field_validator("text")
-    @classmethod
-    def validate_structure(cls, v: str) -> str:
-        """Validate natal chart interpretation structure and content."""
-        # Check minimum length (400-500 words ~ 800 chars in Russian)
-        if len(v) < 800:
-            raise ValueError("Интерпретация натальной карты слишком короткая")
-
-        # Check maximum length
-        if len(v) > 3000:
-            raise ValueError("Интерпретация натальной карты слишком длинная")
-
-        # Check for required sections (at least 3 of 5 from NatalChartPrompt)
-        # Sections: БОЛЬШАЯ ТРОЙКА, ЛИЧНОСТЬ, ПУТЬ РАЗВИТИЯ, КЛЮЧЕВЫЕ АСПЕКТЫ, ИТОГ
-        section_keywords = [
-            "большая тройка",
-            "личность",
-            "развити",  # Matches "ПУТЬ РАЗВИТИЯ" and "развитие"
-            "аспект",   # Matches "КЛЮЧЕВЫЕ АСПЕКТЫ"
-            "итог",
-        ]
-        text_lower = v.lower()
-        found = sum(1 for kw in section_keywords if kw in text_lower)
-        if found < 3:
-            raise ValueError(f"Отсутствуют разделы натальной карты (найдено {found}/5)")
-
-        # Check for forbidden AI self-references
-        error = _check_forbidden_patterns(v)
-        if error:
-            raise ValueError(error)
-
-        return v
+    return _validate(text, GENERAL_HOROSCOPE_RULES)
 
 
 def validate_natal_chart(text: str) -> tuple[bool, str | None]:
@@ -276,14 +266,7 @@ def validate_natal_chart(text: str) -> tuple[bool, str | None]:
     Returns:
         Tuple of (is_valid, error_message or None)
     """
-    try:
-        NatalChartOutput(text=text)
-        return True, None
-    except ValidationError as e:
-        errors = e.errors()
-        if errors:
-            return False, str(errors[0].get("msg", "Validation failed"))
-        return False, "Validation failed"
+    return _validate(text, NATAL_CHART_RULES)
 
 
 def validate_detailed_natal(text: str, min_chars: int = 15000) -> bool:
@@ -300,21 +283,12 @@ def validate_detailed_natal(text: str, min_chars: int = 15000) -> bool:
         return False
 
     # Check for AI self-references
-    ai_patterns = [
-        "как ai", "как ии", "языковая модель", "искусственный интеллект",
-        "я не могу", "я не в состоянии", "к сожалению, я"
-    ]
-    text_lower = text.lower()
-    for pattern in ai_patterns:
-        if pattern in text_lower:
-            return False
+    if DETAILED_NATAL_AI_PHRASES.any(text.lower()):
+        return False
 
     # Check has multiple sections (at least 5 section-like headers)
     section_markers = text.count("\n\n")
-    if section_markers < 5:
-        return False
-
-    return True
+    return section_markers >= 5
 
 
 def validate_detailed_natal_section(text: str, min_words: int) -> bool:
@@ -336,10 +310,4 @@ def validate_detailed_natal_section(text: str, min_words: int) -> bool:
         return False
 
     # Check for AI patterns
-    ai_patterns = ["как ai", "как ии", "языковая модель"]
-    text_lower = text.lower()
-    for pattern in ai_patterns:
-        if pattern in text_lower:
-            return False
-
-    return True
+    return not DETAILED_SECTION_AI_PHRASES.any(text.lower())
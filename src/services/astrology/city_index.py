@@ -0,0 +1,185 @@
+"""Local city index built from the GeoNames cities dump.
+
+Loads ``cities15000.txt`` (all cities with population > 15000, see
+https://download.geonames.org/export/dump/) into memory and answers
+birth city lookups without calling the GeoNames API.
+
+Names are normalized (lowercase, ё -> е, punctuation folded to spaces) and
+indexed under both the original spelling and a Latin transliteration, so
+"Москва", "moskva" and "Moscow" all resolve. Lookup is an exact-key dict
+hit plus a bisect range scan over sorted keys for prefixes.
+"""
+
+import bisect
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_CITIES_FILE = Path(__file__).resolve().parents[2] / "data" / "geo" / "cities15000.txt"
+
+# Shortest prefix served from the index (shorter queries are too ambiguous)
+MIN_PREFIX_LENGTH = 3
+
+_CYRILLIC_RE = re.compile(r"[а-яё]", re.IGNORECASE)
+_SEPARATORS_RE = re.compile(r"[\s\-‐–—'’`.,()]+")
+
+_TRANSLIT = str.maketrans(
+    {
+        "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+        "ж": "zh", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+        "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+        "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch",
+        "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+        "і": "i", "ї": "yi", "є": "ye", "ґ": "g", "ў": "u",
+    }
+)
+
+# Country names for result labels (bot audience is mostly CIS)
+COUNTRY_NAMES_RU = {
+    "RU": "Россия", "UA": "Украина", "BY": "Беларусь", "KZ": "Казахстан",
+    "UZ": "Узбекистан", "KG": "Киргизия", "TJ": "Таджикистан", "TM": "Туркмения",
+    "AZ": "Азербайджан", "AM": "Армения", "GE": "Грузия", "MD": "Молдова",
+    "LV": "Латвия", "LT": "Литва", "EE": "Эстония", "IL": "Израиль",
+    "DE": "Германия", "US": "США", "TR": "Турция", "PL": "Польша",
+    "FI": "Финляндия", "CZ": "Чехия", "RS": "Сербия", "ME": "Черногория",
+    "TH": "Таиланд", "AE": "ОАЭ", "CY": "Кипр", "GB": "Великобритания",
+    "FR": "Франция", "IT": "Италия", "ES": "Испания", "CA": "Канада",
+    "MN": "Монголия", "CN": "Китай",
+}
+
+
+def normalize(name: str) -> str:
+    """Lowercase, fold ё and separators (hyphens, dots, spaces)."""
+    name = name.lower().replace("ё", "е")
+    return _SEPARATORS_RE.sub(" ", name).strip()
+
+
+def transliterate(name: str) -> str:
+    """Latin transliteration of a normalized Cyrillic name."""
+    return name.translate(_TRANSLIT)
+
+
+def is_cyrillic(text: str) -> bool:
+    return _CYRILLIC_RE.search(text) is not None
+
+
+@dataclass(frozen=True, slots=True)
+class IndexedCity:
+    """City record kept in memory."""
+
+    name: str  # GeoNames name (Latin)
+    name_ru: str | None  # First Cyrillic alternate name, if any
+    country_code: str
+    latitude: float
+    longitude: float
+    timezone: str
+    population: int
+
+    def label(self, cyrillic: bool) -> str:
+        """Display name with country, in the query's script."""
+        if cyrillic:
+            country = COUNTRY_NAMES_RU.get(self.country_code, self.country_code)
+            return f"{self.name_ru or self.name}, {country}"
+        return f"{self.name}, {self.country_code}"
+
+
+class CityIndex:
+    """In-memory exact + prefix index of city names."""
+
+    def __init__(self, cities: list[IndexedCity], names: list[list[str]]) -> None:
+        """Build index.
+
+        Args:
+            cities: City records
+            names: Raw names for each city (same order as cities)
+        """
+        self.cities = cities
+        exact: dict[str, list[int]] = {}
+        for city_id, city_names in enumerate(names):
+            keys = set()
+            for raw in city_names:
+                key = normalize(raw)
+                if not key:
+                    continue
+                keys.add(key)
+                if is_cyrillic(key):
+                    keys.add(transliterate(key))
+            for key in keys:
+                exact.setdefault(key, []).append(city_id)
+
+        # Largest cities first within each key
+        for ids in exact.values():
+            ids.sort(key=lambda i: -cities[i].population)
+        self._exact = exact
+        self._keys = sorted(exact)
+
+    def __len__(self) -> int:
+        return len(self.cities)
+
+    def has_exact(self, query: str) -> bool:
+        """True if some city is named exactly ``query`` (not only by prefix)."""
+        key = normalize(query)
+        if not key:
+            return False
+        return key in self._exact or (is_cyrillic(key) and transliterate(key) in self._exact)
+
+    def search(self, query: str, limit: int = 5) -> list[IndexedCity]:
+        """Find cities by exact name, then by name prefix (by population)."""
+        key = normalize(query)
+        if not key:
+            return []
+
+        keys = [key]
+        if is_cyrillic(key):
+            keys.append(transliterate(key))
+
+        found: dict[int, None] = {}
+        for k in keys:
+            for city_id in self._exact.get(k, ()):
+                found.setdefault(city_id)
+
+        if len(found) < limit and len(key) >= MIN_PREFIX_LENGTH:
+            prefix_ids: set[int] = set()
+            for k in keys:
+                start = bisect.bisect_left(self._keys, k)
+                for candidate in self._keys[start:]:
+                    if not candidate.startswith(k):
+                        break
+                    prefix_ids.update(self._exact[candidate])
+            prefix_ids.difference_update(found)
+            for city_id in sorted(prefix_ids, key=lambda i: -self.cities[i].population):
+                found.setdefault(city_id)
+
+        return [self.cities[i] for i in list(found)[:limit]]
+
+
+def load_city_index(path: Path | str = DEFAULT_CITIES_FILE) -> CityIndex:
+    """Parse GeoNames dump (tab-separated, 19 columns) into a CityIndex.
+
+    Columns used: 1 name, 2 asciiname, 3 alternatenames, 4 latitude,
+    5 longitude, 8 country code, 14 population, 17 timezone.
+    Only Cyrillic alternate names are kept (plus name/asciiname).
+    """
+    cities: list[IndexedCity] = []
+    names: list[list[str]] = []
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 18:
+                continue
+            alternates = [n for n in cols[3].split(",") if n and is_cyrillic(n)]
+            cities.append(
+                IndexedCity(
+                    name=cols[1],
+                    name_ru=alternates[0] if alternates else None,
+                    country_code=cols[8],
+                    latitude=float(cols[4]),
+                    longitude=float(cols[5]),
+                    timezone=cols[17] or "UTC",
+                    population=int(cols[14] or 0),
+                )
+            )
+            names.append([cols[1], cols[2], *alternates])
+
+    return CityIndex(cities, names)
@@ -1,16 +1,37 @@
-"""City geocoding service using GeoNames."""
+"""City geocoding service using GeoNames.
+
+Lookups go through three tiers:
+1. Local city index (GeoNames cities15000 dump, loaded in a thread at startup)
+2. LRU cache of remote results
+3. GeoNames API via geopy
+
+An exact name match in the local index is answered locally. Prefix-only
+matches are merged with the remote results, since the town the user
+means may be too small for cities15000.
+"""
 
 import asyncio
+from collections import OrderedDict
 from dataclasses import dataclass
+from pathlib import Path
 
 import structlog
 from geopy.geocoders import GeoNames
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 
 from src.config import settings
+from src.services.astrology.city_index import (
+    DEFAULT_CITIES_FILE,
+    CityIndex,
+    is_cyrillic,
+    load_city_index,
+    normalize,
+)
 
 logger = structlog.get_logger()
 
+REMOTE_CACHE_SIZE = 1024
+
 
 @dataclass
 class CityResult:
@@ -25,11 +46,40 @@ class CityResult:
 class GeocodingService:
     """Service for geocoding birth cities."""
 
-    def __init__(self, username: str | None = None):
+    def __init__(
+        self,
+        username: str | None = None,
+        cities_file: Path | str | None = None,
+        cache_size: int = REMOTE_CACHE_SIZE,
+    ):
         self.geolocator = GeoNames(
             username=username or settings.geonames_username,
             timeout=10,
         )
+        self.cities_file = Path(cities_file or settings.geonames_cities_file or DEFAULT_CITIES_FILE)
+        self.cache_size = cache_size
+
+        self._index: CityIndex | None = None
+        self._index_loaded = False
+        self._index_lock = asyncio.Lock()
+        self._remote_cache: OrderedDict[tuple[str, int], list[CityResult]] = OrderedDict()
+
+    async def get_index(self) -> CityIndex | None:
+        """Load local city index once (None if dump is missing)."""
+        if self._index_loaded:
+            return self._index
+
+        async with self._index_lock:
+            if not self._index_loaded:
+                try:
+                    self._index = await asyncio.to_thread(load_city_index, self.cities_file)
+                    logger.info(
+                        "city_index_loaded", path=str(self.cities_file), cities=len(self._index)
+                    )
+                except OSError as e:
+                    logger.warning("city_index_unavailable", path=str(self.cities_file), error=str(e))
+                self._index_loaded = True
+        return self._index
 
     async def search_city(
         self,
@@ -45,15 +95,53 @@ class GeocodingService:
         Returns:
             List of CityResult with coordinates and timezone
         """
+        local: list[CityResult] = []
+        index = await self.get_index()
+        if index is not None:
+            matches = index.search(query, limit=max_results)
+            cyrillic = is_cyrillic(query)
+            local = [
+                CityResult(
+                    name=city.label(cyrillic),
+                    latitude=city.latitude,
+                    longitude=city.longitude,
+                    timezone=city.timezone,
+                )
+                for city in matches
+            ]
+            # Prefix-only hits may be a larger namesake of a small town that
+            # is not in cities15000, so only exact names skip the remote lookup
+            if local and index.has_exact(query):
+                logger.debug("geocoding_local_hit", query=query, results=len(local))
+                return local
+
+        remote = await self._search_remote_cached(query, max_results)
+        return _merge_results(remote, local, max_results)
+
+    async def _search_remote_cached(self, query: str, max_results: int) -> list[CityResult]:
+        """Remote search through the LRU cache ([] on error, not cached)."""
+        cache_key = (normalize(query), max_results)
+        cached = self._remote_cache.get(cache_key)
+        if cached is not None:
+            self._remote_cache.move_to_end(cache_key)
+            return list(cached)
+
+        cities = await self._search_remote(query, max_results)
+        if cities is None:
+            return []
+        self._remote_cache[cache_key] = cities
+        if len(self._remote_cache) > self.cache_size:
+            self._remote_cache.popitem(last=False)
+        return list(cities)
+
+    async def _search_remote(self, query: str, max_results: int) -> list[CityResult] | None:
+        """Query GeoNames API. Returns None on error (result is not cached)."""
         try:
-            loop = asyncio.get_event_loop()
-            results = await loop.run_in_executor(
-                None,
-                lambda: self.geolocator.geocode(
-                    query,
-                    exactly_one=False,
-                    timeout=10,
-                ),
+            results = await asyncio.to_thread(
+                self.geolocator.geocode,
+                query,
+                exactly_one=False,
+                timeout=10,
             )
 
             if not results:
@@ -79,10 +167,26 @@ class GeocodingService:
 
         except (GeocoderTimedOut, GeocoderServiceError) as e:
             logger.error("geocoding_failed", error=str(e), query=query)
-            return []
+            return None
         except Exception as e:
             logger.error("geocoding_unexpected_error", error=str(e), query=query)
-            return []
+            return None
+
+
+def _merge_results(
+    remote: list[CityResult],
+    local: list[CityResult],
+    max_results: int,
+) -> list[CityResult]:
+    """Remote results first, then local ones at other coordinates."""
+    merged = list(remote)
+    seen = {(round(city.latitude, 1), round(city.longitude, 1)) for city in remote}
+    for city in local:
+        key = (round(city.latitude, 1), round(city.longitude, 1))
+        if key not in seen:
+            seen.add(key)
+            merged.append(city)
+    return merged[:max_results]
 
 
 # Singleton instance
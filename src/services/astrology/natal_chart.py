@@ -4,13 +4,14 @@ Calculates Sun, Moon, and Ascendant positions for a given birth date/time/locati
 Full natal chart includes all planets, houses, and aspects.
 """
 
-from datetime import date, datetime, time
+from datetime import date, time
 from typing import TypedDict
 
-import pytz
 import structlog
 import swisseph as swe
 
+from src.core.timezones import local_to_utc
+
 logger = structlog.get_logger()
 
 # Zodiac signs in order (0-11)
@@ -311,12 +312,8 @@ def calculate_full_natal_chart(
     """
     try:
         # Convert local time to UTC
-        local_tz = pytz.timezone(timezone_str)
-
         if birth_time:
-            dt = datetime.combine(birth_date, birth_time)
-            dt_local = local_tz.localize(dt)
-            dt_utc = dt_local.astimezone(pytz.UTC)
+            dt_utc = local_to_utc(birth_date, birth_time, timezone_str)
             hour_ut = dt_utc.hour + dt_utc.minute / 60.0 + dt_utc.second / 3600.0
 
             # Also need to use UTC date
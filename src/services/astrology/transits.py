@@ -3,13 +3,13 @@
 Calculates current planetary positions and their aspects to natal chart.
 """
 
-from datetime import date, datetime, time
+from datetime import date, time
 from typing import TypedDict
 
-import pytz
 import structlog
 import swisseph as swe
 
+from src.core.timezones import local_to_utc
 from src.services.astrology.natal_chart import (
     ASPECTS,
     PLANETS,
@@ -60,21 +60,16 @@ def _get_planet_ru(name: str) -> str:
     return name
 
 
-def _determine_natal_house(transit_lon: float, natal_data: FullNatalChartResult) -> int:
-    """Determine which natal house a transit falls into.
+def natal_house(longitude: float, houses: dict) -> int:
+    """Determine which natal house a longitude falls into.
 
     Args:
-        transit_lon: Transit planet longitude (0-360)
-        natal_data: Full natal chart with house cusps
+        longitude: Ecliptic longitude (0-360)
+        houses: House cusps by house number (1-12)
 
     Returns:
-        House number (1-12) or 0 if houses unknown
+        House number (1-12) or 0 if not found
     """
-    if not natal_data["time_known"]:
-        return 0  # Houses unknown without birth time
-
-    houses = natal_data["houses"]
-
     # Check each house (12 houses)
     for house_num in range(1, 13):
         cusp = houses[house_num]["cusp"]
@@ -86,17 +81,33 @@ def _determine_natal_house(transit_lon: float, natal_data: FullNatalChartResult)
         # Handle wrapping at 360/0 degrees
         if next_cusp < cusp:
             # House crosses 0° Aries
-            if transit_lon >= cusp or transit_lon < next_cusp:
+            if longitude >= cusp or longitude < next_cusp:
                 return house_num
         else:
             # Normal case
-            if cusp <= transit_lon < next_cusp:
+            if cusp <= longitude < next_cusp:
                 return house_num
 
     # Fallback (shouldn't happen)
     return 0
 
 
+def _determine_natal_house(transit_lon: float, natal_data: FullNatalChartResult) -> int:
+    """Determine which natal house a transit falls into.
+
+    Args:
+        transit_lon: Transit planet longitude (0-360)
+        natal_data: Full natal chart with house cusps
+
+    Returns:
+        House number (1-12) or 0 if houses unknown
+    """
+    if not natal_data["time_known"]:
+        return 0  # Houses unknown without birth time
+
+    return natal_house(transit_lon, natal_data["houses"])
+
+
 def _calculate_transit_aspects(
     transits: dict[str, TransitPosition],
     natal_planets: dict[str, any],
@@ -169,10 +180,7 @@ def calculate_daily_transits(
     """
     try:
         # Convert to noon in user's timezone
-        local_tz = pytz.timezone(timezone_str)
-        noon_local = datetime.combine(forecast_date, time(12, 0, 0))
-        noon_local_tz = local_tz.localize(noon_local)
-        noon_utc = noon_local_tz.astimezone(pytz.UTC)
+        noon_utc = local_to_utc(forecast_date, time(12, 0, 0), timezone_str)
 
         # Calculate Julian Day in UT
         hour_ut = noon_utc.hour + noon_utc.minute / 60.0 + noon_utc.second / 3600.0
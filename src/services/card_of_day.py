@@ -0,0 +1,172 @@
+"""Precomputed card of the day interpretations.
+
+Card of day has only 78 cards x 2 orientations as input, so interpretations
+are generated ahead of demand: a nightly job fills a pool of
+``CARD_OF_DAY_POOL_SIZE`` variants per (card, orientation, date) in
+``card_of_day_interpretations``. Each user is assigned a variant by hashing
+(user, date), so serving is one unique-key read and a user sees the same
+text all day. A missing variant is generated on demand and stored in its
+slot, so the pool also fills itself if the job did not run.
+"""
+
+import asyncio
+import hashlib
+from datetime import date, timedelta
+
+import structlog
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.db.engine import async_session_maker
+from src.db.models.card_of_day import CardOfDayInterpretation
+from src.services.ai import get_ai_service
+from src.services.tarot_deck import get_deck
+
+logger = structlog.get_logger()
+
+# Concurrent LLM generations while filling the pool
+FILL_CONCURRENCY = 8
+
+# Pools are kept for yesterday too (users west of Moscow)
+KEEP_DAYS = 1
+
+
+def variant_for(user_id: int, pool_date: date) -> int:
+    """Stable variant slot for a user on a date."""
+    digest = hashlib.sha256(f"{user_id}:{pool_date.isoformat()}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") % settings.card_of_day_pool_size
+
+
+async def get_pooled_interpretation(
+    session: AsyncSession,
+    user_id: int,
+    card_id: str,
+    is_reversed: bool,
+    pool_date: date,
+) -> str | None:
+    """Read the user's precomputed interpretation, None if not generated yet."""
+    return await session.scalar(
+        select(CardOfDayInterpretation.content).where(
+            CardOfDayInterpretation.card_id == card_id,
+            CardOfDayInterpretation.is_reversed == is_reversed,
+            CardOfDayInterpretation.pool_date == pool_date,
+            CardOfDayInterpretation.variant == variant_for(user_id, pool_date),
+        )
+    )
+
+
+async def _store(
+    card_id: str,
+    is_reversed: bool,
+    pool_date: date,
+    variant: int,
+    content: str,
+) -> str:
+    """Insert a variant; returns the stored content (first writer wins)."""
+    async with async_session_maker() as session:
+        await session.execute(
+            insert(CardOfDayInterpretation)
+            .values(
+                card_id=card_id,
+                is_reversed=is_reversed,
+                pool_date=pool_date,
+                variant=variant,
+                content=content,
+            )
+            .on_conflict_do_nothing(constraint="uq_card_of_day_card_date_variant")
+        )
+        await session.commit()
+        stored = await session.scalar(
+            select(CardOfDayInterpretation.content).where(
+                CardOfDayInterpretation.card_id == card_id,
+                CardOfDayInterpretation.is_reversed == is_reversed,
+                CardOfDayInterpretation.pool_date == pool_date,
+                CardOfDayInterpretation.variant == variant,
+            )
+        )
+    return stored or content
+
+
+async def generate_interpretation(
+    user_id: int,
+    card: dict,
+    is_reversed: bool,
+    pool_date: date,
+) -> str | None:
+    """On-demand fallback: generate the user's variant and store it."""
+    text = await get_ai_service().generate_card_of_day(user_id, card, is_reversed)
+    if not text:
+        return None
+    try:
+        return await _store(
+            card["name_short"], is_reversed, pool_date, variant_for(user_id, pool_date), text
+        )
+    except Exception as e:
+        await logger.awarning("Failed to store card of day variant", error=str(e))
+        return text
+
+
+async def fill_card_of_day_pool(pool_date: date) -> tuple[int, int]:
+    """Generate all missing variants for ``pool_date``.
+
+    Returns:
+        (generated, failed) counts
+    """
+    pool_size = settings.card_of_day_pool_size
+    async with async_session_maker() as session:
+        rows = await session.execute(
+            select(
+                CardOfDayInterpretation.card_id,
+                CardOfDayInterpretation.is_reversed,
+                CardOfDayInterpretation.variant,
+            ).where(CardOfDayInterpretation.pool_date == pool_date)
+        )
+        existing = set(rows.tuples())
+
+    missing = [
+        (card, is_reversed, variant)
+        for card in get_deck()
+        for is_reversed in (False, True)
+        for variant in range(pool_size)
+        if (card["name_short"], is_reversed, variant) not in existing
+    ]
+    if not missing:
+        return (0, 0)
+
+    ai_service = get_ai_service()
+    semaphore = asyncio.Semaphore(FILL_CONCURRENCY)
+
+    async def fill(card: dict, is_reversed: bool, variant: int) -> bool:
+        async with semaphore:
+            try:
+                text = await ai_service.interpret_card_of_day(card, is_reversed)
+                if not text:
+                    return False
+                await _store(card["name_short"], is_reversed, pool_date, variant, text)
+                return True
+            except Exception as e:
+                await logger.aerror(
+                    "Failed to fill card of day variant",
+                    card=card["name_short"],
+                    reversed=is_reversed,
+                    variant=variant,
+                    error=str(e),
+                )
+                return False
+
+    results = await asyncio.gather(*[fill(*slot) for slot in missing])
+    generated = sum(results)
+    return (generated, len(results) - generated)
+
+
+async def delete_old_pools(today: date) -> None:
+    """Drop pools older than KEEP_DAYS before ``today``."""
+    async with async_session_maker() as session:
+        await session.execute(
+            delete(CardOfDayInterpretation).where(
+                CardOfDayInterpretation.pool_date < today - timedelta(days=KEEP_DAYS)
+            )
+        )
+        await session.commit()
@@ -0,0 +1,217 @@
+"""Leader election over a PostgreSQL advisory lock.
+
+With several web workers (``WEB_CONCURRENCY``) every process runs the same
+lifespan, but periodic jobs and webhook registration must happen once.
+Each process runs a ``LeaderElection``:
+- It tries ``pg_try_advisory_lock`` on a dedicated AUTOCOMMIT connection
+  (unpooled, outside the app pool) every ``retry_interval`` seconds.
+- The process that gets the lock becomes leader and runs ``on_elected``
+  plus any hooks added with ``add_elected_hook`` (e.g. webhook setup).
+  The lock lives as long as that connection, so if the leader process dies
+  PostgreSQL releases it and another process takes over on its next try.
+- The leader renews a lease every ``renew_interval`` seconds by checking
+  ``pg_locks`` on its lock connection. The connection also has
+  ``idle_session_timeout`` set to the lease length, so a hung or partitioned
+  leader loses the lock server-side after at most ``lease_seconds``.
+- If a renewal fails, the leader steps down (``on_demoted``) and contends
+  again like any follower. Jobs check ``has_lease`` as a fencing guard, so
+  a leader that has not renewed in time stops doing leader-only work even
+  before it notices the loss.
+- ``stop()`` runs ``on_demoted`` and releases the lock.
+
+Worst-case failover is ``lease_seconds + retry_interval``.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.db.engine import lock_engine as default_engine
+from src.monitoring.metrics import LEADER_STATUS, LEADER_TRANSITIONS
+
+logger = structlog.get_logger()
+
+# Advisory lock keys (bigint) - one per leader role
+SCHEDULER_LOCK_KEY = 0x4164_7472_0001  # "Adtr" + role 1
+
+RETRY_INTERVAL = 15.0  # seconds between lock attempts on followers
+RENEW_INTERVAL = 10.0  # seconds between lease renewals on the leader
+LEASE_SECONDS = 30  # leader must renew within this, or it loses the role
+
+_HOLDS_ADVISORY_LOCK = text(
+    "SELECT count(*) FROM pg_locks "
+    "WHERE locktype = 'advisory' AND pid = pg_backend_pid() AND granted"
+)
+
+
+class LeaderElection:
+    """Single-leader role among processes sharing one PostgreSQL database."""
+
+    def __init__(
+        self,
+        name: str,
+        lock_key: int,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]],
+        retry_interval: float = RETRY_INTERVAL,
+        renew_interval: float = RENEW_INTERVAL,
+        lease_seconds: int = LEASE_SECONDS,
+        engine: AsyncEngine = default_engine,
+    ) -> None:
+        self.name = name
+        self.lock_key = lock_key
+        self.retry_interval = retry_interval
+        self.renew_interval = renew_interval
+        self.lease_seconds = lease_seconds
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._engine = engine
+
+        self._conn: AsyncConnection | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+        self._renewed_at = 0.0
+        self._elected_hooks: list[Callable[[], Awaitable[None]]] = []
+        self.is_leader = False
+
+    @property
+    def has_lease(self) -> bool:
+        """Leader with a lease renewed recently enough to act on it."""
+        return self.is_leader and time.monotonic() - self._renewed_at < self.lease_seconds
+
+    def add_elected_hook(self, hook: Callable[[], Awaitable[None]]) -> None:
+        """Also run ``hook`` whenever this process becomes leader.
+
+        Hook errors are logged and do not affect leadership.
+        """
+        self._elected_hooks.append(hook)
+
+    def start(self) -> None:
+        """Start contending for leadership in the background."""
+        if self._task is None or self._task.done():
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run(), name=f"leader-{self.name}")
+
+    async def stop(self) -> None:
+        """Stop contending; step down and release the lock if leader."""
+        self._stopping.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.is_leader:
+            LEADER_TRANSITIONS.labels(role=self.name, event="stepped_down").inc()
+        await self._step_down()
+
+    async def _try_acquire(self) -> bool:
+        conn = await self._engine.connect()
+        try:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = await conn.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+            )
+            if acquired:
+                await self._set_server_lease(conn)
+        except Exception:
+            await conn.close()
+            raise
+        if not acquired:
+            await conn.close()
+            return False
+        self._conn = conn
+        self._renewed_at = time.monotonic()
+        return True
+
+    async def _set_server_lease(self, conn: AsyncConnection) -> None:
+        """Without renewals PostgreSQL terminates the session (and the lock)."""
+        try:
+            await conn.execute(
+                text(f"SET idle_session_timeout = '{int(self.lease_seconds)}s'")
+            )
+        except DBAPIError as e:
+            # PostgreSQL < 14: lock is only released when the connection drops
+            await logger.awarning("Server-side lease unavailable", role=self.name, error=str(e))
+
+    async def _renew(self) -> bool:
+        """Confirm the lock is still held on our connection."""
+        if self._conn is None:
+            return False
+        started = time.monotonic()
+        held = await asyncio.wait_for(
+            self._conn.scalar(_HOLDS_ADVISORY_LOCK), timeout=self.renew_interval
+        )
+        if held:
+            self._renewed_at = started
+        return bool(held)
+
+    async def _step_down(self) -> None:
+        was_leader = self.is_leader
+        self.is_leader = False
+        if was_leader:
+            LEADER_STATUS.labels(role=self.name).set(0)
+            try:
+                await self._on_demoted()
+            except Exception as e:
+                await logger.aerror("Leader demotion callback failed", role=self.name, error=str(e))
+
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key}
+                )
+            except Exception:
+                # Connection already gone - PostgreSQL released the lock
+                pass
+            finally:
+                await conn.close()
+        if was_leader:
+            await logger.ainfo("Stepped down as leader", role=self.name)
+
+    async def _run_elected_hooks(self) -> None:
+        for hook in self._elected_hooks:
+            try:
+                await hook()
+            except Exception as e:
+                await logger.aerror("Leader hook failed", role=self.name, error=str(e))
+
+    async def _wait(self, seconds: float) -> bool:
+        """Sleep unless stopping; returns True if stop was requested."""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+            return True
+        except TimeoutError:
+            return False
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            if self.is_leader:
+                try:
+                    renewed = await self._renew()
+                    error = None if renewed else "lock not held"
+                except Exception as e:
+                    renewed, error = False, str(e) or type(e).__name__
+                if not renewed:
+                    await logger.aerror("Leadership lost", role=self.name, error=error)
+                    LEADER_TRANSITIONS.labels(role=self.name, event="lost").inc()
+                    await self._step_down()
+            else:
+                try:
+                    if await self._try_acquire():
+                        self.is_leader = True
+                        LEADER_STATUS.labels(role=self.name).set(1)
+                        LEADER_TRANSITIONS.labels(role=self.name, event="elected").inc()
+                        await logger.ainfo("Elected leader", role=self.name)
+                        await self._on_elected()
+                        await self._run_elected_hooks()
+                except Exception as e:
+                    await logger.awarning("Leader election attempt failed", role=self.name, error=str(e))
+                    await self._step_down()
+
+            interval = self.renew_interval if self.is_leader else self.retry_interval
+            if await self._wait(interval):
+                return
@@ -1,8 +1,12 @@
 """Payment service module."""
 from src.services.payment.client import (
+    YooKassaError,
+    YooKassaPayment,
     cancel_recurring,
+    close_yookassa_client,
     create_payment,
     create_recurring_payment,
+    fetch_payment,
 )
 from src.services.payment.schemas import (
     PLAN_DURATION_DAYS,
@@ -24,6 +28,10 @@ __all__ = [
     "create_payment",
     "create_recurring_payment",
     "cancel_recurring",
+    "fetch_payment",
+    "close_yookassa_client",
+    "YooKassaError",
+    "YooKassaPayment",
     # Service
     "activate_subscription",
     "cancel_subscription",
@@ -1,29 +1,217 @@
-"""Async wrapper for YooKassa SDK."""
+"""Native async YooKassa API client.
+
+Uses one shared, connection-pooled httpx.AsyncClient (keep-alive, HTTP
+timeouts) instead of the synchronous SDK, so payment creation on the
+subscribe path neither occupies a worker thread nor pays TLS setup per call.
+"""
 import asyncio
+import random
 import uuid
+from dataclasses import dataclass, field
+from typing import Any
 
+import httpx
 import structlog
-from yookassa import Configuration, Payment as YooPayment
 
 from src.config import settings
 
 logger = structlog.get_logger()
 
+YOOKASSA_API_URL = "https://api.yookassa.ru/v3"
+
+# Connection pool: payments are low-volume but latency-sensitive
+POOL_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=60.0,
+)
+REQUEST_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+
+# Retry policy: safe for POST because every request carries Idempotence-Key
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 0.5  # seconds, doubled per attempt
+BACKOFF_MAX = 8.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class YooKassaError(Exception):
+    """YooKassa API error (mirrors the SDK exception attributes)."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: int | None = None,
+        code: str | None = None,
+        description: str | None = None,
+        parameter: str | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+        self.description = description
+        self.parameter = parameter
+
+
+@dataclass
+class YooKassaPayment:
+    """Subset of YooKassa Payment object used by the bot."""
+
+    id: str
+    status: str
+    paid: bool = False
+    confirmation_url: str | None = None
+    payment_method: dict = field(default_factory=dict)
+    metadata: dict = field(default_factory=dict)
+    raw: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_api(cls, data: dict) -> "YooKassaPayment":
+        """Build from YooKassa JSON response."""
+        return cls(
+            id=data["id"],
+            status=data.get("status", ""),
+            paid=bool(data.get("paid", False)),
+            confirmation_url=(data.get("confirmation") or {}).get("confirmation_url"),
+            payment_method=data.get("payment_method") or {},
+            metadata=data.get("metadata") or {},
+            raw=data,
+        )
+
+
+class YooKassaClient:
+    """Async YooKassa client on a shared pooled HTTP session.
+
+    Features:
+    - One httpx.AsyncClient per process (keep-alive, pooled TLS connections)
+    - Idempotence-Key on every POST (generated or caller-provided)
+    - Retry with exponential backoff + jitter on network errors, 429 and 5xx
+    """
+
+    def __init__(
+        self,
+        shop_id: str,
+        secret_key: str,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self._http = httpx.AsyncClient(
+            base_url=YOOKASSA_API_URL,
+            auth=(shop_id, secret_key),
+            limits=POOL_LIMITS,
+            timeout=REQUEST_TIMEOUT,
+            headers={"Content-Type": "application/json"},
+            transport=transport,
+        )
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        await self._http.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        json: dict | None = None,
+        idempotency_key: str | None = None,
+    ) -> dict:
+        """Send request with retry; returns decoded JSON body."""
+        headers = {"Idempotence-Key": idempotency_key} if idempotency_key else None
+        last_error: Exception | None = None
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                response = await self._http.request(method, path, json=json, headers=headers)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                last_error = YooKassaError(f"YooKassa network error: {e}")
+            else:
+                if response.status_code < 400:
+                    return response.json()
+
+                body = _safe_json(response)
+                last_error = YooKassaError(
+                    f"YooKassa API error {response.status_code}",
+                    status_code=response.status_code,
+                    code=body.get("code"),
+                    description=body.get("description"),
+                    parameter=body.get("parameter"),
+                )
+                if response.status_code not in RETRY_STATUS_CODES:
+                    raise last_error
+
+            if attempt < MAX_ATTEMPTS:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1))
+                delay += random.uniform(0, delay / 2)
+                await logger.awarning(
+                    "YooKassa request retry",
+                    path=path,
+                    attempt=attempt,
+                    delay=round(delay, 2),
+                    error=str(last_error),
+                )
+                await asyncio.sleep(delay)
 
-_configured = False
+        assert last_error is not None
+        raise last_error
 
+    async def create_payment(
+        self, payment_data: dict, idempotency_key: str
+    ) -> YooKassaPayment:
+        """POST /payments."""
+        data = await self._request(
+            "POST", "/payments", json=payment_data, idempotency_key=idempotency_key
+        )
+        return YooKassaPayment.from_api(data)
+
+    async def get_payment(self, payment_id: str) -> YooKassaPayment:
+        """GET /payments/{id} - authoritative payment state."""
+        data = await self._request("GET", f"/payments/{payment_id}")
+        return YooKassaPayment.from_api(data)
+
+
+def _safe_json(response: httpx.Response) -> dict[str, Any]:
+    """Decode error body without failing on non-JSON responses."""
+    try:
+        body = response.json()
+        return body if isinstance(body, dict) else {}
+    except ValueError:
+        return {}
+
+
+_client: YooKassaClient | None = None
+
+
+def get_yookassa_client() -> YooKassaClient:
+    """Get shared YooKassa client (lazy, credentials validated on first use)."""
+    global _client
+    if _client is None:
+        if not (settings.yookassa_shop_id and settings.yookassa_secret_key):
+            raise ValueError("YooKassa credentials not configured")
+        _client = YooKassaClient(settings.yookassa_shop_id, settings.yookassa_secret_key)
+    return _client
+
+
+async def close_yookassa_client() -> None:
+    """Close shared client on shutdown."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
 
-def _ensure_configured():
-    """Lazy configuration - call before each API request."""
-    global _configured
-    if _configured:
-        return
-    if settings.yookassa_shop_id and settings.yookassa_secret_key:
-        Configuration.account_id = settings.yookassa_shop_id
-        Configuration.secret_key = settings.yookassa_secret_key
-        _configured = True
-    else:
-        raise ValueError("YooKassa credentials not configured")
+
+def _build_receipt(description: str, amount: str) -> dict:
+    """Receipt block required by 54-FZ."""
+    return {
+        "customer": {"email": "customer@adtrobot.ru"},
+        "items": [
+            {
+                "description": description,
+                "quantity": "1",
+                "amount": {"value": amount, "currency": "RUB"},
+                "vat_code": 1,  # НДС не облагается
+                "payment_subject": "service",
+                "payment_mode": "full_payment",
+            }
+        ],
+    }
 
 
 async def create_payment(
@@ -32,7 +220,8 @@ async def create_payment(
     description: str,
     save_payment_method: bool = False,
     metadata: dict | None = None,
-) -> dict:
+    idempotency_key: str | None = None,
+) -> YooKassaPayment:
     """
     Create payment with redirect confirmation.
 
@@ -42,12 +231,13 @@ async def create_payment(
         description: Payment description
         save_payment_method: Whether to save card for recurring
         metadata: Additional metadata
+        idempotency_key: Stable key for retries of the same payment
 
     Returns:
-        YooKassa Payment object as dict
+        YooKassaPayment
     """
-    _ensure_configured()
-    idempotency_key = str(uuid.uuid4())
+    client = get_yookassa_client()
+    idempotency_key = idempotency_key or str(uuid.uuid4())
 
     payment_data = {
         "amount": {"value": amount, "currency": "RUB"},
@@ -62,24 +252,9 @@ async def create_payment(
             "user_id": str(user_id),
             **(metadata or {}),
         },
-        "receipt": {
-            "customer": {"email": "customer@adtrobot.ru"},
-            "items": [
-                {
-                    "description": description,
-                    "quantity": "1",
-                    "amount": {"value": amount, "currency": "RUB"},
-                    "vat_code": 1,  # НДС не облагается
-                    "payment_subject": "service",
-                    "payment_mode": "full_payment",
-                }
-            ],
-        },
+        "receipt": _build_receipt(description, amount),
     }
 
-    def _create():
-        return YooPayment.create(payment_data, idempotency_key)
-
     await logger.ainfo(
         "Creating payment",
         user_id=user_id,
@@ -90,7 +265,7 @@ async def create_payment(
     )
 
     try:
-        result = await asyncio.to_thread(_create)
+        result = await client.create_payment(payment_data, idempotency_key)
         await logger.ainfo(
             "Payment created successfully",
             payment_id=result.id,
@@ -113,7 +288,8 @@ async def create_recurring_payment(
     subscription_id: int,
     amount: str,
     description: str,
-) -> dict:
+    idempotency_key: str | None = None,
+) -> YooKassaPayment:
     """
     Create recurring payment using saved payment method.
 
@@ -123,12 +299,14 @@ async def create_recurring_payment(
         subscription_id: Subscription ID
         amount: Amount as string
         description: Payment description
+        idempotency_key: Stable key for retries of the same charge
+            (YooKassa returns the original payment instead of charging again)
 
     Returns:
-        YooKassa Payment object as dict
+        YooKassaPayment
     """
-    _ensure_configured()
-    idempotency_key = str(uuid.uuid4())
+    client = get_yookassa_client()
+    idempotency_key = idempotency_key or str(uuid.uuid4())
 
     payment_data = {
         "amount": {"value": amount, "currency": "RUB"},
@@ -140,24 +318,9 @@ async def create_recurring_payment(
             "subscription_id": str(subscription_id),
             "type": "recurring",
         },
-        "receipt": {
-            "customer": {"email": "customer@adtrobot.ru"},
-            "items": [
-                {
-                    "description": description,
-                    "quantity": "1",
-                    "amount": {"value": amount, "currency": "RUB"},
-                    "vat_code": 1,
-                    "payment_subject": "service",
-                    "payment_mode": "full_payment",
-                }
-            ],
-        },
+        "receipt": _build_receipt(description, amount),
     }
 
-    def _create():
-        return YooPayment.create(payment_data, idempotency_key)
-
     await logger.ainfo(
         "Creating recurring payment",
         user_id=user_id,
@@ -165,8 +328,17 @@ async def create_recurring_payment(
         amount=amount,
     )
 
-    result = await asyncio.to_thread(_create)
-    return result
+    return await client.create_payment(payment_data, idempotency_key)
+
+
+async def fetch_payment(payment_id: str) -> YooKassaPayment:
+    """
+    Fetch current payment state from YooKassa.
+
+    Used to verify webhook notifications: the notification body is not
+    signed, so the API response is treated as the source of truth.
+    """
+    return await get_yookassa_client().get_payment(payment_id)
 
 
 async def cancel_recurring(payment_method_id: str) -> bool:
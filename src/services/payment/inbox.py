@@ -0,0 +1,268 @@
+"""Durable inbox for YooKassa webhook events.
+
+Flow:
+1. ``/webhook/yookassa`` calls ``enqueue_webhook_event`` - one INSERT
+   (ON CONFLICT DO NOTHING on event type + payment id) and returns 200.
+2. ``PaymentInboxWorker`` runs a small pool of workers that claim one due
+   row per transaction with ``SELECT ... FOR UPDATE SKIP LOCKED``, run
+   ``process_webhook_event`` in a fresh session and record the outcome.
+3. Failures are retried with exponential backoff; rows stuck in
+   ``processing`` (instance died mid-event) are reclaimed after a lease.
+
+``process_webhook_event`` flips ``Payment.webhook_processed`` atomically, so
+at-least-once delivery from the inbox (including a row reclaimed while its
+first worker is still running) is safe.
+"""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import structlog
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.engine import AsyncSessionLocal
+from src.db.models.payment_webhook import PaymentWebhookEvent
+from src.monitoring.metrics import QUEUE_DEPTH
+from src.services.payment.service import process_webhook_event
+
+logger = structlog.get_logger()
+
+# Worker pool sizing
+WORKER_COUNT = 4
+IDLE_POLL_INTERVAL = 5.0  # seconds between polls when inbox is empty
+
+# Retry policy
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 5  # seconds, doubled per attempt
+BACKOFF_MAX = 3600
+
+# A row in "processing" longer than this is considered abandoned. Rows are
+# claimed one at a time, so the lease only has to outlive a single event
+# (fetch_payment with all retries takes ~75s)
+PROCESSING_LEASE = timedelta(minutes=5)
+
+
+async def enqueue_webhook_event(session: AsyncSession, event: dict) -> bool:
+    """Persist webhook event to the inbox.
+
+    Args:
+        session: DB session
+        event: Raw YooKassa notification payload
+
+    Returns:
+        True if stored, False if duplicate or malformed
+    """
+    event_type = event.get("event") or "unknown"
+    payment_id = (event.get("object") or {}).get("id")
+    if not payment_id:
+        await logger.awarning("Webhook missing payment_id", event=event)
+        return False
+
+    stmt = (
+        insert(PaymentWebhookEvent)
+        .values(
+            dedupe_key=f"{event_type}:{payment_id}",
+            event_type=event_type,
+            payment_id=payment_id,
+            payload=event,
+        )
+        .on_conflict_do_nothing(index_elements=["dedupe_key"])
+        .returning(PaymentWebhookEvent.id)
+    )
+    result = await session.execute(stmt)
+    await session.commit()
+
+    inserted = result.scalar_one_or_none() is not None
+    if not inserted:
+        await logger.ainfo(
+            "Webhook already in inbox", payment_id=payment_id, event_type=event_type
+        )
+    return inserted
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff for the given number of attempts made."""
+    return timedelta(seconds=min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(0, attempts - 1)))
+
+
+async def claim_event(session: AsyncSession) -> int | None:
+    """Claim the next due inbox row for this worker.
+
+    Rows locked by another worker are skipped (SKIP LOCKED), so workers
+    across processes and replicas never claim the same row concurrently.
+    One row per transaction keeps ``locked_at`` fresh for the event being
+    processed instead of ageing while earlier events of a batch run.
+
+    Returns:
+        ID of the claimed event, or None if nothing is due
+    """
+    now = datetime.now(UTC)
+    stmt = (
+        select(PaymentWebhookEvent.id)
+        .where(
+            or_(
+                and_(
+                    PaymentWebhookEvent.status == "pending",
+                    PaymentWebhookEvent.next_attempt_at <= now,
+                ),
+                and_(
+                    PaymentWebhookEvent.status == "processing",
+                    PaymentWebhookEvent.locked_at < now - PROCESSING_LEASE,
+                ),
+            )
+        )
+        .order_by(PaymentWebhookEvent.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.execute(stmt)
+    event_id = result.scalar_one_or_none()
+
+    if event_id is not None:
+        await session.execute(
+            update(PaymentWebhookEvent)
+            .where(PaymentWebhookEvent.id == event_id)
+            .values(
+                status="processing",
+                locked_at=now,
+                attempts=PaymentWebhookEvent.attempts + 1,
+            )
+        )
+    await session.commit()
+    return event_id
+
+
+async def process_inbox_event(event_id: int) -> None:
+    """Process one claimed inbox event and record its outcome."""
+    async with AsyncSessionLocal() as session:
+        row = await session.get(PaymentWebhookEvent, event_id)
+        if row is None or row.status != "processing":
+            return
+        payload, attempts = row.payload, row.attempts
+
+    try:
+        async with AsyncSessionLocal() as session:
+            processed = await process_webhook_event(session, payload)
+    except Exception as e:
+        failed = attempts >= MAX_ATTEMPTS
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(PaymentWebhookEvent)
+                .where(PaymentWebhookEvent.id == event_id)
+                .values(
+                    status="failed" if failed else "pending",
+                    next_attempt_at=datetime.now(UTC) + _retry_delay(attempts),
+                    locked_at=None,
+                    outcome="error",
+                    last_error=f"{type(e).__name__}: {e}"[:2000],
+                )
+            )
+            await session.commit()
+
+        log = logger.aerror if failed else logger.awarning
+        await log(
+            "Webhook event processing failed",
+            event_id=event_id,
+            attempts=attempts,
+            gave_up=failed,
+            error=str(e),
+        )
+        return
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(PaymentWebhookEvent)
+            .where(PaymentWebhookEvent.id == event_id)
+            .values(
+                status="done",
+                locked_at=None,
+                outcome="processed" if processed else "skipped",
+                processed_at=datetime.now(UTC),
+            )
+        )
+        await session.commit()
+
+
+async def update_inbox_metrics(session: AsyncSession) -> None:
+    """Export inbox depth per status to QUEUE_DEPTH gauge."""
+    stmt = (
+        select(PaymentWebhookEvent.status, func.count())
+        .where(PaymentWebhookEvent.status != "done")
+        .group_by(PaymentWebhookEvent.status)
+    )
+    counts = dict((await session.execute(stmt)).all())
+    QUEUE_DEPTH.labels(status="pending").set(
+        counts.get("pending", 0) + counts.get("processing", 0)
+    )
+    QUEUE_DEPTH.labels(status="failed").set(counts.get("failed", 0))
+
+
+class PaymentInboxWorker:
+    """Pool of asyncio workers draining the payment webhook inbox.
+
+    The webhook endpoint calls ``notify()`` after enqueueing so events are
+    picked up immediately; otherwise workers poll every IDLE_POLL_INTERVAL.
+    """
+
+    def __init__(self, worker_count: int = WORKER_COUNT) -> None:
+        self.worker_count = worker_count
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = False
+
+    def start(self) -> None:
+        """Start worker tasks on the running loop."""
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._run(i), name=f"payment-inbox-{i}")
+            for i in range(self.worker_count)
+        ]
+
+    async def stop(self) -> None:
+        """Stop workers; in-flight events finish or are reclaimed later."""
+        self._stopping = True
+        self._wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers after a new event was enqueued."""
+        self._wakeup.set()
+
+    async def _run(self, worker_no: int) -> None:
+        while not self._stopping:
+            try:
+                async with AsyncSessionLocal() as session:
+                    event_id = await claim_event(session)
+                    if worker_no == 0:
+                        await update_inbox_metrics(session)
+
+                if event_id is not None:
+                    await process_inbox_event(event_id)
+                    continue  # Inbox may have more - claim again right away
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=IDLE_POLL_INTERVAL)
+                except TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await logger.aerror("Payment inbox worker error", worker=worker_no, error=str(e))
+                await asyncio.sleep(IDLE_POLL_INTERVAL)
+
+
+_worker: PaymentInboxWorker | None = None
+
+
+def get_payment_inbox_worker() -> PaymentInboxWorker:
+    """Get payment inbox worker singleton."""
+    global _worker
+    if _worker is None:
+        _worker = PaymentInboxWorker()
+    return _worker
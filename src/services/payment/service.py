@@ -3,12 +3,15 @@ from datetime import datetime, timedelta, timezone
 from ipaddress import ip_address, ip_network
 
 import structlog
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
 from src.db.models.payment import Payment
 from src.db.models.subscription import Subscription, SubscriptionStatus
 from src.db.models.user import User
+from src.services.payment.client import fetch_payment
 from src.services.payment.schemas import PLAN_DURATION_DAYS, PaymentPlan
 
 logger = structlog.get_logger()
@@ -162,6 +165,40 @@ async def cancel_subscription(
     return subscription
 
 
+async def _claim_webhook(
+    session: AsyncSession,
+    payment_id: str,
+    values: dict,
+    create: dict | None = None,
+) -> bool:
+    """Atomically mark the payment's webhook as processed.
+
+    The flag is flipped by a conditional UPDATE (an upsert when ``create``
+    holds the columns of a new row) that only matches unprocessed rows. The
+    row lock holds concurrent callers off until commit, after which their
+    condition no longer matches, so exactly one caller gets True.
+    """
+    values = {**values, "webhook_processed": True}
+    if create is None:
+        stmt = (
+            update(Payment)
+            .where(Payment.id == payment_id, Payment.webhook_processed.is_(False))
+            .values(**values)
+        )
+    else:
+        stmt = (
+            insert(Payment)
+            .values(id=payment_id, **create, **values)
+            .on_conflict_do_update(
+                index_elements=[Payment.id],
+                set_=values,
+                where=Payment.webhook_processed.is_(False),
+            )
+        )
+    result = await session.execute(stmt.returning(Payment.id))
+    return result.scalar_one_or_none() is not None
+
+
 async def process_webhook_event(
     session: AsyncSession,
     event: dict,
@@ -184,12 +221,31 @@ async def process_webhook_event(
         await logger.awarning("Webhook missing payment_id", event=event)
         return False
 
-    # Check idempotency - already processed?
+    # Cheap duplicate check before calling the API; the authoritative one is
+    # the atomic claim below
     existing = await session.get(Payment, payment_id)
     if existing and existing.webhook_processed:
         await logger.ainfo("Webhook duplicate, skipping", payment_id=payment_id)
         return False
 
+    # Verify against YooKassa API: notification body is not signed, so the
+    # API state is authoritative. Errors propagate so the event is retried.
+    if settings.yookassa_shop_id and settings.yookassa_secret_key:
+        verified = await fetch_payment(payment_id)
+        expected_status = {
+            "payment.succeeded": "succeeded",
+            "payment.canceled": "canceled",
+        }.get(event_type)
+        if expected_status and verified.status != expected_status:
+            await logger.awarning(
+                "Webhook status mismatch, skipping",
+                payment_id=payment_id,
+                event_type=event_type,
+                api_status=verified.status,
+            )
+            return False
+        payment_data = verified.raw
+
     metadata = payment_data.get("metadata", {})
     user_id = metadata.get("user_id")
     plan_type = metadata.get("plan_type")
@@ -217,23 +273,22 @@ async def process_webhook_event(
             if user:
                 internal_user_id = user.id
 
-        # Create or update payment record
-        if existing:
-            existing.status = status
-            existing.webhook_processed = True
-            existing.paid_at = datetime.now(timezone.utc)
-        else:
-            payment = Payment(
-                id=payment_id,
-                user_id=internal_user_id,
-                amount=amount_kopeks,
-                status=status,
-                description=payment_data.get("description"),
-                is_recurring=metadata.get("type") == "recurring",
-                webhook_processed=True,
-                paid_at=datetime.now(timezone.utc),
-            )
-            session.add(payment)
+        # Create or update payment record; loses to a concurrent delivery
+        claimed = await _claim_webhook(
+            session,
+            payment_id,
+            {"status": status, "paid_at": datetime.now(timezone.utc)},
+            create={
+                "user_id": internal_user_id,
+                "amount": amount_kopeks,
+                "description": payment_data.get("description"),
+                "is_recurring": metadata.get("type") == "recurring",
+            },
+        )
+        if not claimed:
+            await session.rollback()
+            await logger.ainfo("Webhook duplicate, skipping", payment_id=payment_id)
+            return False
 
         # Activate subscription if this is a subscription payment
         if user_id and plan_type:
@@ -268,8 +323,10 @@ async def process_webhook_event(
 
     elif event_type == "payment.canceled":
         if existing:
-            existing.status = "canceled"
-            existing.webhook_processed = True
+            if not await _claim_webhook(session, payment_id, {"status": "canceled"}):
+                await session.rollback()
+                await logger.ainfo("Webhook duplicate, skipping", payment_id=payment_id)
+                return False
             await session.commit()
         return True
 
@@ -0,0 +1,238 @@
+"""Premium horoscope precomputation ahead of notification time.
+
+Notifications are bucketed by local hour (09:00 is the default), so
+generating personalized horoscopes inside ``send_daily_horoscope`` made a
+burst of natal chart calculations and LLM calls at each popular hour.
+Instead, an hourly leader job generates horoscopes for users whose
+notification falls within the next ``PRECOMPUTE_HORIZON`` (with bounded
+concurrency, in the LLM dispatcher's batch lane) and stores them in
+``premium_horoscopes``. The notification job only reads and sends; the
+next two runs before the notification retry anything that failed.
+
+Candidates are narrowed in SQL: the due (timezone, hour) pairs are worked out
+once per distinct timezone, and only users matching them are loaded, in
+keyset-paged batches.
+"""
+
+import asyncio
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, time, timedelta
+
+import structlog
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.timezones import local_to_utc, local_today
+from src.db.engine import async_session_maker
+from src.db.models.horoscope_cache import PremiumHoroscope
+from src.db.models.user import User
+from src.services.ai import get_ai_service
+from src.services.astrology.natal_chart import calculate_full_natal_chart
+
+logger = structlog.get_logger()
+
+PRECOMPUTE_HORIZON = timedelta(hours=3)
+PRECOMPUTE_CONCURRENCY = 10
+USER_PAGE_SIZE = 500
+DEFAULT_NOTIFICATION_HOUR = 9
+
+# Stored horoscopes are kept for yesterday too (late/misfired notifications)
+KEEP_DAYS = 1
+
+
+def notification_due(
+    timezone_name: str | None,
+    hour: int,
+    now: datetime,
+    horizon: timedelta = PRECOMPUTE_HORIZON,
+) -> date | None:
+    """Local date of the user's next notification if it is within ``horizon``."""
+    today = local_today(timezone_name, now)
+    for day in (today, today + timedelta(days=1)):
+        at = local_to_utc(day, time(hour), timezone_name)
+        if now < at <= now + horizon:
+            return day
+    return None
+
+
+async def get_stored_premium_horoscope(
+    session: AsyncSession,
+    user_pk: int,
+    day: date,
+) -> str | None:
+    """Precomputed horoscope for ``users.id`` on ``day``, if any."""
+    return await session.scalar(
+        select(PremiumHoroscope.content).where(
+            PremiumHoroscope.user_id == user_pk,
+            PremiumHoroscope.horoscope_date == day,
+        )
+    )
+
+
+async def _generate_and_store(user: User, day: date) -> bool:
+    from src.bot.utils.zodiac import ZODIAC_SIGNS
+
+    zodiac = ZODIAC_SIGNS.get(user.zodiac_sign or "")
+    if zodiac is None:
+        return False
+
+    # CPU-bound ephemeris calculation: keep it off the event loop
+    natal_data = await asyncio.to_thread(
+        calculate_full_natal_chart,
+        birth_date=user.birth_date,
+        birth_time=user.birth_time,
+        latitude=user.birth_lat,
+        longitude=user.birth_lon,
+        timezone_str=user.timezone or "Europe/Moscow",
+    )
+    text = await get_ai_service().generate_premium_horoscope(
+        user_id=user.telegram_id,
+        zodiac_sign=user.zodiac_sign,
+        zodiac_sign_ru=zodiac.name_ru,
+        date_str=day.strftime("%d.%m.%Y"),
+        natal_data=natal_data,
+    )
+    if not text:
+        return False
+
+    async with async_session_maker() as session:
+        await session.execute(
+            insert(PremiumHoroscope)
+            .values(user_id=user.id, horoscope_date=day, content=text)
+            .on_conflict_do_nothing(constraint="uq_premium_horoscopes_user_date")
+        )
+        await session.commit()
+    return True
+
+
+def _candidate_filters() -> list:
+    """Users who get premium notifications and have natal data."""
+    return [
+        User.is_premium.is_(True),
+        User.notifications_enabled.is_(True),
+        User.zodiac_sign.isnot(None),
+        User.birth_date.isnot(None),
+        User.birth_lat.isnot(None),
+        User.birth_lon.isnot(None),
+    ]
+
+
+def due_slots(timezones: Iterable[str | None], now: datetime) -> dict[tuple[str, int], date]:
+    """Notification slots due within the horizon, by (timezone, hour).
+
+    Timezone None (Moscow) is keyed as "" to match ``COALESCE`` in SQL.
+    """
+    slots = {}
+    for timezone_name in timezones:
+        for hour in range(24):
+            day = notification_due(timezone_name, hour, now)
+            if day is not None:
+                slots[(timezone_name or "", hour)] = day
+    return slots
+
+
+async def _iter_due_user_pages(slots: dict[tuple[str, int], date]):
+    """Yield pages of users in ``slots`` using keyset pagination by id.
+
+    Each page is loaded in its own short session, so no connection is held
+    while the page is generated.
+    """
+    # Same hour the notification job is scheduled with (``hour or 9``)
+    slot = tuple_(
+        func.coalesce(User.timezone, ""),
+        func.coalesce(func.nullif(User.notification_hour, 0), DEFAULT_NOTIFICATION_HOUR),
+    )
+    last_id = 0
+    while True:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(User)
+                .where(*_candidate_filters(), slot.in_(list(slots)), User.id > last_id)
+                .order_by(User.id)
+                .limit(USER_PAGE_SIZE)
+            )
+            users = result.scalars().all()
+
+        if not users:
+            return
+
+        yield users
+        last_id = users[-1].id
+
+        if len(users) < USER_PAGE_SIZE:
+            return
+
+
+async def _pending(users: list[User], slots: dict[tuple[str, int], date]) -> list[tuple[User, date]]:
+    """Users of a page paired with their notification day, minus stored ones."""
+    due = [
+        (
+            user,
+            slots[(user.timezone or "", user.notification_hour or DEFAULT_NOTIFICATION_HOUR)],
+        )
+        for user in users
+    ]
+    async with async_session_maker() as session:
+        stored = await session.execute(
+            select(PremiumHoroscope.user_id, PremiumHoroscope.horoscope_date).where(
+                tuple_(PremiumHoroscope.user_id, PremiumHoroscope.horoscope_date).in_(
+                    [(user.id, day) for user, day in due]
+                )
+            )
+        )
+        done = set(stored.tuples())
+    return [(user, day) for user, day in due if (user.id, day) not in done]
+
+
+async def precompute_premium_horoscopes(now: datetime | None = None) -> tuple[int, int]:
+    """Generate horoscopes for premium notifications due within the horizon.
+
+    Returns:
+        (generated, failed) counts
+    """
+    if now is None:
+        now = datetime.now(UTC)
+
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(User.timezone).where(*_candidate_filters()).distinct()
+        )
+        timezones = result.scalars().all()
+
+    slots = due_slots(timezones, now)
+    if not slots:
+        return (0, 0)
+
+    semaphore = asyncio.Semaphore(PRECOMPUTE_CONCURRENCY)
+
+    async def run(user: User, day: date) -> bool:
+        async with semaphore:
+            try:
+                return await _generate_and_store(user, day)
+            except Exception as e:
+                await logger.aerror(
+                    "Failed to precompute premium horoscope",
+                    user_id=user.telegram_id,
+                    error=str(e),
+                )
+                return False
+
+    generated = failed = 0
+    async for users in _iter_due_user_pages(slots):
+        pending = await _pending(users, slots)
+        results = await asyncio.gather(*[run(user, day) for user, day in pending])
+        generated += sum(results)
+        failed += len(results) - sum(results)
+    return (generated, failed)
+
+
+async def delete_old_premium_horoscopes(today: date) -> None:
+    """Drop stored horoscopes older than KEEP_DAYS before ``today``."""
+    async with async_session_maker() as session:
+        await session.execute(
+            delete(PremiumHoroscope).where(
+                PremiumHoroscope.horoscope_date < today - timedelta(days=KEEP_DAYS)
+            )
+        )
+        await session.commit()
@@ -1,19 +1,49 @@
-"""APScheduler setup for daily horoscope notifications and subscription management."""
+"""APScheduler setup for daily horoscope notifications and subscription management.
 
-from datetime import date, datetime, timedelta, timezone as tz
+Every process (any worker of any replica) starts the scheduler *paused*, so
+handlers anywhere can add/remove per-user jobs in the shared SQLAlchemy
+jobstore. Only the process elected leader (``get_scheduler_leader``) resumes
+it and runs jobs; job functions are fenced with ``_leader_only``.
+
+APScheduler advances a job's next run time when it fires, so a run that is
+skipped (no lease) or cut short by a lost lease would otherwise be lost
+until the next trigger. Such runs are re-queued as one-shot jobs in the
+shared jobstore and picked up by whichever process leads next; every job
+is safe to run twice (cache-backed or checkpointed).
+"""
+
+import asyncio
+import functools
+from datetime import UTC, date, datetime, timedelta
 
 import structlog
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from pytz import utc
-from sqlalchemy import and_, delete, select
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import and_, delete, or_, select, update
 
 from src.config import settings
+from src.core.rate_limit import AsyncRateLimiter
+from src.core.timezones import get_zone, local_dates, local_today
+from src.services.ai.dispatcher import Lane, llm_lane
+from src.services.leader import SCHEDULER_LOCK_KEY, LeaderElection
 
 logger = structlog.get_logger()
 
 _scheduler: AsyncIOScheduler | None = None
+_leader: LeaderElection | None = None
+
+# Leader re-reads the jobstore at least this often, so jobs added by other
+# workers are picked up without waiting for its next scheduled wakeup
+JOBSTORE_POLL_INTERVAL = 60  # seconds
+
+# Delay before a re-queued run: longer than the worst-case leader failover
+REQUEUE_DELAY = 60  # seconds
+
+
+def _poll_jobstore() -> None:
+    """No-op job: its runs make the leader re-scan the shared jobstore."""
 
 
 def get_scheduler() -> AsyncIOScheduler:
@@ -26,7 +56,15 @@ def get_scheduler() -> AsyncIOScheduler:
         jobstores = {"default": SQLAlchemyJobStore(url=sync_url)}
         _scheduler = AsyncIOScheduler(
             jobstores=jobstores,
-            timezone=utc,
+            timezone=UTC,
+        )
+
+        _scheduler.add_job(
+            _poll_jobstore,
+            IntervalTrigger(seconds=JOBSTORE_POLL_INTERVAL),
+            id="poll_jobstore",
+            replace_existing=True,
+            coalesce=True,
         )
 
         # Add subscription management jobs
@@ -64,14 +102,109 @@ def get_scheduler() -> AsyncIOScheduler:
             misfire_grace_time=3600,  # 1 hour grace
         )
 
+        # Premium horoscopes for notifications due in the next hours
+        _scheduler.add_job(
+            precompute_premium_horoscopes,
+            CronTrigger(minute=15),
+            id="precompute_premium_horoscopes",
+            replace_existing=True,
+            coalesce=True,
+            misfire_grace_time=1800,
+        )
+
+        # Card of day pool for tomorrow at 14:00 Moscow - before midnight
+        # arrives in the easternmost user timezones (UTC+12)
+        _scheduler.add_job(
+            generate_card_of_day_pool,
+            CronTrigger(hour=14, minute=0, timezone="Europe/Moscow"),
+            id="generate_card_of_day_pool",
+            replace_existing=True,
+            misfire_grace_time=3600,  # 1 hour grace
+        )
+
     return _scheduler
 
 
+async def _resume_scheduler() -> None:
+    get_scheduler().resume()
+    await logger.ainfo("Scheduler resumed (leader)")
+
+
+async def _pause_scheduler() -> None:
+    scheduler = get_scheduler()
+    if scheduler.running:
+        scheduler.pause()
+    await logger.ainfo("Scheduler paused (follower)")
+
+
+def get_scheduler_leader() -> LeaderElection:
+    """Leader election deciding which process runs scheduled jobs."""
+    global _leader
+    if _leader is None:
+        _leader = LeaderElection(
+            name="scheduler",
+            lock_key=SCHEDULER_LOCK_KEY,
+            on_elected=_resume_scheduler,
+            on_demoted=_pause_scheduler,
+        )
+    return _leader
+
+
+def _requeue_job(job, *args) -> None:
+    """Run ``job`` once more after REQUEUE_DELAY, on whichever process leads then.
+
+    ``job`` must be the module-level (``_leader_only``-wrapped) function, so
+    the jobstore can reference it by name.
+    """
+    job_id = ":".join([job.__name__, "requeued", *map(str, args)])
+    get_scheduler().add_job(
+        job,
+        "date",
+        run_date=datetime.now(UTC) + timedelta(seconds=REQUEUE_DELAY),
+        args=args,
+        id=job_id,
+        replace_existing=True,
+        misfire_grace_time=3600,
+    )
+
+
+def _leader_only(job):
+    """Fencing for job functions: skip the run unless this process holds
+    a current scheduler lease (guards against a leader that lost the lock
+    but has not paused yet). A skipped run is re-queued for the next
+    leader instead of being lost."""
+
+    @functools.wraps(job)
+    async def wrapper(*args):
+        if not get_scheduler_leader().has_lease:
+            await logger.awarning("Skipping job without scheduler lease", job=job.__name__)
+            _requeue_job(wrapper, *args)
+            return None
+        return await job(*args)
+
+    return wrapper
+
+
+def _batch_lane(job):
+    """Dispatch the job's LLM calls in the batch lane (after interactive)."""
+
+    @functools.wraps(job)
+    async def wrapper(*args, **kwargs):
+        with llm_lane(Lane.BATCH):
+            return await job(*args, **kwargs)
+
+    return wrapper
+
+
+@_leader_only
+@_batch_lane
 async def send_daily_horoscope(user_id: int, zodiac_sign: str) -> None:
     """Job function: send horoscope notification to user.
 
     Sends personalized horoscope for premium users with natal data,
-    or general horoscope for others.
+    or general horoscope for others. Personalized horoscopes are read from
+    ``premium_horoscopes`` (precomputed by ``precompute_premium_horoscopes``),
+    so sending never waits on the LLM.
 
     NOTE: Bot instance fetched inside function - cannot serialize Bot in jobstore.
     """
@@ -81,8 +214,7 @@ async def send_daily_horoscope(user_id: int, zodiac_sign: str) -> None:
     from src.bot.utils.zodiac import ZODIAC_SIGNS
     from src.db.engine import AsyncSessionLocal
     from src.db.models.user import User
-    from src.services.ai import get_ai_service
-    from src.services.astrology.natal_chart import calculate_full_natal_chart
+    from src.services.premium_horoscope import get_stored_premium_horoscope
     from sqlalchemy import select
 
     bot = get_bot()
@@ -93,6 +225,10 @@ async def send_daily_horoscope(user_id: int, zodiac_sign: str) -> None:
         )
         return
 
+    # Determine horoscope type
+    is_premium = False
+    forecast_text = None
+
     # Get user from DB to check premium status
     async with AsyncSessionLocal() as session:
         result = await session.execute(
@@ -100,43 +236,23 @@ async def send_daily_horoscope(user_id: int, zodiac_sign: str) -> None:
         )
         user = result.scalar_one_or_none()
 
-    if not user:
-        await logger.awarning("User not found for notification", user_id=user_id)
-        return
-
-    # Determine horoscope type
-    is_premium = False
-    forecast_text = None
-
-    if user.is_premium and user.birth_lat and user.birth_lon and user.birth_date:
-        # Premium with natal data → personalized horoscope
-        is_premium = True
+        if not user:
+            await logger.awarning("User not found for notification", user_id=user_id)
+            return
 
-        try:
-            natal_data = calculate_full_natal_chart(
-                birth_date=user.birth_date,
-                birth_time=user.birth_time,
-                latitude=user.birth_lat,
-                longitude=user.birth_lon,
-                timezone_str=user.timezone or "Europe/Moscow",
-            )
+        # Date in user's timezone (job fires at user's local hour)
+        today = local_today(user.timezone)
 
-            ai_service = get_ai_service()
-            forecast_text = await ai_service.generate_premium_horoscope(
-                user_id=user_id,
-                zodiac_sign=zodiac_sign,
-                zodiac_sign_ru=zodiac.name_ru,
-                date_str=date.today().strftime("%d.%m.%Y"),
-                natal_data=natal_data,
-            )
-        except Exception as e:
-            await logger.aerror(
-                "Failed to generate premium horoscope, falling back to general",
-                user_id=user_id,
-                error=str(e),
-            )
-            # Fallback to general on error
-            forecast_text = None
+        if user.is_premium and user.birth_lat and user.birth_lon and user.birth_date:
+            # Premium with natal data → precomputed personalized horoscope
+            forecast_text = await get_stored_premium_horoscope(session, user.id, today)
+            if forecast_text:
+                is_premium = True
+            else:
+                await logger.awarning(
+                    "Premium horoscope not precomputed, sending general",
+                    user_id=user_id,
+                )
 
     # Fallback to general horoscope if not premium or generation failed
     if not forecast_text:
@@ -178,7 +294,7 @@ async def send_daily_horoscope(user_id: int, zodiac_sign: str) -> None:
     content = format_daily_horoscope(
         sign_emoji=zodiac.emoji,
         sign_name_ru=zodiac.name_ru,
-        forecast_date=date.today(),
+        forecast_date=today,
         forecast_text=forecast_text,
         daily_tip=tip,
         is_premium=is_premium,
@@ -213,7 +329,7 @@ def schedule_user_notification(
 
     scheduler.add_job(
         send_daily_horoscope,
-        CronTrigger(hour=hour, minute=0, timezone=timezone),
+        CronTrigger(hour=hour, minute=0, timezone=get_zone(timezone)),
         args=[user_id, zodiac_sign],
         id=job_id,
         replace_existing=True,  # Avoid duplicates on reschedule
@@ -237,68 +353,200 @@ def remove_user_notification(user_id: int) -> None:
 
 # ============== Subscription Management Jobs ==============
 
+# Candidates are streamed in keyset pages so a single job never holds one
+# long session (or the whole subscriber base) in memory.
+SUBSCRIPTION_PAGE_SIZE = 200
+
+# Concurrent YooKassa recurring payment requests
+RENEWAL_PAYMENT_CONCURRENCY = 10
+
+# Periods that ended up to this long ago without a renewal attempt are
+# still renewed (transient payment errors, runs missed during failover)
+RENEWAL_GRACE = timedelta(days=3)
+
+# Concurrent Telegram sends + global send rate (Telegram allows ~30 msg/sec)
+NOTIFICATION_CONCURRENCY = 20
+NOTIFICATION_RATE_PER_SECOND = 25
 
+
+def _renewal_idempotency_key(subscription_id: int, period_end: datetime) -> str:
+    """Stable YooKassa idempotency key for one billing period of a subscription.
+
+    A restart that retries the same period reuses the key, so YooKassa
+    returns the original payment instead of charging the card twice.
+    """
+    return f"renew-{subscription_id}-{int(period_end.timestamp())}"
+
+
+def _is_payment_declined(error: Exception) -> bool:
+    """True for a definitive rejection (4xx), False for errors worth retrying."""
+    from src.services.payment import YooKassaError
+
+    status_code = error.status_code if isinstance(error, YooKassaError) else None
+    return status_code is not None and 400 <= status_code < 500 and status_code != 429
+
+
+async def _iter_subscription_pages(build_stmt):
+    """Yield pages of (Subscription, User) rows using keyset pagination by id.
+
+    Args:
+        build_stmt: Callable returning the base select for candidates
+
+    Each page is loaded in its own short session and detached, so no
+    connection is held while the page is processed.
+    """
+    from src.db.engine import async_session_maker
+    from src.db.models.subscription import Subscription
+
+    last_id = 0
+    while True:
+        async with async_session_maker() as session:
+            stmt = (
+                build_stmt()
+                .where(Subscription.id > last_id)
+                .order_by(Subscription.id)
+                .limit(SUBSCRIPTION_PAGE_SIZE)
+            )
+            result = await session.execute(stmt)
+            rows = result.all()
+
+        if not rows:
+            return
+
+        yield rows
+        last_id = rows[-1][0].id
+
+        if len(rows) < SUBSCRIPTION_PAGE_SIZE:
+            return
+
+
+async def _send_job_message(
+    bot,
+    semaphore: asyncio.Semaphore,
+    limiter: AsyncRateLimiter,
+    chat_id: int,
+    text: str,
+) -> bool:
+    """Send a notification under the job's concurrency and rate limits."""
+    async with semaphore:
+        await limiter.acquire()
+        try:
+            await bot.send_message(chat_id, text)
+            return True
+        except Exception as e:
+            await logger.awarning(
+                "Failed to send job notification", user_id=chat_id, error=str(e)
+            )
+            return False
+
+
+@_leader_only
 async def check_expiring_subscriptions() -> None:
     """
     Check for subscriptions expiring in 3 days and send notifications.
     Runs daily at 10:00 Moscow time.
+
+    Candidates are streamed in pages and notified concurrently under a
+    semaphore and a global send rate limit. Each subscription records the
+    period end it was notified for, so a restarted run skips users who
+    already got the reminder and picks up the rest. Subscriptions whose
+    reminder was missed (failed send, missed run) are reminded on a later
+    run while the period has not ended yet.
     """
     from src.bot.bot import get_bot
     from src.db.engine import async_session_maker
     from src.db.models.subscription import Subscription
     from src.db.models.user import User
 
-    async with async_session_maker() as session:
-        # Find subscriptions expiring in 3 days
-        now = datetime.now(tz.utc)
-        three_days = now + timedelta(days=3)
-        four_days = now + timedelta(days=4)
+    now = datetime.now(UTC)
+    four_days = now + timedelta(days=4)
 
-        stmt = (
+    def build_stmt():
+        return (
             select(Subscription, User)
             .join(User, User.id == Subscription.user_id)
             .where(
                 and_(
                     Subscription.status.in_(["active", "trial"]),
-                    Subscription.current_period_end >= three_days,
+                    Subscription.current_period_end >= now,
                     Subscription.current_period_end < four_days,
+                    or_(
+                        Subscription.expiry_notified_for.is_(None),
+                        Subscription.expiry_notified_for != Subscription.current_period_end,
+                    ),
                 )
             )
         )
 
-        result = await session.execute(stmt)
-        expiring = result.all()
+    bot = None
+    semaphore = asyncio.Semaphore(NOTIFICATION_CONCURRENCY)
+    limiter = AsyncRateLimiter(rate=NOTIFICATION_RATE_PER_SECOND)
+
+    async def notify(subscription: Subscription, user: User) -> bool:
+        period_end = subscription.current_period_end
+        end_date = period_end.strftime("%d.%m.%Y")
+        sent = await _send_job_message(
+            bot,
+            semaphore,
+            limiter,
+            user.telegram_id,
+            f"Напоминаем: ваша подписка истекает {end_date}.\n\n"
+            "Продлите сейчас, чтобы не потерять премиум-функции!",
+        )
+        if not sent:
+            return False
+
+        # Checkpoint after delivery: a crash in between re-sends at most one reminder
+        async with async_session_maker() as session:
+            await session.execute(
+                update(Subscription)
+                .where(Subscription.id == subscription.id)
+                .values(expiry_notified_for=period_end)
+            )
+            await session.commit()
 
-        if not expiring:
-            return
+        await logger.ainfo(
+            "Sent expiry notification",
+            user_id=user.telegram_id,
+            expires=end_date,
+        )
+        return True
 
-        bot = get_bot()
+    sent_count = 0
+    failed_count = 0
 
-        for subscription, user in expiring:
-            try:
-                end_date = subscription.current_period_end.strftime("%d.%m.%Y")
-                await bot.send_message(
-                    user.telegram_id,
-                    f"Напоминаем: ваша подписка истекает {end_date}.\n\n"
-                    "Продлите сейчас, чтобы не потерять премиум-функции!",
-                )
-                await logger.ainfo(
-                    "Sent expiry notification",
-                    user_id=user.telegram_id,
-                    expires=end_date,
-                )
-            except Exception as e:
-                await logger.aerror(
-                    "Failed to send expiry notification",
-                    user_id=user.telegram_id,
-                    error=str(e),
-                )
+    async for page in _iter_subscription_pages(build_stmt):
+        if bot is None:
+            bot = get_bot()
+        results = await asyncio.gather(
+            *[notify(subscription, user) for subscription, user in page]
+        )
+        sent_count += sum(1 for ok in results if ok)
+        failed_count += sum(1 for ok in results if not ok)
+
+    if sent_count or failed_count:
+        await logger.ainfo(
+            "Expiry notifications complete", sent=sent_count, failed=failed_count
+        )
 
 
+@_leader_only
 async def auto_renew_subscriptions() -> None:
     """
     Auto-renew subscriptions expiring in 1 day using saved payment method.
     Runs daily at 09:00 Moscow time (before expiry notification).
+
+    Candidates are streamed in pages; recurring payments and notifications
+    run concurrently under separate semaphores. Every charge uses an
+    idempotency key derived from (subscription, period end), and the
+    period is checkpointed in ``renewal_attempted_for`` once the outcome
+    is known. A restart therefore retries unfinished subscriptions with the
+    same key (no double charge) and skips finished ones (no re-charge).
+
+    Periods not attempted yet are also picked up after they ended, within
+    RENEWAL_GRACE: a transient YooKassa error or a run cut short by a lost
+    lease is retried by the next run instead of leaving the subscription
+    active and unpaid.
     """
     from src.bot.bot import get_bot
     from src.db.engine import async_session_maker
@@ -307,92 +555,160 @@ async def auto_renew_subscriptions() -> None:
     from src.services.payment import create_recurring_payment
     from src.services.payment.schemas import PLAN_DURATION_DAYS, PLAN_PRICES_STR, PaymentPlan
 
-    async with async_session_maker() as session:
-        # Find active subscriptions expiring in 1-2 days with payment_method_id
-        now = datetime.now(tz.utc)
-        one_day = now + timedelta(days=1)
-        two_days = now + timedelta(days=2)
+    now = datetime.now(UTC)
+    two_days = now + timedelta(days=2)
 
-        stmt = (
+    def build_stmt():
+        return (
             select(Subscription, User)
             .join(User, User.id == Subscription.user_id)
             .where(
                 and_(
                     Subscription.status == SubscriptionStatus.ACTIVE.value,
                     Subscription.payment_method_id.isnot(None),
-                    Subscription.current_period_end >= one_day,
+                    Subscription.current_period_end >= now - RENEWAL_GRACE,
                     Subscription.current_period_end < two_days,
+                    or_(
+                        Subscription.renewal_attempted_for.is_(None),
+                        Subscription.renewal_attempted_for != Subscription.current_period_end,
+                    ),
                 )
             )
         )
 
-        result = await session.execute(stmt)
-        to_renew = result.all()
+    bot = None
+    payment_semaphore = asyncio.Semaphore(RENEWAL_PAYMENT_CONCURRENCY)
+    notify_semaphore = asyncio.Semaphore(NOTIFICATION_CONCURRENCY)
+    limiter = AsyncRateLimiter(rate=NOTIFICATION_RATE_PER_SECOND)
 
-        if not to_renew:
-            return
-
-        bot = get_bot()
+    async def renew(subscription: Subscription, user: User) -> bool:
+        period_end = subscription.current_period_end
 
-        for subscription, user in to_renew:
-            try:
-                plan = PaymentPlan(subscription.plan)
-                amount = PLAN_PRICES_STR[plan]
-
-                # Create recurring payment
+        try:
+            plan = PaymentPlan(subscription.plan)
+            async with payment_semaphore:
                 payment = await create_recurring_payment(
                     payment_method_id=subscription.payment_method_id,
                     user_id=user.telegram_id,
                     subscription_id=subscription.id,
-                    amount=amount,
+                    amount=PLAN_PRICES_STR[plan],
                     description="Продление подписки AdtroBot",
+                    idempotency_key=_renewal_idempotency_key(subscription.id, period_end),
                 )
-
-                # If payment succeeded immediately (some cards do this)
-                if payment.status == "succeeded":
-                    # Extend subscription period
-                    subscription.current_period_start = subscription.current_period_end
-                    subscription.current_period_end = (
-                        subscription.current_period_end + timedelta(days=PLAN_DURATION_DAYS[plan])
+        except Exception as e:
+            if not _is_payment_declined(e):
+                # Network error or YooKassa outage: leave the period unchecked;
+                # the next daily run retries it with the same idempotency key
+                await logger.awarning(
+                    "Auto-renewal deferred",
+                    user_id=user.telegram_id,
+                    error=str(e),
+                )
+                return False
+
+            # Payment declined - mark as past_due and checkpoint the period
+            async with async_session_maker() as session:
+                await session.execute(
+                    update(Subscription)
+                    .where(Subscription.id == subscription.id)
+                    .values(
+                        status=SubscriptionStatus.PAST_DUE.value,
+                        renewal_attempted_for=period_end,
                     )
-                    user.premium_until = subscription.current_period_end
-                    await session.commit()
+                )
+                await session.commit()
 
-                    await bot.send_message(
-                        user.telegram_id,
-                        f"Подписка продлена до {subscription.current_period_end.strftime('%d.%m.%Y')}!",
+            await logger.aerror(
+                "Auto-renewal failed",
+                user_id=user.telegram_id,
+                error=str(e),
+            )
+            await _send_job_message(
+                bot,
+                notify_semaphore,
+                limiter,
+                user.telegram_id,
+                "Не удалось продлить подписку автоматически.\n"
+                "Проверьте карту и оплатите вручную, чтобы сохранить премиум-доступ.",
+            )
+            return False
+
+        # If payment succeeded immediately (some cards do this)
+        if payment.status == "succeeded":
+            new_period_end = period_end + timedelta(days=PLAN_DURATION_DAYS[plan])
+            async with async_session_maker() as session:
+                # Guard on period end: never extend the same period twice
+                await session.execute(
+                    update(Subscription)
+                    .where(
+                        Subscription.id == subscription.id,
+                        Subscription.current_period_end == period_end,
                     )
-                    await logger.ainfo(
-                        "Auto-renewed subscription",
-                        user_id=user.telegram_id,
-                        until=subscription.current_period_end.isoformat(),
+                    .values(
+                        current_period_start=period_end,
+                        current_period_end=new_period_end,
+                        renewal_attempted_for=period_end,
                     )
-                # Otherwise webhook will handle the result
-
-            except Exception as e:
-                # Payment failed - mark as past_due
-                subscription.status = SubscriptionStatus.PAST_DUE.value
+                )
+                await session.execute(
+                    update(User)
+                    .where(User.id == user.id)
+                    .values(premium_until=new_period_end)
+                )
                 await session.commit()
 
-                await logger.aerror(
-                    "Auto-renewal failed",
-                    user_id=user.telegram_id,
-                    error=str(e),
+            await _send_job_message(
+                bot,
+                notify_semaphore,
+                limiter,
+                user.telegram_id,
+                f"Подписка продлена до {new_period_end.strftime('%d.%m.%Y')}!",
+            )
+            await logger.ainfo(
+                "Auto-renewed subscription",
+                user_id=user.telegram_id,
+                until=new_period_end.isoformat(),
+            )
+        else:
+            # Otherwise webhook will handle the result
+            async with async_session_maker() as session:
+                await session.execute(
+                    update(Subscription)
+                    .where(Subscription.id == subscription.id)
+                    .values(renewal_attempted_for=period_end)
                 )
+                await session.commit()
 
-                try:
-                    await bot.send_message(
-                        user.telegram_id,
-                        "Не удалось продлить подписку автоматически.\n"
-                        "Проверьте карту и оплатите вручную, чтобы сохранить премиум-доступ.",
-                    )
-                except Exception:
-                    pass  # User might have blocked bot
+        return True
+
+    renewed = 0
+    failed = 0
+
+    leader = get_scheduler_leader()
+    async for page in _iter_subscription_pages(build_stmt):
+        # Stop charging as soon as the lease lapses; the re-queued run
+        # continues from the renewal_attempted_for checkpoints
+        if not leader.has_lease:
+            await logger.awarning("Scheduler lease lost, stopping auto-renewal run")
+            _requeue_job(auto_renew_subscriptions)
+            break
+        if bot is None:
+            bot = get_bot()
+        results = await asyncio.gather(
+            *[renew(subscription, user) for subscription, user in page]
+        )
+        renewed += sum(1 for ok in results if ok)
+        failed += sum(1 for ok in results if not ok)
+
+    if renewed or failed:
+        await logger.ainfo("Auto-renewal run complete", processed=renewed, failed=failed)
 
 
 # ============== Horoscope Generation Jobs ==============
 
 
+@_leader_only
+@_batch_lane
 async def generate_daily_horoscopes() -> None:
     """
     Background job: generate horoscopes for all 12 zodiac signs.
@@ -429,16 +745,68 @@ async def generate_daily_horoscopes() -> None:
                 logger.error("Failed to generate horoscope", sign=sign_en)
 
 
+@_leader_only
+@_batch_lane
+async def precompute_premium_horoscopes() -> None:
+    """
+    Background job: generate premium horoscopes ahead of notifications.
+    Runs hourly at :15.
+
+    Covers notifications due in the next 3 hours, so each notification
+    hour gets up to three attempts before it is sent.
+    """
+    from src.services import premium_horoscope
+
+    now = datetime.now(UTC)
+    generated, failed = await premium_horoscope.precompute_premium_horoscopes(now)
+    if generated or failed:
+        await logger.ainfo(
+            "Premium horoscopes precomputed", generated=generated, failed=failed
+        )
+
+    # Once a day (Moscow midnight hour): drop old stored horoscopes
+    if now.astimezone(get_zone("Europe/Moscow")).hour == 0:
+        await premium_horoscope.delete_old_premium_horoscopes(local_today("Europe/Moscow"))
+
+
+@_leader_only
+@_batch_lane
+async def generate_card_of_day_pool() -> None:
+    """
+    Background job: pre-generate tomorrow's card of day interpretations.
+    Runs daily at 14:00 Moscow time.
+
+    Fills the missing variants for every card and orientation (today's
+    pool too, in case a previous run failed) and drops old pools.
+    """
+    from src.services.card_of_day import delete_old_pools, fill_card_of_day_pool
+
+    today = local_today("Europe/Moscow")
+    await delete_old_pools(today)
+
+    for pool_date in (today, today + timedelta(days=1)):
+        generated, failed = await fill_card_of_day_pool(pool_date)
+        await logger.ainfo(
+            "Card of day pool filled",
+            date=str(pool_date),
+            generated=generated,
+            failed=failed,
+        )
+
+
 # ============== Transit Forecast Generation Jobs ==============
 
 
+@_leader_only
+@_batch_lane
 async def generate_transit_forecasts_for_premium() -> None:
     """
     Background job: pre-generate transit forecasts for all premium users.
     Runs daily at 01:00 Moscow time (after horoscopes at 00:00).
 
     Uses asyncio.gather() for PARALLEL generation (much faster than sequential).
-    Semaphore limits concurrent API requests to avoid rate limits.
+    LLM calls run in the dispatcher's batch lane, so interactive requests
+    keep priority for OpenRouter capacity.
 
     Steps:
     1. Find all premium users with birth data (birth_lat, birth_lon, birth_date)
@@ -446,21 +814,21 @@ async def generate_transit_forecasts_for_premium() -> None:
     3. Cache results with 24-hour TTL
     4. Log success/failure for monitoring
     """
-    import asyncio
-
     from src.db.engine import async_session_maker
     from src.db.models.user import User
     from src.services.ai import get_ai_service
     from src.services.astrology.natal_chart import calculate_full_natal_chart
 
-    today = date.today()
+    # Job runs at 01:00 Moscow; zones west of Moscow are still on the
+    # previous day, so they get the day they are about to start
+    today = local_today("Europe/Moscow")
     ai_service = get_ai_service()
 
-    # Semaphore to limit concurrent API requests (avoid rate limits)
-    # 20 concurrent requests = good balance between speed and API limits
+    # Bounds users in flight (chart calculation + request); API pacing and
+    # priority vs interactive traffic come from the LLM dispatcher batch lane
     semaphore = asyncio.Semaphore(20)
 
-    async def generate_for_user(user: User) -> tuple[bool, int]:
+    async def generate_for_user(user: User, forecast_date: date) -> tuple[bool, int]:
         """Generate forecast for a single user (with semaphore)."""
         async with semaphore:
             try:
@@ -477,7 +845,7 @@ async def generate_transit_forecasts_for_premium() -> None:
                 _, telegraph_url = await ai_service.generate_daily_transit_forecast(
                     user_id=user.telegram_id,
                     natal_data=natal_data,
-                    forecast_date=today,
+                    forecast_date=forecast_date,
                     timezone_str=user.timezone or "Europe/Moscow",
                 )
 
@@ -511,9 +879,12 @@ async def generate_transit_forecasts_for_premium() -> None:
 
         await logger.ainfo("Starting transit forecast generation", user_count=len(users))
 
+        # Local dates resolved once per distinct timezone, not per user
+        dates = local_dates(user.timezone for user in users)
+
         # Generate ALL forecasts in parallel (asyncio.gather)
         results = await asyncio.gather(
-            *[generate_for_user(user) for user in users],
+            *[generate_for_user(user, max(dates[user.timezone], today)) for user in users],
             return_exceptions=False,
         )
 
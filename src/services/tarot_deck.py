@@ -0,0 +1,109 @@
+"""Immutable tarot deck with O(1) card lookup and preformatted text.
+
+The 78-card deck is parsed once at startup (``load_deck`` in the app
+lifespan) instead of on a user's first tarot request. Cards are read-only
+mappings indexed by ``name_short``; display labels, meanings and AI prompt
+labels are built once per card (``CardText``) and reused by message
+formatting and tarot prompts.
+
+Kept free of bot/aiogram imports so AI prompts can use it.
+"""
+
+import json
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+DECK_PATH = Path(__file__).parent.parent / "data" / "tarot" / "cards.json"
+
+# Russian card type names
+CARD_TYPE_RU = {
+    "major": "Старший Аркан",
+    "minor": "Младший Аркан",
+}
+
+# Reversed suffix in user-facing text and in AI prompts
+REVERSED_LABEL = " (перевернутая)"
+REVERSED_PROMPT_LABEL = " (перевернута)"
+
+
+@dataclass(frozen=True, slots=True)
+class CardText:
+    """Preformatted strings for one card.
+
+    Pairs are indexed by reversed flag: ``text.label[reversed_flag]``.
+    """
+
+    label: tuple[str, str]  # "The Fool" / "The Fool (перевернутая)"
+    meaning: tuple[str, str]  # meaning_up / meaning_rev
+    prompt_label: tuple[str, str]  # "The Fool" / "The Fool (перевернута)"
+    type_ru: str
+
+
+def _build_card_text(card: Mapping[str, Any]) -> CardText:
+    name = card["name"]
+    return CardText(
+        label=(name, f"{name}{REVERSED_LABEL}"),
+        meaning=(card["meaning_up"], card["meaning_rev"]),
+        prompt_label=(name, f"{name}{REVERSED_PROMPT_LABEL}"),
+        type_ru=CARD_TYPE_RU.get(card["type"], card["type"]),
+    )
+
+
+class TarotDeck:
+    """Immutable 78-card deck indexed by name_short."""
+
+    def __init__(self, cards: Iterable[dict]) -> None:
+        self.cards: tuple[Mapping[str, Any], ...] = tuple(
+            MappingProxyType(dict(card)) for card in cards
+        )
+        self._by_id = {card["name_short"]: card for card in self.cards}
+        self._texts = {card["name_short"]: _build_card_text(card) for card in self.cards}
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        return iter(self.cards)
+
+    def get(self, name_short: str | None) -> Mapping[str, Any] | None:
+        """Card by name_short (e.g., 'ar00'), or None."""
+        return self._by_id.get(name_short)
+
+    def text(self, name_short: str | None) -> CardText | None:
+        """Preformatted strings for card, or None."""
+        return self._texts.get(name_short)
+
+
+def load_tarot_deck(path: Path = DECK_PATH) -> TarotDeck:
+    """Load 78 tarot cards from JSON."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return TarotDeck(data["cards"])
+
+
+# Singleton deck (loaded at startup by load_deck, or on first use)
+_DECK: TarotDeck | None = None
+
+
+def load_deck() -> TarotDeck:
+    """Load deck eagerly (called from app startup)."""
+    global _DECK
+    _DECK = load_tarot_deck()
+    return _DECK
+
+
+def get_deck() -> TarotDeck:
+    """Get tarot deck singleton."""
+    if _DECK is None:
+        return load_deck()
+    return _DECK
+
+
+def get_card_text(card: Mapping[str, Any]) -> CardText:
+    """Preformatted strings for a card from the deck."""
+    text = get_deck().text(card["name_short"])
+    # Cards not from the deck (tests, fixtures) are formatted on the fly
+    return text if text is not None else _build_card_text(card)
@@ -1,20 +1,187 @@
-"""Telegraph service for publishing long-form content."""
+"""Telegraph service for publishing long-form content.
+
+Talks to the Telegraph API directly over one pooled httpx.AsyncClient
+(no worker threads). The account token is persisted in
+``telegraph_accounts`` so all instances publish under one account across
+restarts.
+
+``TelegraphPublisher`` is a small bounded queue in front of the service:
+handlers answer the user first and attach the page URL when it is ready.
+"""
 
 import asyncio
+import json
 import re
+from collections.abc import Awaitable, Callable
 
+import httpx
 import structlog
-from telegraph import Telegraph
-from telegraph.exceptions import TelegraphException
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.config import settings
+from src.db.engine import AsyncSessionLocal
+from src.db.models.telegraph_account import TelegraphAccount
 
 logger = structlog.get_logger()
 
+TELEGRAPH_API_URL = "https://api.telegra.ph"
+
+POOL_LIMITS = httpx.Limits(
+    max_connections=10,
+    max_keepalive_connections=5,
+    keepalive_expiry=60.0,
+)
+REQUEST_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+ACCOUNT_SHORT_NAME = "AdtroBot"
+
+# Publishing queue sizing
+PUBLISH_WORKERS = 4
+PUBLISH_QUEUE_SIZE = 500
+
+
+# Telegraph rejects pages whose content JSON exceeds 64 KB; keep headroom
+# for the "next page" link node
+MAX_PAGE_CONTENT_BYTES = 60_000
+NEXT_PAGE_TEXT = "Продолжение →"
+
+# Header line: emoji at start (common for section headers)
+_EMOJI_HEADER_RE = re.compile(r"^[\U0001F300-\U0001F9FF\u2600-\u26FF\u2700-\u27BF]")
+# Inline markup: **bold** first, then *italic* inside plain/bold runs
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_ITALIC_RE = re.compile(r"\*(.+?)\*")
+
+Node = str | dict
+
+
+def _split_markup(text: str, pattern: re.Pattern[str], tag: str, inner) -> list[Node]:
+    """Split text by pattern into plain runs and ``tag`` nodes."""
+    nodes: list[Node] = []
+    pos = 0
+    for match in pattern.finditer(text):
+        if match.start() > pos:
+            nodes.extend(inner(text[pos : match.start()]))
+        nodes.append({"tag": tag, "children": inner(match.group(1))})
+        pos = match.end()
+    if pos < len(text):
+        nodes.extend(inner(text[pos:]))
+    return nodes
+
+
+def _italic_nodes(text: str) -> list[Node]:
+    if "*" not in text:
+        return [text] if text else []
+    return _split_markup(text, _ITALIC_RE, "i", lambda t: [t] if t else [])
+
+
+def _inline_nodes(text: str) -> list[Node]:
+    """Inline formatting (bold, italic) as Telegraph nodes."""
+    if "*" not in text:
+        return [text]
+    return _split_markup(text, _BOLD_RE, "b", _italic_nodes)
+
+
+def _header_text(line: str) -> str | None:
+    """Header text if line is a header, else None.
+
+    Headers: section markers [HEADER], lines starting with emoji,
+    markdown headers (#, ##, ###).
+    """
+    if line.startswith("[") and line.endswith("]"):
+        return line[1:-1]
+    if line.startswith("#"):
+        for prefix in ("### ", "## ", "# "):
+            if line.startswith(prefix):
+                return line[len(prefix) :]
+    if _EMOJI_HEADER_RE.match(line):
+        return line
+    return None
+
+
+def format_nodes(content: str) -> list[Node]:
+    """Convert markdown-like text to Telegraph content nodes in one pass.
+
+    - Headers with emoji, [MARKERS] or # become <h3>
+    - Bold text **text** becomes <b>, *text* becomes <i>
+    - Lines separated by blank lines are joined into <p> paragraphs
+    - List items (- item / • item) become "• item" paragraphs
+
+    Args:
+        content: Plain text content with optional formatting
+
+    Returns:
+        Telegraph Node list (ready for createPage ``content``)
+    """
+    nodes: list[Node] = []
+    paragraph: list[Node] = []
+
+    def flush() -> None:
+        if paragraph:
+            nodes.append({"tag": "p", "children": paragraph.copy()})
+            paragraph.clear()
+
+    for raw_line in content.strip().split("\n"):
+        line = raw_line.strip()
+
+        # Empty line - flush paragraph
+        if not line:
+            flush()
+            continue
+
+        header = _header_text(line)
+        if header is not None:
+            flush()
+            nodes.append({"tag": "h3", "children": [header]})
+            continue
+
+        if line.startswith("- ") or line.startswith("• "):
+            flush()
+            nodes.append({"tag": "p", "children": ["• ", *_inline_nodes(line[2:].strip())]})
+            continue
+
+        # Regular text - add to current paragraph
+        if paragraph:
+            paragraph.append(" ")
+        paragraph.extend(_inline_nodes(line))
+
+    flush()
+    return nodes
+
+
+def _node_size(node: Node) -> int:
+    return len(json.dumps(node, ensure_ascii=False).encode())
+
+
+def split_pages(nodes: list[Node], max_bytes: int = MAX_PAGE_CONTENT_BYTES) -> list[list[Node]]:
+    """Split nodes into pages whose serialized content fits max_bytes.
+
+    Splits only between top-level nodes; each node is measured once. Sizes
+    match ``json.dumps`` output exactly ("[]" plus ", " between nodes).
+    """
+    pages: list[list[Node]] = [[]]
+    size = 2  # "[]"
+    for node in nodes:
+        node_size = _node_size(node)
+        if pages[-1] and size + 2 + node_size > max_bytes:
+            pages.append([])
+            size = 2
+        if pages[-1]:
+            size += 2  # ", "
+        pages[-1].append(node)
+        size += node_size
+    return pages
+
+
+class TelegraphError(Exception):
+    """Telegraph API returned ok=false."""
+
 
 class TelegraphService:
     """Service for publishing content to Telegraph.
 
-    Uses asyncio.to_thread() for all blocking Telegraph calls.
-    Creates anonymous account on first use.
+    Uses a shared async HTTP client; account token comes from settings,
+    the DB, or is created once and stored in the DB.
     """
 
     # Timeout for Telegraph operations (seconds)
@@ -22,30 +189,78 @@ class TelegraphService:
 
     def __init__(self):
         """Initialize Telegraph service."""
-        self.telegraph = Telegraph()
-        self._token = None
-
-    async def _ensure_account(self) -> None:
-        """Ensure Telegraph account is created (async wrapper).
-
-        Creates anonymous account if not exists.
-        Called internally before publishing.
+        self._http: httpx.AsyncClient | None = None
+        self._token: str | None = settings.telegraph_access_token or None
+        self._account_lock = asyncio.Lock()
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=TELEGRAPH_API_URL,
+                limits=POOL_LIMITS,
+                timeout=REQUEST_TIMEOUT,
+            )
+        return self._http
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _call(self, method: str, **params: str) -> dict:
+        """Call Telegraph API method; returns ``result`` payload."""
+        response = await self._client().post(f"/{method}", data=params)
+        response.raise_for_status()
+        body = response.json()
+        if not body.get("ok"):
+            raise TelegraphError(body.get("error", "Unknown Telegraph error"))
+        return body["result"]
+
+    async def _ensure_account(self) -> str:
+        """Return access token, loading or creating the shared account.
+
+        Concurrent callers (and replicas) converge on the first stored token.
         """
         if self._token:
-            return
-
-        try:
-            response = await asyncio.to_thread(
-                self.telegraph.create_account,
-                short_name="AdtroBot",
-                author_name="AdtroBot",
-                author_url="https://t.me/adtro_bot",
-            )
-            self._token = response.get("access_token")
-            logger.info("telegraph_account_created")
-        except TelegraphException as e:
-            # Account creation failed, will try to publish anyway
-            logger.warning("telegraph_account_creation_failed", error=str(e))
+            return self._token
+
+        async with self._account_lock:
+            if self._token:
+                return self._token
+
+            async with AsyncSessionLocal() as session:
+                token = await session.scalar(
+                    select(TelegraphAccount.access_token).where(
+                        TelegraphAccount.short_name == ACCOUNT_SHORT_NAME
+                    )
+                )
+                if token is None:
+                    result = await self._call(
+                        "createAccount",
+                        short_name=ACCOUNT_SHORT_NAME,
+                        author_name="AdtroBot",
+                        author_url="https://t.me/adtro_bot",
+                    )
+                    await session.execute(
+                        insert(TelegraphAccount)
+                        .values(
+                            short_name=ACCOUNT_SHORT_NAME,
+                            access_token=result["access_token"],
+                        )
+                        .on_conflict_do_nothing(index_elements=["short_name"])
+                    )
+                    await session.commit()
+                    # Another instance may have stored its token first
+                    token = await session.scalar(
+                        select(TelegraphAccount.access_token).where(
+                            TelegraphAccount.short_name == ACCOUNT_SHORT_NAME
+                        )
+                    )
+                    logger.info("telegraph_account_created")
+
+            self._token = token
+            return token
 
     async def publish_article(
         self,
@@ -64,166 +279,175 @@ class TelegraphService:
             Telegraph article URL or None on failure
 
         Note:
-            Uses asyncio.to_thread for blocking Telegraph calls.
-            Has internal timeout of PUBLISH_TIMEOUT seconds.
+            Content over MAX_PAGE_CONTENT_BYTES is split into several pages
+            linked with "next" links; the first page's URL is returned.
+            Each page call has a timeout of PUBLISH_TIMEOUT seconds.
         """
         try:
-            # Ensure account exists
-            await self._ensure_account()
-
-            # Convert content to Telegraph HTML format
-            html_content = self._format_content(content)
-
-            # Create page with timeout protection
-            response = await asyncio.to_thread(
-                self.telegraph.create_page,
-                title=title,
-                html_content=html_content,
-                author_name=author,
-            )
-
-            url = response.get("url")
-            logger.info("telegraph_article_published", title=title, url=url)
+            token = await self._ensure_account()
+            pages = split_pages(format_nodes(content))
+            try:
+                url = await self._publish_pages(token, title, pages, author)
+            except TelegraphError as e:
+                if "ACCESS_TOKEN_INVALID" not in str(e):
+                    raise
+                # Account revoked: replace the stored token and retry once
+                logger.warning("telegraph_token_invalid")
+                await self._discard_token(token)
+                token = await self._ensure_account()
+                url = await self._publish_pages(token, title, pages, author)
+
+            logger.info("telegraph_article_published", title=title, url=url, pages=len(pages))
             return url
 
-        except TelegraphException as e:
+        except TelegraphError as e:
             logger.error("telegraph_publish_error", error=str(e))
             return None
         except Exception as e:
             logger.error("telegraph_unexpected_error", error=str(e))
             return None
 
-    def _format_content(self, content: str) -> str:
-        """Format content for Telegraph.
-
-        Converts markdown-like text to Telegraph HTML:
-        - Headers with emoji become <h3>
-        - Bold text **text** becomes <b>text</b>
-        - Paragraphs separated by blank lines become <p>
-        - Lists (- item) become proper list items
-
-        Args:
-            content: Plain text content with optional formatting
-
-        Returns:
-            HTML formatted content for Telegraph
-        """
-        lines = content.strip().split("\n")
-        html_parts = []
-        current_paragraph = []
-        in_list = False
-
-        for line in lines:
-            line = line.strip()
-
-            # Empty line - flush paragraph
-            if not line:
-                if current_paragraph:
-                    html_parts.append(f"<p>{' '.join(current_paragraph)}</p>")
-                    current_paragraph = []
-                if in_list:
-                    in_list = False
-                continue
-
-            # Header detection (emoji at start or all caps or section marker)
-            if self._is_header(line):
-                if current_paragraph:
-                    html_parts.append(f"<p>{' '.join(current_paragraph)}</p>")
-                    current_paragraph = []
-                # Clean header text
-                header_text = self._clean_header(line)
-                html_parts.append(f"<h3>{header_text}</h3>")
-                continue
-
-            # List item
-            if line.startswith("- ") or line.startswith("• "):
-                if current_paragraph:
-                    html_parts.append(f"<p>{' '.join(current_paragraph)}</p>")
-                    current_paragraph = []
-                item_text = line[2:].strip()
-                item_text = self._format_inline(item_text)
-                html_parts.append(f"<p>• {item_text}</p>")
-                in_list = True
-                continue
-
-            # Regular text - add to current paragraph
-            formatted_line = self._format_inline(line)
-            current_paragraph.append(formatted_line)
-
-        # Flush remaining paragraph
-        if current_paragraph:
-            html_parts.append(f"<p>{' '.join(current_paragraph)}</p>")
-
-        return "\n".join(html_parts)
-
-    def _is_header(self, line: str) -> bool:
-        """Check if line should be a header.
+    async def _publish_pages(
+        self,
+        token: str,
+        title: str,
+        pages: list[list[Node]],
+        author: str,
+    ) -> str | None:
+        """Create ``pages`` as linked Telegraph pages; returns the first URL."""
+        # Publish from the last page back, so every page can link the next
+        url = None
+        for number in range(len(pages), 0, -1):
+            page_nodes = pages[number - 1]
+            if url is not None:
+                page_nodes = [
+                    *page_nodes,
+                    {
+                        "tag": "p",
+                        "children": [
+                            {"tag": "a", "attrs": {"href": url}, "children": [NEXT_PAGE_TEXT]}
+                        ],
+                    },
+                ]
+            page_title = title if len(pages) == 1 else f"{title} ({number}/{len(pages)})"
+            result = await asyncio.wait_for(
+                self._call(
+                    "createPage",
+                    access_token=token,
+                    title=page_title[:256],
+                    author_name=author,
+                    content=json.dumps(page_nodes, ensure_ascii=False),
+                    return_content="false",
+                ),
+                timeout=self.PUBLISH_TIMEOUT,
+            )
+            url = result.get("url")
+        return url
 
-        Args:
-            line: Text line to check
+    async def _discard_token(self, token: str) -> None:
+        """Forget an invalid token so the next ``_ensure_account`` creates an account.
 
-        Returns:
-            True if line appears to be a header
+        The stored row is deleted only if it still holds ``token``, so a
+        replacement stored by another instance is kept.
         """
-        # Section markers [HEADER]
-        if line.startswith("[") and line.endswith("]"):
-            return True
+        async with self._account_lock:
+            if self._token == token:
+                self._token = None
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    delete(TelegraphAccount).where(
+                        TelegraphAccount.short_name == ACCOUNT_SHORT_NAME,
+                        TelegraphAccount.access_token == token,
+                    )
+                )
+                await session.commit()
 
-        # Starts with emoji (common for section headers)
-        # Emoji regex pattern
-        emoji_pattern = r"^[\U0001F300-\U0001F9FF\u2600-\u26FF\u2700-\u27BF]"
-        if re.match(emoji_pattern, line):
-            return True
 
-        # Markdown header
-        if line.startswith("# ") or line.startswith("## ") or line.startswith("### "):
-            return True
+PublishCallback = Callable[[str | None], Awaitable[None]]
 
-        return False
 
-    def _clean_header(self, line: str) -> str:
-        """Clean header text for display.
-
-        Args:
-            line: Raw header line
+class TelegraphPublisher:
+    """Bounded publishing queue with a few async workers.
 
-        Returns:
-            Cleaned header text
-        """
-        # Remove section markers
-        if line.startswith("[") and line.endswith("]"):
-            return line[1:-1]
-
-        # Remove markdown header markers
-        if line.startswith("### "):
-            return line[4:]
-        if line.startswith("## "):
-            return line[3:]
-        if line.startswith("# "):
-            return line[2:]
-
-        return line
-
-    def _format_inline(self, text: str) -> str:
-        """Format inline elements (bold, etc).
+    ``submit()`` returns a future with the page URL (None on failure) and
+    optionally runs ``on_done(url)`` once published, so callers can reply
+    first and attach the link later.
+    """
 
-        Args:
-            text: Text to format
+    def __init__(
+        self,
+        service: TelegraphService,
+        workers: int = PUBLISH_WORKERS,
+        max_pending: int = PUBLISH_QUEUE_SIZE,
+    ) -> None:
+        self.service = service
+        self.worker_count = workers
+        self._queue: asyncio.Queue[
+            tuple[str, str, asyncio.Future, PublishCallback | None]
+        ] = asyncio.Queue(maxsize=max_pending)
+        self._tasks: list[asyncio.Task] = []
+
+    def _ensure_started(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"telegraph-publisher-{i}")
+                for i in range(self.worker_count)
+            ]
+
+    async def stop(self) -> None:
+        """Cancel workers; queued pages are dropped (callers fall back)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(
+        self,
+        title: str,
+        content: str,
+        on_done: PublishCallback | None = None,
+    ) -> asyncio.Future:
+        """Queue article for publishing.
 
         Returns:
-            Text with HTML inline formatting
+            Future resolving to the Telegraph URL or None on failure
         """
-        # Convert **bold** to <b>bold</b>
-        text = re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", text)
-
-        # Convert *italic* to <i>italic</i>
-        text = re.sub(r"\*(.+?)\*", r"<i>\1</i>", text)
-
-        return text
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((title, content, future, on_done))
+        except asyncio.QueueFull:
+            logger.warning("telegraph_queue_full", title=title)
+            future.set_result(None)
+            if on_done is not None:
+                asyncio.create_task(self._run_callback(on_done, None))
+        return future
+
+    async def _worker(self) -> None:
+        while True:
+            title, content, future, on_done = await self._queue.get()
+            try:
+                url = await self.service.publish_article(title, content)
+                if not future.done():
+                    future.set_result(url)
+                if on_done is not None:
+                    await self._run_callback(on_done, url)
+            finally:
+                if not future.done():
+                    future.set_result(None)
+                self._queue.task_done()
+
+    @staticmethod
+    async def _run_callback(on_done: PublishCallback, url: str | None) -> None:
+        try:
+            await on_done(url)
+        except Exception as e:
+            logger.error("telegraph_publish_callback_error", error=str(e))
 
 
-# Singleton instance
+# Singleton instances
 _telegraph_service: TelegraphService | None = None
+_telegraph_publisher: TelegraphPublisher | None = None
 
 
 def get_telegraph_service() -> TelegraphService:
@@ -236,3 +460,23 @@ def get_telegraph_service() -> TelegraphService:
     if _telegraph_service is None:
         _telegraph_service = TelegraphService()
     return _telegraph_service
+
+
+def get_telegraph_publisher() -> TelegraphPublisher:
+    """Get Telegraph publishing queue instance.
+
+    Returns:
+        TelegraphPublisher singleton instance
+    """
+    global _telegraph_publisher
+    if _telegraph_publisher is None:
+        _telegraph_publisher = TelegraphPublisher(get_telegraph_service())
+    return _telegraph_publisher
+
+
+async def close_telegraph() -> None:
+    """Stop publishing workers and close pooled connections on shutdown."""
+    if _telegraph_publisher is not None:
+        await _telegraph_publisher.stop()
+    if _telegraph_service is not None:
+        await _telegraph_service.close()
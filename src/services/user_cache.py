@@ -0,0 +1,92 @@
+"""Short-TTL in-process cache of User rows for per-update user context.
+
+UserContextMiddleware loads the current User once per Telegram update.
+Repeated interactions within USER_CACHE_TTL are served from a column
+snapshot without a DB round-trip; the snapshot is re-attached to the
+update's session as a persistent object, so handlers can modify and
+commit it as usual.
+
+Invalidation (process-local):
+- ORM writes: any flushed new/dirty/deleted User drops its entry.
+- Bulk UPDATE/DELETE statements on users clear the whole cache.
+Other replicas see changes after at most USER_CACHE_TTL seconds.
+"""
+
+import time
+from typing import Any
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from src.config import settings
+from src.db.models.user import User
+
+_cache: dict[int, tuple[dict[str, Any], float]] = {}
+
+_USER_COLUMNS = [attr.key for attr in inspect(User).column_attrs]
+
+
+def get_cached_user(session: Session, telegram_id: int) -> User | None:
+    """Attach cached User snapshot to session, or None on miss/expiry.
+
+    Args:
+        session: Sync session (AsyncSession.sync_session) to attach to
+        telegram_id: Telegram user ID
+    """
+    ttl = settings.user_cache_ttl
+    if ttl <= 0:
+        return None
+
+    entry = _cache.get(telegram_id)
+    if entry is None:
+        return None
+
+    values, cached_at = entry
+    if time.monotonic() - cached_at >= ttl:
+        _cache.pop(telegram_id, None)
+        return None
+
+    # Already in this session's identity map (e.g. loaded by a job)
+    key = session.identity_key(User, values["id"])
+    existing = session.identity_map.get(key)
+    if existing is not None:
+        return existing
+
+    user = User(**values)
+    make_transient_to_detached(user)
+    session.add(user)
+    return user
+
+
+def cache_user(user: User) -> None:
+    """Store column snapshot of a freshly loaded User."""
+    if settings.user_cache_ttl <= 0:
+        return
+    values = {key: getattr(user, key) for key in _USER_COLUMNS}
+    _cache[user.telegram_id] = (values, time.monotonic())
+
+
+def invalidate_user(telegram_id: int) -> None:
+    """Drop cached entry for user."""
+    _cache.pop(telegram_id, None)
+
+
+def clear_user_cache() -> None:
+    """Drop all cached users."""
+    _cache.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_users(session: Session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User) and obj.telegram_id is not None:
+            _cache.pop(obj.telegram_id, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_write(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is User:
+        _cache.clear()
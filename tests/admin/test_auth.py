@@ -0,0 +1,122 @@
+"""Tests for admin token and state caching."""
+
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from src.admin import auth
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        # Token exp is real wall-clock time
+        self.wall = time.time()
+        self.mono = 1000.0
+
+    def time(self) -> float:
+        return self.wall
+
+    def monotonic(self) -> float:
+        return self.mono
+
+    def advance(self, seconds: float) -> None:
+        self.wall += seconds
+        self.mono += seconds
+
+
+class FakeResult:
+    def __init__(self, row) -> None:
+        self.row = row
+
+    def one_or_none(self):
+        return self.row
+
+    def scalar_one_or_none(self):
+        return self.row.username if self.row is not None else None
+
+
+class FakeSession:
+    """Admins table with one row; update statements bump token_version."""
+
+    def __init__(self) -> None:
+        self.admin = SimpleNamespace(id=1, username="root", is_active=True, token_version=0)
+        self.queries = 0
+
+    async def execute(self, statement) -> FakeResult:
+        if statement.is_update:
+            self.admin.token_version += 1
+        else:
+            self.queries += 1
+        return FakeResult(SimpleNamespace(**vars(self.admin)))
+
+    async def commit(self) -> None:
+        return None
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(auth, "time", clock)
+    monkeypatch.setattr(auth, "_token_claims", {})
+    monkeypatch.setattr(auth, "_admin_states", {})
+    return clock
+
+
+def _token(version: int = 0, minutes: int = 60) -> str:
+    return auth.create_access_token(
+        {"sub": "root", "ver": version}, expires_delta=timedelta(minutes=minutes)
+    )
+
+
+async def test_cached_identity_skips_database(clock):
+    session = FakeSession()
+    token = _token()
+
+    for _ in range(3):
+        admin = await auth.get_current_admin(token, session)
+    assert admin.username == "root"
+    assert session.queries == 1
+
+
+async def test_revoked_version_rejects_cached_token(clock):
+    session = FakeSession()
+    token = _token()
+    await auth.get_current_admin(token, session)
+
+    await auth.revoke_admin_tokens(session, admin_id=1)
+
+    with pytest.raises(HTTPException) as exc:
+        await auth.get_current_admin(token, session)
+    assert exc.value.status_code == 401
+    assert (await auth.get_current_admin(_token(version=1), session)).token_version == 1
+
+
+async def test_deactivated_admin_rejected_after_state_ttl(clock):
+    session = FakeSession()
+    token = _token()
+    await auth.get_current_admin(token, session)
+
+    # Deactivated by another process: served from cache until the TTL passes
+    session.admin.is_active = False
+    await auth.get_current_admin(token, session)
+
+    clock.advance(auth.ADMIN_STATE_TTL)
+    with pytest.raises(HTTPException) as exc:
+        await auth.get_current_admin(token, session)
+    assert exc.value.detail == "Admin account is disabled"
+
+
+async def test_expired_cached_token_rejected(clock):
+    session = FakeSession()
+    token = _token(minutes=1)
+    await auth.get_current_admin(token, session)
+    assert token in auth._token_claims
+
+    clock.advance(61)
+    with pytest.raises(HTTPException) as exc:
+        await auth.get_current_admin(token, session)
+    assert exc.value.status_code == 401
+    assert token not in auth._token_claims
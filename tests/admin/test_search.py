@@ -0,0 +1,26 @@
+"""Tests for admin search cursors and LIKE escaping."""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.admin.services.search import decode_cursor, encode_cursor, ilike_contains
+from src.db.models.tarot_spread import TarotSpread
+
+
+@pytest.mark.parametrize("rank", [0.0, 0.1, 1 / 3, 1e-9])
+def test_cursor_round_trip(rank):
+    assert decode_cursor(encode_cursor(rank, 42)) == (rank, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "abc", "0.5", "0.5:", ":10", "0.5:x"])
+def test_malformed_cursor_raises(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_ilike_contains_escapes_wildcards():
+    compiled = ilike_contains(TarotSpread.question, "50%_off\\").compile(
+        dialect=postgresql.dialect()
+    )
+    assert "ESCAPE '\\'" in str(compiled)
+    assert list(compiled.params.values()) == ["%50\\%\\_off\\\\%"]
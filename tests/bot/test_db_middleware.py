@@ -0,0 +1,93 @@
+"""Tests for UserContextMiddleware user loading and caching."""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.db.models.user import User
+from src.services import user_cache
+
+try:
+    from src.bot.middlewares.db import UserContextMiddleware
+except OSError:  # cairosvg without the native cairo library
+    pytest.skip("bot package needs libcairo", allow_module_level=True)
+
+
+class FakeResult:
+    def __init__(self, user: User | None) -> None:
+        self.user = user
+
+    def scalar_one_or_none(self) -> User | None:
+        return self.user
+
+
+class FakeLazySession:
+    def __init__(self, user: User | None) -> None:
+        self.user = user
+        self.sync_session = Session()
+        self.queries = 0
+        self.releases = 0
+
+    async def execute(self, statement) -> FakeResult:
+        self.queries += 1
+        return FakeResult(self.user)
+
+    async def release(self) -> bool:
+        self.releases += 1
+        return True
+
+
+@pytest.fixture(autouse=True)
+def clean_cache(monkeypatch):
+    monkeypatch.setattr(settings, "user_cache_ttl", 10.0)
+    user_cache.clear_user_cache()
+    yield
+    user_cache.clear_user_cache()
+
+
+async def _run(session: FakeLazySession, telegram_id: int | None = 42) -> User | None:
+    data = {"session": session}
+    if telegram_id is not None:
+        data["event_from_user"] = SimpleNamespace(id=telegram_id)
+
+    async def handler(event, data):
+        return data["db_user"]
+
+    return await UserContextMiddleware()(handler, None, data)
+
+
+async def test_cache_miss_loads_caches_and_releases():
+    session = FakeLazySession(User(id=1, telegram_id=42))
+
+    db_user = await _run(session)
+
+    assert db_user is session.user
+    assert (session.queries, session.releases) == (1, 1)
+    assert 42 in user_cache._cache
+
+
+async def test_cache_hit_skips_query():
+    user_cache.cache_user(User(id=1, telegram_id=42, zodiac_sign="leo"))
+    session = FakeLazySession(None)
+
+    db_user = await _run(session)
+
+    assert db_user.zodiac_sign == "leo"
+    assert db_user in session.sync_session
+    assert (session.queries, session.releases) == (0, 0)
+
+
+async def test_unregistered_user_is_none_and_not_cached():
+    session = FakeLazySession(None)
+
+    assert await _run(session) is None
+    assert user_cache._cache == {}
+
+
+async def test_update_without_user_skips_lookup():
+    session = FakeLazySession(None)
+
+    assert await _run(session, telegram_id=None) is None
+    assert session.queries == 0
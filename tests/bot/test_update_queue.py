@@ -0,0 +1,94 @@
+"""Tests for the webhook update queue: ordering, dedupe and shedding."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from aiogram.types import Chat, Message, Update
+
+try:
+    from src.bot.update_queue import UpdateQueue
+except OSError:  # cairosvg without the native cairo library
+    pytest.skip("bot package needs libcairo", allow_module_level=True)
+
+
+def _update(update_id: int, chat_id: int) -> Update:
+    return Update(
+        update_id=update_id,
+        message=Message(
+            message_id=update_id,
+            date=datetime.now(),
+            chat=Chat(id=chat_id, type="private"),
+            text=str(update_id),
+        ),
+    )
+
+
+class FakeDispatcher:
+    """Records processing order; handlers of a chat can be held open."""
+
+    def __init__(self) -> None:
+        self.started: list[int] = []
+        self.finished: list[int] = []
+        self.gates: dict[int, asyncio.Event] = {}
+
+    async def feed_update(self, bot, update: Update) -> None:
+        self.started.append(update.update_id)
+        gate = self.gates.get(update.update_id)
+        if gate is not None:
+            await gate.wait()
+        await asyncio.sleep(0)
+        self.finished.append(update.update_id)
+
+
+@pytest.fixture
+async def queue_env():
+    dp = FakeDispatcher()
+    queue = UpdateQueue(workers=4, max_pending=3)
+    queue.start(dp, bot=None)
+    yield queue, dp
+    await queue.stop(timeout=1)
+
+
+async def test_updates_of_one_chat_run_in_order(queue_env):
+    queue, dp = queue_env
+    dp.gates[1] = asyncio.Event()
+
+    for update_id, chat_id in [(1, 10), (2, 10), (3, 20)]:
+        assert queue.submit(_update(update_id, chat_id))
+    await asyncio.sleep(0.01)
+
+    # Chat 20 is not blocked by the slow chat 10 handler; update 2 waits
+    assert dp.started == [1, 3]
+    dp.gates[1].set()
+    await asyncio.wait_for(queue._idle.wait(), timeout=1)
+    assert dp.finished.index(1) < dp.finished.index(2)
+
+
+async def test_duplicate_update_is_dropped(queue_env):
+    queue, dp = queue_env
+
+    assert queue.submit(_update(1, 10))
+    # Telegram retry of the same update is acknowledged but not processed
+    assert queue.submit(_update(1, 10))
+    await asyncio.wait_for(queue._idle.wait(), timeout=1)
+
+    assert dp.finished == [1]
+
+
+async def test_full_queue_sheds_updates(queue_env):
+    queue, dp = queue_env
+    dp.gates[1] = asyncio.Event()
+    assert queue.submit(_update(1, 10))
+    await asyncio.sleep(0.01)
+
+    # Update 1 is running; three more fill the queue, the fourth is shed
+    assert all(queue.submit(_update(update_id, 10)) for update_id in (2, 3, 4))
+    assert queue.submit(_update(5, 10)) is False
+    assert queue.size == 3
+
+    dp.gates[1].set()
+    await asyncio.wait_for(queue._idle.wait(), timeout=1)
+    assert dp.finished == [1, 2, 3, 4]
+    # A shed update is not remembered, so Telegram's redelivery is processed
+    assert queue.submit(_update(5, 10))
@@ -0,0 +1,64 @@
+"""Tests for cached timezone resolution and local-to-UTC conversion."""
+
+from datetime import UTC, date, datetime, time
+
+import pytest
+import pytz
+from structlog.testing import capture_logs
+
+from src.core import timezones
+from src.core.timezones import DEFAULT_TIMEZONE, get_zone, local_to_utc
+
+
+@pytest.mark.parametrize(
+    ("zone", "day", "at", "expected"),
+    [
+        # Fall-back: 01:30 happens twice, standard time (second) wins
+        ("America/New_York", date(2026, 11, 1), time(1, 30), datetime(2026, 11, 1, 6, 30)),
+        ("Europe/Berlin", date(2026, 10, 25), time(2, 30), datetime(2026, 10, 25, 1, 30)),
+        # Spring-forward gap: offset before the transition
+        ("America/New_York", date(2026, 3, 8), time(2, 30), datetime(2026, 3, 8, 7, 30)),
+        ("Europe/Berlin", date(2026, 3, 29), time(2, 30), datetime(2026, 3, 29, 1, 30)),
+        # Regular summer and winter times
+        ("Europe/Berlin", date(2026, 7, 1), time(12), datetime(2026, 7, 1, 10)),
+        ("Europe/Berlin", date(2026, 1, 1), time(12), datetime(2026, 1, 1, 11)),
+        (None, date(2026, 1, 1), time(9), datetime(2026, 1, 1, 6)),
+    ],
+)
+def test_local_to_utc_matches_pytz_is_dst_false(zone, day, at, expected):
+    result = local_to_utc(day, at, zone)
+
+    assert result == expected.replace(tzinfo=UTC)
+    localized = pytz.timezone(zone or DEFAULT_TIMEZONE).localize(
+        datetime.combine(day, at), is_dst=False
+    )
+    assert result == localized
+
+
+def test_invalid_zone_falls_back_to_default_and_logs():
+    timezones._load_zone.cache_clear()
+
+    with capture_logs() as logs:
+        zone = get_zone("Mars/Olympus_Mons")
+        # Cached: logged once per name
+        get_zone("Mars/Olympus_Mons")
+
+    assert zone.key == DEFAULT_TIMEZONE
+    assert logs == [
+        {
+            "event": "Unknown timezone, using default",
+            "log_level": "warning",
+            "timezone": "Mars/Olympus_Mons",
+            "default": DEFAULT_TIMEZONE,
+        }
+    ]
+
+
+def test_valid_zone_does_not_log():
+    timezones._load_zone.cache_clear()
+
+    with capture_logs() as logs:
+        zone = get_zone("Asia/Yekaterinburg")
+
+    assert zone.key == "Asia/Yekaterinburg"
+    assert logs == []
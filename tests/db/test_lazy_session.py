@@ -0,0 +1,151 @@
+"""Tests for LazySession creation and connection release."""
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from src.db import lazy_session
+from src.db.lazy_session import LazySession
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Note(Base):
+    __tablename__ = "notes"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    text: Mapped[str]
+
+
+class FakeAsyncSession:
+    """AsyncSession stand-in over a real sync Session (SQLite in memory)."""
+
+    def __init__(self, sync_session: Session) -> None:
+        self.sync_session = sync_session
+        self.commits = 0
+        self.closed = False
+
+    @property
+    def new(self):
+        return self.sync_session.new
+
+    @property
+    def dirty(self):
+        return self.sync_session.dirty
+
+    @property
+    def deleted(self):
+        return self.sync_session.deleted
+
+    def in_transaction(self) -> bool:
+        return self.sync_session.in_transaction()
+
+    def add(self, obj) -> None:
+        self.sync_session.add(obj)
+
+    async def execute(self, statement):
+        return self.sync_session.execute(statement)
+
+    async def flush(self) -> None:
+        self.sync_session.flush()
+
+    async def commit(self) -> None:
+        self.commits += 1
+        self.sync_session.commit()
+
+    async def close(self) -> None:
+        self.closed = True
+        self.sync_session.close()
+
+
+@pytest.fixture
+def factory():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    created: list[FakeAsyncSession] = []
+
+    def make() -> FakeAsyncSession:
+        session = FakeAsyncSession(Session(engine, expire_on_commit=False))
+        created.append(session)
+        return session
+
+    make.created = created
+    yield make
+    engine.dispose()
+
+
+async def test_session_created_on_first_use(factory):
+    lazy = LazySession(factory)
+
+    assert not lazy.is_active
+    assert await lazy.release() is False
+    await lazy.close()
+    assert factory.created == []
+
+    await lazy.execute(select(Note))
+    assert lazy.is_active
+    assert len(factory.created) == 1
+
+
+async def test_release_commits_read_only_transaction(factory):
+    lazy = LazySession(factory)
+    await lazy.execute(select(Note))
+
+    assert await lazy.release() is True
+
+    session = factory.created[0]
+    assert session.commits == 1
+    assert not session.in_transaction()
+    # Nothing left to end
+    assert await lazy.release() is False
+
+
+async def test_release_keeps_unflushed_writes(factory):
+    lazy = LazySession(factory)
+    lazy.add(Note(id=1, text="draft"))
+
+    assert lazy.has_pending_writes()
+    assert await lazy.release() is False
+    assert factory.created[0].commits == 0
+
+
+async def test_release_keeps_flushed_uncommitted_writes(factory):
+    lazy = LazySession(factory)
+    lazy.add(Note(id=1, text="draft"))
+    await lazy.flush()
+
+    # Flushed rows leave session.new empty, the after_flush flag remains
+    assert not lazy.new
+    assert await lazy.release() is False
+
+    await lazy.commit()
+    assert not lazy.has_pending_writes()
+
+
+async def test_loaded_objects_stay_usable_after_release(factory):
+    lazy = LazySession(factory)
+    lazy.add(Note(id=1, text="saved"))
+    await lazy.commit()
+
+    note = (await lazy.execute(select(Note))).scalar_one()
+    await lazy.release()
+
+    assert note.text == "saved"
+
+
+async def test_release_current_session(factory):
+    assert await lazy_session.release_current_session() is False
+
+    lazy = LazySession(factory)
+    token = lazy_session.set_current_session(lazy)
+    try:
+        await lazy.execute(select(Note))
+        assert await lazy_session.release_current_session() is True
+    finally:
+        lazy_session.reset_current_session(token)
+
+    await lazy.close()
+    assert factory.created[0].closed
+    assert not lazy.is_active
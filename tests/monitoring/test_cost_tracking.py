@@ -0,0 +1,18 @@
+"""Tests for cached prompt token extraction from provider usage."""
+
+from types import SimpleNamespace
+
+from src.monitoring.cost_tracking import _cached_tokens
+
+
+def test_cached_tokens_from_usage_details():
+    usage = SimpleNamespace(prompt_tokens_details=SimpleNamespace(cached_tokens=512))
+    assert _cached_tokens(usage) == 512
+    assert _cached_tokens(SimpleNamespace(prompt_tokens_details={"cached_tokens": 256})) == 256
+
+
+def test_cached_tokens_missing_is_zero():
+    assert _cached_tokens(SimpleNamespace()) == 0
+    assert _cached_tokens(SimpleNamespace(prompt_tokens_details=None)) == 0
+    no_cache = SimpleNamespace(prompt_tokens_details=SimpleNamespace(cached_tokens=None))
+    assert _cached_tokens(no_cache) == 0
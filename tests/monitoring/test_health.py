@@ -0,0 +1,84 @@
+"""Tests for the background health monitor snapshot and refresh."""
+
+import asyncio
+
+import pytest
+
+from src.monitoring import health
+from src.monitoring.health import HealthCheckResult, HealthMonitor, HealthSnapshot
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+
+@pytest.fixture
+def checks(monkeypatch):
+    """Replace dependency checks with a gated, counting fake."""
+    state = {"runs": 0, "gate": asyncio.Event(), "healthy": True}
+
+    async def run_all_checks(session):
+        state["runs"] += 1
+        await state["gate"].wait()
+        return state["healthy"], [HealthCheckResult("database", state["healthy"])]
+
+    monkeypatch.setattr(health, "run_all_checks", run_all_checks)
+    monkeypatch.setattr(health, "AsyncSessionLocal", FakeSession)
+    return state
+
+
+def test_starting_before_first_run():
+    body, healthy = HealthMonitor().cached_status()
+
+    assert body == {"status": "starting", "checks": {}}
+    assert healthy is False
+
+
+def test_stale_snapshot_is_unhealthy():
+    monitor = HealthMonitor()
+    monitor.snapshot = HealthSnapshot(True, [HealthCheckResult("database", True)])
+    assert monitor.cached_status()[1] is True
+
+    monitor.snapshot.monotonic -= health.STALE_AFTER + 1
+    body, healthy = monitor.cached_status()
+
+    assert body["status"] == "stale"
+    assert healthy is False
+
+
+async def test_concurrent_refreshes_share_one_run(checks):
+    monitor = HealthMonitor()
+
+    waiters = [asyncio.create_task(monitor.refresh()) for _ in range(3)]
+    await asyncio.sleep(0)
+    checks["gate"].set()
+    snapshots = await asyncio.gather(*waiters)
+
+    assert checks["runs"] == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+    assert monitor.snapshot is snapshots[0]
+    assert monitor.cached_status() == (snapshots[0].to_dict(), True)
+
+    # A finished run is not reused
+    await monitor.refresh()
+    assert checks["runs"] == 2
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_run(checks):
+    monitor = HealthMonitor()
+    checks["healthy"] = False
+
+    first = asyncio.create_task(monitor.refresh())
+    second = asyncio.create_task(monitor.refresh())
+    await asyncio.sleep(0)
+    first.cancel()
+    checks["gate"].set()
+
+    snapshot = await second
+    assert snapshot.healthy is False
+    assert checks["runs"] == 1
+    assert monitor.cached_status()[1] is False
@@ -0,0 +1,32 @@
+"""Tests for provider prompt-cache breakpoints in AI requests."""
+
+from src.services.ai.client import _with_cache_breakpoint
+
+MESSAGES = [
+    {"role": "system", "content": "instructions and chart"},
+    {"role": "user", "content": "question"},
+]
+
+
+def test_system_prompt_marked_for_explicit_cache_providers():
+    for model in ("google/gemini-2.0-flash-001", "anthropic/claude-3.5-haiku"):
+        marked = _with_cache_breakpoint(model, MESSAGES)
+        assert marked[0] == {
+            "role": "system",
+            "content": [
+                {
+                    "type": "text",
+                    "text": "instructions and chart",
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ],
+        }
+        assert marked[1:] == MESSAGES[1:]
+    # Input is not modified (it is also used for token estimates)
+    assert MESSAGES[0]["content"] == "instructions and chart"
+
+
+def test_automatic_cache_providers_unchanged():
+    assert _with_cache_breakpoint("openai/gpt-4o-mini", MESSAGES) is MESSAGES
+    user_only = MESSAGES[1:]
+    assert _with_cache_breakpoint("google/gemini-2.0-flash-001", user_only) is user_only
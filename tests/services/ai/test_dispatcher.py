@@ -0,0 +1,80 @@
+"""Tests for LLM dispatcher priority admission."""
+
+import asyncio
+
+from src.services.ai.dispatcher import Lane, LLMDispatcher, current_lane, llm_lane
+
+
+def _dispatcher(max_concurrency: int = 2, tokens_per_minute: int = 1_000_000) -> LLMDispatcher:
+    return LLMDispatcher(
+        max_concurrency=max_concurrency,
+        tokens_per_minute=tokens_per_minute,
+        requests_per_minute=60_000,
+    )
+
+
+async def test_waiters_served_by_lane_priority():
+    """Freed slots go to interactive first, then report, then batch."""
+    dispatcher = _dispatcher(max_concurrency=2)
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def call(name: str, lane: Lane) -> None:
+        async with dispatcher.slot("model", 10, lane=lane):
+            order.append(name)
+            await release.wait()
+
+    # Fill both slots (batch may take only half of them: 1)
+    holders = [
+        asyncio.create_task(call("interactive-0", Lane.INTERACTIVE)),
+        asyncio.create_task(call("batch-0", Lane.BATCH)),
+    ]
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.create_task(call("batch-1", Lane.BATCH)),
+        asyncio.create_task(call("report-1", Lane.REPORT)),
+        asyncio.create_task(call("interactive-1", Lane.INTERACTIVE)),
+    ]
+    await asyncio.sleep(0.01)
+    assert dispatcher.queued == 3
+
+    release.set()
+    await asyncio.gather(*holders, *waiters)
+    assert order == ["interactive-0", "batch-0", "interactive-1", "report-1", "batch-1"]
+
+
+async def test_batch_leaves_budget_for_interactive():
+    """Batch lane stops short of the reserved token budget."""
+    dispatcher = _dispatcher(max_concurrency=10, tokens_per_minute=1000)
+
+    async with dispatcher.slot("model", 600, lane=Lane.BATCH):
+        batch = asyncio.create_task(_enter(dispatcher, 200, Lane.BATCH))
+        await asyncio.sleep(0.01)
+        assert not batch.done()
+
+        # Interactive may use the reserve
+        async with dispatcher.slot("model", 300, lane=Lane.INTERACTIVE) as grant:
+            grant.settle(50)
+        batch.cancel()
+
+
+async def test_oversized_batch_request_is_admitted():
+    """An estimate above the lane's budget is clamped instead of waiting forever."""
+    dispatcher = _dispatcher(max_concurrency=10, tokens_per_minute=1000)
+
+    async with dispatcher.slot("model", 5000, lane=Lane.BATCH) as grant:
+        assert grant.reserved == 700
+        # Reserve stays available to interactive requests
+        await asyncio.wait_for(_enter(dispatcher, 300, Lane.INTERACTIVE), timeout=1)
+
+
+async def _enter(dispatcher: LLMDispatcher, tokens: int, lane: Lane) -> None:
+    async with dispatcher.slot("model", tokens, lane=lane):
+        pass
+
+
+def test_lane_context():
+    assert current_lane() is Lane.INTERACTIVE
+    with llm_lane(Lane.BATCH):
+        assert current_lane() is Lane.BATCH
+    assert current_lane() is Lane.INTERACTIVE
@@ -0,0 +1,117 @@
+"""Tests for compact chart encoding and prompt token budgets."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.ai import prompt_budget
+from src.services.ai.chart_encoding import encode_chart, fit_chart
+from src.services.ai.prompt_budget import count_tokens, fit_history
+from src.services.astrology.transits import natal_house
+
+
+def _cusp(cusp: float) -> dict:
+    return {"cusp": cusp, "sign": "Aries", "sign_ru": "Овен"}
+
+
+def _natal(aspect_count: int, time_known: bool = True) -> dict:
+    return {
+        "planets": {
+            "sun": {"longitude": 12.0, "sign": "Aries", "sign_ru": "Овен", "degree": 12.0},
+            "moon": {"longitude": 95.0, "sign": "Cancer", "sign_ru": "Рак", "degree": 5.0},
+        },
+        # Equal houses starting at 300°, house 2 ends at 0° Aries
+        "houses": {num: _cusp((300 + 30 * (num - 1)) % 360) for num in range(1, 13)},
+        "angles": {
+            "ascendant": {
+                "longitude": 300.0, "sign": "Aquarius", "sign_ru": "Водолей", "degree": 0.0
+            },
+            "mc": {"longitude": 210.0, "sign": "Scorpio", "sign_ru": "Скорпион", "degree": 0.0},
+        },
+        "aspects": [
+            {
+                "planet1": "sun",
+                "planet1_ru": "Солнце",
+                "planet2": "moon",
+                "planet2_ru": "Луна",
+                "aspect": "Square",
+                "aspect_ru": "квадрат",
+                "orb": 0.5 * (i + 1),
+            }
+            for i in range(aspect_count)
+        ],
+        "time_known": time_known,
+    }
+
+
+def test_natal_house_wraps_at_zero_aries():
+    houses = _natal(0)["houses"]
+    assert natal_house(310.0, houses) == 1
+    assert natal_house(345.0, houses) == 2
+    assert natal_house(12.0, houses) == 3
+    assert natal_house(95.0, houses) == 6
+
+
+def test_chart_omits_houses_without_birth_time():
+    known = encode_chart(_natal(1))
+    assert "Солнце Овен 12° д3" in known
+    assert "Асц Водолей 0°" in known
+
+    unknown = encode_chart(_natal(1, time_known=False))
+    assert "Солнце Овен 12°\n" in unknown
+    assert "д3" not in unknown
+    assert "Асц Водолей" not in unknown
+
+
+def test_fit_chart_drops_widest_aspects():
+    natal = _natal(20)
+    full = encode_chart(natal)
+    budget = count_tokens(encode_chart(natal, max_aspects=3))
+
+    fitted = fit_chart(natal, budget)
+    assert count_tokens(fitted) <= budget < count_tokens(full)
+    assert "0.5" in fitted and "1.5" in fitted
+    assert "2.0" not in fitted
+
+
+def test_fit_history_keeps_recent_turns_starting_with_user():
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i} " * 20}
+        for i in range(6)
+    ]
+    assert fit_history(history, 10_000) == history
+
+    # Room for three messages: the oldest kept would be an assistant reply
+    budget = sum(count_tokens(message["content"]) + 4 for message in history[-3:])
+    assert fit_history(history, budget) == history[-2:]
+    assert fit_history(history, 0) == []
+
+
+async def test_encoding_loaded_once_at_startup(monkeypatch):
+    calls: list[str] = []
+
+    def get_encoding(name: str):
+        calls.append(name)
+        return SimpleNamespace(encode=lambda text, disallowed_special: text.split())
+
+    monkeypatch.setattr(prompt_budget, "tiktoken", SimpleNamespace(get_encoding=get_encoding))
+    monkeypatch.setattr(prompt_budget, "_encoding", None)
+    # Character estimate until the encoding is loaded
+    assert count_tokens("one two three") == 5
+
+    await prompt_budget.load_encoding()
+    await prompt_budget.load_encoding()
+    assert calls == ["o200k_base"]
+    assert count_tokens("one two three") == 3
+
+
+async def test_real_encoder_counts_tokens(monkeypatch):
+    monkeypatch.setattr(prompt_budget, "_encoding", None)
+    await prompt_budget.load_encoding()
+    if prompt_budget._encoding is None:
+        pytest.skip("o200k_base encoding file is not available offline")
+
+    assert count_tokens("hello world") == 2
+    # Cyrillic text is denser than the 3-chars-per-token estimate
+    text = "Солнце в Овне дает тебе энергию первопроходца"
+    assert count_tokens(text) < -(-len(text) // 3)
@@ -0,0 +1,70 @@
+"""Tests for the content-addressed LLM response cache."""
+
+import asyncio
+
+from src.services.ai.response_cache import ResponseCache, response_key
+
+
+def test_key_covers_prompt_and_params():
+    key = response_key("model", "system", "user", max_tokens=800, temperature=0.8)
+    assert key == response_key("model", "system", "user", temperature=0.8, max_tokens=800)
+    assert key != response_key("model", "system", "user", max_tokens=801, temperature=0.8)
+    assert key != response_key("other", "system", "user", max_tokens=800, temperature=0.8)
+
+
+def test_pool_fills_before_serving_variants():
+    cache = ResponseCache(variants=2)
+    key = response_key("model", "system", "user")
+
+    assert cache.get(key) is None
+    cache.add(key, "first")
+    assert cache.get(key) is None  # pool still filling
+    cache.add(key, "second")
+    cache.add(key, "third")  # pool full, ignored
+
+    assert {cache.get(key) for _ in range(50)} == {"first", "second"}
+
+
+def test_expired_and_evicted_pools_miss():
+    cache = ResponseCache(variants=1, max_keys=2)
+    cache.add("expired", "text", ttl=0)
+    assert cache.get("expired") is None
+
+    cache.add("a", "a")
+    cache.add("b", "b")
+    cache.add("c", "c")
+    assert len(cache) == 2
+    assert cache.get("a") is None and cache.get("c") == "c"
+
+
+async def test_concurrent_misses_share_one_generation():
+    cache = ResponseCache(variants=3)
+    key = response_key("model", "system", "user")
+    calls = 0
+    release = asyncio.Event()
+
+    async def generate() -> str:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return f"text {calls}"
+
+    callers = [asyncio.create_task(cache.get_or_generate(key, generate)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*callers) == ["text 1"] * 5
+    assert calls == 1
+    # Next miss generates another variant
+    assert await cache.get_or_generate(key, generate) == "text 2"
+
+
+async def test_failed_generation_is_not_cached():
+    cache = ResponseCache(variants=1)
+    key = response_key("model", "system", "user")
+
+    async def fail() -> None:
+        return None
+
+    assert await cache.get_or_generate(key, fail) is None
+    assert len(cache) == 0
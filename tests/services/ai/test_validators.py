@@ -1,7 +1,14 @@
 """Tests for AI output validators."""
 
+import re
 
-from src.services.ai.validators import validate_natal_chart
+from src.services.ai import validators
+from src.services.ai.validators import (
+    FORBIDDEN_PATTERNS,
+    NATAL_CHART_RULES,
+    collect_violations,
+    validate_natal_chart,
+)
 
 
 def test_validate_natal_chart_valid():
@@ -119,3 +126,46 @@ def test_validate_natal_chart_ai_pattern():
     is_valid, error = validate_natal_chart(ai_text)
     assert is_valid is False
     assert "AI" in error or "не могу" in error.lower()
+
+
+def test_collect_violations_reports_all():
+    """All structural violations are reported in one pass, in check order."""
+    text = "Извините, но я не могу. " * 5
+
+    violations = collect_violations(text, NATAL_CHART_RULES)
+
+    assert len(violations) == 3
+    assert "короткая" in violations[0]
+    assert "найдено 0/5" in violations[1]
+    assert "AI" in violations[2]
+
+
+def test_forbidden_patterns_merged_into_one_pattern():
+    """All FORBIDDEN_PATTERNS are one case-sensitive alternation."""
+    pattern = validators._FORBIDDEN_RE
+
+    assert isinstance(pattern, re.Pattern)
+    assert not pattern.flags & re.IGNORECASE
+    for source in FORBIDDEN_PATTERNS:
+        assert f"(?:{source.removeprefix('(?i)').lower()})" in pattern.pattern
+
+
+def test_validation_scans_text_once_with_precompiled_pattern(monkeypatch):
+    """One search per validation; nothing is compiled at call time."""
+    searched: list[str] = []
+    compiled = validators._FORBIDDEN_RE
+
+    class CountingPattern:
+        def search(self, text: str):
+            searched.append(text)
+            return compiled.search(text)
+
+    monkeypatch.setattr(validators, "_FORBIDDEN_RE", CountingPattern())
+    # Any re.compile/re.search during validation would fail here
+    monkeypatch.setattr(validators, "re", None)
+    text = "Как языковая модель, Я НЕ МОГУ предсказать будущее. " * 50
+
+    violations = collect_violations(text, NATAL_CHART_RULES)
+
+    assert validators.FORBIDDEN_MESSAGE in violations
+    assert searched == [text.lower()]
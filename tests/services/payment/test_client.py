@@ -0,0 +1,96 @@
+"""Tests for the async YooKassa client retry and error handling."""
+
+import json
+
+import httpx
+import pytest
+
+from src.services.payment import client
+from src.services.payment.client import YooKassaClient, YooKassaError
+
+PAYMENT = {"id": "pay-1", "status": "succeeded", "paid": True}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(client, "BACKOFF_BASE", 0)
+
+
+def _client(responses: list) -> tuple[YooKassaClient, list[httpx.Request]]:
+    """Client whose transport replays ``responses`` (Response or exception)."""
+    requests: list[httpx.Request] = []
+    replies = iter(responses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        reply = next(replies)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    return YooKassaClient("shop", "secret", transport=httpx.MockTransport(handler)), requests
+
+
+@pytest.mark.parametrize("status_code", [429, 500, 503])
+async def test_retries_rate_limit_and_server_errors(status_code):
+    yookassa, requests = _client(
+        [httpx.Response(status_code), httpx.Response(200, json=PAYMENT)]
+    )
+
+    payment = await yookassa.get_payment("pay-1")
+
+    assert payment.id == "pay-1"
+    assert payment.paid
+    assert len(requests) == 2
+
+
+async def test_retries_transport_errors_then_gives_up():
+    yookassa, requests = _client(
+        [httpx.ConnectError("connection refused")] * client.MAX_ATTEMPTS
+    )
+
+    with pytest.raises(YooKassaError, match="network error") as exc_info:
+        await yookassa.get_payment("pay-1")
+
+    assert exc_info.value.status_code is None
+    assert len(requests) == client.MAX_ATTEMPTS
+
+
+async def test_client_error_raised_without_retry():
+    body = {"code": "invalid_request", "description": "Bad amount", "parameter": "amount"}
+    yookassa, requests = _client([httpx.Response(400, json=body)])
+
+    with pytest.raises(YooKassaError) as exc_info:
+        await yookassa.create_payment({"amount": {}}, idempotency_key="key-1")
+
+    error = exc_info.value
+    assert error.status_code == 400
+    assert (error.code, error.description, error.parameter) == (
+        "invalid_request",
+        "Bad amount",
+        "amount",
+    )
+    assert len(requests) == 1
+
+
+async def test_idempotence_key_sent_on_every_attempt():
+    yookassa, requests = _client(
+        [httpx.Response(502), httpx.Response(200, json={**PAYMENT, "status": "pending"})]
+    )
+
+    await yookassa.create_payment({"amount": {"value": "299.00"}}, idempotency_key="renewal-7")
+
+    assert [request.headers["Idempotence-Key"] for request in requests] == [
+        "renewal-7",
+        "renewal-7",
+    ]
+    assert json.loads(requests[0].content) == {"amount": {"value": "299.00"}}
+    assert requests[0].url.path == "/v3/payments"
+
+
+async def test_get_request_has_no_idempotence_key():
+    yookassa, requests = _client([httpx.Response(200, json=PAYMENT)])
+
+    await yookassa.get_payment("pay-1")
+
+    assert "Idempotence-Key" not in requests[0].headers
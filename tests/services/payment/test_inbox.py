@@ -0,0 +1,190 @@
+"""Tests for the payment webhook inbox: claiming, lease expiry, duplicates."""
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.config import settings
+from src.services.payment import client, inbox, service
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class FakeResult:
+    def __init__(self, value) -> None:
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class ClaimSession:
+    """Session for claim_event: returns a fixed row id for the SELECT."""
+
+    def __init__(self, event_id: int | None) -> None:
+        self.event_id = event_id
+        self.statements: list = []
+        self.committed = False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.event_id)
+
+    async def commit(self) -> None:
+        self.committed = True
+
+
+class PaymentsTable:
+    """In-memory payments table honouring the conditional webhook claim."""
+
+    def __init__(self) -> None:
+        self.processed: set[str] = set()
+
+
+class PaymentSession:
+    """Session for process_webhook_event backed by a shared PaymentsTable.
+
+    ``get`` never sees committed rows, mimicking two deliveries that both
+    pass the cheap duplicate check before either has committed.
+    """
+
+    def __init__(self, table: PaymentsTable) -> None:
+        self.table = table
+        self.rolled_back = False
+
+    async def get(self, model, key):
+        return None
+
+    async def execute(self, statement):
+        sql = _sql(statement)
+        if sql.startswith(("INSERT INTO payments", "UPDATE payments")):
+            params = statement.compile().params
+            payment_id = params.get("id") or params["id_1"]
+            if payment_id in self.table.processed:
+                return FakeResult(None)
+            self.table.processed.add(payment_id)
+            return FakeResult(payment_id)
+        # User lookup
+        return FakeResult(None)
+
+    async def commit(self) -> None:
+        return None
+
+    async def rollback(self) -> None:
+        self.rolled_back = True
+
+
+def _succeeded_event(payment_id: str = "pay-1") -> dict:
+    return {
+        "event": "payment.succeeded",
+        "object": {
+            "id": payment_id,
+            "status": "succeeded",
+            "amount": {"value": "299.00"},
+            "metadata": {"user_id": "42", "plan_type": "monthly"},
+        },
+    }
+
+
+@pytest.fixture
+def activations(monkeypatch):
+    activated: list[int] = []
+
+    async def activate_subscription(session, user_telegram_id, plan, **kwargs):
+        activated.append(user_telegram_id)
+
+    monkeypatch.setattr(service, "activate_subscription", activate_subscription)
+    # Skip API verification
+    monkeypatch.setattr(settings, "yookassa_shop_id", "")
+    return activated
+
+
+async def test_claim_event_takes_one_row_and_starts_lease():
+    session = ClaimSession(event_id=7)
+
+    assert await inbox.claim_event(session) == 7
+
+    select_stmt, update_stmt = session.statements
+    select_sql = _sql(select_stmt)
+    assert "LIMIT" in select_sql
+    assert select_stmt.compile().params["param_1"] == 1
+    assert "FOR UPDATE SKIP LOCKED" in select_sql
+    params = update_stmt.compile().params
+    assert params["status"] == "processing"
+    assert abs(params["locked_at"] - datetime.now(UTC)) < timedelta(minutes=1)
+    assert session.committed
+
+
+async def test_claim_event_without_due_rows():
+    session = ClaimSession(event_id=None)
+
+    assert await inbox.claim_event(session) is None
+    # Nothing to mark as processing
+    assert len(session.statements) == 1
+
+
+async def test_claim_event_reclaims_rows_after_lease_expiry():
+    session = ClaimSession(event_id=None)
+
+    await inbox.claim_event(session)
+
+    (select_stmt,) = session.statements
+    params = select_stmt.compile().params
+    assert params["status_2"] == "processing"
+    # Processing rows are reclaimable once locked_at is older than the lease
+    expected = datetime.now(UTC) - inbox.PROCESSING_LEASE
+    assert abs(params["locked_at_1"] - expected) < timedelta(minutes=1)
+
+
+def test_processing_lease_outlives_one_event():
+    timeout = client.REQUEST_TIMEOUT
+    backoff = sum(
+        min(client.BACKOFF_MAX, client.BACKOFF_BASE * 2 ** (attempt - 1)) * 1.5
+        for attempt in range(1, client.MAX_ATTEMPTS)
+    )
+    worst_case = client.MAX_ATTEMPTS * (timeout.connect + timeout.read) + backoff
+
+    assert inbox.PROCESSING_LEASE > timedelta(seconds=worst_case)
+
+
+async def test_duplicate_delivery_is_processed_once(activations):
+    table = PaymentsTable()
+    first, second = PaymentSession(table), PaymentSession(table)
+
+    assert await service.process_webhook_event(first, _succeeded_event()) is True
+    assert await service.process_webhook_event(second, _succeeded_event()) is False
+
+    assert activations == [42]
+    assert second.rolled_back
+
+
+async def test_canceled_duplicate_is_skipped(activations, monkeypatch):
+    table = PaymentsTable()
+    table.processed.add("pay-1")
+    session = PaymentSession(table)
+
+    async def get(model, key):
+        return SimpleNamespace(webhook_processed=False)
+
+    monkeypatch.setattr(session, "get", get)
+    event = {"event": "payment.canceled", "object": {"id": "pay-1"}}
+
+    assert await service.process_webhook_event(session, event) is False
+    assert session.rolled_back
+
+
+async def test_webhook_claim_only_matches_unprocessed_rows():
+    session = ClaimSession(event_id=None)
+
+    await service._claim_webhook(session, "pay-1", {"status": "succeeded"}, create={"amount": 1})
+    await service._claim_webhook(session, "pay-1", {"status": "canceled"})
+
+    upsert_sql, update_sql = map(_sql, session.statements)
+    assert "ON CONFLICT (id) DO UPDATE" in upsert_sql
+    assert "WHERE payments.webhook_processed IS false" in upsert_sql
+    assert "payments.webhook_processed IS false" in update_sql
+    assert "RETURNING payments.id" in update_sql
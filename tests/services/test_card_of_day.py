@@ -0,0 +1,149 @@
+"""Tests for card of day variant assignment and pool filling."""
+
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.config import settings
+from src.services import card_of_day
+from src.services.card_of_day import variant_for
+
+
+def test_variant_stable_per_user_and_day():
+    day = date(2026, 10, 19)
+    assert variant_for(42, day) == variant_for(42, day)
+    assert all(
+        0 <= variant_for(user_id, day) < settings.card_of_day_pool_size for user_id in range(100)
+    )
+
+
+def test_variants_spread_across_users():
+    day = date(2026, 10, 19)
+    assert {variant_for(user_id, day) for user_id in range(100)} == set(
+        range(settings.card_of_day_pool_size)
+    )
+
+
+class FakePoolTable:
+    """card_of_day_interpretations with its unique (card, reversed, date, variant) key."""
+
+    def __init__(self) -> None:
+        self.rows: dict[tuple, str] = {}
+        self.fail_writes = False
+
+
+class FakeSession:
+    def __init__(self, table: FakePoolTable) -> None:
+        self.table = table
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    async def execute(self, statement):
+        params = statement.compile().params
+        if "content" in params:
+            if self.table.fail_writes:
+                raise ConnectionError("database unavailable")
+            key = (params["card_id"], params["is_reversed"], params["pool_date"], params["variant"])
+            # ON CONFLICT DO NOTHING
+            self.table.rows.setdefault(key, params["content"])
+            return None
+        rows = [key[:2] + key[3:] for key in self.table.rows if key[2] == params["pool_date_1"]]
+        return SimpleNamespace(tuples=lambda: rows)
+
+    async def scalar(self, statement) -> str | None:
+        params = statement.compile().params
+        # Boolean comparisons compile to literal true/false, not a bind param
+        is_reversed = "is_reversed = true" in str(statement)
+        key = (params["card_id_1"], is_reversed, params["pool_date_1"], params["variant_1"])
+        return self.table.rows.get(key)
+
+    async def commit(self) -> None:
+        return None
+
+
+class FakeAIService:
+    def __init__(self) -> None:
+        self.interpreted: list[tuple[str, bool]] = []
+
+    async def generate_card_of_day(self, user_id, card, is_reversed):
+        return f"{card['name_short']} для {user_id}"
+
+    async def interpret_card_of_day(self, card, is_reversed):
+        self.interpreted.append((card["name_short"], is_reversed))
+        return f"{card['name_short']} {'rev' if is_reversed else 'up'}"
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    table = FakePoolTable()
+    ai_service = FakeAIService()
+    monkeypatch.setattr(card_of_day, "async_session_maker", lambda: FakeSession(table))
+    monkeypatch.setattr(card_of_day, "get_ai_service", lambda: ai_service)
+    return SimpleNamespace(table=table, ai=ai_service)
+
+
+DAY = date(2026, 10, 19)
+
+
+async def test_store_first_writer_wins(pool):
+    first = await card_of_day._store("ar01", False, DAY, 2, "первый")
+    second = await card_of_day._store("ar01", False, DAY, 2, "второй")
+
+    assert (first, second) == ("первый", "первый")
+    assert pool.table.rows == {("ar01", False, DAY, 2): "первый"}
+
+
+async def test_generate_interpretation_fills_users_slot(pool):
+    card = {"name_short": "ar01"}
+
+    text = await card_of_day.generate_interpretation(42, card, True, DAY)
+
+    assert text == "ar01 для 42"
+    assert pool.table.rows == {("ar01", True, DAY, variant_for(42, DAY)): "ar01 для 42"}
+
+
+async def test_generate_interpretation_returns_concurrent_winner(pool):
+    card = {"name_short": "ar01"}
+    pool.table.rows[("ar01", True, DAY, variant_for(42, DAY))] = "уже в пуле"
+
+    assert await card_of_day.generate_interpretation(42, card, True, DAY) == "уже в пуле"
+
+
+async def test_generate_interpretation_survives_store_failure(pool):
+    pool.table.fail_writes = True
+
+    text = await card_of_day.generate_interpretation(42, {"name_short": "ar01"}, False, DAY)
+
+    assert text == "ar01 для 42"
+    assert pool.table.rows == {}
+
+
+async def test_fill_pool_skips_existing_slots(pool, monkeypatch):
+    monkeypatch.setattr(settings, "card_of_day_pool_size", 2)
+    monkeypatch.setattr(card_of_day, "get_deck", lambda: [{"name_short": "ar01"}, {"name_short": "ar02"}])
+    pool.table.rows[("ar01", False, DAY, 0)] = "готово"
+    pool.table.rows[("ar02", True, DAY, 1)] = "готово"
+    # Another day's pool does not count
+    pool.table.rows[("ar01", True, DAY - timedelta(days=1), 0)] = "вчера"
+
+    generated, failed = await card_of_day.fill_card_of_day_pool(DAY)
+
+    assert (generated, failed) == (6, 0)
+    assert sorted(pool.ai.interpreted) == [
+        ("ar01", False),
+        ("ar01", True),
+        ("ar01", True),
+        ("ar02", False),
+        ("ar02", False),
+        ("ar02", True),
+    ]
+    assert pool.table.rows[("ar01", False, DAY, 0)] == "готово"
+    assert len([key for key in pool.table.rows if key[2] == DAY]) == 8
+
+    # A full pool generates nothing
+    assert await card_of_day.fill_card_of_day_pool(DAY) == (0, 0)
@@ -0,0 +1,82 @@
+"""Tests for the local GeoNames city index and local-first geocoding."""
+
+import pytest
+
+from src.services.astrology.city_index import load_city_index
+from src.services.astrology.geocoding import CityResult, GeocodingService
+
+
+def _row(geonameid, name, alternates, lat, lon, country, population, tz):
+    cols = [
+        str(geonameid), name, name, ",".join(alternates), str(lat), str(lon),
+        "P", "PPLC", country, "", "", "", "", "", str(population), "", "0", tz, "2024-01-01",
+    ]
+    return "\t".join(cols)
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "cities.txt"
+    path.write_text(
+        "\n".join(
+            [
+                _row(524901, "Moscow", ["Moskva", "Москва"], 55.75, 37.62, "RU", 10381222, "Europe/Moscow"),
+                _row(4400648, "Moscow", [], 46.73, -117.0, "US", 25000, "America/Los_Angeles"),
+                _row(498817, "Saint Petersburg", ["Санкт-Петербург"], 59.94, 30.31, "RU", 5351935, "Europe/Moscow"),
+                _row(1486209, "Yekaterinburg", ["Екатеринбург"], 56.85, 60.61, "RU", 1495066, "Asia/Yekaterinburg"),
+                _row(472045, "Oryol", ["Орёл"], 52.97, 36.07, "RU", 317854, "Europe/Moscow"),
+            ]
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    return load_city_index(path)
+
+
+def test_exact_match_ranked_by_population(index):
+    results = index.search("moscow")
+    assert [c.country_code for c in results] == ["RU", "US"]
+    assert results[0].timezone == "Europe/Moscow"
+
+
+def test_cyrillic_and_transliteration(index):
+    assert index.search("Москва")[0].label(cyrillic=True) == "Москва, Россия"
+    assert index.search("moskva")[0].country_code == "RU"
+    # ё folds to е, hyphen folds to space
+    assert index.search("Орел")[0].name == "Oryol"
+    assert index.search("санкт петербург")[0].name == "Saint Petersburg"
+
+
+def test_prefix_match(index):
+    assert [c.name for c in index.search("екатер")] == ["Yekaterinburg"]
+    assert index.search("мо", limit=5) == []
+    assert index.search("unknown city") == []
+
+
+def test_has_exact_ignores_prefix_hits(index):
+    assert index.has_exact("Москва")
+    assert index.has_exact("moskva")
+    assert not index.has_exact("екатер")
+
+
+async def test_prefix_hits_merged_with_remote(index, monkeypatch):
+    service = GeocodingService(username="test")
+    service._index = index
+    service._index_loaded = True
+
+    # Small town missing from cities15000 shares a prefix with Yekaterinburg
+    town = CityResult("Ekaterinovka, RU", 52.05, 44.34, "Europe/Saratov")
+    remote_calls = []
+
+    async def search_remote(query, max_results):
+        remote_calls.append(query)
+        return [town]
+
+    monkeypatch.setattr(service, "_search_remote", search_remote)
+
+    results = await service.search_city("Екатер")
+    assert [city.name for city in results] == ["Ekaterinovka, RU", "Екатеринбург, Россия"]
+
+    # Exact names are still answered locally
+    assert (await service.search_city("Москва"))[0].timezone == "Europe/Moscow"
+    assert remote_calls == ["Екатер"]
@@ -0,0 +1,125 @@
+"""Tests for advisory-lock leader election."""
+
+import asyncio
+
+from src.services.leader import LeaderElection
+
+
+class FakeLockServer:
+    """Session-level advisory locks shared by fake connections."""
+
+    def __init__(self) -> None:
+        self.holders: dict[int, "FakeConnection"] = {}
+
+
+class FakeConnection:
+    def __init__(self, server: FakeLockServer) -> None:
+        self.server = server
+        self.closed = False
+
+    async def execution_options(self, **kwargs):
+        return self
+
+    async def scalar(self, statement, params=None):
+        sql = str(statement)
+        if "pg_try_advisory_lock" in sql:
+            holder = self.server.holders.get(params["key"])
+            if holder is None or holder.closed:
+                self.server.holders[params["key"]] = self
+                return True
+            return holder is self
+        if "pg_locks" in sql:
+            return sum(1 for holder in self.server.holders.values() if holder is self)
+        raise AssertionError(sql)
+
+    async def execute(self, statement, params=None):
+        if "pg_advisory_unlock" in str(statement):
+            if self.server.holders.get(params["key"]) is self:
+                del self.server.holders[params["key"]]
+
+    async def close(self) -> None:
+        self.closed = True
+        self.server.holders = {k: c for k, c in self.server.holders.items() if c is not self}
+
+
+class FakeEngine:
+    def __init__(self, server: FakeLockServer) -> None:
+        self.server = server
+
+    async def connect(self) -> FakeConnection:
+        return FakeConnection(self.server)
+
+
+def _election(server: FakeLockServer, events: list[str], name: str) -> LeaderElection:
+    async def on_elected() -> None:
+        events.append(f"{name}:elected")
+
+    async def on_demoted() -> None:
+        events.append(f"{name}:demoted")
+
+    return LeaderElection(
+        name=name,
+        lock_key=1,
+        on_elected=on_elected,
+        on_demoted=on_demoted,
+        retry_interval=0.01,
+        renew_interval=0.01,
+        engine=FakeEngine(server),
+    )
+
+
+async def test_single_leader_and_failover():
+    """Only one process leads; the other takes over once the leader stops."""
+    server = FakeLockServer()
+    events: list[str] = []
+    first = _election(server, events, "a")
+    second = _election(server, events, "b")
+
+    first.start()
+    await asyncio.sleep(0.05)
+    second.start()
+    await asyncio.sleep(0.05)
+    assert first.has_lease and not second.is_leader
+
+    await first.stop()
+    await asyncio.sleep(0.05)
+    assert second.has_lease
+    assert events == ["a:elected", "a:demoted", "b:elected"]
+    await second.stop()
+
+
+async def test_leader_steps_down_when_lock_lost():
+    """A failed lease renewal demotes the leader and drops its lease."""
+    server = FakeLockServer()
+    events: list[str] = []
+    election = _election(server, events, "a")
+    election.start()
+    await asyncio.sleep(0.05)
+    assert election.has_lease
+
+    # Session terminated server-side and another process took the lock
+    server.holders[1] = FakeConnection(server)
+    await asyncio.sleep(0.05)
+
+    assert not election.is_leader and not election.has_lease
+    assert events == ["a:elected", "a:demoted"]
+    await election.stop()
+
+
+async def test_elected_hook_failure_keeps_leadership():
+    """Hooks run once per election; a failing hook does not demote."""
+    server = FakeLockServer()
+    events: list[str] = []
+    election = _election(server, events, "a")
+
+    async def failing_hook() -> None:
+        events.append("a:hook")
+        raise RuntimeError("telegram unavailable")
+
+    election.add_elected_hook(failing_hook)
+    election.start()
+    await asyncio.sleep(0.05)
+
+    assert election.has_lease
+    assert events == ["a:elected", "a:hook"]
+    await election.stop()
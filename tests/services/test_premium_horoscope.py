@@ -0,0 +1,165 @@
+"""Tests for premium horoscope precompute scheduling."""
+
+import threading
+from datetime import UTC, date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.services import premium_horoscope
+from src.services.premium_horoscope import due_slots, notification_due
+
+
+def test_due_within_horizon():
+    # 06:15 Moscow (UTC+3) -> 09:00 notification is 2h45m away
+    now = datetime(2026, 10, 19, 3, 15, tzinfo=UTC)
+    assert notification_due("Europe/Moscow", 9, now) == date(2026, 10, 19)
+    assert notification_due("Europe/Moscow", 10, now) is None
+    assert notification_due("Europe/Moscow", 6, now) is None  # already passed
+
+
+def test_due_next_local_day():
+    # 22:15 Moscow: midnight notification belongs to tomorrow
+    now = datetime(2026, 10, 19, 19, 15, tzinfo=UTC)
+    assert notification_due("Europe/Moscow", 0, now) == date(2026, 10, 20)
+    # Same instant is already Oct 20 in Vladivostok (UTC+10)
+    assert notification_due("Asia/Vladivostok", 7, now) == date(2026, 10, 20)
+
+
+def test_horizon_is_configurable():
+    now = datetime(2026, 10, 19, 3, 15, tzinfo=UTC)
+    assert notification_due("Europe/Moscow", 9, now, horizon=timedelta(hours=1)) is None
+
+
+def test_due_slots_per_timezone_and_hour():
+    now = datetime(2026, 10, 19, 3, 15, tzinfo=UTC)
+
+    slots = due_slots([None, "Asia/Vladivostok"], now)
+
+    # 06:15 Moscow and 13:15 Vladivostok: the next three whole hours
+    today = date(2026, 10, 19)
+    assert slots == {
+        ("", 7): today,
+        ("", 8): today,
+        ("", 9): today,
+        ("Asia/Vladivostok", 14): today,
+        ("Asia/Vladivostok", 15): today,
+        ("Asia/Vladivostok", 16): today,
+    }
+
+
+def _user(user_id: int, hour: int | None = 9) -> SimpleNamespace:
+    return SimpleNamespace(id=user_id, telegram_id=1000 + user_id, timezone=None, notification_hour=hour)
+
+
+class FakeResult:
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self) -> list:
+        return self.rows
+
+    def tuples(self) -> list:
+        return self.rows
+
+
+class FakeSession:
+    """Serves the timezone, user page and stored-horoscope queries."""
+
+    def __init__(self, env: SimpleNamespace) -> None:
+        self.env = env
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    async def execute(self, statement) -> FakeResult:
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        if sql.startswith("SELECT DISTINCT users.timezone"):
+            return FakeResult([None])
+        if "FROM premium_horoscopes" in sql:
+            return FakeResult(self.env.stored)
+        self.env.user_queries.append(sql)
+        last_id = statement.compile().params["id_1"]
+        users = [u for u in self.env.users if u.id > last_id]
+        return FakeResult(users[: premium_horoscope.USER_PAGE_SIZE])
+
+
+@pytest.fixture
+def precompute_env(monkeypatch):
+    env = SimpleNamespace(users=[], stored=[], user_queries=[], generated=[])
+
+    async def generate_and_store(user, day):
+        env.generated.append((user.id, day))
+        return True
+
+    monkeypatch.setattr(premium_horoscope, "async_session_maker", lambda: FakeSession(env))
+    monkeypatch.setattr(premium_horoscope, "_generate_and_store", generate_and_store)
+    monkeypatch.setattr(premium_horoscope, "USER_PAGE_SIZE", 2)
+    return env
+
+
+async def test_precompute_pages_due_users(precompute_env):
+    now = datetime(2026, 10, 19, 3, 15, tzinfo=UTC)
+    today = date(2026, 10, 19)
+    precompute_env.users = [_user(1), _user(2), _user(3, hour=None), _user(4, hour=8)]
+    precompute_env.stored = [(2, today)]
+
+    generated, failed = await premium_horoscope.precompute_premium_horoscopes(now)
+
+    assert (generated, failed) == (3, 0)
+    assert precompute_env.generated == [(1, today), (3, today), (4, today)]
+    # Two full keyset pages, then an empty one; the due slot filter runs in SQL
+    assert len(precompute_env.user_queries) == 3
+    sql = precompute_env.user_queries[0]
+    assert "(coalesce(users.timezone, " in sql
+    assert "coalesce(nullif(users.notification_hour, " in sql
+    assert "ORDER BY users.id" in sql
+
+
+async def test_precompute_nothing_due(precompute_env, monkeypatch):
+    monkeypatch.setattr(premium_horoscope, "due_slots", lambda timezones, now: {})
+
+    assert await premium_horoscope.precompute_premium_horoscopes() == (0, 0)
+    assert precompute_env.user_queries == []
+
+
+async def test_natal_chart_calculated_off_event_loop(monkeypatch):
+    try:
+        import src.bot.utils.zodiac  # noqa: F401
+    except OSError:  # cairosvg without the native cairo library
+        pytest.skip("bot package needs libcairo")
+
+    threads = []
+
+    def calculate_full_natal_chart(**kwargs):
+        threads.append(threading.current_thread())
+        return {}
+
+    async def generate_premium_horoscope(**kwargs):
+        return None
+
+    monkeypatch.setattr(premium_horoscope, "calculate_full_natal_chart", calculate_full_natal_chart)
+    monkeypatch.setattr(
+        premium_horoscope,
+        "get_ai_service",
+        lambda: SimpleNamespace(generate_premium_horoscope=generate_premium_horoscope),
+    )
+    user = SimpleNamespace(
+        zodiac_sign="Aries",
+        birth_date=date(1990, 4, 1),
+        birth_time=None,
+        birth_lat=55.75,
+        birth_lon=37.62,
+        timezone=None,
+        telegram_id=1,
+    )
+
+    assert await premium_horoscope._generate_and_store(user, date(2026, 10, 19)) is False
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,160 @@
+"""Tests for subscription auto-renewal runs."""
+
+import sys
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import src.db.engine
+import src.services.payment
+from src.services import scheduler
+from src.services.payment import YooKassaError
+
+
+class FakeLeader:
+    def __init__(self) -> None:
+        self.has_lease = True
+
+
+class FakeSession:
+    def __init__(self, updates: list) -> None:
+        self.updates = updates
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    async def execute(self, statement) -> None:
+        self.updates.append(statement)
+
+    async def commit(self) -> None:
+        return None
+
+
+class FakeBot:
+    def __init__(self) -> None:
+        self.sent: list[tuple[int, str]] = []
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        self.sent.append((chat_id, text))
+
+
+def _row(subscription_id: int) -> tuple:
+    period_end = datetime.now(UTC) + timedelta(days=1, hours=1)
+    subscription = SimpleNamespace(
+        id=subscription_id,
+        plan="monthly",
+        payment_method_id="pm",
+        current_period_end=period_end,
+    )
+    user = SimpleNamespace(id=subscription_id, telegram_id=1000 + subscription_id)
+    return (subscription, user)
+
+
+@pytest.fixture
+def renewal_env(monkeypatch):
+    leader = FakeLeader()
+    env = SimpleNamespace(
+        leader=leader,
+        pages=[],
+        lose_lease_after=None,
+        charged=[],
+        updates=[],
+        requeued=[],
+        statements=[],
+        bot=FakeBot(),
+    )
+
+    async def iter_pages(build_stmt):
+        env.statements.append(build_stmt())
+        for number, page in enumerate(env.pages):
+            if number == env.lose_lease_after:
+                leader.has_lease = False
+            yield page
+
+    async def create_recurring_payment(subscription_id, **kwargs):
+        env.charged.append(subscription_id)
+        return SimpleNamespace(status="pending")
+
+    monkeypatch.setattr(scheduler, "get_scheduler_leader", lambda: leader)
+    monkeypatch.setattr(scheduler, "_iter_subscription_pages", iter_pages)
+    monkeypatch.setattr(scheduler, "_requeue_job", lambda job, *args: env.requeued.append(job))
+    monkeypatch.setattr(src.services.payment, "create_recurring_payment", create_recurring_payment)
+    monkeypatch.setattr(src.db.engine, "async_session_maker", lambda: FakeSession(env.updates))
+    # Fake bot module: jobs import get_bot lazily
+    monkeypatch.setitem(sys.modules, "src.bot.bot", SimpleNamespace(get_bot=lambda: env.bot))
+    return env
+
+
+async def test_auto_renew_stops_when_lease_lost_between_pages(renewal_env):
+    renewal_env.pages = [[_row(1), _row(2)], [_row(3), _row(4)]]
+    # Lock lost while the first page was being charged
+    renewal_env.lose_lease_after = 1
+
+    await scheduler.auto_renew_subscriptions()
+
+    assert renewal_env.charged == [1, 2]
+    # Run continues on the next leader instead of waiting a day
+    assert renewal_env.requeued == [scheduler.auto_renew_subscriptions]
+
+
+async def test_skipped_job_is_requeued(renewal_env):
+    renewal_env.leader.has_lease = False
+
+    await scheduler.auto_renew_subscriptions()
+
+    assert renewal_env.charged == []
+    assert renewal_env.requeued == [scheduler.auto_renew_subscriptions]
+
+
+async def test_auto_renew_picks_up_unattempted_ended_periods(renewal_env):
+    await scheduler.auto_renew_subscriptions()
+
+    (statement,) = renewal_env.statements
+    params = statement.compile().params
+    # Lower bound on current_period_end reaches back RENEWAL_GRACE
+    lower = min(value for value in params.values() if isinstance(value, datetime))
+    expected = datetime.now(UTC) - scheduler.RENEWAL_GRACE
+    assert abs(lower - expected) < timedelta(minutes=1)
+
+
+@pytest.mark.parametrize(
+    ("error", "declined"),
+    [
+        (YooKassaError("card expired", status_code=400), True),
+        (YooKassaError("network error"), False),
+        (YooKassaError("service unavailable", status_code=503), False),
+        (YooKassaError("too many requests", status_code=429), False),
+    ],
+)
+async def test_auto_renew_checkpoints_only_declines(renewal_env, monkeypatch, error, declined):
+    async def create_recurring_payment(subscription_id, **kwargs):
+        raise error
+
+    monkeypatch.setattr(src.services.payment, "create_recurring_payment", create_recurring_payment)
+    renewal_env.pages = [[_row(1)]]
+
+    await scheduler.auto_renew_subscriptions()
+
+    # Transient errors leave renewal_attempted_for unset for the next run
+    assert bool(renewal_env.updates) is declined
+    assert bool(renewal_env.bot.sent) is declined
+
+
+def test_requeue_adds_one_shot_job(monkeypatch):
+    added = []
+    fake = SimpleNamespace(add_job=lambda job, trigger, **kwargs: added.append((job, trigger, kwargs)))
+    monkeypatch.setattr(scheduler, "get_scheduler", lambda: fake)
+
+    scheduler._requeue_job(scheduler.send_daily_horoscope, 42, "aries")
+
+    ((job, trigger, kwargs),) = added
+    assert job is scheduler.send_daily_horoscope
+    assert trigger == "date"
+    assert kwargs["id"] == "send_daily_horoscope:requeued:42:aries"
+    assert kwargs["args"] == (42, "aries")
+    assert kwargs["replace_existing"] is True
+    assert kwargs["run_date"] > datetime.now(UTC)
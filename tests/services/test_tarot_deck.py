@@ -0,0 +1,32 @@
+"""Tests for the tarot deck index."""
+
+import pytest
+
+from src.services.tarot_deck import load_tarot_deck
+
+
+@pytest.fixture(scope="module")
+def deck():
+    return load_tarot_deck()
+
+
+def test_deck_indexed_by_name_short(deck):
+    assert len(deck) == 78
+    for card in deck:
+        assert deck.get(card["name_short"]) is card
+    assert deck.get("unknown") is None
+
+
+def test_deck_is_immutable(deck):
+    with pytest.raises(TypeError):
+        deck.get("ar01")["name"] = "Changed"
+
+
+def test_card_text_preformatted(deck):
+    card = deck.get("ar01")
+    text = deck.text("ar01")
+    assert text.label == (card["name"], f"{card['name']} (перевернутая)")
+    assert text.prompt_label[True] == f"{card['name']} (перевернута)"
+    assert text.meaning[False] == card["meaning_up"]
+    assert text.meaning[True] == card["meaning_rev"]
+    assert text.type_ru == "Старший Аркан"
@@ -0,0 +1,153 @@
+"""Tests for tarot history keyset paging and the history counter."""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.elements import BinaryExpression
+
+from src.db.models.user import User
+
+try:
+    from src.bot.callbacks.tarot import HistoryAction, HistoryCallback
+    from src.bot.handlers import tarot
+    from src.bot.keyboards.tarot import get_history_keyboard
+except OSError:  # cairosvg without the native cairo library
+    pytest.skip("bot package needs libcairo", allow_module_level=True)
+
+
+def _rows(ids: list[int]) -> list[SimpleNamespace]:
+    start = datetime(2026, 1, 1)
+    return [
+        SimpleNamespace(
+            id=spread_id,
+            created_at=start + timedelta(hours=spread_id),
+            spread_type="three_card",
+            question=f"вопрос {spread_id}",
+        )
+        for spread_id in ids
+    ]
+
+
+def _nav(markup) -> dict[HistoryAction, HistoryCallback]:
+    callbacks = [
+        HistoryCallback.unpack(button.callback_data)
+        for row in markup.inline_keyboard
+        for button in row
+        if button.callback_data.startswith("h:")
+    ]
+    return {cb.a: cb for cb in callbacks if cb.a != HistoryAction.VIEW}
+
+
+class FakeResult:
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+
+    def all(self) -> list:
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+        self.statements: list = []
+        self.added: list = []
+        self.commits = 0
+
+    async def execute(self, statement) -> FakeResult:
+        self.statements.append(statement)
+        return FakeResult(self.rows)
+
+    def add(self, obj) -> None:
+        self.added.append(obj)
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+class FakeMessage:
+    def __init__(self) -> None:
+        self.edits: list[tuple[str, object]] = []
+
+    async def edit_text(self, text: str, reply_markup=None) -> None:
+        self.edits.append((text, reply_markup))
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_keyboard_anchors_on_first_and_last_spread():
+    markup = get_history_keyboard(_rows([20, 19, 18]), page=1, total_pages=3, offset=5)
+
+    nav = _nav(markup)
+
+    # Back pages from the newest spread shown, forward from the oldest
+    assert (nav[HistoryAction.PAGE_BACK].i, nav[HistoryAction.PAGE_BACK].p) == (20, 0)
+    assert (nav[HistoryAction.PAGE].i, nav[HistoryAction.PAGE].p) == (18, 2)
+
+
+def test_keyboard_edges_have_one_direction():
+    first = _nav(get_history_keyboard(_rows([5, 4]), page=0, total_pages=2))
+    last = _nav(get_history_keyboard(_rows([3, 2]), page=1, total_pages=2))
+
+    assert set(first) == {HistoryAction.PAGE}
+    assert set(last) == {HistoryAction.PAGE_BACK}
+
+
+async def test_page_back_loads_newer_spreads_in_display_order():
+    # Query returns the page ascending (closest to the anchor first)
+    session = FakeSession(_rows([11, 12, 13, 14, 15]))
+    callback = SimpleNamespace(message=FakeMessage())
+    user = SimpleNamespace(id=1, tarot_history_count=12)
+
+    await tarot.show_history_page(callback, session, user, page=1, anchor_id=10, backward=True)
+
+    sql = _sql(session.statements[0])
+    assert "(tarot_spreads.created_at, tarot_spreads.id) > (" in sql
+    assert "ORDER BY tarot_spreads.created_at, tarot_spreads.id" in sql
+    ((text, markup),) = callback.message.edits
+    assert "Страница 2/3" in text
+    nav = _nav(markup)
+    # Shown newest first, so the anchors are the page's edges
+    assert nav[HistoryAction.PAGE_BACK].i == 15
+    assert nav[HistoryAction.PAGE].i == 11
+
+
+async def test_page_forward_loads_older_spreads():
+    session = FakeSession(_rows([9, 8, 7, 6, 5]))
+    callback = SimpleNamespace(message=FakeMessage())
+    user = SimpleNamespace(id=1, tarot_history_count=12)
+
+    await tarot.show_history_page(callback, session, user, page=1, anchor_id=10)
+
+    sql = _sql(session.statements[0])
+    assert "(tarot_spreads.created_at, tarot_spreads.id) < (" in sql
+    assert "ORDER BY tarot_spreads.created_at DESC, tarot_spreads.id DESC" in sql
+    assert "OFFSET" not in sql
+
+
+async def test_empty_history_skips_query():
+    session = FakeSession([])
+    callback = SimpleNamespace(message=FakeMessage())
+    user = SimpleNamespace(id=1, tarot_history_count=0)
+
+    await tarot.show_history_page(callback, session, user, page=0)
+
+    assert session.statements == []
+    assert "нет сохраненных раскладов" in callback.message.edits[0][0]
+
+
+async def test_saving_spread_increments_counter_in_sql():
+    session = FakeSession([])
+    user = User(id=1, telegram_id=42, tarot_history_count=3)
+    cards = [({"name_short": "ar01"}, False)]
+
+    await tarot.save_spread_to_history(session, user, "three_card", "вопрос", cards, None)
+
+    # Server-side increment, not a read-modify-write of a possibly stale value
+    assert isinstance(user.tarot_history_count, BinaryExpression)
+    assert str(user.tarot_history_count) == "users.tarot_history_count + :tarot_history_count_1"
+    assert len(session.added) == 1
+    assert session.commits == 1
@@ -0,0 +1,122 @@
+"""Tests for Telegraph content formatting."""
+
+import json
+from itertools import pairwise
+
+from src.services.telegraph import (
+    MAX_PAGE_CONTENT_BYTES,
+    TelegraphError,
+    TelegraphService,
+    format_nodes,
+    split_pages,
+)
+
+
+def _detailed_report(words: int) -> str:
+    """Realistic detailed natal report: emoji headers, bold, lists, paragraphs."""
+    sentence = (
+        "Солнце в **Овне** дает тебе энергию первопроходца, а Луна в *Раке* "
+        "делает тебя эмоционально чувствительным и заботливым к близким."
+    )
+    per_sentence = len(sentence.split())
+    blocks = []
+    section = 0
+    while sum(len(b.split()) for b in blocks) < words:
+        section += 1
+        blocks.append(f"🌟 РАЗДЕЛ {section}")
+        blocks.append("\n".join([sentence] * 4))
+        blocks.append(f"- Совет {section}: доверяй **интуиции**")
+        blocks.append("\n".join([sentence] * (200 // per_sentence)))
+    return "\n\n".join(blocks)
+
+
+def test_format_nodes_structure():
+    """Headers, inline markup, lists and paragraphs map to Telegraph nodes."""
+    content = "🌟 БОЛЬШАЯ ТРОЙКА\nСолнце в **Овне** и *Луна*\nвторая строка\n\n- пункт\n[ИТОГ]"
+
+    nodes = format_nodes(content)
+
+    assert nodes == [
+        {"tag": "h3", "children": ["🌟 БОЛЬШАЯ ТРОЙКА"]},
+        {
+            "tag": "p",
+            "children": [
+                "Солнце в ",
+                {"tag": "b", "children": ["Овне"]},
+                " и ",
+                {"tag": "i", "children": ["Луна"]},
+                " ",
+                "вторая строка",
+            ],
+        },
+        {"tag": "p", "children": ["• ", "пункт"]},
+        {"tag": "h3", "children": ["ИТОГ"]},
+    ]
+
+
+def test_split_pages_respects_size_limit():
+    """Large documents are split into pages within Telegraph's size limit."""
+    nodes = format_nodes(_detailed_report(30000))
+
+    pages = split_pages(nodes)
+
+    assert len(pages) > 1
+    assert sum(len(page) for page in pages) == len(nodes)
+    for page in pages:
+        assert len(json.dumps(page, ensure_ascii=False).encode()) <= MAX_PAGE_CONTENT_BYTES
+
+
+def _page_bytes(page: list) -> int:
+    return len(json.dumps(page, ensure_ascii=False).encode())
+
+
+def test_long_report_nodes_and_page_splits():
+    """Every section maps to four nodes; pages are filled greedily."""
+    report = _detailed_report(5000)
+    sections = report.count("🌟 РАЗДЕЛ")
+
+    nodes = format_nodes(report)
+    pages = split_pages(nodes, max_bytes=4000)
+
+    assert len(nodes) == 4 * sections
+    for number, start in enumerate(range(0, len(nodes), 4), start=1):
+        header, text, advice, tail = nodes[start : start + 4]
+        assert header == {"tag": "h3", "children": [f"🌟 РАЗДЕЛ {number}"]}
+        assert text["children"][1] == {"tag": "b", "children": ["Овне"]}
+        assert advice["children"][0] == "• "
+        assert tail["tag"] == "p"
+
+    assert len(pages) > 1
+    assert [node for page in pages for node in page] == nodes
+    for page, next_page in pairwise(pages):
+        assert _page_bytes(page) <= 4000
+        # The next node would not have fit: no page is split early
+        assert _page_bytes([*page, next_page[0]]) > 4000
+    assert _page_bytes(pages[-1]) <= 4000
+
+
+async def test_invalid_token_replaces_account_and_retries(monkeypatch):
+    service = TelegraphService()
+    tokens = iter(["revoked", "fresh"])
+    discarded: list[str] = []
+    used: list[str] = []
+
+    async def ensure_account() -> str:
+        return next(tokens)
+
+    async def discard_token(token: str) -> None:
+        discarded.append(token)
+
+    async def call(method: str, **params: str) -> dict:
+        used.append(params["access_token"])
+        if params["access_token"] == "revoked":
+            raise TelegraphError("ACCESS_TOKEN_INVALID")
+        return {"url": "https://telegra.ph/page"}
+
+    monkeypatch.setattr(service, "_ensure_account", ensure_account)
+    monkeypatch.setattr(service, "_discard_token", discard_token)
+    monkeypatch.setattr(service, "_call", call)
+
+    assert await service.publish_article("Title", "text") == "https://telegra.ph/page"
+    assert discarded == ["revoked"]
+    assert used == ["revoked", "fresh"]
@@ -0,0 +1,92 @@
+"""Tests for the short-TTL User snapshot cache."""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.db.models.user import User
+from src.services import user_cache
+
+
+@pytest.fixture(autouse=True)
+def clean_cache(monkeypatch):
+    monkeypatch.setattr(settings, "user_cache_ttl", 10.0)
+    user_cache.clear_user_cache()
+    yield
+    user_cache.clear_user_cache()
+
+
+def _user(telegram_id: int = 42) -> User:
+    return User(id=telegram_id + 1000, telegram_id=telegram_id, zodiac_sign="aries")
+
+
+def test_snapshot_reattached_as_persistent():
+    user_cache.cache_user(_user())
+    session = Session()
+
+    user = user_cache.get_cached_user(session, 42)
+
+    assert user is not None
+    assert (user.id, user.zodiac_sign) == (1042, "aries")
+    # Attached via make_transient_to_detached: persistent, not pending
+    state = inspect(user)
+    assert state.persistent
+    assert user in session
+    assert not session.new
+
+
+def test_existing_identity_is_reused():
+    user_cache.cache_user(_user())
+    session = Session()
+
+    first = user_cache.get_cached_user(session, 42)
+
+    assert user_cache.get_cached_user(session, 42) is first
+
+
+def test_snapshot_expires_after_ttl(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(user_cache.time, "monotonic", lambda: clock.now)
+    user_cache.cache_user(_user())
+
+    clock.now += settings.user_cache_ttl - 1
+    assert user_cache.get_cached_user(Session(), 42) is not None
+
+    clock.now += 1
+    assert user_cache.get_cached_user(Session(), 42) is None
+    assert 42 not in user_cache._cache
+
+
+def test_zero_ttl_disables_cache(monkeypatch):
+    monkeypatch.setattr(settings, "user_cache_ttl", 0)
+
+    user_cache.cache_user(_user())
+
+    assert user_cache.get_cached_user(Session(), 42) is None
+
+
+def test_flushed_user_invalidated():
+    user_cache.cache_user(_user(42))
+    user_cache.cache_user(_user(43))
+    flushed = SimpleNamespace(new=[], dirty=[_user(42)], deleted=[])
+
+    user_cache._invalidate_flushed_users(flushed, None)
+
+    assert set(user_cache._cache) == {43}
+
+
+def test_bulk_user_update_clears_cache():
+    user_cache.cache_user(_user(42))
+    user_cache.cache_user(_user(43))
+    state = SimpleNamespace(
+        is_update=True,
+        is_delete=False,
+        bind_mapper=inspect(User),
+    )
+
+    user_cache._invalidate_on_bulk_write(state)
+
+    assert user_cache._cache == {}